@@ -1,9 +1,15 @@
 import streamlit as st
 from dotenv import load_dotenv
 from src.utils import load_sample_call, load_file, list_files, get_next_id, save_bulk_summary, load_chat_history, save_chat_history, add_footer
-from src.summarizer import summarize_call, load_prompt
+from src.summarizer import summarize_call, load_prompt, build_bulk_chat_messages
 from src.logger import logger
 from src.config import Config
+from src.chat_history import ChatHistoryManager
+from src.context_serializer import build_summaries_context, format_context_stats
+from src.context_budget import count_tokens
+from src.map_reduce_chat import MapReduceChat, format_map_reduce_stats, needs_map_reduce
+from src.llm_usage import format_usage, log_usage
+from src.streaming import StreamRenderer, format_stream_stats, iter_openai_text
 import openai
 import os
 import pandas as pd
@@ -422,6 +428,8 @@ with col3:
         # Initialize chat history
         if "messages" not in st.session_state:
             st.session_state.messages = load_chat_history()
+        if "chat_history_manager" not in st.session_state:
+            st.session_state.chat_history_manager = ChatHistoryManager()
         
         # Check if summaries exist
         if "bulk_summaries" not in st.session_state or not st.session_state.bulk_summaries:
@@ -459,8 +467,9 @@ with col3:
                     st.markdown(user_input)
                     st.caption(f"🕐 {user_timestamp}")
                 
-                # Prepare summaries context
-                summaries_context = json.dumps(st.session_state.bulk_summaries, indent=2)
+                # Prepare summaries context (CHAT_CONTEXT_FORMAT; the default table is the same for every question)
+                summaries_context, context_stats = build_summaries_context(
+                    st.session_state.bulk_summaries, user_input, model=model_choice)
                 
                 # Load chat prompts
                 chat_system_prompt = load_prompt('chat_system_prompt.txt')
@@ -476,56 +485,63 @@ with col3:
                         
                         response_start = time.time()
                         
-                        # Format user prompt with summaries
-                        formatted_user_prompt = chat_user_prompt.replace('{{PASTE ENTIRE SUMMARY HERE}}', summaries_context) if chat_user_prompt else summaries_context
+                        # Recent conversation turns verbatim within the token budget (excluding current message);
+                        # older turns are sent as a rolling summary that is updated in the background
+                        history_manager = st.session_state.chat_history_manager
+                        history_manager.model = model_choice
+                        chat_history = history_manager.build_history(st.session_state.messages[:-1])
                         
-                        # Combine all prompts
-                        full_system_prompt = f"{chat_system_prompt}\n\n{formatted_user_prompt}\n\n{chat_guardrail_prompt}" if chat_system_prompt and chat_guardrail_prompt else chat_system_prompt
-                        
-                        # Build complete message history with conversation context
-                        messages = [{"role": "system", "content": full_system_prompt}]
-                        
-                        # Add ALL previous conversation messages for full context (excluding current message)
-                        # This allows the LLM to understand the conversation flow and reference previous exchanges
-                        for msg in st.session_state.messages[:-1]:
-                            # Clean message - only include role and content
-                            clean_msg = {"role": msg["role"], "content": msg["content"]}
-                            messages.append(clean_msg)
-                        
-                        # Add the current user message at the end
-                        messages.append({"role": "user", "content": user_input})
+                        # Static prompts and the summaries snapshot form a stable prefix (provider prompt caching);
+                        # history and the current question come last
+                        messages = build_bulk_chat_messages(user_input, chat_history, summaries_context,
+                                                            chat_system_prompt, chat_user_prompt, chat_guardrail_prompt)
                         
                         logger.debug(f"Chat with {len(messages)-2} previous messages in conversation history")
                         
                         # Display assistant message container with streaming
                         response_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                         with st.chat_message("assistant"):
-                            message_placeholder = st.empty()
-                            full_response = ""
+                            renderer = StreamRenderer(st.empty(), model=model_choice, start_time=response_start)
                             
-                            # Stream the response
-                            response_start_stream = time.time()
-                            stream = openai.chat.completions.create(
-                                model=model_choice,
-                                messages=messages,
-                                temperature=st.session_state.temperature,
-                                max_tokens=st.session_state.max_tokens,
-                                stream=True
-                            )
-                            
-                            for chunk in stream:
-                                if chunk.choices[0].delta.content is not None:
-                                    full_response += chunk.choices[0].delta.content
-                                    message_placeholder.markdown(full_response + "▌")
+                            base_system_prompt = f"{chat_system_prompt}\n\n{chat_guardrail_prompt}" if chat_system_prompt and chat_guardrail_prompt else chat_system_prompt
+                            prompt_tokens = (count_tokens(base_system_prompt, model_choice) + count_tokens(chat_user_prompt, model_choice)
+                                             + sum(count_tokens(msg["content"], model_choice) for msg in messages[1:]))
+                            map_reduce = None
+                            usage = {}
+                            if needs_map_reduce(context_stats["tokens"], model_choice, st.session_state.max_tokens, prompt_tokens):
+                                # Too many summaries for one request: answer per batch, then stream the combined answer
+                                map_reduce = MapReduceChat(st.session_state.openai_api_key, model_choice,
+                                                           st.session_state.temperature, st.session_state.max_tokens)
+                                batches = map_reduce.build_batches(st.session_state.bulk_summaries, user_input,
+                                                                   base_system_prompt, chat_history)
+                                with st.spinner(f"Answering over {len(batches)} batches of summaries..."):
+                                    partials = map_reduce.map(user_input, batches, base_system_prompt, chat_history)
+                                stream = map_reduce.reduce_stream(user_input, partials, base_system_prompt, chat_history,
+                                                                  len(st.session_state.bulk_summaries))
+                            else:
+                                completion = openai.chat.completions.create(
+                                    model=model_choice,
+                                    messages=messages,
+                                    temperature=st.session_state.temperature,
+                                    max_tokens=st.session_state.max_tokens,
+                                    stream=True,
+                                    stream_options={"include_usage": True}
+                                )
+                                stream = iter_openai_text(completion, usage)
                             
-                            # Final response without cursor
-                            message_placeholder.markdown(full_response)
+                            # Stream the response (redrawn in coalesced batches, not per token)
+                            full_response = renderer.render(stream)
+                            usage_counts = log_usage("Popover chat", usage["usage"], model_choice) if usage.get("usage") else {}
                             
                             # Calculate response time
                             response_time = time.time() - response_start
                             
-                            # Display timestamp and response time
-                            st.caption(f"🕐 {response_timestamp} | ⏱️ Response time: {response_time:.2f}s")
+                            # Display timestamp, response time, time to first token, throughput and prompt cache hits
+                            st.caption(f"🕐 {response_timestamp} | ⏱️ Response time: {response_time:.2f}s"
+                                       f"{format_stream_stats(renderer.get_stats())}{format_usage(usage_counts)}")
+                            st.caption(format_context_stats(context_stats))
+                            if map_reduce:
+                                st.caption(format_map_reduce_stats(map_reduce.stats))
                         
                         # Add to history
                         st.session_state.messages.append({
@@ -534,6 +550,7 @@ with col3:
                             "timestamp": response_timestamp,
                             "response_time": response_time
                         })
+                        history_manager.schedule_summary(st.session_state.messages)
                         
                         # Save history
                         #save_chat_history(st.session_state.messages)
@@ -551,6 +568,7 @@ with col3:
                 if st.button("🗑️ Clear", key="clear_chat", width="stretch"):
                     st.session_state.messages = []
                     save_chat_history([])
+                    st.session_state.chat_history_manager.reset()
                     st.rerun()
             
             with col2:
@@ -14,16 +14,29 @@ import shutil
 from datetime import datetime
 from src.utils import (
     save_bulk_summary,
+    get_summaries_version,
     get_next_id,
     load_bulk_summary_chat_history,
     save_bulk_summary_chat_history,
     add_footer,
 )
 from src.logger import logger
-from src.summarizer import chat_with_bulk_summaries, load_prompt
+from src.summarizer import build_bulk_chat_messages, chat_with_bulk_summaries, load_prompt
 from src.plotter import detect_chart_request, generate_chart
-from src.rag_chat import RAGChatbot
+from src.chart_specs import build_chart_spec, export_chart_png
+from src.chart_dashboard import build_dashboard_specs, format_dashboard_stats, generate_dashboard
+from src.rag_chat import get_shared_chatbot, reset_shared_chatbots
+from src.vector_store import VectorStoreManager, get_embeddings
+from src.index_worker import get_index_worker
 from src.config import Config, get_retriever_k
+from src.answer_cache import compute_prompt_hash, get_answer_cache, history_for_cache, stream_cached_answer
+from src.chat_history import ChatHistoryManager
+from src.context_serializer import build_summaries_context, format_context_stats
+from src.context_budget import count_tokens
+from src.map_reduce_chat import MapReduceChat, format_map_reduce_stats, needs_map_reduce
+from src.llm_usage import format_usage, log_usage
+from src.streaming import StreamRenderer, format_stream_stats, iter_openai_text
+from src.summary_store import FILTER_COLUMNS, SORT_COLUMNS, get_summaries, get_summary_store
 
 
 def _handle_clear_vector_store() -> None:
@@ -34,17 +47,13 @@ def _handle_clear_vector_store() -> None:
             logger.info("🗑️  VECTOR STORE CLEAR INITIATED BY USER")
             logger.info("=" * 70)
 
-            # Verify RAG chatbot exists in session state
-            if "rag_chatbot" not in st.session_state:
-                logger.error("❌ No RAG chatbot in session state. Cannot clear.")
-                st.error("❌ RAG chatbot not initialized. Please refresh the page.")
-                return
-
-            rag_chatbot = st.session_state.rag_chatbot
-            vector_path = rag_chatbot.vector_store_manager.vector_store_path
+            # The index is shared by all sessions, so clear it on disk and drop the shared chatbots
+            vector_store_manager = VectorStoreManager()
+            vector_path = vector_store_manager.vector_store_path
 
             # Call clear_vector_store on the manager
-            if rag_chatbot.vector_store_manager.clear_vector_store():
+            if vector_store_manager.clear_vector_store():
+                reset_shared_chatbots()
                 logger.info("✅ Vector store deletion confirmed by manager")
 
                 # Verify directory is actually gone
@@ -63,8 +72,6 @@ def _handle_clear_vector_store() -> None:
 
                 # Clear all related session state
                 logger.info("Clearing related session state...")
-                if "rag_chatbot" in st.session_state:
-                    del st.session_state.rag_chatbot
                 st.session_state.rag_chat_history = []
                 st.session_state.vector_reload_status = None
                 # Set flag to prevent re-initialization on next render
@@ -108,23 +115,83 @@ def export_chat_history_to_csv(messages):
     df = pd.DataFrame(chat_data)
     return df.to_csv(index=False).encode("utf-8")
 
-def load_summaries(file_path):
-    """Load summaries from a JSON file."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            summaries = json.load(f)
-            logger.debug(f"Loaded {len(summaries)} summaries from {file_path}")
-            return summaries
-    except FileNotFoundError:
-        logger.error(f"Summaries file not found: {file_path}")
-        return []
-    except json.JSONDecodeError:
-        logger.error(f"Error decoding JSON from file: {file_path}")
-        return []
-
-def format_summaries_for_context(summaries: list) -> str:
-    """Format summaries into JSON format for the LLM context."""
-    return json.dumps(summaries, indent=2)
+def _format_answer_cache_stats(stats: dict) -> str:
+    """Format answer cache statistics for a caption."""
+    return (f"⚡ Answer cache: {stats['hit_rate']:.0%} hit rate ({stats['hits']}/{stats['lookups']} questions) | "
+            f"{stats['entries']} cached answers, {stats['stale_entries']} stale | "
+            f"{stats['stale_evictions']} invalidated by data changes | avg age served {stats['avg_served_age_seconds']:.0f}s")
+
+
+def _get_standard_answer_cache():
+    """Return the shared answer cache for the standard chat, or None if disabled."""
+    if not Config.ANSWER_CACHE_ENABLED:
+        return None
+    return get_answer_cache(f"standard:{Config.EMBEDDING_MODEL}")
+
+
+def _create_chart(chart_type: str, summaries: list):
+    """
+    Build a chart in the configured render mode.
+    
+    Returns:
+        Tuple of (chart dict for session state or None, summary text). The chart dict holds
+        chart_type and either a Vega-Lite spec ('spec' mode) or a base64 PNG image ('png' mode).
+    """
+    data_version = get_summaries_version()
+    if Config.CHART_RENDER_MODE == 'png':
+        chart_image, chart_summary = generate_chart(chart_type, summaries, data_version)
+        return ({"chart_type": chart_type, "image": chart_image} if chart_image else None), chart_summary
+    chart_spec, chart_summary = build_chart_spec(chart_type, summaries, data_version)
+    return ({"chart_type": chart_type, "spec": chart_spec} if chart_spec else None), chart_summary
+
+
+def _show_chart(chart: dict, chart_key: str, summaries: list) -> None:
+    """Show a stored chart: Vega-Lite specs render in the browser, with a PNG rendered only when downloaded."""
+    if "spec" not in chart:
+        st.image(f"data:image/png;base64,{chart['image']}", width=600)
+        return
+    st.vega_lite_chart(spec=chart["spec"], width=600)
+    chart_type = chart["chart_type"]
+    st.download_button(
+        "🖼️ Download PNG",
+        data=lambda: export_chart_png(chart_type, summaries, get_summaries_version()),
+        file_name=f"{chart_type.replace(' ', '_')}_chart.png",
+        mime="image/png",
+        key=f"png_{chart_key}",
+        on_click="ignore",
+    )
+
+
+def _render_dashboard(summaries: list) -> None:
+    """Show every chart in a two-column grid (Vega-Lite specs, or PNGs rendered in parallel in 'png' mode)."""
+    start = time.time()
+    data_version = get_summaries_version()
+    if Config.CHART_RENDER_MODE == 'png':
+        stats = generate_dashboard(summaries, data_version)
+        charts = stats["charts"]
+        caption = format_dashboard_stats(stats)
+    else:
+        charts = build_dashboard_specs(summaries, data_version)
+        caption = f"⏱️ {len(charts)} charts in {time.time() - start:.2f}s"
+    
+    columns = st.columns(2)
+    for idx, chart in enumerate(charts):
+        with columns[idx % 2]:
+            with st.container(border=True):
+                st.markdown(f"**{chart['chart_type'].title()}**")
+                if chart.get("spec") or chart.get("image"):
+                    _show_chart(chart, f"dashboard_{idx}", summaries)
+                st.caption(chart["summary"])
+    st.caption(caption)
+
+
+def _get_history_manager(state_key: str, api_key: str, model: str) -> ChatHistoryManager:
+    """Return this session's history manager for a chat, creating it on first use."""
+    if state_key not in st.session_state:
+        st.session_state[state_key] = ChatHistoryManager(api_key=api_key, model=model)
+    manager = st.session_state[state_key]
+    manager.model = model
+    return manager
 
 
 def _render_standard_chat(summaries):
@@ -134,8 +201,8 @@ def _render_standard_chat(summaries):
     if 'bulk_summary_chat_history' not in st.session_state:
         st.session_state.bulk_summary_chat_history = load_bulk_summary_chat_history()
     
-    if 'chart_images' not in st.session_state:
-        st.session_state.chart_images = {}
+    if 'charts' not in st.session_state:
+        st.session_state.charts = {}
     
     # Get API key and model settings from session state (sidebar), with Config as fallback
     api_key = st.session_state.get('openai_api_key')
@@ -161,14 +228,14 @@ def _render_standard_chat(summaries):
                 # Display timestamp and response time if available
                 if "timestamp" in message:
                     if "response_time" in message:
-                        st.caption(f"🕐 {message['timestamp']} | ⏱️ Response time: {message['response_time']:.2f}s")
+                        cached_note = " | ⚡ Cached answer" if message.get("cached") else ""
+                        st.caption(f"🕐 {message['timestamp']} | ⏱️ Response time: {message['response_time']:.2f}s{cached_note}")
                     else:
                         st.caption(f"🕐 {message['timestamp']}")
                 
-                # Check if this message has a chart image
-                if f"chart_{idx}" in st.session_state.chart_images:
-                    chart_image = st.session_state.chart_images[f"chart_{idx}"]
-                    st.image(f"data:image/png;base64,{chart_image}", width=600)
+                # Check if this message has a chart
+                if f"chart_{idx}" in st.session_state.charts:
+                    _show_chart(st.session_state.charts[f"chart_{idx}"], f"chart_{idx}", summaries)
         
         # Auto-scroll to bottom when new messages arrive
         st.markdown("""
@@ -226,9 +293,6 @@ def _render_standard_chat(summaries):
                 st.markdown(prompt)
                 st.caption(f"🕐 {user_timestamp}")
         
-        # Get summaries context for LLM
-        summaries_context = format_summaries_for_context(summaries)
-        
         # Check if user is requesting a chart
         chart_type = detect_chart_request(prompt)
         
@@ -240,15 +304,15 @@ def _render_standard_chat(summaries):
             chart_status = st.status("Generating chart...", expanded=True)
             with chart_status:
                 st.write("Creating visualization...")
-                chart_image, chart_summary = generate_chart(chart_type, summaries)
+                chart, chart_summary = _create_chart(chart_type, summaries)
             
             chart_end = time.time()
             chart_time = chart_end - chart_start
             
-            if chart_image:
-                # Store chart image with message index
+            if chart:
+                # Store chart with message index
                 chart_idx = len(st.session_state.bulk_summary_chat_history)
-                st.session_state.chart_images[f"chart_{chart_idx}"] = chart_image
+                st.session_state.charts[f"chart_{chart_idx}"] = chart
                 
                 # Get current timestamp for chart response
                 chart_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -257,7 +321,7 @@ def _render_standard_chat(summaries):
                 with chat_container:
                     with st.chat_message("assistant"):
                         st.markdown(f"📊 **{chart_type.title()} Chart**\n\n{chart_summary}")
-                        st.image(f"data:image/png;base64,{chart_image}", width=600)
+                        _show_chart(chart, f"chart_{chart_idx}", summaries)
                         st.caption(f"🕐 {chart_timestamp} | ⏱️ Response time: {chart_time:.2f}s")
                 
                 # Add to history with chart marker, timestamp, and response time
@@ -288,67 +352,114 @@ def _render_standard_chat(summaries):
             # Track response time
             response_start = time.time()
             
-            # Build clean chat history for LLM (excluding current user message and metadata)
-            clean_chat_history = []
-            for msg in st.session_state.bulk_summary_chat_history[:-1]:
-                clean_chat_history.append({
-                    "role": msg["role"],
-                    "content": msg["content"]
-                })
+            # Recent turns verbatim within the token budget, older turns as a rolling summary
+            history_manager = _get_history_manager('bulk_summary_history_manager', api_key, model)
+            clean_chat_history = history_manager.build_history(st.session_state.bulk_summary_chat_history[:-1])
             
             # Get current timestamp for assistant response
             response_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             
             logger.debug(f"LLM chat with {len(clean_chat_history)} previous messages in history")
             
-            # Build messages for streaming
             chat_system_prompt = load_prompt('chat_system_prompt.txt')
             chat_user_prompt = load_prompt('chat_user_prompt.txt')
             chat_guardrail_prompt = load_prompt('chat_guardrail_prompt.txt')
-            formatted_user_prompt = chat_user_prompt.replace('{{PASTE ENTIRE SUMMARY HERE}}', summaries_context) if chat_user_prompt else summaries_context
             full_system_prompt = f"{chat_system_prompt}\n\n{chat_guardrail_prompt}" if chat_system_prompt and chat_guardrail_prompt else chat_system_prompt
             
-            messages = [{"role": "system", "content": full_system_prompt}]
-            messages.extend(clean_chat_history)
-            messages.append({"role": "user", "content": f"{formatted_user_prompt}\n\nUser Question: {prompt}"})
+            # Repeat questions over unchanged summaries and prompts are answered from the cache,
+            # checked before the summaries context is serialized and counted
+            answer_cache = _get_standard_answer_cache()
+            cache_scope = None
+            cached = None
+            if answer_cache:
+                try:
+                    cache_scope = {
+                        "data_version": get_summaries_version(),
+                        "prompt_hash": compute_prompt_hash(full_system_prompt, chat_user_prompt, model, temperature,
+                                                           max_tokens, Config.CHAT_CONTEXT_FORMAT,
+                                                           history_for_cache(prompt, clean_chat_history)),
+                        # Embedded with this session's key; the cache is shared by all sessions
+                        "vector": answer_cache.normalize(get_embeddings(api_key).embed_query(prompt))
+                    }
+                    cached = answer_cache.lookup(prompt, **cache_scope)
+                except Exception as e:
+                    logger.warning(f"⚠️  Answer cache lookup failed: {str(e)}")
+                    cache_scope = None
+            
+            context_stats = None
+            if not cached:
+                # Summaries snapshot in CHAT_CONTEXT_FORMAT; the default table does not depend on the question
+                summaries_context, context_stats = build_summaries_context(summaries, prompt, model=model)
+                # Static prompts and the summaries snapshot form a stable prefix (provider prompt caching);
+                # history and the question come last
+                messages = build_bulk_chat_messages(prompt, clean_chat_history, summaries_context,
+                                                    chat_system_prompt, chat_user_prompt, chat_guardrail_prompt)
+                prompt_tokens = (count_tokens(full_system_prompt, model) + count_tokens(chat_user_prompt, model)
+                                 + sum(count_tokens(msg["content"], model) for msg in messages[1:]))
             
             # Display streaming response inside container
             with chat_container:
                 with st.chat_message("assistant"):
-                    message_placeholder = st.empty()
-                    full_response = ""
+                    renderer = StreamRenderer(st.empty(), model=model, start_time=response_start)
                     
-                    # Stream the response
-                    stream = openai.chat.completions.create(
-                        model=model,
-                        messages=messages,
-                        temperature=temperature,
-                        max_tokens=max_tokens,
-                        stream=True
-                    )
-                    
-                    for chunk in stream:
-                        if chunk.choices[0].delta.content is not None:
-                            full_response += chunk.choices[0].delta.content
-                            message_placeholder.markdown(full_response + "▌")
+                    map_reduce = None
+                    usage = {}
+                    if cached:
+                        stream = stream_cached_answer(cached["answer"])
+                    elif needs_map_reduce(context_stats["tokens"], model, max_tokens, prompt_tokens):
+                        # Too many summaries for one request: answer per batch, then stream the combined answer
+                        map_reduce = MapReduceChat(api_key, model, temperature, max_tokens)
+                        batches = map_reduce.build_batches(summaries, prompt, full_system_prompt, clean_chat_history)
+                        with st.spinner(f"Answering over {len(batches)} batches of {len(summaries):,} summaries..."):
+                            partials = map_reduce.map(prompt, batches, full_system_prompt, clean_chat_history)
+                        stream = map_reduce.reduce_stream(prompt, partials, full_system_prompt, clean_chat_history,
+                                                          len(summaries))
+                    else:
+                        # Stream the response
+                        completion = openai.chat.completions.create(
+                            model=model,
+                            messages=messages,
+                            temperature=temperature,
+                            max_tokens=max_tokens,
+                            stream=True,
+                            stream_options={"include_usage": True}
+                        )
+                        stream = iter_openai_text(completion, usage)
                     
-                    # Final response without cursor
-                    message_placeholder.markdown(full_response)
+                    # Redrawn in coalesced batches, not per token
+                    full_response = renderer.render(stream)
+                    usage_counts = log_usage("Standard chat", usage["usage"], model) if usage.get("usage") else {}
                     
                     # Calculate response time and display metadata
                     response_time = time.time() - response_start
-                    st.caption(f"🕐 {response_timestamp} | ⏱️ Response time: {response_time:.2f}s")
+                    cached_note = " | ⚡ Cached answer" if cached else ""
+                    st.caption(f"🕐 {response_timestamp} | ⏱️ Response time: {response_time:.2f}s"
+                               f"{format_stream_stats(renderer.get_stats())}{format_usage(usage_counts)}{cached_note}")
+                    if context_stats:
+                        st.caption(format_context_stats(context_stats))
+                    if map_reduce:
+                        st.caption(format_map_reduce_stats(map_reduce.stats))
+            
+            if cache_scope and not cached:
+                answer_cache.store(prompt, full_response, **cache_scope)
             
             # Add to history
             st.session_state.bulk_summary_chat_history.append({
                 "role": "assistant",
                 "content": full_response,
                 "timestamp": response_timestamp,
-                "response_time": response_time
+                "response_time": response_time,
+                "cached": bool(cached)
             })
+            history_manager.schedule_summary(st.session_state.bulk_summary_chat_history)
             
             logger.info("LLM streaming response generated successfully")
     
+    # Answer cache hit rate and staleness
+    answer_cache = _get_standard_answer_cache()
+    if answer_cache:
+        st.caption(_format_answer_cache_stats(answer_cache.stats(get_summaries_version())))
+    
     # Chat history management buttons
     col1, col2, col3 = st.columns(3)
     
@@ -356,6 +467,8 @@ def _render_standard_chat(summaries):
         if st.button("Clear Chat History", key="clear_bulk_chat_btn"):
             st.session_state.bulk_summary_chat_history = []
             save_bulk_summary_chat_history([])
+            if 'bulk_summary_history_manager' in st.session_state:
+                st.session_state.bulk_summary_history_manager.reset()
             st.success("Chat history cleared!")
             st.rerun()
     
@@ -372,6 +485,35 @@ def _render_standard_chat(summaries):
                 )
 
 
+@st.fragment(run_every=1)
+def _render_reindex_status():
+    """Show progress of the background reindex job started from this session."""
+    job_id = st.session_state.get('reindex_job_id')
+    if not job_id:
+        return
+    
+    status = get_index_worker().get_status()
+    if status.get('job_id') != job_id:
+        return
+    
+    state = status.get('state')
+    if state in ('queued', 'running'):
+        done = status.get('docs_done', 0)
+        total = status.get('docs_total', 0)
+        stage = status.get('stage', 'queued')
+        if stage == 'embedding' and total:
+            throughput = status.get('throughput', 0.0)
+            eta = status.get('eta_seconds')
+            eta_text = f", ETA {eta:.0f}s" if eta is not None else ""
+            st.progress(done / total, text=f"🔄 Reindexing: {done:,}/{total:,} documents embedded ({throughput:,.0f} docs/s{eta_text}). Chat stays available on the current index.")
+        else:
+            st.info(f"🔄 Reindexing ({stage})... Chat stays available on the current index.")
+    elif state == 'done':
+        st.success(f"✅ Vector store reloaded successfully! {status.get('document_count', 0):,} documents indexed in {status.get('duration_seconds', 0):.1f}s and now searchable.")
+    elif state == 'failed':
+        st.error(f"❌ Failed to reload vector store: {status.get('error', 'unknown error')}")
+
+
 def _render_rag_chat():
     """Render the RAG-based chat interface with vector search."""
     
@@ -386,30 +528,23 @@ def _render_rag_chat():
         st.warning("Please enter your OpenAI API key in the main app page first!")
         return
     
-    # Initialize RAG chatbot ONCE and keep it in session state (CRITICAL FIX)
+    # The RAG chatbot and its vector index are shared by all sessions (loaded once per process);
+    # session state only holds this user's chat history
     # Check if we just cleared the vector store (skip re-initialization)
     should_skip_init = st.session_state.get('skip_rag_initialization', False)
     
-    if 'rag_chatbot' not in st.session_state and not should_skip_init:
-        logger.info("=" * 70)
-        logger.info("🆕 FIRST TIME RAG INITIALIZATION - Creating RAG chatbot and vector store")
-        logger.info("=" * 70)
-        with st.spinner("Initializing RAG Chatbot and vector store (first time only)..."):
-            rag_chatbot = RAGChatbot(api_key=api_key)
-            if rag_chatbot.initialize(model=model, temperature=temperature, max_tokens=max_tokens, force_recreate=False):
-                st.session_state.rag_chatbot = rag_chatbot
-                logger.info("✅ RAG Chatbot created and stored in session state")
-                st.success("✅ RAG Chatbot initialized successfully!")
-            else:
-                logger.error("❌ Failed to initialize RAG Chatbot")
-                st.error("❌ Failed to initialize RAG Chatbot. Please check API key and logs.")
-                return
-    elif should_skip_init:
+    rag_chatbot = None
+    if not should_skip_init:
+        with st.spinner("Loading RAG Chatbot and vector store..."):
+            rag_chatbot = get_shared_chatbot(api_key, model=model, temperature=temperature, max_tokens=max_tokens)
+        if rag_chatbot is None:
+            logger.error("❌ Failed to initialize RAG Chatbot")
+            st.error("❌ Failed to initialize RAG Chatbot. Please check API key and logs.")
+            return
+    else:
         logger.info("⏭️  Skipping RAG initialization - vector store was just cleared")
         # Reset the flag for next render
         st.session_state.skip_rag_initialization = False
-    else:
-        logger.debug("✅ Using existing RAG chatbot from session state (no recreation needed)")
     
     # Initialize RAG chat history in session state
     if 'rag_chat_history' not in st.session_state:
@@ -419,6 +554,9 @@ def _render_rag_chat():
     if 'vector_reload_status' not in st.session_state:
         st.session_state.vector_reload_status = None
     
+    # Background reindex progress (polls the worker while a job is active)
+    _render_reindex_status()
+    
     # Display persistent reload status message if exists
     if st.session_state.vector_reload_status:
         if st.session_state.vector_reload_status == 'success':
@@ -432,11 +570,14 @@ def _render_rag_chat():
         for message in st.session_state.rag_chat_history:
             with st.chat_message(message['role']):
                 st.markdown(message['content'])
+                if message.get("analytics"):
+                    st.caption(f"🧮 {message['analytics']}")
                 
                 # Display timestamp and response time if available
                 if "timestamp" in message:
                     if "response_time" in message:
-                        st.caption(f"🕐 {message['timestamp']} | ⏱️ Response time: {message['response_time']:.2f}s")
+                        cached_note = " | ⚡ Cached answer" if message.get("cached") else ""
+                        st.caption(f"🕐 {message['timestamp']} | ⏱️ Response time: {message['response_time']:.2f}s{cached_note}")
                     else:
                         st.caption(f"🕐 {message['timestamp']}")
         
@@ -489,6 +630,8 @@ def _render_rag_chat():
     if prompt:
         # Clear reload status when new prompt is entered
         st.session_state.vector_reload_status = None
+        if get_index_worker().get_status().get('state') not in ('queued', 'running'):
+            st.session_state.reindex_job_id = None
         
         # Add user message to history with timestamp
         user_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -505,7 +648,6 @@ def _render_rag_chat():
                 st.caption(f"🕐 {user_timestamp}")
         
         # Get RAG response with streaming
-        rag_chatbot = st.session_state.get('rag_chatbot')
         if rag_chatbot:
             # Track response time
             response_start = time.time()
@@ -513,37 +655,56 @@ def _render_rag_chat():
             # Get current timestamp for assistant response
             response_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             
+            # Recent turns verbatim within the token budget, older turns as a rolling summary
+            rag_history_manager = _get_history_manager('rag_history_manager', api_key, rag_chatbot.model)
+            
             try:
                 # Display streaming response inside container
                 with rag_chat_container:
                     with st.chat_message("assistant"):
-                        message_placeholder = st.empty()
-                        full_response = ""
+                        renderer = StreamRenderer(st.empty(), model=rag_chatbot.model, start_time=response_start)
+                        cache_info = {}
+                        analytics_info = {}
+                        usage_info = {}
                         
-                        # Get streaming response from RAG chatbot
+                        # Get streaming response from RAG chatbot (cached answers stream back immediately)
                         stream = rag_chatbot.get_rag_response_stream(
                             user_message=prompt,
-                            chat_history=st.session_state.rag_chat_history[:-1]
+                            chat_history=st.session_state.rag_chat_history[:-1],
+                            cache_info=cache_info,
+                            history_manager=rag_history_manager,
+                            analytics_info=analytics_info,
+                            usage_info=usage_info
                         )
                         
-                        for chunk in stream:
-                            full_response += chunk
-                            message_placeholder.markdown(full_response + "▌")
-                        
-                        # Final response without cursor
-                        message_placeholder.markdown(full_response)
+                        # Redrawn in coalesced batches, not per token
+                        full_response = renderer.render(stream)
                         
                         # Calculate response time and display metadata
                         response_time = time.time() - response_start
-                        st.caption(f"🕐 {response_timestamp} | ⏱️ Response time: {response_time:.2f}s")
+                        cached_note = " | ⚡ Cached answer" if cache_info.get("cached") else ""
+                        st.caption(f"🕐 {response_timestamp} | ⏱️ Response time: {response_time:.2f}s"
+                                   f"{format_stream_stats(renderer.get_stats())}{format_usage(usage_info)}{cached_note}")
+                        
+                        # Aggregate questions are computed over all summaries; show the exact table
+                        analytics_note = None
+                        if analytics_info:
+                            analytics_note = (f"{analytics_info['description']} - computed over {analytics_info['matched_rows']:,} "
+                                              f"of {analytics_info['total_rows']:,} summaries in {analytics_info['compute_ms']:.0f}ms")
+                            st.caption(f"🧮 {analytics_note}")
+                            with st.expander("Computed table"):
+                                st.dataframe(analytics_info['table'], hide_index=True)
                 
                 # Add to history
                 st.session_state.rag_chat_history.append({
                     "role": "assistant",
                     "content": full_response,
                     "timestamp": response_timestamp,
-                    "response_time": response_time
+                    "response_time": response_time,
+                    "cached": bool(cache_info.get("cached")),
+                    "analytics": analytics_note
                 })
+                rag_history_manager.schedule_summary(st.session_state.rag_chat_history)
                 
                 logger.info("RAG streaming response generated successfully")
             except AttributeError:
@@ -551,7 +712,8 @@ def _render_rag_chat():
                 with st.spinner("Searching vector store and generating response..."):
                     response = rag_chatbot.get_rag_response(
                         user_message=prompt,
-                        chat_history=st.session_state.rag_chat_history[:-1]
+                        chat_history=st.session_state.rag_chat_history[:-1],
+                        history_manager=rag_history_manager
                     )
                     response_time = time.time() - response_start
                 
@@ -562,6 +724,7 @@ def _render_rag_chat():
                         "timestamp": response_timestamp,
                         "response_time": response_time
                     })
+                    rag_history_manager.schedule_summary(st.session_state.rag_chat_history)
                     logger.info("RAG response generated successfully (non-streaming fallback)")
                 else:
                     error_msg = "Failed to generate RAG response. Please check logs."
@@ -572,6 +735,10 @@ def _render_rag_chat():
                     })
                     logger.error(error_msg)
     
+    # Answer cache hit rate and staleness
+    if rag_chatbot and rag_chatbot.get_answer_cache_stats():
+        st.caption(_format_answer_cache_stats(rag_chatbot.get_answer_cache_stats()))
+    
     # Chat history and vector store management buttons
     col1, col2, col3, col4 = st.columns(4)
     
@@ -579,6 +746,8 @@ def _render_rag_chat():
         if st.button("Clear RAG Chat History", key="clear_rag_chat_btn", width="stretch"):
             st.session_state.rag_chat_history = []
             st.session_state.vector_reload_status = None
+            if 'rag_history_manager' in st.session_state:
+                st.session_state.rag_history_manager.reset()
             st.success("RAG chat history cleared!")
             st.rerun()
     
@@ -597,54 +766,15 @@ def _render_rag_chat():
     
     with col3:
         if st.button("🔄 Reload Vector Store", key="reload_vector_btn", width="stretch"):
-            try:
-                with st.spinner("🔄 Reloading vector store and indexing new summaries..."):
-                    logger.info("=" * 70)
-                    logger.info("🔄 VECTOR STORE RELOAD INITIATED BY USER")
-                    logger.info("=" * 70)
-                    
-                    # Get fresh API key and settings
-                    api_key = st.session_state.get('openai_api_key')
-                    
-                    # Get the EXISTING RAG chatbot from session state
-                    if 'rag_chatbot' not in st.session_state:
-                        logger.error("❌ No RAG chatbot in session state. Cannot reload.")
-                        st.error("❌ RAG chatbot not initialized. Please refresh the page.")
-                        st.rerun()
-                        return
-                    
-                    rag_chatbot = st.session_state.rag_chatbot
-                    
-                    # Call reload_vector_store on the existing chatbot with force_recreate=True
-                    logger.info("🔄 Reloading vector store in existing chatbot instance...")
-                    if rag_chatbot.vector_store_manager.create_vector_store(api_key, force_recreate=True):
-                        logger.info("✅ Vector store reloaded successfully")
-                        
-                        # Reinitialize retriever with configured k value
-                        rag_chatbot.vector_store_manager.retriever = rag_chatbot.vector_store_manager.vector_store.as_retriever(search_kwargs={"k": rag_chatbot.vector_store_manager.retriever_k})
-                        
-                        # Check vector store info after reload
-                        vs_info = rag_chatbot.vector_store_manager.get_vector_store_info()
-                        logger.info(f"📊 Vector Store after reload: {vs_info}")
-                        
-                        st.session_state.vector_reload_status = 'success'
-                        logger.info("=" * 70)
-                        logger.info(f"✅ VECTOR STORE RELOAD COMPLETE - {vs_info.get('document_count', 0)} documents indexed!")
-                        logger.info("=" * 70)
-                    else:
-                        logger.error("❌ Failed to reload vector store")
-                        st.session_state.vector_reload_status = 'error'
-                        logger.info("=" * 70)
-                    
-                    st.rerun()
-            except Exception as e:
-                st.session_state.vector_reload_status = 'error'
-                error_details = f"Vector store reload failed: {str(e)}"
-                logger.error("=" * 70)
-                logger.error(f"❌ RELOAD FAILED: {error_details}")
-                logger.error("=" * 70, exc_info=True)
-                st.error(f"❌ {error_details}")
-                st.rerun()
+            logger.info("=" * 70)
+            logger.info("🔄 VECTOR STORE RELOAD INITIATED BY USER")
+            logger.info("=" * 70)
+            
+            # Rebuild in the background; chat keeps using the current index until the new one is published
+            api_key = st.session_state.get('openai_api_key')
+            st.session_state.reindex_job_id = get_index_worker().submit(api_key)
+            st.session_state.vector_reload_status = None
+            st.rerun()
     
     with col4:
         ""
@@ -656,12 +786,97 @@ def _render_rag_chat():
         #     _handle_clear_vector_store()
     
     
+_SORT_LABELS = {
+    'id': 'File order',
+    'conversation_date': 'Date',
+    'agent_name': 'Agent',
+    'department': 'Department',
+    'resolution_status': 'Resolution',
+    'score_int': 'Score',
+    'rating_int': 'Rating',
+    'duration_seconds': 'Duration',
+}
+_FILTER_LABELS = {'agent_name': 'Agent', 'department': 'Department', 'resolution_status': 'Resolution'}
+
+
+def _reset_summaries_page() -> None:
+    st.session_state.summaries_page = 1
+
+
+def _render_summaries_table(summaries_file: str):
+    """
+    Show the summaries table one page at a time, filtered and sorted in SQLite.
+    
+    Returns:
+        Callable that exports the filtered, sorted summaries as CSV bytes (for a download button)
+    """
+    store = get_summary_store(summaries_file)
+    if not store.ready:
+        with st.spinner("Building the summaries table..."):
+            store.refresh()
+    # Rebuilds after the summaries change run in the background; the previous table is shown meanwhile
+    if store.refresh(wait=False):
+        st.toast("🗃️ Summaries table rebuilt")
+    elif store.building:
+        st.caption("🔄 Summaries changed - rebuilding the table in the background, showing the previous version")
+    
+    filter_columns = st.columns(len(FILTER_COLUMNS) + 1)
+    selected = {}
+    for column, container in zip(FILTER_COLUMNS, filter_columns):
+        with container:
+            selected[column] = st.multiselect(_FILTER_LABELS[column], store.distinct_values(column),
+                                              key=f"summaries_filter_{column}", on_change=_reset_summaries_page)
+    first_date, last_date = store.date_range()
+    with filter_columns[-1]:
+        dates = st.date_input("Date range", value=(),
+                              min_value=datetime.fromisoformat(first_date).date() if first_date else None,
+                              max_value=datetime.fromisoformat(last_date).date() if last_date else None,
+                              key="summaries_filter_dates", on_change=_reset_summaries_page)
+    filters = {
+        "agents": selected['agent_name'],
+        "departments": selected['department'],
+        "statuses": selected['resolution_status'],
+        "date_from": dates[0] if len(dates) > 0 else None,
+        "date_to": dates[1] if len(dates) > 1 else None,
+    }
+    
+    sort_col, order_col, size_col, page_col = st.columns(4)
+    with sort_col:
+        sort_by = st.selectbox("Sort by", SORT_COLUMNS, format_func=_SORT_LABELS.get,
+                               key="summaries_sort", on_change=_reset_summaries_page)
+    with order_col:
+        descending = st.toggle("Descending", key="summaries_descending", on_change=_reset_summaries_page)
+    with size_col:
+        page_sizes = sorted({Config.SUMMARY_PAGE_SIZE, 25, 50, 100, 250})
+        page_size = st.selectbox("Rows per page", page_sizes, index=page_sizes.index(Config.SUMMARY_PAGE_SIZE),
+                                 key="summaries_page_size", on_change=_reset_summaries_page)
+    
+    start = time.time()
+    page = st.session_state.get("summaries_page", 1)
+    page_df, total = store.query_page(filters, sort_by, descending, page, page_size)
+    pages = max(1, -(-total // page_size))
+    if page > pages:
+        # Rows were removed since the page was chosen
+        st.session_state.summaries_page = page = pages
+        page_df, total = store.query_page(filters, sort_by, descending, page, page_size)
+    query_seconds = time.time() - start
+    with page_col:
+        st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, step=1, key="summaries_page")
+    
+    st.dataframe(page_df, width="stretch", hide_index=True)
+    first_row = (page - 1) * page_size + 1
+    last_row = first_row + len(page_df) - 1
+    st.caption(f"Showing {min(first_row, last_row):,}–{last_row:,} of {total:,} summaries "
+               f"(page loaded in {query_seconds * 1000:.0f} ms)")
+    return lambda: store.export_csv(filters, sort_by, descending)
+
+
 def main():
     st.set_page_config(page_title="View Summaries", page_icon="📋", layout="wide")
     st.title("View Summaries")
     
     summaries_file = os.path.join('output_data', 'bulk_summaries.json')
-    summaries = load_summaries(summaries_file)
+    summaries = get_summaries(summaries_file)
     
     if not summaries:
         st.info("No summaries available.")
@@ -670,25 +885,21 @@ def main():
     # ==================== TOP SECTION: SUMMARIES TABLE ====================
     st.subheader("📊 Call Summaries")
     
-    # Convert summaries to DataFrame for better display
-    df = pd.DataFrame(summaries)
-    
-    # Display the DataFrame with Streamlit
-    st.dataframe(df, width="stretch", hide_index=True)
-    
-    # Provide download option
-    csv = df.to_csv(index=False).encode('utf-8')
+    # Only the visible page is loaded and sent to the browser
+    export_csv = _render_summaries_table(summaries_file)
     
     # Create columns for download and clear buttons
     col1, col2 = st.columns(2)
     
     with col1:
+        # The CSV is built only when the button is clicked, with the current filters and sort order
         st.download_button(
             label="Download summaries as CSV",
-            data=csv,
+            data=export_csv,
             file_name='summaries.csv',
             mime='text/csv',
-            width="stretch"
+            width="stretch",
+            on_click="ignore",
         )
     
     with col2:
@@ -717,18 +928,16 @@ def main():
                     
                     # Clear vector store since summaries are now gone
                     logger.info("🔄 Clearing vector store since summaries have been deleted...")
-                    if 'rag_chatbot' in st.session_state:
-                        rag_chatbot = st.session_state.rag_chatbot
-                        if rag_chatbot.vector_store_manager.clear_vector_store():
-                            logger.info("✅ Vector store cleared successfully after clearing summaries")
-                            # Clear related session state
-                            del st.session_state.rag_chatbot
-                            st.session_state.rag_chat_history = []
-                            st.session_state.vector_reload_status = None
-                            st.session_state.skip_rag_initialization = True
-                        else:
-                            logger.error("❌ Failed to clear vector store after clearing summaries")
-                            st.session_state.vector_reload_status = 'error'
+                    if VectorStoreManager().clear_vector_store():
+                        reset_shared_chatbots()
+                        logger.info("✅ Vector store cleared successfully after clearing summaries")
+                        # Clear related session state
+                        st.session_state.rag_chat_history = []
+                        st.session_state.vector_reload_status = None
+                        st.session_state.skip_rag_initialization = True
+                    else:
+                        logger.error("❌ Failed to clear vector store after clearing summaries")
+                        st.session_state.vector_reload_status = 'error'
                     
                     st.success("✅ All summaries, metadata, and vector store cleared! You can now start fresh.")
                     # Clear session state
@@ -741,6 +950,10 @@ def main():
                 logger.error(f"Error clearing summaries: {str(e)}")
                 st.error(f"Error clearing summaries: {str(e)}")
     
+    # ==================== KPI DASHBOARD: ALL CHARTS AT ONCE ====================
+    if st.toggle("📈 Show KPI dashboard (all charts)", key="show_dashboard"):
+        _render_dashboard(summaries)
+    
     # Divider
     st.divider()
     
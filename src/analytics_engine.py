@@ -0,0 +1,472 @@
+"""
+Local Analytical Query Engine
+
+Aggregate questions ("average agent score by department", "how many unresolved
+calls in March") used to go through retrieval: up to RETRIEVER_K documents were
+sent to the LLM, which then did the arithmetic. That is slow, expensive, and
+wrong once the corpus is larger than k. This module recognizes aggregate and
+metric questions with a rule-based intent classifier and compiles them into
+vectorized pandas aggregations over the full summary frame (see
+src/summary_frame.py). The LLM only narrates the computed table.
+
+Functions:
+- classify_question(): Parse an aggregate question into a query spec, or None
+- describe_filters(): Filters a query spec applies, for prompts and captions
+- run_query(): Execute a query spec against the summary frame
+- answer_aggregate_question(): Classify and run in one step
+- format_table_markdown(): Render a result table for the LLM prompt
+"""
+
+import calendar
+import re
+import time
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from src.logger import logger
+from src.vector_shards import OPEN_START, extract_date_range
+
+
+# Questions that ask for explanations or examples go to retrieval, even if they mention numbers
+_NARRATIVE_KEYWORDS = ['why', 'summarize', 'summarise', 'example', 'examples', 'describe', 'explain',
+                       'what did', 'what do', 'complain', 'complaints', 'feedback', 'quote', 'recommend',
+                       'suggest', 'improve', 'how can', 'how should', 'tell me about', 'transcript']
+
+_AGGREGATION_KEYWORDS = {
+    'share': ['percentage', 'percent', '%', 'share', 'proportion', 'ratio', 'rate', 'breakdown',
+              'distribution', 'split'],
+    'count': ['how many', 'number of', 'count', 'total calls', 'total number', 'most common',
+              'most frequent', 'least common'],
+    'mean': ['average', 'avg', 'mean'],
+    'median': ['median'],
+    'sum': ['total', 'sum', 'combined'],
+    'max': ['highest', 'top', 'best', 'most', 'maximum', 'max', 'longest', 'largest', 'greatest'],
+    'min': ['lowest', 'worst', 'least', 'minimum', 'min', 'shortest', 'smallest', 'bottom', 'fewest'],
+}
+
+# Metric column -> words that refer to it
+METRICS = {
+    'agent_score': ['score', 'scores', 'scored', 'performance', 'performing'],
+    'agent_rating': ['rating', 'ratings', 'rated', 'stars'],
+    'duration_seconds': ['duration', 'durations', 'length', 'handle time', 'handling time', 'how long',
+                         'longest', 'shortest', 'minutes'],
+}
+METRIC_LABELS = {
+    'agent_score': 'agent score',
+    'agent_rating': 'agent rating',
+    'duration_seconds': 'call duration (minutes)',
+}
+
+# Words that make a ranking by call volume ("most calls"); other agent/department rankings use the score
+_VOLUME_KEYWORDS = ['calls', 'call volume', 'volume']
+# Performance rankings ("best agent") without a metric rank these groups by agent score
+_PERFORMANCE_GROUPS = ['agent_name', 'department']
+
+# Group-by column -> words that refer to it
+DIMENSIONS = {
+    'department': ['department', 'departments', 'team', 'teams'],
+    'agent_name': ['agent', 'agents', 'rep', 'reps', 'representative', 'representatives'],
+    'issue_category': ['issue category', 'issue categories', 'category', 'categories', 'issue type',
+                       'issue types', 'issue', 'issues', 'reason', 'reasons'],
+    'resolution_status': ['resolution status', 'status'],
+    'customer_tone': ['customer tone', 'tone', 'tones', 'sentiment'],
+    'customer_emotions': ['emotion', 'emotions'],
+    'month': ['month', 'months', 'monthly'],
+}
+
+# Columns whose values can be named in a question as a filter ("in Billing", "for Emma Smith")
+FILTER_COLUMNS = ['department', 'issue_category', 'customer_tone', 'agent_name']
+
+# What a "how many" question may count; "how many agents" is not a number of calls
+_CALL_NOUNS = ['calls', 'call', 'conversations', 'conversation', 'interactions', 'contacts', 'cases', 'tickets']
+
+# Question scaffolding, handling verbs and date words; any other word a filter does not cover is a topic
+# ("calls mention refunds") the frame cannot filter on, so the question goes to retrieval
+_FILLER_WORDS = {
+    'a', 'an', 'the', 'of', 'in', 'on', 'for', 'to', 'by', 'per', 'with', 'from', 'at', 'during', 'and', 'or',
+    'as', 'into', 'within', 'is', 'are', 'was', 'were', 'be', 'been', 'there', 'do', 'does', 'did', 'have', 'has',
+    'had', 'what', 'which', 'who', 'whose', 'whom', 'how', 'many', 'much', 's', 'me', 'us', 'we', 'our', 'i', 'my',
+    'show', 'list', 'give', 'tell', 'find', 'get', 'got', 'please', 'all', 'each', 'every', 'across', 'among', 'it',
+    'its', 'this', 'that', 'these', 'those', 'their', 'they', 'than', 'so', 'far', 'overall', 'whole', 'entire',
+    'only', 'any', 'handle', 'handles', 'handled', 'handling', 'take', 'takes', 'took', 'taken', 'receive',
+    'received', 'answer', 'answered', 'log', 'logged', 'recorded', 'name', 'names', 'rank', 'ranks', 'ranked',
+    'ranking', 'perform', 'performed', 'scoring', 'not', 'resolved', 'unresolved', 'resolution', 'customer',
+    'customers', 'caller', 'callers', 'year', 'years', 'today', 'yesterday', 'last', 'past',
+    'previous', 'since', 'after', 'before', 'until', 'till', 'through', 'starting', 'prior', 'earlier', 'later',
+    'up', 'jan', 'feb', 'mar', 'apr', 'jun', 'jul', 'aug', 'sep', 'sept', 'oct', 'nov', 'dec',
+    *(name.lower() for name in calendar.month_name[1:]),
+}
+
+DEFAULT_TOP_N = 10
+
+
+def _phrase_pattern(phrases: List[str]) -> str:
+    return r"(?<![\w%])(?:" + "|".join(re.escape(p) for p in sorted(phrases, key=len, reverse=True)) + r")(?![\w])"
+
+
+def _contains(text: str, phrases: List[str]) -> bool:
+    return re.search(_phrase_pattern(phrases), text) is not None
+
+
+def _detect_group_by(text: str) -> Optional[str]:
+    """Find the dimension a question groups or ranks by ("by department", "which agents", "top 5 agents")."""
+    for column, words in DIMENSIONS.items():
+        words_re = _phrase_pattern(words)
+        if re.search(rf"\b(?:by|per|for each|for every|each|every|across|among)\s+(?:the\s+)?{words_re}", text):
+            return column
+        if re.search(rf"\b(?:which|what)\s+(?:\w+\s+)?{words_re}", text):
+            return column
+        if re.search(rf"\b(?:top|bottom)\s+\d*\s*(?:\w+(?:ing|ed)\s+)?{words_re}", text):
+            return column
+        if re.search(rf"\b(?:most|least)\s+(?:common|frequent|popular)\s+{words_re}", text):
+            return column
+        # "worst performing agent", "highest rated department" (but not "highest agent score")
+        if re.search(rf"\b(?:best|worst|highest|lowest)\s+(?:\w+(?:ing|ed)\s+)?{words_re}(?!\s+(?:score|rating|name))", text):
+            return column
+        if column == 'agent_name' and re.search(r"^(?:who|whose)\b", text):
+            return column
+        if column == 'month' and 'monthly' in text:
+            return column
+    return None
+
+
+def _counts_calls(text: str) -> bool:
+    """False when a "how many" / "number of" question counts something other than calls ("how many agents")."""
+    match = re.search(r"\b(?:how many|number of)((?:\s+[\w'-]+){1,4})", text)
+    return match is None or _contains(match.group(1), _CALL_NOUNS)
+
+
+def _uncovered_words(text: str, filters: Dict[str, str]) -> List[str]:
+    """Words of a question that no keyword, dimension, metric or detected filter accounts for."""
+    covered = set(_FILLER_WORDS)
+    for phrases in (*_AGGREGATION_KEYWORDS.values(), *METRICS.values(), *DIMENSIONS.values(),
+                    _VOLUME_KEYWORDS, _CALL_NOUNS):
+        for phrase in phrases:
+            covered.update(re.findall(r"[a-z]+", phrase))
+    for value in filters.values():
+        covered.update(re.findall(r"[a-z]+", str(value).lower()))
+    return [word for word in re.findall(r"[a-z]+", text) if word not in covered]
+
+
+def _detect_direction(text: str, metric: Optional[str], group_by: Optional[str]) -> Optional[str]:
+    """
+    'max' or 'min' from the superlative attached to the metric (or, without a metric, to the
+    ranked group), so "top 5 calls with the lowest score" is 'min'. None without a superlative.
+    """
+    extremes = [(match.start(), match.end(), direction) for direction in ('max', 'min')
+                for match in re.finditer(_phrase_pattern(_AGGREGATION_KEYWORDS[direction]), text)]
+    if not extremes:
+        return None
+    anchor_words = METRICS[metric] if metric else DIMENSIONS.get(group_by, [])
+    anchors = [match.start() for match in re.finditer(_phrase_pattern(anchor_words), text)] if anchor_words else []
+    if not anchors:
+        return 'max' if any(direction == 'max' for _, _, direction in extremes) else 'min'
+
+    def distance(extreme) -> int:
+        start, end, _ = extreme
+        # Characters between the superlative and the nearest anchor; superlatives after it ("score is lowest") count less
+        return min(max(anchor - end, 0) if start <= anchor else start - anchor + len(text) for anchor in anchors)
+
+    return min(extremes, key=distance)[2]
+
+
+def _detect_metric(text: str) -> Optional[str]:
+    for column, words in METRICS.items():
+        if _contains(text, words):
+            return column
+    return None
+
+
+def _detect_share_target(text: str, group_by: Optional[str]) -> Optional[str]:
+    """Column whose value shares are requested ("resolution rate", "sentiment breakdown")."""
+    if _contains(text, ['resolved', 'unresolved', 'resolution']):
+        return 'resolution_status'
+    if _contains(text, ['tone', 'sentiment']):
+        return 'customer_tone'
+    if _contains(text, ['emotion', 'emotions']):
+        return 'customer_emotions'
+    return group_by
+
+
+def _detect_filters(text: str, frame: pd.DataFrame, exclude: List[str]) -> Dict[str, str]:
+    """Find column values named in the question, plus resolved/unresolved."""
+    filters = {}
+    if 'resolution_status' not in exclude:
+        if _contains(text, ['unresolved', 'not resolved']):
+            filters['resolution_status'] = 'Unresolved'
+        elif _contains(text, ['resolved']):
+            filters['resolution_status'] = 'Resolved'
+
+    for column in FILTER_COLUMNS:
+        if column in exclude or column not in frame:
+            continue
+        values = frame[column].cat.categories if hasattr(frame[column], 'cat') else frame[column].unique()
+        # Longest names first so "Technical Support" wins over "Support"
+        for value in sorted((str(v) for v in values), key=len, reverse=True):
+            if value and value != 'Unknown' and re.search(rf"\b{re.escape(value.lower())}\b", text):
+                filters[column] = value
+                break
+    return filters
+
+
+def classify_question(question: str, frame: pd.DataFrame) -> Optional[Dict]:
+    """
+    Recognize an aggregate or metric question and compile it into a query spec.
+
+    Args:
+        question: User question
+        frame: Summary frame (used to recognize named departments, agents, categories)
+
+    Returns:
+        dict with aggregation, metric, group_by, share_target, filters, date_range,
+        top_n and ascending, or None if the question should go to retrieval
+    """
+    text = question.lower().strip()
+    if not text or _contains(text, _NARRATIVE_KEYWORDS):
+        return None
+
+    group_by = _detect_group_by(text)
+    metric = _detect_metric(text)
+
+    aggregation = None
+    if _contains(text, _AGGREGATION_KEYWORDS['share']):
+        aggregation = 'share'
+    elif _contains(text, _AGGREGATION_KEYWORDS['count']):
+        aggregation = 'count'
+    elif _contains(text, _AGGREGATION_KEYWORDS['mean']):
+        aggregation = 'mean'
+    elif _contains(text, _AGGREGATION_KEYWORDS['median']):
+        aggregation = 'median'
+    elif _contains(text, _AGGREGATION_KEYWORDS['sum']):
+        aggregation = 'sum' if metric else 'count'
+
+    direction = _detect_direction(text, metric, group_by)
+    if aggregation is None:
+        aggregation = direction
+    if aggregation is None:
+        return None
+    if aggregation == 'count' and not _counts_calls(text):
+        return None
+    if aggregation in ('mean', 'median', 'sum') and metric is None:
+        return None
+    if aggregation in ('max', 'min') and metric is None and group_by is None:
+        return None
+    if aggregation in ('max', 'min') and metric is None and group_by in _PERFORMANCE_GROUPS \
+            and not _contains(text, _VOLUME_KEYWORDS):
+        # "Who is the best agent?" asks about performance, not about who took the most calls
+        metric = 'agent_score'
+
+    share_target = _detect_share_target(text, group_by) if aggregation == 'share' else None
+
+    top_match = re.search(r"\b(?:top|bottom)\s+(\d+)\b", text)
+    top_n = int(top_match.group(1)) if top_match else None
+    # "lowest average score", "least common issue" and "bottom 5" sort ascending whatever the aggregation
+    ascending = direction == 'min'
+
+    exclude = [column for column in (group_by, share_target) if column]
+    filters = _detect_filters(text, frame, exclude)
+    if aggregation == 'share' and share_target is None and not filters:
+        return None
+    topic = _uncovered_words(text, filters)
+    if topic:
+        logger.debug(f"Analytics: no filter covers {topic}, leaving the question to retrieval")
+        return None
+    return {
+        "aggregation": aggregation,
+        "metric": metric,
+        "group_by": group_by,
+        "share_target": share_target,
+        "filters": filters,
+        # Only an explicit month, year or period ("March 2025", "last month") limits the dates
+        "date_range": extract_date_range(question),
+        "top_n": top_n,
+        "ascending": ascending,
+    }
+
+
+def _apply_filters(frame: pd.DataFrame, spec: Dict) -> pd.DataFrame:
+    mask = np.ones(len(frame), dtype=bool)
+    for column, value in spec["filters"].items():
+        mask &= (frame[column] == value).to_numpy()
+    if spec["date_range"]:
+        start, end = spec["date_range"]
+        months = frame['month']
+        mask &= ((months >= start) & (months <= end)).to_numpy()
+    return frame[mask]
+
+
+def _metric_values(frame: pd.DataFrame, metric: str) -> pd.Series:
+    values = frame[metric]
+    return values / 60.0 if metric == 'duration_seconds' else values
+
+
+def describe_query(spec: Dict) -> str:
+    """Return a one-line description of a query spec, e.g. 'Average agent score by department'."""
+    metric_label = METRIC_LABELS.get(spec["metric"], 'calls')
+    aggregation = spec["aggregation"]
+    if aggregation == 'count':
+        description = "Number of calls"
+    elif aggregation == 'share' and spec["share_target"] is None:
+        description = "Share of calls"
+    elif aggregation == 'share':
+        description = f"Share of calls by {spec['share_target'].replace('_', ' ')}"
+    elif aggregation in ('max', 'min') and not spec["group_by"] and spec["top_n"]:
+        description = f"Calls with the {'lowest' if aggregation == 'min' else 'highest'} {metric_label}"
+    elif aggregation in ('max', 'min') and spec["group_by"]:
+        label = f"average {metric_label}" if spec["metric"] else "number of calls"
+        description = f"{spec['group_by'].replace('_', ' ').capitalize()} ranked by {label}"
+    else:
+        names = {'mean': 'Average', 'median': 'Median', 'sum': 'Total', 'max': 'Highest', 'min': 'Lowest'}
+        description = f"{names[aggregation]} {metric_label}"
+    if spec["group_by"] and aggregation not in ('max', 'min'):
+        if not (aggregation == 'share' and spec["share_target"] == spec["group_by"]):
+            description += f" by {spec['group_by'].replace('_', ' ')}"
+    conditions = describe_filters(spec)
+    if conditions:
+        description += f" ({conditions})"
+    return description
+
+
+def describe_filters(spec: Dict) -> str:
+    """Return the filters a query spec applies, e.g. 'department = Billing, months 2025-03..2025-03' ('' if none)."""
+    conditions = [f"{column.replace('_', ' ')} = {value}" for column, value in spec["filters"].items()]
+    if spec["date_range"]:
+        start, end = spec["date_range"]
+        conditions.append(f"months up to {end}" if start == OPEN_START else f"months {start}..{end}")
+    return ', '.join(conditions)
+
+
+def run_query(frame: pd.DataFrame, spec: Dict) -> pd.DataFrame:
+    """
+    Execute a query spec with vectorized pandas operations.
+
+    Args:
+        frame: Summary frame
+        spec: Query spec from classify_question
+
+    Returns:
+        Result table (one row per group, or a single row for ungrouped questions)
+    """
+    data = _apply_filters(frame, spec)
+    aggregation, metric, group_by = spec["aggregation"], spec["metric"], spec["group_by"]
+    metric_label = METRIC_LABELS.get(metric, '')
+
+    if aggregation == 'share':
+        target = spec["share_target"]
+        if target is None:
+            # "percentage of angry customers in Billing": calls matching the outcome filters
+            # (tone, resolution) out of the calls in scope (department, category, agent, dates)
+            outcome = {column for column in spec["filters"] if column in ('customer_tone', 'resolution_status')}
+            scope = {column: value for column, value in spec["filters"].items() if column not in outcome} if outcome else {}
+            base = _apply_filters(frame, dict(spec, filters=scope))
+            return pd.DataFrame({'matching calls': [len(data)], 'calls in scope': [len(base)],
+                                 'share %': [len(data) / max(len(base), 1) * 100]})
+        if group_by and group_by != target:
+            counts = data.groupby([group_by, target], observed=True).size().unstack(fill_value=0)
+            calls = counts.sum(axis=1)
+            table = counts.div(calls, axis=0).mul(100).add_suffix(' %')
+            table.columns = table.columns.astype(str)
+            table.insert(0, 'calls', calls)
+            return table.reset_index()
+        counts = data[target].value_counts()
+        counts = counts[counts > 0]
+        return pd.DataFrame({target: counts.index.astype(str), 'calls': counts.to_numpy(),
+                             'share %': (counts / max(len(data), 1) * 100).to_numpy()})
+
+    if not group_by:
+        if aggregation == 'count':
+            return pd.DataFrame({'calls': [len(data)]})
+        values = _metric_values(data, metric)
+        if aggregation in ('max', 'min') and spec["top_n"]:
+            # "top 5 calls with the lowest score": the calls themselves
+            order = values.sort_values(ascending=spec["ascending"]).head(spec["top_n"]).index
+            table = data.loc[order, [column for column in ('call_id', 'agent_name', 'department', 'month')
+                                     if column in data]]
+            return table.assign(**{metric_label: values.loc[order]}).reset_index(drop=True)
+        result = getattr(values, aggregation)()
+        return pd.DataFrame({f"{aggregation} {metric_label}": [result], 'calls': [int(values.count())]})
+
+    grouped = data.groupby(group_by, observed=True)
+    if aggregation == 'count' or (aggregation in ('max', 'min') and metric is None):
+        table = grouped.size().rename('calls').to_frame()
+        sort_column = 'calls'
+    else:
+        how = 'mean' if aggregation in ('max', 'min') else aggregation
+        table = _metric_values(data, metric).groupby(data[group_by], observed=True).agg(how).rename(
+            f"{how} {metric_label}").to_frame()
+        table['calls'] = grouped.size()
+        sort_column = table.columns[0]
+
+    table = table.sort_values(sort_column, ascending=spec["ascending"])
+    if spec["top_n"]:
+        table = table.head(spec["top_n"])
+    elif aggregation in ('max', 'min'):
+        table = table.head(DEFAULT_TOP_N)
+    return table.reset_index()
+
+
+def answer_aggregate_question(question: str, frame: pd.DataFrame) -> Optional[Dict]:
+    """
+    Answer an aggregate question from the summary frame, if it is one.
+
+    Args:
+        question: User question
+        frame: Summary frame
+
+    Returns:
+        dict with spec, description, table, matched_rows, total_rows and compute_ms,
+        or None if the question should go to retrieval
+    """
+    if frame is None or frame.empty:
+        return None
+    spec = classify_question(question, frame)
+    if spec is None:
+        return None
+
+    start = time.perf_counter()
+    try:
+        table = run_query(frame, spec)
+        matched_rows = len(_apply_filters(frame, spec))
+    except Exception as e:
+        logger.warning(f"⚠️  Analytics query failed, falling back to retrieval: {str(e)}")
+        return None
+    compute_ms = (time.perf_counter() - start) * 1000
+
+    description = describe_query(spec)
+    logger.info(f"🧮 Analytics: {description} | {matched_rows:,} of {len(frame):,} calls | {compute_ms:.1f}ms")
+    return {
+        "spec": spec,
+        "description": description,
+        "table": table,
+        "matched_rows": matched_rows,
+        "total_rows": len(frame),
+        "compute_ms": compute_ms,
+    }
+
+
+def format_table_markdown(table: pd.DataFrame, max_rows: int = 50) -> str:
+    """
+    Render a result table as a Markdown pipe table (numbers rounded to 2 decimals).
+
+    Args:
+        table: Result table
+        max_rows: Rows included; a note says how many were left out
+
+    Returns:
+        Markdown table
+    """
+    shown = table.head(max_rows)
+
+    def cell(value) -> str:
+        if isinstance(value, (float, np.floating)):
+            return 'n/a' if np.isnan(value) else f"{value:,.2f}"
+        if isinstance(value, (int, np.integer)):
+            return f"{value:,}"
+        return str(value)
+
+    lines = ["| " + " | ".join(str(column) for column in shown.columns) + " |",
+             "|" + "---|" * len(shown.columns)]
+    lines += ["| " + " | ".join(cell(value) for value in row) + " |" for row in shown.itertuples(index=False)]
+    if len(table) > max_rows:
+        lines.append(f"\n({len(table) - max_rows} more rows not shown)")
+    return "\n".join(lines)
@@ -0,0 +1,262 @@
+"""
+Semantic Answer Cache for Chat
+
+This module caches LLM answers and serves them again for questions that are
+semantically the same ("Which agents have the highest scores?" vs "Which
+agents scored highest?"). Lookups compare the question embedding against all
+cached question embeddings with one NumPy matrix product; a hit needs cosine
+similarity above the threshold and the same cache scope:
+
+- data version: version stamp of the summaries (see utils.get_summaries_version)
+- prompt hash: hash of the prompts, model settings and, for follow-up questions,
+  the chat history sent to the LLM (see history_for_cache)
+
+Entries from an older data version or prompt are stale and are evicted when
+found. Entries also expire after a TTL, and the least recently used entry is
+evicted when the cache is full. Hit rate and staleness are tracked in stats().
+
+Caches are shared by all sessions, whatever their API key, so they hold no
+embeddings: callers embed questions with their own key and pass the vector.
+
+Functions:
+- compute_prompt_hash(): Stable hash of everything besides the question that shapes an answer
+- history_for_cache(): The part of the sent history a question's answer depends on
+- stream_cached_answer(): Yield a cached answer in chunks, like an LLM stream
+- get_answer_cache(): Return a named process-wide cache
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional
+import numpy as np
+from src.logger import logger
+from src.config import Config
+
+
+def compute_prompt_hash(*parts) -> str:
+    """
+    Hash prompts, settings and history into a short cache scope key.
+
+    Args:
+        *parts: Strings, numbers, lists or dicts (JSON-serializable)
+
+    Returns:
+        str: 16-character hex digest
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+# Words and openings that refer back to earlier turns ("what about their ratings?", "and for Billing?",
+# "only resolved ones", "sort by rating")
+_FOLLOW_UP_WORDS = ['it', 'its', 'they', 'them', 'their', 'theirs', 'those', 'these', 'he', 'him', 'his', 'she',
+                    'her', 'hers', 'one', 'ones', 'same', 'also', 'else', 'again', 'instead', 'other', 'others',
+                    'former', 'latter', 'above', 'previous', 'second', 'first', 'last one', 'you said',
+                    'you mentioned', 'your answer', 'tell me more']
+_FOLLOW_UP_WORDS_RE = re.compile(r"\b(?:" + "|".join(re.escape(word) for word in _FOLLOW_UP_WORDS) + r")\b")
+_FOLLOW_UP_START_RE = re.compile(r"^\s*(?:and|but|so|then|now|only|just|what about|how about|why|what else|"
+                                 r"in|for|by|sort|order|filter|expand|elaborate|continue|more|compare|same)\b")
+# A question stands on its own only if it names what it is about ("Which agents ...?")
+_SUBJECT_WORDS_RE = re.compile(r"\b(?:agents?|calls?|callers?|customers?|departments?|teams?|issues?|summar(?:y|ies)|"
+                               r"conversations?|reps?|representatives?)\b")
+_MIN_STANDALONE_WORDS = 4
+
+
+def history_for_cache(question: str, history: List[Dict]) -> List:
+    """
+    Return the part of the history sent to the LLM that a question's answer depends on.
+
+    The cache is shared by all sessions, so history is left out of the key only
+    when the answer cannot depend on it: on the first turn, or for a question
+    that stands on its own ("Which agents have the highest scores?") - at least
+    a few words, naming agents, calls, departments or similar, and without
+    pronouns or openers that refer back. Anything else, including short
+    elliptical follow-ups such as "Only for Billing" or "Sort by rating", keeps
+    the sent history (window and rolling summary) in the key.
+
+    Args:
+        question: User question
+        history: Role/content messages sent with the question
+
+    Returns:
+        List of (role, content) pairs; empty if the answer does not depend on the history
+    """
+    messages = [(msg['role'], msg['content']) for msg in history or []]
+    text = question.lower()
+    standalone = (len(text.split()) >= _MIN_STANDALONE_WORDS and _SUBJECT_WORDS_RE.search(text)
+                  and not (_FOLLOW_UP_START_RE.search(text) or _FOLLOW_UP_WORDS_RE.search(text)))
+    return [] if standalone else messages
+
+
+def stream_cached_answer(answer: str, chunk_size: int = 64) -> Iterator[str]:
+    """Yield a cached answer in chunks so it renders through the normal streaming path."""
+    for start in range(0, len(answer), chunk_size):
+        yield answer[start:start + chunk_size]
+
+
+class SemanticAnswerCache:
+    """Thread-safe LRU cache of answers keyed by question-embedding similarity."""
+
+    def __init__(self, similarity_threshold: float = None, max_entries: int = None, ttl_seconds: float = None):
+        """
+        Args:
+            similarity_threshold: Minimum cosine similarity for a hit (uses Config.ANSWER_CACHE_SIMILARITY if None)
+            max_entries: Entries kept before LRU eviction (uses Config.ANSWER_CACHE_MAX_ENTRIES if None)
+            ttl_seconds: Entry lifetime, 0 = no expiry (uses Config.ANSWER_CACHE_TTL_SECONDS if None)
+        """
+        self.similarity_threshold = Config.ANSWER_CACHE_SIMILARITY if similarity_threshold is None else similarity_threshold
+        self.max_entries = max_entries or Config.ANSWER_CACHE_MAX_ENTRIES
+        self.ttl_seconds = Config.ANSWER_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self._entries: "OrderedDict[int, Dict]" = OrderedDict()
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_ids: List[int] = []
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._stats = {"lookups": 0, "hits": 0, "misses": 0, "stale_evictions": 0,
+                       "expired_evictions": 0, "served_age_total": 0.0}
+
+    @staticmethod
+    def normalize(vector) -> np.ndarray:
+        """Convert an embedding into a unit-length float32 vector."""
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _question_matrix(self) -> np.ndarray:
+        """Stacked question vectors of all entries (rebuilt only after changes)."""
+        if self._matrix is None:
+            self._matrix_ids = list(self._entries)
+            self._matrix = (np.vstack([self._entries[i]["vector"] for i in self._matrix_ids])
+                            if self._matrix_ids else None)
+        return self._matrix
+
+    def _remove(self, entry_id: int) -> None:
+        self._entries.pop(entry_id, None)
+        self._matrix = None
+
+    def lookup(self, question: str, data_version: str, prompt_hash: str, vector: np.ndarray) -> Optional[Dict]:
+        """
+        Find a cached answer for a semantically equivalent question.
+
+        Args:
+            question: User question
+            data_version: Current summaries version
+            prompt_hash: Current prompt/settings/history hash
+            vector: Unit-length question vector (see normalize)
+
+        Returns:
+            dict with answer, question, similarity and age_seconds, or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            self._stats["lookups"] += 1
+            matrix = self._question_matrix()
+            if matrix is not None:
+                similarities = matrix @ vector
+                for position in np.argsort(-similarities):
+                    similarity = float(similarities[position])
+                    if similarity < self.similarity_threshold:
+                        break
+                    entry_id = self._matrix_ids[position]
+                    entry = self._entries.get(entry_id)
+                    if entry is None:
+                        continue
+                    if self.ttl_seconds and now - entry["created_at"] > self.ttl_seconds:
+                        self._stats["expired_evictions"] += 1
+                        self._remove(entry_id)
+                        continue
+                    if entry["data_version"] != data_version or entry["prompt_hash"] != prompt_hash:
+                        # Same question under older data or prompts: never serve it again
+                        if entry["data_version"] != data_version:
+                            self._stats["stale_evictions"] += 1
+                            self._remove(entry_id)
+                        continue
+                    self._entries.move_to_end(entry_id)
+                    entry["hits"] += 1
+                    age = now - entry["created_at"]
+                    self._stats["hits"] += 1
+                    self._stats["served_age_total"] += age
+                    logger.info(f"⚡ Answer cache hit (similarity {similarity:.3f}, age {age:.0f}s) for: '{question[:80]}'")
+                    return {"answer": entry["answer"], "question": entry["question"],
+                            "similarity": similarity, "age_seconds": age}
+            self._stats["misses"] += 1
+            return None
+
+    def store(self, question: str, answer: str, data_version: str, prompt_hash: str, vector: np.ndarray) -> None:
+        """
+        Cache an answer.
+
+        Args:
+            question: User question
+            answer: Full LLM answer
+            data_version: Summaries version the answer was generated from
+            prompt_hash: Prompt/settings/history hash the answer was generated with
+            vector: Unit-length question vector (see normalize)
+        """
+        if not answer or not answer.strip():
+            return
+        with self._lock:
+            self._entries[self._next_id] = {
+                "question": question,
+                "answer": answer,
+                "vector": vector,
+                "data_version": data_version,
+                "prompt_hash": prompt_hash,
+                "created_at": time.time(),
+                "hits": 0
+            }
+            self._next_id += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    def clear(self) -> None:
+        """Remove all entries (stats are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+
+    def stats(self, data_version: str = None) -> Dict:
+        """
+        Return hit rate and staleness statistics.
+
+        Args:
+            data_version: Current summaries version; entries from other versions count as stale
+
+        Returns:
+            dict with lookups, hits, misses, hit_rate, entries, stale_entries,
+            evictions and the average age of served answers
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["stale_entries"] = (sum(1 for entry in self._entries.values() if entry["data_version"] != data_version)
+                                      if data_version is not None else 0)
+        stats["hit_rate"] = stats["hits"] / stats["lookups"] if stats["lookups"] else 0.0
+        served_age_total = stats.pop("served_age_total")
+        stats["avg_served_age_seconds"] = served_age_total / stats["hits"] if stats["hits"] else 0.0
+        return stats
+
+
+_caches: Dict[str, SemanticAnswerCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_answer_cache(name: str) -> SemanticAnswerCache:
+    """
+    Return the process-wide answer cache with this name, creating it on first use.
+
+    Args:
+        name: Cache name, e.g. 'rag:<embedding model>' (question vectors must come from that model)
+
+    Returns:
+        SemanticAnswerCache shared by all sessions
+    """
+    with _caches_lock:
+        if name not in _caches:
+            _caches[name] = SemanticAnswerCache()
+        return _caches[name]
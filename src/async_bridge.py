@@ -0,0 +1,86 @@
+"""
+Sync Bridge for Async Code
+
+Streamlit scripts run synchronously, while the RAG pipeline is asyncio-native.
+This module runs coroutines and async generators on one process-wide event
+loop in a background thread, so sync callers can await results and iterate
+async streams. Closing a bridged iterator early (e.g. the user navigated away
+and Streamlit stopped the script) closes the async generator on the loop,
+which cancels the work it is waiting on.
+
+Functions:
+- get_event_loop(): Return the process-wide background event loop
+- run_sync(): Run a coroutine on the loop and wait for its result
+- iterate_sync(): Iterate an async generator from sync code
+"""
+
+import asyncio
+import threading
+from typing import AsyncIterator, Awaitable, Iterator, Optional, TypeVar
+
+
+T = TypeVar('T')
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Return the process-wide event loop, starting its thread on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="async-bridge", daemon=True).start()
+        return _loop
+
+
+def run_sync(coro: Awaitable[T], timeout: float = None) -> T:
+    """
+    Run a coroutine on the background loop and block until it finishes.
+
+    Args:
+        coro: Coroutine to run
+        timeout: Seconds to wait before cancelling it (None = no limit)
+
+    Returns:
+        The coroutine's result
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, get_event_loop())
+    try:
+        return future.result(timeout=timeout)
+    except BaseException:
+        future.cancel()
+        raise
+
+
+def iterate_sync(agen: AsyncIterator[T]) -> Iterator[T]:
+    """
+    Iterate an async generator from sync code, one item at a time.
+
+    If iteration stops early (break, exception or generator close), the async
+    generator is closed on the loop so in-flight requests are cancelled.
+
+    Args:
+        agen: Async generator to iterate
+
+    Yields:
+        Items produced by agen
+    """
+    loop = get_event_loop()
+    exhausted = False
+    try:
+        while True:
+            future = asyncio.run_coroutine_threadsafe(agen.__anext__(), loop)
+            try:
+                item = future.result()
+            except StopAsyncIteration:
+                exhausted = True
+                return
+            except BaseException:
+                future.cancel()
+                raise
+            yield item
+    finally:
+        if not exhausted:
+            asyncio.run_coroutine_threadsafe(agen.aclose(), loop)
@@ -0,0 +1,178 @@
+"""
+Rendered Chart Cache
+
+Rendering a chart with matplotlib and base64-encoding the PNG takes around a
+second, and it used to happen on every "show agent performance chart" request
+even when the summaries had not changed. This module caches rendered charts
+keyed by chart type, data version (see utils.get_summaries_version) and render
+parameters (e.g. dpi), so a repeat request from any session is served without
+rendering.
+
+Entries are kept in memory with least-recently-used eviction. If a cache
+directory is configured, entries are also written there as JSON files and read
+back on a memory miss, so rendered charts survive restarts; the directory is
+trimmed to the same number of entries, oldest first.
+
+Classes:
+- ChartImageCache: Thread-safe LRU cache of rendered charts with optional disk persistence
+
+Functions:
+- get_chart_cache(): Return the process-wide chart cache
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from src.answer_cache import compute_prompt_hash
+from src.logger import logger
+from src.config import Config
+
+
+class ChartImageCache:
+    """Thread-safe LRU cache of rendered charts (base64 PNG and summary text)."""
+
+    def __init__(self, max_entries: int = None, cache_dir: str = None):
+        """
+        Args:
+            max_entries: Entries kept before LRU eviction (uses Config.CHART_CACHE_MAX_ENTRIES if None)
+            cache_dir: Directory for persisted entries, '' = memory only (uses Config.CHART_CACHE_DIR if None)
+        """
+        self.max_entries = max_entries or Config.CHART_CACHE_MAX_ENTRIES
+        self.cache_dir = Config.CHART_CACHE_DIR if cache_dir is None else cache_dir
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"lookups": 0, "hits": 0, "disk_hits": 0, "misses": 0, "stores": 0}
+
+    @staticmethod
+    def make_key(chart_type: str, data_version: str, render_params: Dict = None) -> str:
+        """
+        Build the cache key for a chart.
+
+        Args:
+            chart_type: Chart type (e.g. 'agent performance')
+            data_version: Summaries version the chart is rendered from
+            render_params: Parameters that change the image (e.g. {"dpi": 100})
+
+        Returns:
+            str: 16-character hex key
+        """
+        return compute_prompt_hash(chart_type, data_version, render_params or {})
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[Dict]:
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            # Refresh mtime so disk trimming is least-recently-used too
+            os.utime(path)
+            return entry
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Could not read cached chart {path}: {str(e)}")
+            return None
+
+    def _write_disk(self, key: str, entry: Dict) -> None:
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = f"{self._path(key)}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(temp_path, self._path(key))
+            files = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir) if name.endswith('.json')]
+            if len(files) > self.max_entries:
+                files.sort(key=os.path.getmtime)
+                for path in files[:len(files) - self.max_entries]:
+                    os.remove(path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not persist chart to {self.cache_dir}: {str(e)}")
+
+    def _remember(self, key: str, entry: Dict) -> None:
+        """Add an entry to the in-memory LRU (lock held)."""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Look up a rendered chart.
+
+        Args:
+            key: Key from make_key()
+
+        Returns:
+            dict with image, summary, chart_type, data_version and created_at, or None on a miss
+        """
+        with self._lock:
+            self._stats["lookups"] += 1
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry
+        entry = self._read_disk(key) if self.cache_dir else None
+        with self._lock:
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["hits"] += 1
+            self._stats["disk_hits"] += 1
+            self._remember(key, entry)
+        return entry
+
+    def put(self, key: str, chart_type: str, data_version: str, image: str, summary: str) -> None:
+        """
+        Cache a rendered chart.
+
+        Args:
+            key: Key from make_key()
+            chart_type: Chart type
+            data_version: Summaries version the chart was rendered from
+            image: Base64-encoded PNG
+            summary: Summary text shown with the chart
+        """
+        entry = {"image": image, "summary": summary, "chart_type": chart_type,
+                 "data_version": data_version, "created_at": time.time()}
+        with self._lock:
+            self._remember(key, entry)
+            self._stats["stores"] += 1
+        if self.cache_dir:
+            self._write_disk(key, entry)
+
+    def clear(self) -> None:
+        """Remove all in-memory entries (persisted files are kept; stats are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """
+        Return cache statistics.
+
+        Returns:
+            dict with lookups, hits, disk_hits, misses, stores, entries and hit_rate
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        stats["hit_rate"] = stats["hits"] / stats["lookups"] if stats["lookups"] else 0.0
+        return stats
+
+
+_cache: Optional[ChartImageCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_chart_cache() -> ChartImageCache:
+    """Return the process-wide chart cache shared by all sessions, creating it on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ChartImageCache()
+        return _cache
@@ -0,0 +1,158 @@
+"""
+Parallel KPI Dashboard of All Charts
+
+Charts used to be produced one at a time, on request, from the chat. This
+module renders every chart in the plotter registry (plotter.CHART_GENERATORS)
+for a dashboard overview. Matplotlib rendering is CPU-bound and pyplot is not
+thread-safe, so PNG charts are rendered concurrently in a process pool: every
+worker gets the shared chart frame (see plotter.get_chart_frame) and renders
+one chart. The dashboard takes about as long as its slowest chart, and charts
+already in the rendered-chart cache are not rendered again.
+
+In the default 'spec' render mode, dashboard charts are Vega-Lite specs that
+the browser draws, which takes milliseconds and needs no worker processes.
+
+Functions:
+- render_chart_worker(): Render one chart (runs in a worker process)
+- get_dashboard_pool(): Return the process-wide rendering pool
+- generate_dashboard(): Render every chart as PNG concurrently
+- build_dashboard_specs(): Vega-Lite specs for every chart
+- format_dashboard_stats(): Caption text for a rendered dashboard
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+import pandas as pd
+from src.chart_cache import get_chart_cache
+from src.chart_specs import build_chart_spec
+from src.config import Config
+from src.logger import logger
+from src.plotter import CHART_GENERATORS, chart_cache_key, get_chart_frame
+
+
+def render_chart_worker(chart_type: str, frame: pd.DataFrame) -> Tuple[Optional[str], str, float]:
+    """
+    Render one chart from a chart frame.
+
+    Args:
+        chart_type: Key of plotter.CHART_GENERATORS
+        frame: Chart frame from get_chart_frame()
+
+    Returns:
+        Tuple of (base64 PNG or None, summary text, render seconds)
+    """
+    start = time.time()
+    image, summary_text = CHART_GENERATORS[chart_type](frame)
+    return image, summary_text, time.time() - start
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_dashboard_pool() -> ProcessPoolExecutor:
+    """Return the process-wide pool that renders dashboard charts, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = Config.DASHBOARD_WORKERS or min(len(CHART_GENERATORS), os.cpu_count() or 1)
+            # Spawned workers: forking the multi-threaded Streamlit server is unsafe
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            logger.info(f"📈 Started dashboard rendering pool with {workers} workers")
+        return _pool
+
+
+def _reset_pool() -> None:
+    """Drop a broken pool so the next dashboard starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def generate_dashboard(summaries: list, data_version: str = None, chart_types: Iterable[str] = None,
+                       parallel: bool = True) -> Dict:
+    """
+    Render every chart as a PNG, concurrently in the process pool.
+
+    Args:
+        summaries: Summary dicts
+        data_version: Version stamp of the summaries; the chart frame and rendered charts are reused while it is unchanged
+        chart_types: Charts to render (all of CHART_GENERATORS if None)
+        parallel: Render in the process pool; False renders in this process, one chart at a time
+
+    Returns:
+        Dict with charts (list of dicts with chart_type, image, summary, seconds and cached, in
+        chart_types order), seconds (wall time), rendered, cached and slowest_seconds
+    """
+    start = time.time()
+    chart_types = list(chart_types or CHART_GENERATORS)
+    frame = get_chart_frame(summaries, data_version)
+    chart_cache = get_chart_cache() if data_version is not None and Config.CHART_CACHE_ENABLED else None
+
+    results = {}
+    for chart_type in chart_types:
+        cached = chart_cache.get(chart_cache_key(chart_type, data_version)) if chart_cache else None
+        if cached is not None:
+            results[chart_type] = {"image": cached["image"], "summary": cached["summary"], "seconds": 0.0, "cached": True}
+    pending = [chart_type for chart_type in chart_types if chart_type not in results]
+
+    if parallel and len(pending) > 1:
+        try:
+            pool = get_dashboard_pool()
+            futures = {chart_type: pool.submit(render_chart_worker, chart_type, frame) for chart_type in pending}
+            for chart_type, future in futures.items():
+                image, summary_text, seconds = future.result()
+                results[chart_type] = {"image": image, "summary": summary_text, "seconds": seconds, "cached": False}
+        except Exception as e:
+            logger.warning(f"⚠️ Parallel dashboard rendering failed, rendering the remaining charts serially: {str(e)}")
+            _reset_pool()
+    for chart_type in pending:
+        if chart_type not in results:
+            image, summary_text, seconds = render_chart_worker(chart_type, frame)
+            results[chart_type] = {"image": image, "summary": summary_text, "seconds": seconds, "cached": False}
+        if chart_cache and results[chart_type]["image"]:
+            chart_cache.put(chart_cache_key(chart_type, data_version), chart_type, data_version,
+                            results[chart_type]["image"], results[chart_type]["summary"])
+
+    charts = [{"chart_type": chart_type, **results[chart_type]} for chart_type in chart_types]
+    stats = {
+        "charts": charts,
+        "seconds": time.time() - start,
+        "rendered": len(pending),
+        "cached": len(chart_types) - len(pending),
+        "slowest_seconds": max((chart["seconds"] for chart in charts), default=0.0),
+    }
+    logger.info(f"📈 Dashboard: {stats['rendered']} charts rendered, {stats['cached']} cached in {stats['seconds']:.2f}s "
+                f"(slowest chart {stats['slowest_seconds']:.2f}s)")
+    return stats
+
+
+def build_dashboard_specs(summaries: list, data_version: str = None, chart_types: Iterable[str] = None) -> List[Dict]:
+    """
+    Build Vega-Lite specs for every chart.
+
+    Args:
+        summaries: Summary dicts
+        data_version: Version stamp of the summaries
+        chart_types: Charts to build (all of CHART_GENERATORS if None)
+
+    Returns:
+        List of dicts with chart_type, spec (None if there is nothing to plot) and summary
+    """
+    charts = []
+    for chart_type in chart_types or CHART_GENERATORS:
+        spec, summary_text = build_chart_spec(chart_type, summaries, data_version)
+        charts.append({"chart_type": chart_type, "spec": spec, "summary": summary_text})
+    return charts
+
+
+def format_dashboard_stats(stats: Dict) -> str:
+    """Return a caption like '⏱️ 8 charts in 1.12s (6 rendered, 2 cached; slowest chart 0.95s)'."""
+    return (f"⏱️ {len(stats['charts'])} charts in {stats['seconds']:.2f}s ({stats['rendered']} rendered, "
+            f"{stats['cached']} cached; slowest chart {stats['slowest_seconds']:.2f}s)")
@@ -0,0 +1,175 @@
+"""
+Declarative (Vega-Lite) Chart Specs
+
+Charts used to be rendered with matplotlib on the server and sent to the
+browser as base64 PNGs (tens of KB each, kept in session state for every
+chart in the chat). This module instead builds a Vega-Lite spec from the
+pre-aggregated chart data (a few rows per chart, see plotter.chart_data), which
+Streamlit renders in the browser with st.vega_lite_chart. Building a spec needs
+no rendering on the server and the spec is typically a few hundred bytes; the
+chart data is bounded (histograms, top-N plus 'Other', time buckets) however
+many calls are in the store.
+
+PNG export stays available on demand: export_chart_png() renders the same chart
+with matplotlib (through the rendered-chart cache) only when it is requested.
+
+Functions:
+- build_chart_spec(): Vega-Lite spec and summary text for a chart type
+- export_chart_png(): PNG bytes of a chart, rendered on demand
+"""
+
+import base64
+import json
+from typing import Dict, Optional, Tuple
+import pandas as pd
+from src.plotter import SCORE_LEVELS, SENTIMENT_COLORS, chart_data, generate_chart, get_chart_frame
+
+
+def _values(data: pd.DataFrame) -> list:
+    """JSON-safe records (plain ints and floats instead of NumPy scalars)."""
+    return json.loads(data.to_json(orient='records'))
+
+
+def _bar(title: str, data: pd.DataFrame, x: str, x_title: str, y: str, y_title: str, **encoding) -> Dict:
+    return {
+        "title": title,
+        "data": {"values": _values(data)},
+        "mark": {"type": "bar", "tooltip": True},
+        "encoding": {
+            "x": {"field": x, "type": "nominal", "title": x_title, "sort": None},
+            "y": {"field": y, "type": "quantitative", "title": y_title},
+            **encoding,
+        },
+    }
+
+
+def _pie(title: str, data: pd.DataFrame, category: str, domain: list, colors: list) -> Dict:
+    return {
+        "title": title,
+        "data": {"values": _values(data)},
+        "mark": {"type": "arc", "tooltip": True},
+        "encoding": {
+            "theta": {"field": "calls", "type": "quantitative"},
+            "color": {"field": category, "type": "nominal", "sort": domain,
+                      "scale": {"domain": domain, "range": colors}},
+        },
+    }
+
+
+def _histogram(title: str, data: pd.DataFrame, count_column: str, x_title: str, y_title: str) -> Dict:
+    return {
+        "title": title,
+        "data": {"values": _values(data[['bin_start', 'bin_end', count_column]])},
+        "mark": {"type": "bar", "tooltip": True},
+        "encoding": {
+            "x": {"field": "bin_start", "type": "quantitative", "bin": {"binned": True}, "title": x_title},
+            "x2": {"field": "bin_end"},
+            "y": {"field": count_column, "type": "quantitative", "title": y_title},
+        },
+    }
+
+
+def _agent_performance_spec(data: pd.DataFrame) -> Dict:
+    if 'bin' in data:
+        return _histogram('Agent Performance Distribution', data, 'agents', 'Average Agent Score', 'Number of Agents')
+    spec = _bar('Agent Performance Scores', data, 'agent', 'Agent Name', 'avg_score', 'Average Agent Score',
+                color={"condition": [{"test": "datum.avg_score >= 80", "value": "#2ecc71"},
+                                     {"test": "datum.avg_score >= 60", "value": "#f39c12"}],
+                       "value": "#e74c3c"})
+    spec["encoding"]["y"]["scale"] = {"domain": [0, 100]}
+    return spec
+
+
+def _score_distribution_spec(data: pd.DataFrame) -> Dict:
+    return _pie('Agent Performance Distribution', data, 'level', SCORE_LEVELS,
+                ['#27ae60', '#2ecc71', '#f39c12', '#e74c3c'])
+
+
+def _duration_spec(data: pd.DataFrame) -> Dict:
+    if 'bin' in data:
+        return _histogram('Call Duration Distribution', data, 'calls', 'Duration (minutes)', 'Number of Calls')
+    return _bar('Call Duration by Agent', data, 'agent', 'Agent', 'avg_minutes', 'Average Duration (minutes)')
+
+
+def _agent_count_spec(data: pd.DataFrame) -> Dict:
+    return _bar('Conversation Count by Agent', data, 'agent', 'Agent Name', 'calls', 'Number of Conversations')
+
+
+def _sentiment_spec(data: pd.DataFrame) -> Dict:
+    sentiments = data['sentiment'].tolist()
+    return _pie('Customer Sentiment Distribution', data, 'sentiment', sentiments,
+                [SENTIMENT_COLORS.get(sentiment, '#95a5a6') for sentiment in sentiments])
+
+
+def _rating_spec(data: pd.DataFrame) -> Dict:
+    spec = _bar('Agent Rating Distribution', data, 'rating', 'Rating (Stars)', 'calls', 'Number of Calls',
+                color={"field": "rating", "type": "ordinal", "legend": None,
+                       "scale": {"domain": [1, 2, 3, 4, 5],
+                                 "range": ['#e74c3c', '#f39c12', '#f1c40f', '#2ecc71', '#27ae60']}})
+    spec["encoding"]["x"]["type"] = "ordinal"
+    return spec
+
+
+def _resolution_spec(data: pd.DataFrame) -> Dict:
+    return _pie('Call Resolution Status', data, 'status', ['Resolved', 'Unresolved'], ['#2ecc71', '#e74c3c'])
+
+
+def _volume_spec(data: pd.DataFrame) -> Dict:
+    data = data.assign(period=data['period'].dt.strftime('%Y-%m-%d'))
+    return {
+        "title": "Call Volume Over Time",
+        "data": {"values": _values(data)},
+        "mark": {"type": "area", "line": True, "opacity": 0.3, "tooltip": True},
+        "encoding": {
+            "x": {"field": "period", "type": "temporal", "title": "Period"},
+            "y": {"field": "calls", "type": "quantitative", "title": "Number of Calls"},
+        },
+    }
+
+
+_SPEC_BUILDERS = {
+    'agent performance': _agent_performance_spec,
+    'score distribution': _score_distribution_spec,
+    'duration': _duration_spec,
+    'agent count': _agent_count_spec,
+    'sentiment': _sentiment_spec,
+    'rating': _rating_spec,
+    'resolution': _resolution_spec,
+    'volume': _volume_spec,
+}
+
+
+def build_chart_spec(chart_type: str, summaries: list, data_version: str = None) -> Tuple[Optional[Dict], str]:
+    """
+    Build a Vega-Lite spec for a chart from pre-aggregated data.
+
+    Args:
+        chart_type: Chart type from detect_chart_request() (unknown types fall back to agent performance)
+        summaries: Summary dicts
+        data_version: Version stamp of the summaries; the chart frame is reused while it is unchanged
+
+    Returns:
+        Tuple of (Vega-Lite spec for st.vega_lite_chart or None, summary text)
+    """
+    if chart_type not in _SPEC_BUILDERS:
+        chart_type = 'agent performance'
+    data, summary_text = chart_data(chart_type, get_chart_frame(summaries, data_version))
+    if data is None:
+        return None, summary_text
+    return _SPEC_BUILDERS[chart_type](data), summary_text
+
+
+def export_chart_png(chart_type: str, summaries: list, data_version: str = None) -> bytes:
+    """
+    Render a chart to PNG with matplotlib (served from the chart cache when already rendered).
+
+    Args:
+        chart_type: Chart type from detect_chart_request()
+        summaries: Summary dicts
+        data_version: Version stamp of the summaries
+
+    Returns:
+        bytes: PNG image (empty if the chart could not be rendered)
+    """
+    image, _ = generate_chart(chart_type, summaries, data_version)
+    return base64.b64decode(image) if image else b''
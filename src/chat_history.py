@@ -0,0 +1,241 @@
+"""
+Token-Budgeted Chat History with Rolling Summarization
+
+Chat requests used to carry the full conversation, so prompt size and latency
+grew with every turn. This module keeps the most recent turns verbatim within a
+token budget (and a turn limit) and folds older turns into a rolling summary.
+The summary is updated on a background thread after each answer, so no request
+waits for it; until it catches up, turns that left the window are simply not sent.
+
+Functions:
+- history_window_start(): Index of the first message kept verbatim
+- window_history(): Most recent turns within the budget, without a summary
+- summarize_history(): Fold messages into a rolling summary with the LLM
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+import openai
+from src.logger import logger
+from src.config import Config
+from src.context_budget import count_tokens
+
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:"
+
+_SUMMARY_SYSTEM_PROMPT = (
+    "You maintain a running summary of a conversation between a call center analyst and an "
+    "assistant that answers questions about call summaries. Merge the new messages into the "
+    "existing summary. Keep questions asked, conclusions, numbers, agent names and call IDs "
+    "that later questions may refer to. Drop pleasantries. Answer with the updated summary only."
+)
+
+
+def _clean_messages(history: List[Dict]) -> List[Dict]:
+    """Return user/assistant messages with only role and content."""
+    return [{"role": msg["role"], "content": msg.get("content", "")}
+            for msg in history or [] if msg.get("role") in ("user", "assistant")]
+
+
+def history_window_start(messages: List[Dict], model: str = None, token_budget: int = None,
+                         max_turns: int = None) -> int:
+    """
+    Find the first message of the verbatim history window.
+
+    Messages are taken newest first until the token budget or the turn limit
+    would be exceeded; the window never starts with an assistant message.
+
+    Args:
+        messages: User/assistant messages, oldest first
+        model: Model name for token counting (uses Config.MODEL_NAME if None)
+        token_budget: Token budget for verbatim messages (uses Config.CHAT_HISTORY_TOKEN_BUDGET if None)
+        max_turns: Maximum user/assistant turns kept (uses Config.CHAT_HISTORY_MAX_TURNS if None)
+
+    Returns:
+        int: Index of the first message to send verbatim (len(messages) if none fit)
+    """
+    token_budget = Config.CHAT_HISTORY_TOKEN_BUDGET if token_budget is None else token_budget
+    max_turns = Config.CHAT_HISTORY_MAX_TURNS if max_turns is None else max_turns
+
+    start = len(messages)
+    used = 0
+    while start > 0 and len(messages) - start < max_turns * 2:
+        tokens = count_tokens(messages[start - 1]["content"], model)
+        if used + tokens > token_budget:
+            break
+        used += tokens
+        start -= 1
+    while start < len(messages) and messages[start]["role"] == "assistant":
+        start += 1
+    return start
+
+
+def window_history(history: List[Dict], model: str = None) -> List[Dict]:
+    """
+    Return the most recent role/content messages that fit the history budget.
+
+    Args:
+        history: Full chat history (entries may carry extra keys such as timestamps)
+        model: Model name for token counting
+
+    Returns:
+        List of role/content messages, oldest first
+    """
+    messages = _clean_messages(history)
+    return messages[history_window_start(messages, model):]
+
+
+def summarize_history(previous_summary: str, messages: List[Dict], api_key: str = None,
+                      model: str = None, max_tokens: int = None) -> str:
+    """
+    Fold messages into a rolling conversation summary.
+
+    Args:
+        previous_summary: Summary of everything before messages ('' if none)
+        messages: User/assistant messages to fold in, oldest first
+        api_key: OpenAI API key (uses the module-level openai key if None)
+        model: Model for summarization (uses Config.CHAT_HISTORY_SUMMARY_MODEL or MODEL_NAME if None)
+        max_tokens: Maximum summary length (uses Config.CHAT_HISTORY_SUMMARY_MAX_TOKENS if None)
+
+    Returns:
+        str: Updated summary
+    """
+    transcript = "\n".join(f"{msg['role'].upper()}: {msg['content']}" for msg in messages)
+    client = openai.OpenAI(api_key=api_key) if api_key else openai
+    response = client.chat.completions.create(
+        model=model or Config.CHAT_HISTORY_SUMMARY_MODEL or Config.MODEL_NAME,
+        messages=[
+            {"role": "system", "content": _SUMMARY_SYSTEM_PROMPT},
+            {"role": "user", "content": f"Existing summary:\n{previous_summary or '(none)'}\n\nNew messages:\n{transcript}"}
+        ],
+        temperature=0.0,
+        max_tokens=max_tokens or Config.CHAT_HISTORY_SUMMARY_MAX_TOKENS
+    )
+    return response.choices[0].message.content.strip()
+
+
+_summary_executor: Optional[ThreadPoolExecutor] = None
+_summary_executor_lock = threading.Lock()
+
+
+def _get_summary_executor() -> ThreadPoolExecutor:
+    """Return the process-wide executor that runs summary updates."""
+    global _summary_executor
+    with _summary_executor_lock:
+        if _summary_executor is None:
+            _summary_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="history-summary")
+        return _summary_executor
+
+
+class ChatHistoryManager:
+    """Per-conversation history window plus a rolling summary of older turns."""
+
+    def __init__(self, api_key: str = None, model: str = None, token_budget: int = None,
+                 max_turns: int = None, summarize_fn: Callable[[str, List[Dict]], str] = None):
+        """
+        Args:
+            api_key: OpenAI API key used for summarization
+            model: Chat model, used for token counting
+            token_budget: Token budget for verbatim messages (uses Config.CHAT_HISTORY_TOKEN_BUDGET if None)
+            max_turns: Maximum verbatim turns (uses Config.CHAT_HISTORY_MAX_TURNS if None)
+            summarize_fn: Callable (previous summary, messages) -> summary (uses summarize_history if None)
+        """
+        self.model = model
+        self.token_budget = Config.CHAT_HISTORY_TOKEN_BUDGET if token_budget is None else token_budget
+        self.max_turns = Config.CHAT_HISTORY_MAX_TURNS if max_turns is None else max_turns
+        self._summarize = summarize_fn or (lambda summary, messages: summarize_history(summary, messages, api_key))
+        self._lock = threading.Lock()
+        self._summary = ""
+        self._summarized_count = 0
+        self._generation = 0
+        self._pending: Optional[Future] = None
+
+    def reset(self) -> None:
+        """Forget the summary (e.g. after the chat history was cleared)."""
+        with self._lock:
+            self._clear_summary()
+
+    def _clear_summary(self) -> None:
+        self._summary, self._summarized_count = "", 0
+        self._generation += 1
+
+    def _window_start(self, messages: List[Dict]) -> int:
+        return history_window_start(messages, self.model, self.token_budget, self.max_turns)
+
+    def build_history(self, history: List[Dict]) -> List[Dict]:
+        """
+        Return the history to send with the next request.
+
+        Args:
+            history: Full chat history (entries may carry extra keys such as timestamps)
+
+        Returns:
+            List of role/content messages: a system message with the rolling
+            summary (if any), followed by the most recent turns verbatim
+        """
+        messages = _clean_messages(history)
+        start = self._window_start(messages)
+        with self._lock:
+            if self._summarized_count > len(messages):
+                # History was cleared or replaced since the summary was made
+                self._clear_summary()
+            summary = self._summary
+        window = messages[start:]
+        if start:
+            logger.debug(f"Chat history window: {len(window)}/{len(messages)} messages verbatim, "
+                         f"summary {'present' if summary else 'pending'}")
+        if summary:
+            return [{"role": "system", "content": f"{SUMMARY_PREFIX}\n{summary}"}] + window
+        return window
+
+    def schedule_summary(self, history: List[Dict]) -> Optional[Future]:
+        """
+        Fold turns that left the verbatim window into the summary on a background thread.
+
+        Call after each answer. Does nothing if no new turns left the window or an
+        update is already running (the next call catches up).
+
+        Args:
+            history: Full chat history including the latest answer
+
+        Returns:
+            Future of the summary update, or None if nothing was scheduled
+        """
+        messages = _clean_messages(history)
+        start = self._window_start(messages)
+        with self._lock:
+            if self._summarized_count > len(messages):
+                self._clear_summary()
+            if start <= self._summarized_count or (self._pending and not self._pending.done()):
+                return None
+            first = self._summarized_count
+            self._pending = _get_summary_executor().submit(
+                self._update_summary, self._summary, messages[first:start], start, self._generation)
+            return self._pending
+
+    def _update_summary(self, previous_summary: str, messages: List[Dict], end: int, generation: int) -> None:
+        try:
+            summary = self._summarize(previous_summary, messages)
+        except Exception as e:
+            logger.warning(f"⚠️  Chat history summary update failed: {str(e)}")
+            return
+        with self._lock:
+            # Drop the result if the history was reset while summarizing
+            if self._generation != generation:
+                return
+            self._summary, self._summarized_count = summary, end
+        logger.info(f"🧾 Chat history summary updated ({end} earlier messages summarized)")
+
+    def wait(self, timeout: float = None) -> None:
+        """Block until a running summary update has finished."""
+        pending = self._pending
+        if pending is not None:
+            pending.result(timeout=timeout)
+
+    def get_stats(self) -> Dict:
+        """Return how many messages are summarized and whether an update is running."""
+        with self._lock:
+            return {"summarized_messages": self._summarized_count,
+                    "summary_tokens": count_tokens(self._summary, self.model),
+                    "updating": bool(self._pending and not self._pending.done())}
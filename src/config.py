@@ -20,10 +20,73 @@ class Config:
     RETRIEVER_K = int(os.getenv('RETRIEVER_K', '100'))
     SUMMARIES_FILE = os.getenv('SUMMARIES_FILE', 'output_data/bulk_summaries.json')
     VECTOR_STORE_PATH = os.getenv('VECTOR_STORE_PATH', 'output_data/vector_store')
+    # Index type: 'flat' (exact), 'sq8' (int8 scalar quantization) or 'pq' (product quantization)
+    VECTOR_INDEX_TYPE = os.getenv('VECTOR_INDEX_TYPE', 'flat').lower()
+    PQ_SUBQUANTIZERS = int(os.getenv('PQ_SUBQUANTIZERS', '64'))
+    RERANK_CANDIDATES_FACTOR = int(os.getenv('RERANK_CANDIDATES_FACTOR', '4'))
+    # One FAISS shard per conversationDate month, searched in parallel and skipped outside a query's date range
+    SHARD_BY_MONTH = os.getenv('SHARD_BY_MONTH', 'FALSE').upper() == 'TRUE'
+    MAX_LOADED_SHARDS = int(os.getenv('MAX_LOADED_SHARDS', '12'))
+    SHARD_SEARCH_WORKERS = int(os.getenv('SHARD_SEARCH_WORKERS', '4'))
+    # Each build goes to a new snapshot directory; this many (including the current one) are kept
+    VECTOR_SNAPSHOTS_TO_KEEP = int(os.getenv('VECTOR_SNAPSHOTS_TO_KEEP', '2'))
+    # Retrieved context is cut off by relevance, then packed up to this many tokens (0 = context window only)
+    CONTEXT_TOKEN_BUDGET = int(os.getenv('CONTEXT_TOKEN_BUDGET', '8000'))
+    RETRIEVAL_SCORE_THRESHOLD = float(os.getenv('RETRIEVAL_SCORE_THRESHOLD', '0.0'))
+    RETRIEVAL_MAX_SCORE_GAP = float(os.getenv('RETRIEVAL_MAX_SCORE_GAP', '0.1'))
+    # MMR re-ranking: RETRIEVER_K candidates are narrowed to MMR_K relevant but diverse documents
+    MMR_ENABLED = os.getenv('MMR_ENABLED', 'TRUE').upper() == 'TRUE'
+    MMR_K = int(os.getenv('MMR_K', '30'))
+    MMR_LAMBDA = float(os.getenv('MMR_LAMBDA', '0.7'))
+    MMR_DUPLICATE_THRESHOLD = float(os.getenv('MMR_DUPLICATE_THRESHOLD', '0.97'))
+    # Repeat questions (cosine similarity >= ANSWER_CACHE_SIMILARITY) are answered from cache
+    ANSWER_CACHE_ENABLED = os.getenv('ANSWER_CACHE_ENABLED', 'TRUE').upper() == 'TRUE'
+    ANSWER_CACHE_SIMILARITY = float(os.getenv('ANSWER_CACHE_SIMILARITY', '0.95'))
+    ANSWER_CACHE_MAX_ENTRIES = int(os.getenv('ANSWER_CACHE_MAX_ENTRIES', '500'))
+    ANSWER_CACHE_TTL_SECONDS = int(os.getenv('ANSWER_CACHE_TTL_SECONDS', '86400'))
+    # Chat history: recent turns verbatim within this budget, older turns folded into a rolling summary
+    CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv('CHAT_HISTORY_TOKEN_BUDGET', '2000'))
+    CHAT_HISTORY_MAX_TURNS = int(os.getenv('CHAT_HISTORY_MAX_TURNS', '6'))
+    CHAT_HISTORY_SUMMARY_MODEL = os.getenv('CHAT_HISTORY_SUMMARY_MODEL', '')
+    CHAT_HISTORY_SUMMARY_MAX_TOKENS = int(os.getenv('CHAT_HISTORY_SUMMARY_MAX_TOKENS', '300'))
+    # Aggregate questions are computed with pandas over all summaries; the LLM only narrates the table
+    ANALYTICS_ENGINE_ENABLED = os.getenv('ANALYTICS_ENGINE_ENABLED', 'TRUE').upper() == 'TRUE'
+    ANALYTICS_MAX_TABLE_ROWS = int(os.getenv('ANALYTICS_MAX_TABLE_ROWS', '50'))
+    # Full-summary chat context: 'table' (same text for every question, so it stays a cacheable prompt prefix),
+    # 'projected' (only the fields the question needs; smaller, but the prefix changes with the question),
+    # 'minified' or 'json'
+    CHAT_CONTEXT_FORMAT = os.getenv('CHAT_CONTEXT_FORMAT', 'table').lower()
+    # Full-summary contexts above CHAT_CONTEXT_MAX_TOKENS are answered by map-reduce over token-bounded batches
+    CHAT_CONTEXT_MAX_TOKENS = int(os.getenv('CHAT_CONTEXT_MAX_TOKENS', '100000'))
+    MAP_REDUCE_ENABLED = os.getenv('MAP_REDUCE_ENABLED', 'TRUE').upper() == 'TRUE'
+    MAP_REDUCE_BATCH_TOKENS = int(os.getenv('MAP_REDUCE_BATCH_TOKENS', '50000'))
+    MAP_REDUCE_CONCURRENCY = int(os.getenv('MAP_REDUCE_CONCURRENCY', '8'))
+    MAP_REDUCE_MAP_MAX_TOKENS = int(os.getenv('MAP_REDUCE_MAP_MAX_TOKENS', '500'))
+    # Streamed answers are redrawn at most every STREAM_FLUSH_INTERVAL_MS, or sooner once this many characters are buffered
+    STREAM_FLUSH_INTERVAL_MS = int(os.getenv('STREAM_FLUSH_INTERVAL_MS', '50'))
+    STREAM_FLUSH_CHARS = int(os.getenv('STREAM_FLUSH_CHARS', '2000'))
+    # Rendered charts are cached by chart type, data version and render settings (CHART_CACHE_DIR = '' keeps them in memory only)
+    CHART_CACHE_ENABLED = os.getenv('CHART_CACHE_ENABLED', 'TRUE').upper() == 'TRUE'
+    CHART_CACHE_MAX_ENTRIES = int(os.getenv('CHART_CACHE_MAX_ENTRIES', '64'))
+    CHART_CACHE_DIR = os.getenv('CHART_CACHE_DIR', '')
+    CHART_DPI = int(os.getenv('CHART_DPI', '100'))
+    # Charts stay readable and fast to render at any corpus size: more categories than CHART_MAX_BARS switch to
+    # histograms (CHART_HISTOGRAM_BINS bins) or top-N plus 'Other'; time series use day, week or month buckets
+    CHART_MAX_BARS = int(os.getenv('CHART_MAX_BARS', '25'))
+    CHART_HISTOGRAM_BINS = int(os.getenv('CHART_HISTOGRAM_BINS', '20'))
+    CHART_MAX_TIME_BUCKETS = int(os.getenv('CHART_MAX_TIME_BUCKETS', '60'))
+    # 'spec': Vega-Lite specs rendered in the browser (PNG export on demand); 'png': server-rendered matplotlib images
+    CHART_RENDER_MODE = os.getenv('CHART_RENDER_MODE', 'spec').lower()
+    # Worker processes that render dashboard charts in parallel (0 = one per chart, up to the CPU count)
+    DASHBOARD_WORKERS = int(os.getenv('DASHBOARD_WORKERS', '0'))
+    # Rows per page of the summaries table (filtered, sorted and paginated in SQLite, see summary_store)
+    SUMMARY_PAGE_SIZE = int(os.getenv('SUMMARY_PAGE_SIZE', '50'))
     
     # LLM Configuration
     MODEL_NAME = os.getenv('MODEL_NAME', 'gpt-4.1-mini-2025-04-14')
+    # OpenAI embedding model, or 'local-hash' / 'local-hash-<dim>' for the offline NumPy backend
     EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'text-embedding-3-small')
+    EMBEDDING_BATCH_SIZE = int(os.getenv('EMBEDDING_BATCH_SIZE', '1000'))
     TEMPERATURE = float(os.getenv('TEMPERATURE', '0.0'))
     MAX_TOKENS = int(os.getenv('MAX_TOKENS', '600'))
     
@@ -39,9 +102,24 @@ class Config:
         logger.info("=" * 70)
         logger.info(f"🔍 RETRIEVER_K: {cls.RETRIEVER_K} (max documents to retrieve)")
         logger.info(f"📊 Summaries File: {cls.SUMMARIES_FILE}")
+        logger.info(f"🗃️  Summaries Table: {cls.SUMMARY_PAGE_SIZE} rows per page")
         logger.info(f"🗂️  Vector Store Path: {cls.VECTOR_STORE_PATH}")
+        logger.info(f"🗜️  Vector Index Type: {cls.VECTOR_INDEX_TYPE} (PQ sub-quantizers: {cls.PQ_SUBQUANTIZERS}, re-rank factor: {cls.RERANK_CANDIDATES_FACTOR})")
+        logger.info(f"🗓️  Shard By Month: {'ON' if cls.SHARD_BY_MONTH else 'OFF'} (max loaded shards: {cls.MAX_LOADED_SHARDS}, search workers: {cls.SHARD_SEARCH_WORKERS})")
+        logger.info(f"📸 Vector Snapshots Kept: {cls.VECTOR_SNAPSHOTS_TO_KEEP}")
+        logger.info(f"🎯 Context Budget: {cls.CONTEXT_TOKEN_BUDGET} tokens (score threshold: {cls.RETRIEVAL_SCORE_THRESHOLD}, max score gap: {cls.RETRIEVAL_MAX_SCORE_GAP})")
+        logger.info(f"🎯 MMR Re-ranking: {'ON' if cls.MMR_ENABLED else 'OFF'} (keep {cls.MMR_K} of {cls.RETRIEVER_K} candidates, lambda {cls.MMR_LAMBDA}, duplicates >= {cls.MMR_DUPLICATE_THRESHOLD})")
+        logger.info(f"⚡ Answer Cache: {'ON' if cls.ANSWER_CACHE_ENABLED else 'OFF'} (similarity >= {cls.ANSWER_CACHE_SIMILARITY}, max {cls.ANSWER_CACHE_MAX_ENTRIES} entries, TTL {cls.ANSWER_CACHE_TTL_SECONDS}s)")
+        logger.info(f"🧾 Chat History: last {cls.CHAT_HISTORY_MAX_TURNS} turns within {cls.CHAT_HISTORY_TOKEN_BUDGET} tokens, older turns summarized (model: {cls.CHAT_HISTORY_SUMMARY_MODEL or cls.MODEL_NAME})")
+        logger.info(f"📦 Chat Context Format: {cls.CHAT_CONTEXT_FORMAT}")
+        logger.info(f"🗺️  Map-Reduce Chat: {'ON' if cls.MAP_REDUCE_ENABLED else 'OFF'} (above {cls.CHAT_CONTEXT_MAX_TOKENS} context tokens; batches of {cls.MAP_REDUCE_BATCH_TOKENS} tokens, {cls.MAP_REDUCE_CONCURRENCY} concurrent)")
+        logger.info(f"📡 Stream Rendering: every {cls.STREAM_FLUSH_INTERVAL_MS}ms or {cls.STREAM_FLUSH_CHARS} buffered characters")
+        logger.info(f"📈 Chart Render Mode: {cls.CHART_RENDER_MODE} (max {cls.CHART_MAX_BARS} bars, {cls.CHART_HISTOGRAM_BINS} histogram bins, {cls.CHART_MAX_TIME_BUCKETS} time buckets)")
+        logger.info(f"📈 Dashboard Workers: {cls.DASHBOARD_WORKERS or 'auto'}")
+        logger.info(f"🖼️  Chart Cache: {'ON' if cls.CHART_CACHE_ENABLED else 'OFF'} (max {cls.CHART_CACHE_MAX_ENTRIES} charts, {'persisted to ' + cls.CHART_CACHE_DIR if cls.CHART_CACHE_DIR else 'memory only'}, {cls.CHART_DPI} dpi)")
+        logger.info(f"🧮 Analytics Engine: {'ON' if cls.ANALYTICS_ENGINE_ENABLED else 'OFF'} (max {cls.ANALYTICS_MAX_TABLE_ROWS} table rows sent to the LLM)")
         logger.info(f"🤖 Model: {cls.MODEL_NAME}")
-        logger.info(f"🧠 Embedding Model: {cls.EMBEDDING_MODEL}")
+        logger.info(f"🧠 Embedding Model: {cls.EMBEDDING_MODEL} (batch size: {cls.EMBEDDING_BATCH_SIZE})")
         logger.info(f"🌡️  Temperature: {cls.TEMPERATURE}")
         logger.info(f"📝 Max Tokens: {cls.MAX_TOKENS}")
         logger.info(f"📍 Log Level: {cls.LOG_LEVEL}")
@@ -83,5 +161,15 @@ def get_vector_store_config() -> dict:
     return {
         'summaries_file': Config.SUMMARIES_FILE,
         'vector_store_path': Config.VECTOR_STORE_PATH,
-        'retriever_k': Config.RETRIEVER_K
+        'retriever_k': Config.RETRIEVER_K,
+        'index_type': Config.VECTOR_INDEX_TYPE,
+        'pq_subquantizers': Config.PQ_SUBQUANTIZERS,
+        'rerank_candidates_factor': Config.RERANK_CANDIDATES_FACTOR,
+        'shard_by_month': Config.SHARD_BY_MONTH,
+        'max_loaded_shards': Config.MAX_LOADED_SHARDS,
+        'shard_search_workers': Config.SHARD_SEARCH_WORKERS,
+        'vector_snapshots_to_keep': Config.VECTOR_SNAPSHOTS_TO_KEEP,
+        'context_token_budget': Config.CONTEXT_TOKEN_BUDGET,
+        'retrieval_score_threshold': Config.RETRIEVAL_SCORE_THRESHOLD,
+        'retrieval_max_score_gap': Config.RETRIEVAL_MAX_SCORE_GAP
     }
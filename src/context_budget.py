@@ -0,0 +1,156 @@
+"""
+Token Budgeting for LLM Context Assembly
+
+This module counts prompt tokens and decides how many retrieved documents fit
+into a request. Retrieved documents are first cut off by relevance (score
+threshold and similarity gap), then packed in score order until the token
+budget derived from the model's context window and max_tokens is used up.
+
+Functions:
+- count_tokens(): Count tokens for a text with the model's tokenizer
+- get_context_window(): Look up a model's context window size
+- compute_context_budget(): Tokens available for retrieved context
+- select_relevant(): Adaptive cut-off by score threshold and similarity gap
+- pack_documents(): Pack documents into a token budget
+"""
+
+from functools import lru_cache
+from typing import Dict, List, Tuple
+import tiktoken
+from src.logger import logger
+from src.config import Config
+
+
+# Context window sizes (tokens) by model name prefix, longest prefix wins
+MODEL_CONTEXT_WINDOWS = {
+    'gpt-4.1': 1_047_576,
+    'gpt-4o': 128_000,
+    'gpt-4-turbo': 128_000,
+    'gpt-4': 8_192,
+    'gpt-3.5-turbo': 16_385,
+}
+DEFAULT_CONTEXT_WINDOW = 128_000
+
+# Tokens kept free for message framing and tokenizer differences
+SAFETY_MARGIN_TOKENS = 512
+
+# Rough characters-per-token ratio used when no tokenizer is available (e.g. offline)
+APPROX_CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=16)
+def _get_encoding(model: str):
+    """Return the tiktoken encoding for a model, or None if it cannot be loaded."""
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding('o200k_base')
+    except Exception as e:
+        logger.warning(f"⚠️  Tokenizer unavailable for {model} ({e}); using approximate token counts")
+        return None
+
+
+def count_tokens(text: str, model: str = None) -> int:
+    """
+    Count tokens in a text using the model's tokenizer.
+
+    Args:
+        text: Text to count
+        model: Model name (uses Config.MODEL_NAME if None)
+
+    Returns:
+        int: Number of tokens
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding(model or Config.MODEL_NAME)
+    if encoding is None:
+        return len(text) // APPROX_CHARS_PER_TOKEN + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def get_context_window(model: str = None) -> int:
+    """Return the context window size of a model in tokens."""
+    model = (model or Config.MODEL_NAME).lower()
+    matches = [prefix for prefix in MODEL_CONTEXT_WINDOWS if model.startswith(prefix)]
+    if not matches:
+        return DEFAULT_CONTEXT_WINDOW
+    return MODEL_CONTEXT_WINDOWS[max(matches, key=len)]
+
+
+def compute_context_budget(model: str = None, max_tokens: int = None, prompt_tokens: int = 0,
+                           budget_cap: int = None) -> int:
+    """
+    Compute how many tokens of retrieved context can be sent with a request.
+
+    Args:
+        model: Model name (uses Config.MODEL_NAME if None)
+        max_tokens: Tokens reserved for the response (uses Config.MAX_TOKENS if None)
+        prompt_tokens: Tokens already used by system prompt, history and question
+        budget_cap: Upper bound on context tokens (uses Config.CONTEXT_TOKEN_BUDGET if None, 0 = no cap)
+
+    Returns:
+        int: Token budget for retrieved context (never negative)
+    """
+    max_tokens = max_tokens or Config.MAX_TOKENS
+    budget_cap = Config.CONTEXT_TOKEN_BUDGET if budget_cap is None else budget_cap
+    available = get_context_window(model) - max_tokens - prompt_tokens - SAFETY_MARGIN_TOKENS
+    if budget_cap:
+        available = min(available, budget_cap)
+    return max(available, 0)
+
+
+def select_relevant(results: List[Dict], score_threshold: float = None, max_gap: float = None,
+                    min_results: int = 1) -> List[Dict]:
+    """
+    Cut scored results off by absolute score and by the first large similarity gap.
+
+    Args:
+        results: Results with a 'score' key (higher is more similar), sorted best first
+        score_threshold: Drop results scoring below this (uses Config.RETRIEVAL_SCORE_THRESHOLD if None)
+        max_gap: Stop at the first drop between neighbours larger than this
+                 (uses Config.RETRIEVAL_MAX_SCORE_GAP if None, 0 = disabled)
+        min_results: Always keep at least this many results that pass the threshold
+
+    Returns:
+        List of results that survived the cut-off
+    """
+    score_threshold = Config.RETRIEVAL_SCORE_THRESHOLD if score_threshold is None else score_threshold
+    max_gap = Config.RETRIEVAL_MAX_SCORE_GAP if max_gap is None else max_gap
+
+    selected = []
+    for result in results:
+        score = result.get('score', 0.0)
+        if score < score_threshold:
+            break
+        if max_gap and selected and len(selected) >= min_results and selected[-1]['score'] - score > max_gap:
+            logger.debug(f"Similarity gap cut-off after {len(selected)} documents ({selected[-1]['score']:.3f} -> {score:.3f})")
+            break
+        selected.append(result)
+    return selected
+
+
+def pack_documents(results: List[Dict], budget_tokens: int, model: str = None,
+                   text_key: str = 'content') -> Tuple[List[Dict], int]:
+    """
+    Pack documents in order until the token budget is used up.
+
+    Args:
+        results: Documents to pack, best first
+        budget_tokens: Maximum tokens for all packed documents
+        model: Model name for token counting
+        text_key: Key holding each document's text
+
+    Returns:
+        Tuple of (packed documents, tokens used)
+    """
+    packed = []
+    used = 0
+    for result in results:
+        tokens = count_tokens(result.get(text_key, ''), model)
+        if used + tokens > budget_tokens:
+            break
+        packed.append(result)
+        used += tokens
+    return packed, used
@@ -0,0 +1,198 @@
+"""
+Compact Serialization of Summaries for Full-Context Chat
+
+The "all summaries" chat modes used to send json.dumps(summaries, indent=2)
+of every summary on every message, including the long agentScoreReason and
+agentRatingReason texts. This module serializes summaries in more compact
+formats and reports the measured token count of the result:
+
+- json: the original pretty-printed JSON (kept for comparison)
+- minified: JSON without indentation or spaces
+- table: header line with the field names once, then one row per call (the
+  default: the same text for every question, so it stays a cacheable prefix)
+- projected: table restricted to the fields the question needs (smaller, but
+  the text changes whenever a question needs different fields)
+
+Functions:
+- select_fields(): Fields a question needs (projected format)
+- serialize_summaries(): Serialize summaries in a given format
+- build_summaries_context(): Serialize and measure the context for a question
+- serialize_batches(): Split serialized summaries into token-bounded batches
+- format_context_stats(): Caption text for the measured context
+"""
+
+import json
+import re
+from typing import Dict, List, Tuple
+from src.config import Config
+from src.context_budget import count_tokens
+from src.summary_normalizer import strip_canonical
+
+
+CONTEXT_FORMATS = ('json', 'minified', 'table', 'projected')
+
+# Table column order, as in the summarization schema
+TABLE_FIELDS = [
+    'callId', 'conversationDate', 'conversationTime', 'conversationLength', 'agentName', 'agentId',
+    'department', 'customerName', 'callSummary', 'issueCategory', 'resolutionStatus', 'customerTone',
+    'customerEmotions', 'agentTone', 'agentEmotions', 'agentScore', 'agentScoreReason', 'agentRating',
+    'agentRatingReason',
+]
+# Long free-text justifications, sent only when a question asks why
+REASON_FIELDS = ['agentScoreReason', 'agentRatingReason']
+
+# Always sent in the projected format, so answers can cite calls, agents and dates
+BASE_FIELDS = ['callId', 'agentName', 'department', 'conversationDate']
+# Sent when a question matches none of the keyword groups below
+DEFAULT_FIELDS = [field for field in TABLE_FIELDS if field not in REASON_FIELDS]
+
+# (question pattern, fields it needs)
+_FIELD_KEYWORDS = [
+    (r"\bscor|perform|best|worst|top|rank|compar", ['agentScore', 'agentRating']),
+    (r"\brat(?:e|ed|ing|ings)\b|\bstars?\b", ['agentRating']),
+    (r"\bresol|unresol|escalat|fix|outcome|follow.?up", ['resolutionStatus']),
+    (r"sentiment|\btone|emotion|mood|angry|upset|frustrat|happy|satisf|polite|empath",
+     ['customerTone', 'customerEmotions', 'agentTone', 'agentEmotions']),
+    (r"issue|problem|categor|complain|reason for|topic|about|happen|summar", ['issueCategory', 'callSummary']),
+    (r"duration|how long|longest|shortest|length|minutes|time", ['conversationLength', 'conversationTime']),
+    (r"customer", ['customerName']),
+    (r"agent.?id|employee", ['agentId']),
+]
+_WHY_PATTERN = r"\bwhy\b|reason|justif|explain|feedback|improv"
+
+
+def select_fields(question: str) -> List[str]:
+    """
+    Return the summary fields a question needs, in table order.
+
+    Args:
+        question: User question
+
+    Returns:
+        List of summary keys (DEFAULT_FIELDS if the question matches no keyword group)
+    """
+    text = (question or '').lower()
+    fields = set()
+    for pattern, needed in _FIELD_KEYWORDS:
+        if re.search(pattern, text):
+            fields.update(needed)
+    if not fields:
+        fields.update(DEFAULT_FIELDS)
+    if re.search(_WHY_PATTERN, text):
+        fields.update(['agentScore', 'agentRating', 'callSummary'] + REASON_FIELDS)
+    fields.update(BASE_FIELDS)
+    return [field for field in TABLE_FIELDS if field in fields]
+
+
+def _cell(value) -> str:
+    """Table cell text: no newlines or column separators inside values."""
+    if value is None:
+        return ''
+    return ' '.join(str(value).split()).replace('|', '/')
+
+
+def _serialize_table(summaries: List[Dict], fields: List[str]) -> str:
+    lines = ['|'.join(fields)]
+    lines.extend('|'.join(_cell(summary.get(field)) for field in fields) for summary in summaries)
+    return '\n'.join(lines)
+
+
+def serialize_summaries(summaries: List[Dict], fmt: str = None, question: str = None) -> Tuple[str, List[str]]:
+    """
+    Serialize summaries for the LLM context.
+
+    Args:
+        summaries: Summary dicts
+        fmt: One of CONTEXT_FORMATS (uses Config.CHAT_CONTEXT_FORMAT if None)
+        question: User question, used to choose fields in the projected format
+
+    Returns:
+        Tuple of (text, fields included; empty for the JSON formats, which keep every summarizer field)
+    """
+    fmt = (fmt or Config.CHAT_CONTEXT_FORMAT).lower()
+    if fmt == 'json':
+        return json.dumps([strip_canonical(summary) for summary in summaries], indent=2), []
+    if fmt == 'minified':
+        return json.dumps([strip_canonical(summary) for summary in summaries], separators=(',', ':'),
+                          ensure_ascii=False), []
+    if fmt == 'table':
+        fields = TABLE_FIELDS
+    elif fmt == 'projected':
+        fields = select_fields(question)
+    else:
+        raise ValueError(f"Unknown context format '{fmt}' (expected one of {', '.join(CONTEXT_FORMATS)})")
+    return f"One call per line, columns separated by '|':\n{_serialize_table(summaries, fields)}", fields
+
+
+def build_summaries_context(summaries: List[Dict], question: str = None, fmt: str = None,
+                            model: str = None) -> Tuple[str, Dict]:
+    """
+    Serialize summaries for a question and measure the result.
+
+    Args:
+        summaries: Summary dicts
+        question: User question (projected format)
+        fmt: One of CONTEXT_FORMATS (uses Config.CHAT_CONTEXT_FORMAT if None)
+        model: Model name for token counting
+
+    Returns:
+        Tuple of (context text, stats dict with format, fields, summaries and tokens)
+    """
+    fmt = (fmt or Config.CHAT_CONTEXT_FORMAT).lower()
+    text, fields = serialize_summaries(summaries, fmt, question)
+    stats = {"format": fmt, "fields": fields, "summaries": len(summaries), "tokens": count_tokens(text, model)}
+    return text, stats
+
+
+def serialize_batches(summaries: List[Dict], batch_tokens: int, question: str = None, fmt: str = None,
+                      model: str = None) -> List[Dict]:
+    """
+    Serialize summaries into batches that each fit a token budget.
+
+    Every batch is self-contained (table batches repeat the header line).
+    A single summary larger than the budget gets a batch of its own.
+
+    Args:
+        summaries: Summary dicts
+        batch_tokens: Maximum tokens per batch
+        question: User question (projected format)
+        fmt: One of CONTEXT_FORMATS (uses Config.CHAT_CONTEXT_FORMAT if None)
+        model: Model name for token counting
+
+    Returns:
+        List of dicts with text, summaries (count) and tokens
+    """
+    fmt = (fmt or Config.CHAT_CONTEXT_FORMAT).lower()
+    if fmt == 'json':
+        rows = [json.dumps(strip_canonical(summary), indent=2) for summary in summaries]
+    elif fmt == 'minified':
+        rows = [json.dumps(strip_canonical(summary), separators=(',', ':'), ensure_ascii=False)
+                for summary in summaries]
+    else:
+        header = serialize_summaries([], fmt, question)[0]
+        fields = header.splitlines()[-1].split('|')
+        rows = ['|'.join(_cell(summary.get(field)) for field in fields) for summary in summaries]
+
+    def batch_text(batch_rows: List[str]) -> str:
+        if fmt in ('json', 'minified'):
+            return f"[{','.join(batch_rows)}]"
+        return '\n'.join([header] + batch_rows)
+
+    fixed_tokens = count_tokens(batch_text([]), model)
+    batches, current, used = [], [], fixed_tokens
+    for row in rows:
+        tokens = count_tokens(row, model) + 1
+        if current and used + tokens > batch_tokens:
+            batches.append({"text": batch_text(current), "summaries": len(current), "tokens": used})
+            current, used = [], fixed_tokens
+        current.append(row)
+        used += tokens
+    if current:
+        batches.append({"text": batch_text(current), "summaries": len(current), "tokens": used})
+    return batches
+
+
+def format_context_stats(stats: Dict) -> str:
+    """Return a caption like '📦 Context: 300 calls as projected (6 fields), 9,120 tokens'."""
+    fields_note = f" ({len(stats['fields'])} fields)" if stats.get('fields') else ""
+    return f"📦 Context: {stats['summaries']:,} calls as {stats['format']}{fields_note}, {stats['tokens']:,} tokens"
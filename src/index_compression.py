@@ -0,0 +1,228 @@
+"""
+Vector Index Compression Module
+
+This module provides optional compressed FAISS index modes that cut the
+in-memory footprint of the vector store. The compressed index is used to find
+candidates; the exact float32 vectors stay on disk (memory-mapped) and are only
+read for the handful of candidates that need re-ranking.
+
+Index types:
+- flat: exact IndexFlatL2, 4 bytes per dimension (default, no compression)
+- sq8: scalar int8 quantization, 1 byte per dimension (4x smaller)
+- pq: product quantization, PQ_SUBQUANTIZERS bytes per vector
+
+Functions:
+- build_index(): Build a flat or compressed FAISS index from float32 vectors
+- estimate_index_memory(): Estimate in-memory index size for a corpus
+- measure_recall(): Measure recall@k of an index against exact search
+"""
+
+import json
+import os
+from typing import Dict, Optional, Tuple
+import numpy as np
+import faiss
+from src.logger import logger
+
+
+SUPPORTED_INDEX_TYPES = ('flat', 'sq8', 'pq')
+EXACT_VECTORS_FILE = 'vectors.npy'
+INDEX_META_FILE = 'index_meta.json'
+
+# PQ codebooks use 8 bits per sub-quantizer, so training needs at least 256 vectors
+PQ_NBITS = 8
+PQ_MIN_TRAINING_VECTORS = 2 ** PQ_NBITS
+
+
+def _resolve_pq_subquantizers(dim: int, requested: int) -> int:
+    """Return the largest sub-quantizer count <= requested that divides dim."""
+    for m in range(min(requested, dim), 0, -1):
+        if dim % m == 0:
+            return m
+    return 1
+
+
+def build_index(vectors: np.ndarray, index_type: str = 'flat', pq_m: int = 64) -> Tuple[object, str]:
+    """
+    Build a FAISS index over float32 vectors.
+
+    Args:
+        vectors: Array of shape (n, d) with the exact embeddings
+        index_type: One of 'flat', 'sq8' or 'pq'
+        pq_m: Number of PQ sub-quantizers (bytes per vector) for 'pq'
+
+    Returns:
+        Tuple of (trained index with all vectors added, index type actually built)
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    num_docs, dim = vectors.shape
+
+    if index_type not in SUPPORTED_INDEX_TYPES:
+        logger.warning(f"⚠️  Unknown index type '{index_type}', falling back to 'flat'")
+        index_type = 'flat'
+
+    if index_type == 'pq' and num_docs < PQ_MIN_TRAINING_VECTORS:
+        logger.warning(f"⚠️  Only {num_docs} vectors - PQ needs at least {PQ_MIN_TRAINING_VECTORS} to train. Using 'sq8' instead.")
+        index_type = 'sq8'
+
+    if index_type == 'flat':
+        index = faiss.IndexFlatL2(dim)
+    elif index_type == 'sq8':
+        index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_L2)
+    else:
+        m = _resolve_pq_subquantizers(dim, pq_m)
+        if m != pq_m:
+            logger.info(f"ℹ️  Adjusted PQ sub-quantizers from {pq_m} to {m} (must divide dimension {dim})")
+        index = faiss.IndexPQ(dim, m, PQ_NBITS, faiss.METRIC_L2)
+
+    if not index.is_trained:
+        logger.info(f"🏋️  Training {index_type} index on {num_docs} vectors (dim={dim})...")
+        index.train(vectors)
+    index.add(vectors)
+    return index, index_type
+
+
+def bytes_per_vector(dim: int, index_type: str, pq_m: int = 64) -> int:
+    """Return the in-memory code size of one vector for the given index type."""
+    if index_type == 'sq8':
+        return dim
+    if index_type == 'pq':
+        return _resolve_pq_subquantizers(dim, pq_m) * PQ_NBITS // 8
+    return dim * 4
+
+
+def estimate_index_memory(num_docs: int, dim: int, index_type: str = 'flat', pq_m: int = 64) -> int:
+    """
+    Estimate the in-memory size of an index in bytes (vector codes only).
+
+    Args:
+        num_docs: Number of indexed documents
+        dim: Embedding dimension
+        index_type: One of 'flat', 'sq8' or 'pq'
+        pq_m: Number of PQ sub-quantizers for 'pq'
+
+    Returns:
+        int: Estimated bytes held in RAM by the index
+    """
+    return num_docs * bytes_per_vector(dim, index_type, pq_m)
+
+
+def format_bytes(num_bytes: float) -> str:
+    """Format a byte count as a human readable string."""
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if num_bytes < 1024:
+            return f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} TB"
+
+
+class RerankingIndex:
+    """
+    Compressed FAISS index that re-ranks its top candidates with exact vectors.
+
+    Exposes the same search() signature as a FAISS index so it can be dropped
+    into LangChain's FAISS vector store. Every other attribute is delegated to
+    the wrapped compressed index.
+    """
+
+    def __init__(self, index, exact_vectors: np.ndarray, candidate_factor: int = 4):
+        """
+        Args:
+            index: Compressed FAISS index (sq8 or pq)
+            exact_vectors: Exact float32 vectors, usually an np.memmap
+            candidate_factor: Candidates fetched per requested result before re-ranking
+        """
+        self.index = index
+        self.exact_vectors = exact_vectors
+        self.candidate_factor = max(1, candidate_factor)
+
+    def __getattr__(self, name):
+        return getattr(self.index, name)
+
+    def search(self, x: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Search the compressed index and re-rank candidates with exact L2 distances."""
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        fetch_k = min(k * self.candidate_factor, self.index.ntotal)
+        _, candidates = self.index.search(x, fetch_k)
+
+        distances = np.full((x.shape[0], k), np.inf, dtype=np.float32)
+        indices = np.full((x.shape[0], k), -1, dtype=np.int64)
+        for row, (query, ids) in enumerate(zip(x, candidates)):
+            ids = ids[ids != -1]
+            if ids.size == 0:
+                continue
+            # Sorted ids keep memmap reads sequential
+            ids = np.sort(ids)
+            exact = np.asarray(self.exact_vectors[ids], dtype=np.float32)
+            exact_dist = ((exact - query) ** 2).sum(axis=1)
+            order = np.argsort(exact_dist)[:k]
+            distances[row, :order.size] = exact_dist[order]
+            indices[row, :order.size] = ids[order]
+        return distances, indices
+
+
+def measure_recall(exact_vectors: np.ndarray, index, k: int = 10, num_queries: int = 100,
+                   seed: int = 42) -> float:
+    """
+    Measure recall@k of an index against exact brute-force search.
+
+    Queries are sampled from the indexed vectors themselves, so no extra
+    embedding calls are needed.
+
+    Args:
+        exact_vectors: Exact float32 vectors of shape (n, d)
+        index: Index to evaluate (compressed FAISS index or RerankingIndex)
+        k: Number of neighbours to compare
+        num_queries: Number of sampled queries
+        seed: Random seed for query sampling
+
+    Returns:
+        float: Mean fraction of exact top-k neighbours found by the index
+    """
+    exact_vectors = np.ascontiguousarray(exact_vectors, dtype=np.float32)
+    num_docs = exact_vectors.shape[0]
+    if num_docs == 0:
+        return 0.0
+    k = min(k, num_docs)
+    rng = np.random.default_rng(seed)
+    query_ids = rng.choice(num_docs, size=min(num_queries, num_docs), replace=False)
+    queries = exact_vectors[query_ids]
+
+    ground_truth = faiss.IndexFlatL2(exact_vectors.shape[1])
+    ground_truth.add(exact_vectors)
+    _, true_ids = ground_truth.search(queries, k)
+    _, found_ids = index.search(queries, k)
+
+    hits = [len(set(t) & set(f)) / k for t, f in zip(true_ids.tolist(), found_ids.tolist())]
+    return float(np.mean(hits))
+
+
+def save_exact_vectors(folder_path: str, vectors: np.ndarray) -> str:
+    """Save exact float32 vectors next to the index for re-ranking."""
+    path = os.path.join(folder_path, EXACT_VECTORS_FILE)
+    np.save(path, np.ascontiguousarray(vectors, dtype=np.float32))
+    return path
+
+
+def load_exact_vectors(folder_path: str) -> Optional[np.ndarray]:
+    """Memory-map exact vectors from disk, or return None if they are missing."""
+    path = os.path.join(folder_path, EXACT_VECTORS_FILE)
+    if not os.path.exists(path):
+        return None
+    return np.load(path, mmap_mode='r')
+
+
+def write_index_meta(folder_path: str, meta: Dict) -> None:
+    """Write index metadata (index type, embedding model, ...) to disk."""
+    with open(os.path.join(folder_path, INDEX_META_FILE), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+
+def read_index_meta(folder_path: str) -> Dict:
+    """Read index metadata, returning an empty dict for legacy indexes without it."""
+    path = os.path.join(folder_path, INDEX_META_FILE)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
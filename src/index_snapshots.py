@@ -0,0 +1,146 @@
+"""
+Versioned Vector Index Snapshots
+
+Every vector store build is written to its own snapshot directory
+(path/snapshots/<version>) and published by atomically replacing the CURRENT
+pointer file. Readers only ever see a complete snapshot: a crash mid-build
+leaves the previous snapshot published, and queries keep running against the
+old snapshot until they switch to the new one. Old snapshots are garbage
+collected once newer ones are published.
+
+Layout:
+    path/CURRENT                  -> name of the published snapshot
+    path/snapshots/<version>/     -> index.faiss, index.pkl, index_meta.json, ...
+
+Functions:
+- new_snapshot_version(): Sortable, unique snapshot version name
+- publish_snapshot(): Atomically point CURRENT at a snapshot
+- resolve_current_snapshot(): Path and version of the published snapshot
+- gc_snapshots(): Remove snapshots older than the ones kept
+"""
+
+import os
+import shutil
+import uuid
+from datetime import datetime
+from typing import List, Optional, Tuple
+from src.logger import logger
+from src.index_compression import EXACT_VECTORS_FILE, INDEX_META_FILE
+from src.vector_shards import SHARDS_DIR
+
+
+SNAPSHOTS_DIR = 'snapshots'
+CURRENT_FILE = 'CURRENT'
+
+# Files of the pre-snapshot layout, where the index lived directly under path
+_LEGACY_ENTRIES = ('index.faiss', 'index.pkl', EXACT_VECTORS_FILE, INDEX_META_FILE, SHARDS_DIR)
+
+
+def new_snapshot_version() -> str:
+    """Return a new snapshot version; versions sort by creation time."""
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def snapshot_path(root: str, version: str) -> str:
+    """Return the directory of a snapshot version."""
+    return os.path.join(root, SNAPSHOTS_DIR, version)
+
+
+def list_snapshots(root: str) -> List[str]:
+    """Return all snapshot versions under root, oldest first."""
+    snapshots_root = os.path.join(root, SNAPSHOTS_DIR)
+    if not os.path.isdir(snapshots_root):
+        return []
+    return sorted(name for name in os.listdir(snapshots_root)
+                  if os.path.isdir(os.path.join(snapshots_root, name)))
+
+
+def read_current_version(root: str) -> Optional[str]:
+    """Return the published snapshot version, or None if nothing is published."""
+    try:
+        with open(os.path.join(root, CURRENT_FILE), 'r', encoding='utf-8') as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def publish_snapshot(root: str, version: str) -> None:
+    """
+    Atomically make a snapshot the current one.
+
+    The pointer is written to a temporary file and moved over CURRENT with
+    os.replace, so readers see either the old or the new version, never a partial write.
+
+    Args:
+        root: Vector store root directory
+        version: Snapshot version to publish (must be fully written)
+    """
+    tmp_path = os.path.join(root, f"{CURRENT_FILE}.{uuid.uuid4().hex}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, os.path.join(root, CURRENT_FILE))
+    logger.info(f"📌 Published vector store snapshot {version}")
+
+
+def unpublish_snapshot(root: str) -> None:
+    """Remove the CURRENT pointer so no snapshot is published."""
+    try:
+        os.remove(os.path.join(root, CURRENT_FILE))
+    except FileNotFoundError:
+        pass
+
+
+def resolve_current_snapshot(root: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Find the index directory to load.
+
+    Args:
+        root: Vector store root directory
+
+    Returns:
+        Tuple of (snapshot directory, version). Falls back to (root, None) for a
+        legacy index stored directly under root, and (None, None) if there is no index.
+    """
+    version = read_current_version(root)
+    if version and os.path.isdir(snapshot_path(root, version)):
+        return snapshot_path(root, version), version
+    if any(os.path.exists(os.path.join(root, entry)) for entry in _LEGACY_ENTRIES):
+        return root, None
+    return None, None
+
+
+def gc_snapshots(root: str, keep: int = 2) -> List[str]:
+    """
+    Remove old snapshots, keeping the current one and the newest older ones.
+
+    Snapshots newer than the current one may still be building and are never
+    removed. Once a snapshot is published, legacy index files under root are removed too.
+
+    Args:
+        root: Vector store root directory
+        keep: Number of snapshots to keep, including the current one
+
+    Returns:
+        List of removed snapshot versions
+    """
+    current = read_current_version(root)
+    if current is None:
+        return []
+
+    older = [version for version in list_snapshots(root) if version < current]
+    removed = older[:max(0, len(older) - max(keep - 1, 0))]
+    for version in removed:
+        shutil.rmtree(snapshot_path(root, version), ignore_errors=True)
+
+    for entry in _LEGACY_ENTRIES:
+        legacy_path = os.path.join(root, entry)
+        if os.path.isdir(legacy_path):
+            shutil.rmtree(legacy_path, ignore_errors=True)
+        elif os.path.exists(legacy_path):
+            os.remove(legacy_path)
+
+    if removed:
+        logger.info(f"🧹 Removed {len(removed)} old vector store snapshot(s): {', '.join(removed)}")
+    return removed
@@ -0,0 +1,138 @@
+"""
+Background Reindex Worker
+
+This module runs vector store rebuilds on a background thread so the
+Streamlit page that requested them stays responsive. A single process-wide
+worker accepts reindex jobs, builds a new index snapshot and publishes it;
+chat sessions keep querying the current snapshot and switch over once the new
+one is published (see VectorStoreManager.refresh_snapshot).
+
+Progress (stage, documents embedded, throughput, ETA) is kept in a status
+dict that the UI polls with get_status().
+
+Functions:
+- get_index_worker(): Return the process-wide IndexWorker
+"""
+
+import queue
+import threading
+import time
+import uuid
+from typing import Dict, Optional
+from src.logger import logger
+from src.vector_store import VectorStoreManager
+
+
+class IndexWorker:
+    """Background thread that runs one reindex job at a time and reports progress."""
+
+    def __init__(self):
+        self._jobs: "queue.Queue[Dict]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._status: Dict = {"state": "idle"}
+
+    def submit(self, api_key: str, summaries_file: str = None, vector_store_path: str = None) -> Optional[str]:
+        """
+        Queue a reindex job.
+
+        A job that is already queued or running is not duplicated; its id is returned instead.
+
+        Args:
+            api_key: OpenAI API key for embeddings
+            summaries_file: Path to bulk_summaries.json (uses config default if None)
+            vector_store_path: Vector store root (uses config default if None)
+
+        Returns:
+            str: Id of the queued (or already active) job
+        """
+        with self._lock:
+            if self._status.get("state") in ("queued", "running"):
+                logger.info(f"ℹ️  Reindex job {self._status['job_id']} already in progress - not queuing another")
+                return self._status["job_id"]
+
+            job_id = uuid.uuid4().hex[:8]
+            self._status = {"state": "queued", "job_id": job_id, "submitted_at": time.time()}
+            self._jobs.put({
+                "job_id": job_id,
+                "api_key": api_key,
+                "summaries_file": summaries_file,
+                "vector_store_path": vector_store_path
+            })
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="index-worker", daemon=True)
+                self._thread.start()
+        logger.info(f"📥 Reindex job {job_id} queued")
+        return job_id
+
+    def get_status(self) -> Dict:
+        """Return a snapshot of the current (or last) job's status."""
+        with self._lock:
+            return dict(self._status)
+
+    def _update(self, **fields) -> None:
+        with self._lock:
+            self._status.update(fields)
+
+    def _on_progress(self, stage: str, done: int, total: int) -> None:
+        """Record progress and derive throughput and ETA for the embedding stage."""
+        now = time.time()
+        status = self.get_status()
+        fields = {"stage": stage, "docs_done": done, "docs_total": total}
+        if stage == 'embedding':
+            started = status.get("embedding_started_at") or now
+            fields["embedding_started_at"] = started
+            elapsed = now - started
+            if elapsed > 0 and done:
+                throughput = done / elapsed
+                fields["throughput"] = throughput
+                fields["eta_seconds"] = (total - done) / throughput
+        self._update(**fields)
+
+    def _run(self) -> None:
+        while True:
+            try:
+                job = self._jobs.get(timeout=60)
+            except queue.Empty:
+                # Let the thread exit when idle; submit() starts a new one
+                with self._lock:
+                    if self._jobs.empty():
+                        self._thread = None
+                        return
+                continue
+
+            started = time.time()
+            self._update(state="running", stage="loading", started_at=started)
+            logger.info(f"🏗️  Reindex job {job['job_id']} started")
+            try:
+                manager = VectorStoreManager(job["summaries_file"], job["vector_store_path"])
+                success = manager.create_vector_store(job["api_key"], force_recreate=True,
+                                                      progress_callback=self._on_progress)
+                duration = time.time() - started
+                if success:
+                    self._update(state="done", finished_at=time.time(), duration_seconds=duration,
+                                 document_count=manager._document_count(),
+                                 snapshot_version=manager.snapshot_version, eta_seconds=0)
+                    logger.info(f"✅ Reindex job {job['job_id']} finished in {duration:.1f}s (snapshot {manager.snapshot_version})")
+                else:
+                    self._update(state="failed", finished_at=time.time(), duration_seconds=duration,
+                                 error="Vector store build failed - check logs")
+                    logger.error(f"❌ Reindex job {job['job_id']} failed")
+            except Exception as e:
+                self._update(state="failed", finished_at=time.time(), error=str(e))
+                logger.error(f"❌ Reindex job {job['job_id']} failed: {str(e)}", exc_info=True)
+            finally:
+                self._jobs.task_done()
+
+
+_worker: Optional[IndexWorker] = None
+_worker_lock = threading.Lock()
+
+
+def get_index_worker() -> IndexWorker:
+    """Return the process-wide index worker, creating it on first use."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = IndexWorker()
+        return _worker
@@ -0,0 +1,136 @@
+"""
+LLM Token Usage and Cost Accounting
+
+This module turns OpenAI usage records into token counts and an estimated
+cost, and adds them up per pipeline stage (e.g. the map and reduce stages of
+a map-reduce chat), so the UI can report what each stage cost. Prompt tokens
+served from the provider's prompt prefix cache are recorded separately, since
+they are billed at a discount and cut time to first token.
+
+Functions:
+- get_model_prices(): Look up per-token prices for a model
+- estimate_cost(): Estimated USD cost of a request
+- usage_to_dict(): Token counts from an OpenAI or LangChain usage record
+- log_usage(): Log one request's token usage and prompt cache hits
+- format_usage(): Caption fragment with cached prompt tokens
+- new_stage_stats(): Empty per-stage usage record
+- add_usage(): Add a usage record to a stage record
+"""
+
+from typing import Any, Dict, Tuple
+from src.logger import logger
+from src.config import Config
+
+
+# USD per 1M tokens (input, cached input, output) by model name prefix, longest prefix wins
+MODEL_PRICES = {
+    'gpt-4.1': (2.00, 0.50, 8.00),
+    'gpt-4.1-mini': (0.40, 0.10, 1.60),
+    'gpt-4.1-nano': (0.10, 0.025, 0.40),
+    'gpt-4o': (2.50, 1.25, 10.00),
+    'gpt-4o-mini': (0.15, 0.075, 0.60),
+    'gpt-4-turbo': (10.00, 10.00, 30.00),
+    'gpt-3.5-turbo': (0.50, 0.50, 1.50),
+}
+DEFAULT_PRICES = (2.00, 0.50, 8.00)
+
+
+def get_model_prices(model: str = None) -> Tuple[float, float, float]:
+    """Return (input, cached input, output) USD prices per 1M tokens for a model."""
+    model = (model or Config.MODEL_NAME).lower()
+    matches = [prefix for prefix in MODEL_PRICES if model.startswith(prefix)]
+    if not matches:
+        return DEFAULT_PRICES
+    return MODEL_PRICES[max(matches, key=len)]
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> float:
+    """
+    Estimate the USD cost of a request.
+
+    Args:
+        model: Model name
+        prompt_tokens: Input tokens (including cached ones)
+        completion_tokens: Output tokens
+        cached_tokens: Input tokens served from the prompt cache
+
+    Returns:
+        float: Estimated cost in USD
+    """
+    input_price, cached_price, output_price = get_model_prices(model)
+    return ((prompt_tokens - cached_tokens) * input_price + cached_tokens * cached_price
+            + completion_tokens * output_price) / 1_000_000
+
+
+def usage_to_dict(usage: Any) -> Dict:
+    """
+    Read token counts from a usage record.
+
+    Args:
+        usage: OpenAI response.usage, or a LangChain usage_metadata dict (None if unavailable)
+
+    Returns:
+        Dict with prompt_tokens, cached_tokens and completion_tokens
+    """
+    if usage is None:
+        return {"prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0}
+    if isinstance(usage, dict):
+        details = usage.get('input_token_details') or {}
+        return {"prompt_tokens": usage.get('input_tokens', 0) or 0,
+                "cached_tokens": details.get('cache_read', 0) or 0,
+                "completion_tokens": usage.get('output_tokens', 0) or 0}
+    details = getattr(usage, 'prompt_tokens_details', None)
+    return {"prompt_tokens": getattr(usage, 'prompt_tokens', 0) or 0,
+            "cached_tokens": (getattr(details, 'cached_tokens', 0) or 0) if details is not None else 0,
+            "completion_tokens": getattr(usage, 'completion_tokens', 0) or 0}
+
+
+def log_usage(label: str, usage: Any, model: str) -> Dict:
+    """
+    Log a request's token usage, prompt cache hits and estimated cost.
+
+    Args:
+        label: Request type for the log line (e.g. "Standard chat")
+        usage: OpenAI usage object or LangChain usage_metadata dict
+        model: Model the request was sent to
+
+    Returns:
+        Dict from usage_to_dict() plus cost_usd
+    """
+    counts = usage_to_dict(usage)
+    counts["cost_usd"] = estimate_cost(model, counts["prompt_tokens"], counts["completion_tokens"], counts["cached_tokens"])
+    if counts["prompt_tokens"]:
+        logger.info(f"💾 {label}: {counts['cached_tokens']:,}/{counts['prompt_tokens']:,} prompt tokens cached "
+                    f"({counts['cached_tokens'] / counts['prompt_tokens']:.0%}), {counts['completion_tokens']:,} completion tokens, "
+                    f"${counts['cost_usd']:.4f}")
+    return counts
+
+
+def format_usage(counts: Dict) -> str:
+    """Return ' | 💾 4,096/5,210 prompt tokens cached' for a caption ('' if no usage was reported)."""
+    if not counts or not counts.get("prompt_tokens"):
+        return ""
+    return f" | 💾 {counts['cached_tokens']:,}/{counts['prompt_tokens']:,} prompt tokens cached"
+
+
+def new_stage_stats() -> Dict:
+    """Return an empty usage record for one pipeline stage."""
+    return {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0, "seconds": 0.0}
+
+
+def add_usage(stats: Dict, usage: Any, model: str) -> None:
+    """
+    Add a usage record (or None if the API returned none) to a stage record.
+
+    Args:
+        stats: Record from new_stage_stats()
+        usage: response.usage of a chat completion
+        model: Model the request was sent to
+    """
+    stats["calls"] += 1
+    if usage is None:
+        return
+    counts = usage_to_dict(usage)
+    for key in ("prompt_tokens", "cached_tokens", "completion_tokens"):
+        stats[key] += counts[key]
+    stats["cost_usd"] += estimate_cost(model, counts["prompt_tokens"], counts["completion_tokens"], counts["cached_tokens"])
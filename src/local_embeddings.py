@@ -0,0 +1,136 @@
+"""
+Local Embedding Backend for Offline Indexing
+
+This module provides a deterministic, zero-cost embedding backend that runs
+entirely on CPU with NumPy. Text is tokenized into words, each word unigram and
+bigram is hashed into a fixed number of buckets with a pseudo-random sign
+(the "hashing trick"), and counts are log-scaled and L2-normalized. Only the
+word hashes are computed in Python; bigram hashes and bucket counts are
+vectorized over whole batches with NumPy.
+
+It is selected with EMBEDDING_MODEL=local-hash (or local-hash-<dimension>,
+e.g. local-hash-512) and is useful for air-gapped indexing and as a
+deterministic baseline for retrieval benchmarks.
+
+Functions:
+- is_local_embedding_model(): Check whether a model name selects this backend
+- parse_local_dimension(): Extract the vector dimension from a model name
+"""
+
+import re
+import zlib
+from typing import Dict, List
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+LOCAL_EMBEDDING_PREFIX = 'local-hash'
+DEFAULT_LOCAL_DIMENSION = 768
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Bound the token -> hash cache so very large vocabularies cannot grow it forever
+_MAX_CACHE_ENTRIES = 2_000_000
+
+_BIGRAM_MULTIPLIER = np.uint64(0x9E3779B1)
+_HASH_MASK = np.uint64(0xFFFFFFFF)
+
+
+def is_local_embedding_model(model_name: str) -> bool:
+    """Return True if the model name selects the local hashed n-gram backend."""
+    return bool(model_name) and model_name.lower().startswith(LOCAL_EMBEDDING_PREFIX)
+
+
+def parse_local_dimension(model_name: str) -> int:
+    """
+    Extract the vector dimension from a local model name.
+
+    Args:
+        model_name: 'local-hash' or 'local-hash-<dimension>'
+
+    Returns:
+        int: Vector dimension (DEFAULT_LOCAL_DIMENSION if not specified)
+    """
+    suffix = model_name[len(LOCAL_EMBEDDING_PREFIX):].lstrip('-')
+    return int(suffix) if suffix.isdigit() else DEFAULT_LOCAL_DIMENSION
+
+
+class HashedNgramEmbeddings(Embeddings):
+    """LangChain-compatible embeddings built from hashed word n-grams."""
+
+    def __init__(self, dimension: int = DEFAULT_LOCAL_DIMENSION, batch_size: int = 4096):
+        """
+        Initialize the hashed n-gram embedder.
+
+        Args:
+            dimension: Number of hash buckets (output vector dimension)
+            batch_size: Number of texts vectorized per NumPy batch
+        """
+        self.dimension = dimension
+        self.batch_size = batch_size
+        self._hashes: Dict[str, int] = {}
+
+    def _token_hash(self, token: str) -> int:
+        """Return the stable 32-bit hash of a token (cached)."""
+        h = zlib.crc32(token.encode('utf-8'))
+        if len(self._hashes) >= _MAX_CACHE_ENTRIES:
+            self._hashes.clear()
+        self._hashes[token] = h
+        return h
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        """Vectorize one batch of texts into an (n, dimension) float32 array."""
+        tokens = []
+        lengths = []
+        for text in texts:
+            text_tokens = _TOKEN_RE.findall(text.lower())
+            lengths.append(len(text_tokens))
+            tokens.extend(text_tokens)
+
+        hashes = list(map(self._hashes.get, tokens))
+        if None in hashes:
+            hashes = [h if h is not None else self._token_hash(t) for h, t in zip(hashes, tokens)]
+        unigram_hashes = np.array(hashes, dtype=np.uint64)
+        rows = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+
+        # Bigram hashes are combined from adjacent unigram hashes within the same text
+        same_text = rows[1:] == rows[:-1]
+        bigram_hashes = ((unigram_hashes[:-1] * _BIGRAM_MULTIPLIER) ^ unigram_hashes[1:]) & _HASH_MASK
+        hashes = np.concatenate([unigram_hashes, bigram_hashes[same_text]])
+        rows = np.concatenate([rows, rows[:-1][same_text]])
+
+        buckets = (hashes % self.dimension).astype(np.int64)
+        signs = np.where((hashes // self.dimension) & 1, 1.0, -1.0)
+        counts = np.bincount(rows * self.dimension + buckets, weights=signs,
+                             minlength=len(texts) * self.dimension)
+        vectors = counts.reshape(len(texts), self.dimension)
+
+        # Sublinear term frequency, then unit length so L2 distance tracks cosine similarity
+        vectors = np.sign(vectors) * np.log1p(np.abs(vectors))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (vectors / norms).astype(np.float32)
+
+    def embed_array(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts into a float32 NumPy array without Python list conversion.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            np.ndarray: Array of shape (len(texts), dimension)
+        """
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        batches = [self._embed_batch(texts[i:i + self.batch_size])
+                   for i in range(0, len(texts), self.batch_size)]
+        return np.vstack(batches)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed a list of documents."""
+        return self.embed_array(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query."""
+        return self.embed_array([text])[0].tolist()
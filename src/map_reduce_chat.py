@@ -0,0 +1,303 @@
+"""
+Map-Reduce Chat over Summary Batches
+
+The full-summary chat modes send every summary in one prompt, which fails or
+gets truncated once the corpus outgrows a single request. When the serialized
+summaries exceed the single-request limit, this module answers in two stages:
+
+- map: the summaries are split into token-bounded batches and the question is
+  asked of every batch concurrently (bounded by MAP_REDUCE_CONCURRENCY)
+- reduce: the partial answers are combined into the final answer, which is
+  streamed; if the partial answers themselves are too large they are first
+  combined in groups (non-streamed) until they fit one request
+
+Token usage, estimated cost and wall time are recorded per stage.
+
+Classes:
+- MapReduceChat: Run the map and reduce stages for one question
+
+Functions:
+- needs_map_reduce(): Whether a context is too large for a single request
+- format_map_reduce_stats(): Caption text with per-stage latency and cost
+"""
+
+import asyncio
+import re
+import time
+from typing import AsyncIterator, Dict, Iterator, List, Tuple
+import openai
+from src.logger import logger
+from src.config import Config
+from src.async_bridge import iterate_sync, run_sync
+from src.context_budget import compute_context_budget, count_tokens
+from src.context_serializer import serialize_batches
+from src.llm_usage import add_usage, new_stage_stats
+
+
+_MAP_INSTRUCTIONS = (
+    "You are answering the user's question over one batch of a larger set of call "
+    "summaries. Use only the calls in this batch. Give exact counts, sums and the number of calls each figure "
+    "is based on, and cite call IDs and agent names, so your answer can be combined with the answers for the "
+    "other batches. If no call in this batch is relevant, answer exactly: No relevant calls in this batch."
+)
+_REDUCE_INSTRUCTIONS = (
+    "The question below was answered separately over {batches} batches covering {summaries} call summaries. "
+    "Combine the partial answers into one final answer to the question. Add up counts and totals across batches, "
+    "recompute averages and rates weighted by the number of calls behind each figure, merge rankings, and ignore "
+    "batches without relevant calls. Do not mention batches in the final answer."
+)
+# Intermediate combine of a group of partial answers, which is merged again later
+_FOLD_INSTRUCTIONS = (
+    "The question below was answered separately over {batches} batches covering {summaries} call summaries, which "
+    "are only part of the calls asked about. Combine these partial answers into one intermediate answer that will "
+    "later be merged with the answers for the other calls. Add up counts and totals, recompute averages and rates "
+    "weighted by the number of calls behind each figure, and merge rankings. Keep exact counts, the number of calls "
+    "each figure is based on, call IDs and agent names. If no batch has relevant calls, answer exactly: No relevant "
+    "calls in this batch."
+)
+# Header of a partial answer, e.g. "Batch 3 (120 calls):"
+_PARTIAL_CALLS_RE = re.compile(r"^\w+ \d+ \((\d+) calls\):")
+# Added when map batches failed, so the final answer discloses partial coverage instead of undercounting silently
+_PARTIAL_COVERAGE_INSTRUCTIONS = (
+    " {omitted} of the {total} call summaries could not be analyzed because their batches failed, so the partial "
+    "answers cover only {summaries} calls. Start the final answer by stating that it is based on {summaries} of "
+    "{total} calls, and present counts and totals as covering only those calls."
+)
+
+
+def needs_map_reduce(context_tokens: int, model: str = None, max_tokens: int = None, prompt_tokens: int = 0) -> bool:
+    """
+    Decide whether a serialized summaries context is too large for one request.
+
+    Args:
+        context_tokens: Tokens of the serialized summaries
+        model: Model name (uses Config.MODEL_NAME if None)
+        max_tokens: Tokens reserved for the answer
+        prompt_tokens: Tokens of the prompts, history and question
+
+    Returns:
+        bool: True if the context exceeds the single-request limit
+    """
+    if not Config.MAP_REDUCE_ENABLED:
+        return False
+    return context_tokens > compute_context_budget(model, max_tokens, prompt_tokens, Config.CHAT_CONTEXT_MAX_TOKENS)
+
+
+class MapReduceChat:
+    """Answer a question over summary batches (map) and combine the partial answers (reduce)."""
+
+    def __init__(self, api_key: str = None, model: str = None, temperature: float = None,
+                 max_tokens: int = None, concurrency: int = None, map_max_tokens: int = None):
+        """
+        Args:
+            api_key: OpenAI API key (uses the module-level openai key if None)
+            model: Model for both stages (uses Config.MODEL_NAME if None)
+            temperature: Sampling temperature (uses Config.TEMPERATURE if None)
+            max_tokens: Maximum tokens of the final answer (uses Config.MAX_TOKENS if None)
+            concurrency: Map requests in flight at once (uses Config.MAP_REDUCE_CONCURRENCY if None)
+            map_max_tokens: Maximum tokens per partial answer (uses Config.MAP_REDUCE_MAP_MAX_TOKENS if None)
+        """
+        self.api_key = api_key or openai.api_key
+        self.model = model or Config.MODEL_NAME
+        self.temperature = Config.TEMPERATURE if temperature is None else temperature
+        self.max_tokens = max_tokens or Config.MAX_TOKENS
+        self.concurrency = concurrency or Config.MAP_REDUCE_CONCURRENCY
+        self.map_max_tokens = map_max_tokens or Config.MAP_REDUCE_MAP_MAX_TOKENS
+        self.stats = {"map": new_stage_stats(), "reduce": new_stage_stats()}
+        self.stats["map"].update({"batches": 0, "failed": 0, "omitted_summaries": 0})
+
+    def _client(self) -> openai.AsyncOpenAI:
+        return openai.AsyncOpenAI(api_key=self.api_key)
+
+    def batch_token_budget(self, prompt_tokens: int = 0) -> int:
+        """Tokens of summaries per map request."""
+        limit = compute_context_budget(self.model, self.map_max_tokens, prompt_tokens, Config.CHAT_CONTEXT_MAX_TOKENS)
+        return max(min(Config.MAP_REDUCE_BATCH_TOKENS, limit), 1)
+
+    def build_batches(self, summaries: List[Dict], question: str, system_prompt: str,
+                      history: List[Dict] = None) -> List[Dict]:
+        """
+        Split summaries into token-bounded batches for the map stage.
+
+        Args:
+            summaries: Summary dicts
+            question: User question (chooses the projected fields)
+            system_prompt: System prompt sent with every map request
+            history: Role/content history sent with every map request
+
+        Returns:
+            List of batch dicts (text, summaries, tokens)
+        """
+        prompt_tokens = (count_tokens(system_prompt, self.model) + count_tokens(question, self.model)
+                         + sum(count_tokens(msg["content"], self.model) for msg in history or [])
+                         + count_tokens(_MAP_INSTRUCTIONS, self.model))
+        batches = serialize_batches(summaries, self.batch_token_budget(prompt_tokens), question, model=self.model)
+        self.stats["map"]["batches"] = len(batches)
+        return batches
+
+    async def _complete(self, client: openai.AsyncOpenAI, messages: List[Dict], max_tokens: int, stage: str) -> str:
+        response = await client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=self.temperature,
+            max_tokens=max_tokens
+        )
+        add_usage(self.stats[stage], response.usage, self.model)
+        return (response.choices[0].message.content or "").strip()
+
+    async def amap(self, question: str, batches: List[Dict], system_prompt: str,
+                   history: List[Dict] = None) -> List[str]:
+        """
+        Ask the question of every batch concurrently.
+
+        Args:
+            question: User question
+            batches: Batches from build_batches()
+            system_prompt: System prompt
+            history: Role/content history
+
+        Returns:
+            Partial answers, in batch order (failed batches are left out; stats count them and
+            the calls they held, and the reduce prompt discloses the partial coverage)
+        """
+        start = time.time()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def answer_batch(client: openai.AsyncOpenAI, index: int, batch: Dict) -> str:
+            # Static instructions and the batch first, so repeat questions reuse the cached prompt prefix per batch
+            messages = [{"role": "system", "content": f"{system_prompt}\n\n{_MAP_INSTRUCTIONS}\n\n"
+                                                      f"Call summaries (batch {index + 1} of {len(batches)}):\n{batch['text']}"}]
+            messages += list(history or []) + [{"role": "user", "content": f"User Question: {question}"}]
+            async with semaphore:
+                return await self._complete(client, messages, self.map_max_tokens, "map")
+
+        async with self._client() as client:
+            results = await asyncio.gather(*(answer_batch(client, i, batch) for i, batch in enumerate(batches)),
+                                           return_exceptions=True)
+        partials = []
+        for index, result in enumerate(results):
+            if isinstance(result, BaseException):
+                self.stats["map"]["failed"] += 1
+                self.stats["map"]["omitted_summaries"] += batches[index]['summaries']
+                logger.warning(f"⚠️  Map batch {index + 1}/{len(batches)} failed: {str(result)}")
+            else:
+                partials.append(f"Batch {index + 1} ({batches[index]['summaries']} calls):\n{result}")
+        self.stats["map"]["seconds"] = time.time() - start
+        logger.info(f"🗺️  Map stage: {len(partials)}/{len(batches)} batches answered in {self.stats['map']['seconds']:.2f}s "
+                    f"({self.stats['map']['prompt_tokens']:,} prompt tokens, ${self.stats['map']['cost_usd']:.4f})")
+        if not partials:
+            raise RuntimeError("All map batches failed")
+        return partials
+
+    def _reduce_messages(self, question: str, partials: List[str], system_prompt: str,
+                         history: List[Dict], summaries: int) -> List[Dict]:
+        omitted = self.stats["map"]["omitted_summaries"]
+        covered = max(summaries - omitted, 0)
+        instructions = _REDUCE_INSTRUCTIONS.format(batches=len(partials), summaries=covered)
+        if omitted:
+            instructions += _PARTIAL_COVERAGE_INSTRUCTIONS.format(omitted=omitted, total=summaries, summaries=covered)
+        joined = "\n\n".join(partials)
+        return [{"role": "system", "content": f"{system_prompt}\n\n{instructions}"}] + list(history or []) + [
+            {"role": "user", "content": f"Partial answers:\n{joined}\n\nUser Question: {question}"}]
+
+    def _fold_messages(self, question: str, group: List[str], system_prompt: str,
+                       history: List[Dict]) -> Tuple[List[Dict], int]:
+        """Messages combining one group of partial answers, and the number of calls the group covers."""
+        calls = sum(int(match.group(1)) for match in map(_PARTIAL_CALLS_RE.match, group) if match)
+        instructions = _FOLD_INSTRUCTIONS.format(batches=len(group), summaries=calls)
+        joined = "\n\n".join(group)
+        messages = [{"role": "system", "content": f"{system_prompt}\n\n{instructions}"}] + list(history or []) + [
+            {"role": "user", "content": f"Partial answers:\n{joined}\n\nUser Question: {question}"}]
+        return messages, calls
+
+    async def _fold_partials(self, client: openai.AsyncOpenAI, question: str, partials: List[str],
+                             system_prompt: str, history: List[Dict]) -> List[str]:
+        """Combine partial answers in groups until they fit one reduce request."""
+        prompt_tokens = (count_tokens(system_prompt, self.model) + count_tokens(question, self.model)
+                         + sum(count_tokens(msg["content"], self.model) for msg in history or []))
+        budget = compute_context_budget(self.model, self.max_tokens, prompt_tokens, Config.CHAT_CONTEXT_MAX_TOKENS)
+        while len(partials) > 1 and count_tokens("\n\n".join(partials), self.model) > budget:
+            groups, current, used = [], [], 0
+            for partial in partials:
+                tokens = count_tokens(partial, self.model)
+                if current and used + tokens > budget:
+                    groups.append(current)
+                    current, used = [], 0
+                current.append(partial)
+                used += tokens
+            groups.append(current)
+            if len(groups) == len(partials):
+                break
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+            async def fold(group: List[str]) -> Tuple[str, int]:
+                messages, calls = self._fold_messages(question, group, system_prompt, history)
+                async with semaphore:
+                    # Merged counts and rankings get the final answer's budget, not a batch answer's
+                    return await self._complete(client, messages, self.max_tokens, "reduce"), calls
+
+            folded = await asyncio.gather(*map(fold, groups))
+            partials = [f"Group {i + 1} ({calls} calls):\n{answer}" for i, (answer, calls) in enumerate(folded)]
+            logger.info(f"🧩 Folded partial answers into {len(partials)} groups")
+        return partials
+
+    async def areduce_stream(self, question: str, partials: List[str], system_prompt: str,
+                             history: List[Dict] = None, summaries: int = 0) -> AsyncIterator[str]:
+        """
+        Combine partial answers into the final answer and stream it.
+
+        Args:
+            question: User question
+            partials: Partial answers from amap()
+            system_prompt: System prompt
+            history: Role/content history
+            summaries: Total number of summaries asked about (calls of failed map batches are reported as not covered)
+
+        Yields:
+            str: Chunks of the final answer
+        """
+        start = time.time()
+        stats = self.stats["reduce"]
+        try:
+            async with self._client() as client:
+                partials = await self._fold_partials(client, question, partials, system_prompt, history)
+                stream = await client.chat.completions.create(
+                    model=self.model,
+                    messages=self._reduce_messages(question, partials, system_prompt, history, summaries),
+                    temperature=self.temperature,
+                    max_tokens=self.max_tokens,
+                    stream=True,
+                    stream_options={"include_usage": True}
+                )
+                usage = None
+                async for chunk in stream:
+                    if chunk.usage is not None:
+                        usage = chunk.usage
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+                add_usage(stats, usage, self.model)
+        finally:
+            stats["seconds"] = time.time() - start
+        logger.info(f"🧩 Reduce stage: {stats['calls']} calls in {stats['seconds']:.2f}s (${stats['cost_usd']:.4f})")
+
+    def map(self, question: str, batches: List[Dict], system_prompt: str, history: List[Dict] = None) -> List[str]:
+        """Sync wrapper around amap()."""
+        return run_sync(self.amap(question, batches, system_prompt, history))
+
+    def reduce_stream(self, question: str, partials: List[str], system_prompt: str,
+                      history: List[Dict] = None, summaries: int = 0) -> Iterator[str]:
+        """Sync wrapper around areduce_stream()."""
+        return iterate_sync(self.areduce_stream(question, partials, system_prompt, history, summaries))
+
+
+def format_map_reduce_stats(stats: Dict) -> str:
+    """Return a caption with per-stage batches, latency, tokens and estimated cost."""
+    map_stats, reduce_stats = stats["map"], stats["reduce"]
+    failed = (f", {map_stats['failed']} failed ({map_stats['omitted_summaries']:,} calls not covered)"
+              if map_stats.get("failed") else "")
+    return (f"🗺️ Map: {map_stats['batches']} batches{failed}, {map_stats['seconds']:.1f}s, "
+            f"{map_stats['prompt_tokens']:,} in ({map_stats['cached_tokens']:,} cached) / {map_stats['completion_tokens']:,} out tokens, "
+            f"${map_stats['cost_usd']:.4f} | "
+            f"🧩 Reduce: {reduce_stats['calls']} calls, {reduce_stats['seconds']:.1f}s, "
+            f"{reduce_stats['prompt_tokens']:,} in ({reduce_stats['cached_tokens']:,} cached) / {reduce_stats['completion_tokens']:,} out tokens, "
+            f"${reduce_stats['cost_usd']:.4f}")
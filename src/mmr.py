@@ -0,0 +1,106 @@
+"""
+Maximal Marginal Relevance (MMR) Re-ranking
+
+With a large k the retriever often returns many near-duplicate summaries
+(e.g. dozens of identical Wi-Fi connectivity calls) that use up context
+without adding information. This module re-ranks a candidate pool with MMR:
+each pick balances relevance to the query against similarity to the documents
+already picked. Near-duplicates of a picked document are dropped.
+
+Everything runs on the vectors already stored in the index (exact vectors for
+compressed indexes, reconstructed vectors for flat ones), so re-ranking needs
+no new embedding calls; each pick is one matrix-vector product in NumPy.
+
+Functions:
+- search_with_vectors(): FAISS search that also returns the stored vectors of the hits
+- mmr_select(): Vectorized greedy MMR selection
+"""
+
+from typing import Any, List, Tuple
+import numpy as np
+from langchain_core.documents import Document
+from src.index_compression import RerankingIndex
+
+
+def _stored_vectors(index, ids: np.ndarray) -> np.ndarray:
+    """Return the stored vectors for FAISS ids (exact vectors when the index is re-ranked)."""
+    if isinstance(index, RerankingIndex):
+        # Sorted reads keep memmap access sequential
+        order = np.argsort(ids)
+        vectors = np.empty((ids.size, index.d), dtype=np.float32)
+        vectors[order] = np.asarray(index.exact_vectors[ids[order]], dtype=np.float32)
+        return vectors
+    return index.reconstruct_batch(ids)
+
+
+def search_with_vectors(store: Any, embedding: List[float], k: int) -> List[Tuple[Document, float, np.ndarray]]:
+    """
+    Search a LangChain FAISS store and return hits together with their stored vectors.
+
+    Args:
+        store: LangChain FAISS store
+        embedding: Query vector
+        k: Number of candidates
+
+    Returns:
+        List of (document, L2 distance, vector), closest first
+    """
+    k = min(k, store.index.ntotal)
+    if k <= 0:
+        return []
+    query = np.asarray([embedding], dtype=np.float32)
+    distances, ids = store.index.search(query, k)
+    keep = ids[0] != -1
+    ids, distances = ids[0][keep], distances[0][keep]
+    if ids.size == 0:
+        return []
+    vectors = _stored_vectors(store.index, ids.astype(np.int64))
+    return [(store.docstore.search(store.index_to_docstore_id[int(i)]), float(distance), vector)
+            for i, distance, vector in zip(ids, distances, vectors)]
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+def mmr_select(query_vector: np.ndarray, candidate_vectors: np.ndarray, k: int,
+               lambda_mult: float = 0.7, duplicate_threshold: float = 1.0) -> List[int]:
+    """
+    Select a diverse, relevant subset of candidates with maximal marginal relevance.
+
+    Each step picks argmax(lambda * sim(query, d) - (1 - lambda) * max sim(d, picked)).
+    Candidates whose cosine similarity to a picked document reaches
+    duplicate_threshold are never picked, so fewer than k may be returned.
+
+    Args:
+        query_vector: Query embedding, shape (dim,)
+        candidate_vectors: Candidate embeddings, shape (n, dim)
+        k: Maximum number of candidates to select
+        lambda_mult: 1.0 = relevance only, 0.0 = diversity only
+        duplicate_threshold: Cosine similarity at which a candidate counts as a duplicate
+
+    Returns:
+        Indices into candidate_vectors, in pick order
+    """
+    n = len(candidate_vectors)
+    if n == 0 or k <= 0:
+        return []
+    vectors = _normalize_rows(np.asarray(candidate_vectors, dtype=np.float32))
+    query = _normalize_rows(np.asarray(query_vector, dtype=np.float32))
+    relevance = vectors @ query
+
+    max_similarity = np.full(n, -1.0, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    selected = []
+    for _ in range(min(k, n)):
+        scores = np.where(available, lambda_mult * relevance - (1 - lambda_mult) * np.maximum(max_similarity, 0), -np.inf)
+        pick = int(np.argmax(scores))
+        if not np.isfinite(scores[pick]):
+            break
+        selected.append(pick)
+        available[pick] = False
+        similarity = vectors @ vectors[pick]
+        np.maximum(max_similarity, similarity, out=max_similarity)
+        available &= max_similarity < duplicate_threshold
+    return selected
@@ -1,6 +1,13 @@
 """
 Plotting module for generating various charts and graphs from call center summaries.
 Supports bar charts, pie charts, line charts, scatter plots, and more.
+
+Chart data comes from one normalized chart frame (numeric score, rating and
+duration columns, categorical sentiment and resolution columns) built from the
+canonical fields added at save time (see summary_normalizer), parsing only
+older summaries, and cached per summaries version, so every chart
+generator shares it instead of looping over the summary dicts. Rendered
+charts are cached by chart type, data version and dpi (see chart_cache).
 """
 
 import matplotlib.pyplot as plt
@@ -11,8 +18,13 @@ import numpy as np
 import json
 import io
 import base64
-from typing import Tuple, Optional, Dict, Any
+import threading
+from collections import OrderedDict
+from typing import Tuple, Optional, Dict, Union
 from src.logger import logger
+from src.config import Config
+from src.chart_cache import get_chart_cache
+from src.summary_frame import build_summary_frame
 
 # Set style for better-looking plots
 sns.set_style("whitegrid")
@@ -23,50 +35,317 @@ plt.rcParams['font.size'] = 10
 def encode_plot_to_base64(fig) -> str:
     """Convert matplotlib figure to base64 string for embedding in Streamlit."""
     buffer = io.BytesIO()
-    fig.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
+    fig.savefig(buffer, format='png', dpi=Config.CHART_DPI, bbox_inches='tight')
     buffer.seek(0)
     img_base64 = base64.b64encode(buffer.read()).decode()
     plt.close(fig)
     return img_base64
 
 
-def extract_numeric_value(value: Any) -> float:
-    """Safely extract numeric value from various types."""
-    try:
-        if isinstance(value, (int, float)):
-            return float(value)
-        elif isinstance(value, str):
-            # Try to convert string to float
-            return float(value)
-        else:
-            return 0.0
-    except (ValueError, TypeError):
-        return 0.0
-
-
-def generate_agent_performance_bar_chart(summaries: list) -> Tuple[str, str]:
-    """Generate bar chart showing agent performance scores."""
+def build_chart_frame(summaries: list) -> pd.DataFrame:
+    """
+    Build the normalized chart frame from summary dicts with vectorized parsing.
+    
+    Columns: agent_name (categorical), score (missing scores count as 0),
+    rating (NaN if missing), duration_minutes (NaN if unparseable),
+    sentiment (lowercase customer tone, categorical), resolution_status
+    (categorical), resolved (bool) and conversation_date.
+    """
+    base = build_summary_frame(summaries)
+    frame = pd.DataFrame({
+        'agent_name': base['agent_name'],
+        'score': base['agent_score'].fillna(0.0),
+        'rating': base['agent_rating'],
+        'duration_minutes': base['duration_seconds'] / 60,
+        'resolution_status': base['resolution_status'],
+        'conversation_date': base['conversation_date'],
+    })
+    # Per-category string work: one operation per distinct value, not per call
+    tones = base['customer_tone'].cat.categories.astype(str)
+    frame['sentiment'] = pd.Categorical(tones.str.lower()[base['customer_tone'].cat.codes])
+    statuses = base['resolution_status'].cat.categories.astype(str)
+    resolved_categories = np.asarray(statuses.str.contains('Resolved') & ~statuses.str.contains('Unresolved'), dtype=bool)
+    frame['resolved'] = resolved_categories[base['resolution_status'].cat.codes]
+    return frame
+
+
+_chart_frames: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+_chart_frames_lock = threading.Lock()
+_MAX_CACHED_CHART_FRAMES = 4
+
+
+def get_chart_frame(summaries: list, data_version: str = None) -> pd.DataFrame:
+    """
+    Return the chart frame for summaries, built once per data version.
+    
+    Args:
+        summaries: Summary dicts
+        data_version: Version stamp of the summaries (e.g. get_summaries_version());
+                      the frame is not cached if None
+    
+    Returns:
+        Chart frame (see build_chart_frame)
+    """
+    if data_version is None:
+        return build_chart_frame(summaries)
+    with _chart_frames_lock:
+        frame = _chart_frames.get(data_version)
+        if frame is not None:
+            _chart_frames.move_to_end(data_version)
+            return frame
+    frame = build_chart_frame(summaries)
+    logger.info(f"📊 Built chart frame: {len(frame)} rows (version {data_version})")
+    with _chart_frames_lock:
+        _chart_frames[data_version] = frame
+        while len(_chart_frames) > _MAX_CACHED_CHART_FRAMES:
+            _chart_frames.popitem(last=False)
+    return frame
+
+
+def _as_chart_frame(data: Union[list, pd.DataFrame]) -> pd.DataFrame:
+    """Accept summary dicts or a prepared chart frame."""
+    return data if isinstance(data, pd.DataFrame) else build_chart_frame(data or [])
+
+
+# Score levels of the score distribution chart, best first
+SCORE_LEVELS = ['Excellent (85+)', 'Very Good (75-84)', 'Good (60-74)', 'Needs Improvement (<60)']
+
+
+def histogram_data(values: np.ndarray, bins: int = None, bin_width: float = None, count_column: str = 'calls') -> pd.DataFrame:
+    """
+    Bin values with NumPy into a bounded number of bins with readable edges.
+    
+    Args:
+        values: Numeric values (NaN values are ignored)
+        bins: Maximum number of bins (uses Config.CHART_HISTOGRAM_BINS if None)
+        bin_width: Fixed bin width; by default the smallest whole-number width giving at most `bins` bins
+        count_column: Name of the count column
+    
+    Returns:
+        DataFrame with bin (label such as '10-12'), bin_start, bin_end and the count column
+    """
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    bins = bins or Config.CHART_HISTOGRAM_BINS
+    if values.size == 0:
+        return pd.DataFrame({'bin': [], 'bin_start': [], 'bin_end': [], count_column: []})
+    low, high = np.floor(values.min()), values.max()
+    width = bin_width or max(1.0, float(np.ceil((high - low + 1) / bins)))
+    low = np.floor(low / width) * width
+    # Whole bins from low past high, so the maximum falls inside the last bin
+    edges = low + width * np.arange(int((high - low) // width) + 2)
+    counts, edges = np.histogram(values, bins=edges)
+    return pd.DataFrame({
+        'bin': [f"{start:g}-{end:g}" for start, end in zip(edges[:-1], edges[1:])],
+        'bin_start': edges[:-1],
+        'bin_end': edges[1:],
+        count_column: counts,
+    })
+
+
+def top_n_with_other(counts: pd.Series, n: int = None, label: str = 'agents') -> pd.Series:
+    """
+    Keep the n largest counts and sum the rest into one 'Other (k ...)' bucket.
+    
+    Args:
+        counts: Counts indexed by category name
+        n: Categories to keep (uses Config.CHART_MAX_BARS if None)
+        label: Plural noun for the other bucket label
+    
+    Returns:
+        Series of at most n + 1 counts, largest first, with the other bucket last
+    """
+    n = n or Config.CHART_MAX_BARS
+    counts = counts.sort_values(ascending=False, kind='stable')
+    if len(counts) <= n:
+        return counts
+    top = counts.iloc[:n].copy()
+    top[f"Other ({len(counts) - n} {label})"] = counts.iloc[n:].sum()
+    return top
+
+
+def time_bucket_counts(dates: pd.Series, max_buckets: int = None) -> Tuple[pd.DataFrame, str]:
+    """
+    Count calls per day, week or month with NumPy, using the finest bucket that fits max_buckets.
+    
+    Args:
+        dates: Call dates (NaT values are ignored)
+        max_buckets: Maximum number of buckets (uses Config.CHART_MAX_TIME_BUCKETS if None)
+    
+    Returns:
+        Tuple of (DataFrame with period (bucket start) and calls, including empty buckets; bucket name)
+    """
+    max_buckets = max_buckets or Config.CHART_MAX_TIME_BUCKETS
+    days = dates.dropna().to_numpy().astype('datetime64[D]')
+    if days.size == 0:
+        return pd.DataFrame({'period': pd.to_datetime([]), 'calls': []}), 'day'
+    span_days = int((days.max() - days.min()).astype(np.int64))
+    if span_days < max_buckets:
+        bucket, starts, step = 'day', days, np.timedelta64(1, 'D')
+    elif span_days // 7 < max_buckets:
+        # Weeks start on Monday (1970-01-01 was a Thursday)
+        bucket, step = 'week', np.timedelta64(7, 'D')
+        starts = days - ((days.astype(np.int64) + 3) % 7).astype('timedelta64[D]')
+    else:
+        bucket, starts, step = 'month', days.astype('datetime64[M]'), np.timedelta64(1, 'M')
+    origin = starts.min()
+    counts = np.bincount(((starts - origin) // step).astype(np.int64))
+    periods = (origin + np.arange(counts.size) * step).astype('datetime64[D]')
+    return pd.DataFrame({'period': pd.to_datetime(periods), 'calls': counts}), bucket
+
+
+def _agent_performance_data(frame: pd.DataFrame) -> Tuple[pd.DataFrame, str]:
+    # Average score per agent, in order of first appearance
+    avg_scores = frame.groupby('agent_name', observed=True, sort=False)['score'].mean()
+    score_range = f"Average scores range from {avg_scores.min():.1f} to {avg_scores.max():.1f}."
+    if len(avg_scores) > Config.CHART_MAX_BARS:
+        # Too many agents for one bar each: distribution of agent averages
+        data = histogram_data(avg_scores.to_numpy(), count_column='agents')
+        return data, f"Generated agent performance distribution for {len(avg_scores)} agents. {score_range}"
+    data = pd.DataFrame({'agent': avg_scores.index.astype(str), 'avg_score': avg_scores.round(1).to_numpy()})
+    summary_text = f"Generated agent performance bar chart with {len(data)} agents. {score_range}"
+    return data, summary_text
+
+
+def _score_distribution_data(frame: pd.DataFrame) -> Tuple[pd.DataFrame, str]:
+    # Categorize scores in one pass: <60, 60-74, 75-84, 85+
+    needs_improvement, good, very_good, excellent = (
+        int(count) for count in np.bincount(np.digitize(frame['score'].to_numpy(), [60, 75, 85]), minlength=4))
+    data = pd.DataFrame({'level': SCORE_LEVELS, 'calls': [excellent, very_good, good, needs_improvement]})
+    summary_text = f"Score distribution: Excellent ({excellent}), Very Good ({very_good}), Good ({good}), Needs Improvement ({needs_improvement})"
+    return data, summary_text
+
+
+def _duration_data(frame: pd.DataFrame) -> Tuple[pd.DataFrame, str]:
+    # Average duration per agent over calls with a parseable duration
+    timed = frame[frame['duration_minutes'].notna()]
+    if timed.empty:
+        return timed, "Could not parse conversation durations"
+    durations = timed['duration_minutes']
+    summary_text = f"Average call duration: {durations.mean():.1f} minutes. Range: {durations.min():.0f} - {durations.max():.0f} minutes"
+    grouped = timed.groupby('agent_name', observed=True, sort=False)['duration_minutes'].agg(['mean', 'size'])
+    if len(grouped) > Config.CHART_MAX_BARS:
+        # Too many agents for one bar each: histogram of call durations
+        return histogram_data(durations.to_numpy()), summary_text
+    data = pd.DataFrame({'agent': grouped.index.astype(str), 'avg_minutes': grouped['mean'].round(1).to_numpy(),
+                         'calls': grouped['size'].to_numpy()})
+    return data, summary_text
+
+
+def _agent_count_data(frame: pd.DataFrame) -> Tuple[pd.DataFrame, str]:
+    # Count conversations per agent
+    agent_counts = frame['agent_name'].value_counts(sort=False)
+    agent_counts = agent_counts[agent_counts > 0].sort_index()
+    summary_text = f"Total conversations: {int(agent_counts.sum())} across {len(agent_counts)} agents. Agent with most calls: {agent_counts.idxmax()} ({int(agent_counts.max())} calls)"
+    if len(agent_counts) > Config.CHART_MAX_BARS:
+        # Busiest agents, then everyone else in one bucket
+        agent_counts = top_n_with_other(agent_counts.rename(index=str))
+    data = pd.DataFrame({'agent': agent_counts.index.astype(str), 'calls': agent_counts.to_numpy()})
+    return data, summary_text
+
+
+def _sentiment_data(frame: pd.DataFrame) -> Tuple[pd.DataFrame, str]:
+    # Sentiment counts
+    counts = frame['sentiment'].value_counts(sort=False)
+    counts = counts[counts > 0].rename(index=str)
+    summary_text = f"Customer sentiment breakdown: {', '.join([f'{tone.capitalize()} ({count})' for tone, count in counts.items()])}"
+    if len(counts) > Config.CHART_MAX_BARS:
+        counts = top_n_with_other(counts, label='tones')
+    data = pd.DataFrame({'sentiment': counts.index.astype(str), 'calls': counts.to_numpy()})
+    return data, summary_text
+
+
+def _rating_data(frame: pd.DataFrame) -> Tuple[pd.DataFrame, str]:
+    # Count ratings (calls without a numeric rating are left out)
+    ratings_values = np.trunc(frame['rating'].dropna().to_numpy()).astype(int)
+    ratings_values = ratings_values[(ratings_values >= 1) & (ratings_values <= 5)]
+    counts = np.bincount(ratings_values, minlength=6)[1:]
+    data = pd.DataFrame({'rating': np.arange(1, 6), 'calls': counts})
+    avg_rating = (data['rating'] * data['calls']).sum() / counts.sum() if counts.sum() > 0 else 0
+    summary_text = f"Average agent rating: {avg_rating:.2f}/5 stars. Distribution: {', '.join([f'{r} star(s) ({count} calls)' for r, count in zip(data['rating'], data['calls']) if count > 0])}"
+    return data, summary_text
+
+
+def _resolution_data(frame: pd.DataFrame) -> Tuple[pd.DataFrame, str]:
+    # Resolved calls (resolutionStatus mentions Resolved but not Unresolved)
+    resolved = int(frame['resolved'].sum())
+    unresolved = len(frame) - resolved
+    data = pd.DataFrame({'status': ['Resolved', 'Unresolved'], 'calls': [resolved, unresolved]})
+    resolution_rate = resolved / len(frame) * 100
+    summary_text = f"Overall resolution rate: {resolution_rate:.1f}% ({resolved}/{len(frame)} calls resolved)"
+    return data, summary_text
+
+
+def _volume_data(frame: pd.DataFrame) -> Tuple[pd.DataFrame, str]:
+    # Calls per day, week or month, whichever keeps the series within CHART_MAX_TIME_BUCKETS points
+    data, bucket = time_bucket_counts(frame['conversation_date'])
+    if data.empty:
+        return data, "Could not parse conversation dates"
+    busiest = data.loc[data['calls'].idxmax()]
+    summary_text = (f"Call volume per {bucket}: {int(data['calls'].sum())} calls over {len(data)} {bucket}s "
+                    f"(busiest {bucket} starting {busiest['period']:%Y-%m-%d}: {int(busiest['calls'])} calls)")
+    undated = int(frame['conversation_date'].isna().sum())
+    if undated:
+        summary_text += f". {undated} calls without a date are not shown"
+    return data, summary_text
+
+
+_CHART_DATA = {
+    'agent performance': _agent_performance_data,
+    'score distribution': _score_distribution_data,
+    'duration': _duration_data,
+    'agent count': _agent_count_data,
+    'sentiment': _sentiment_data,
+    'rating': _rating_data,
+    'resolution': _resolution_data,
+    'volume': _volume_data,
+}
+
+
+def chart_data(chart_type: str, summaries: Union[list, pd.DataFrame]) -> Tuple[Optional[pd.DataFrame], str]:
+    """
+    Aggregate the data a chart shows (a few rows per chart, whatever the number of calls).
+    
+    Args:
+        chart_type: Chart type from detect_chart_request() (unknown types fall back to agent performance)
+        summaries: Summary dicts or a chart frame from get_chart_frame()
+    
+    Returns:
+        Tuple of (aggregated DataFrame or None if there is nothing to plot, summary text)
+    """
+    frame = _as_chart_frame(summaries)
+    if frame.empty:
+        return None, "No data available"
+    data, summary_text = _CHART_DATA.get(chart_type, _agent_performance_data)(frame)
+    return (data if not data.empty else None), summary_text
+
+
+def _plot_histogram(data: pd.DataFrame, count_column: str, title: str, xlabel: str, ylabel: str) -> str:
+    """Draw binned data from histogram_data() as adjacent bars and return the base64 PNG."""
+    fig, ax = plt.subplots(figsize=(12, 6))
+    ax.bar(data['bin_start'], data[count_column], width=data['bin_end'] - data['bin_start'], align='edge',
+           color='#3498db', edgecolor='black', linewidth=1.2)
+    ax.set_xlabel(xlabel, fontsize=12, fontweight='bold')
+    ax.set_ylabel(ylabel, fontsize=12, fontweight='bold')
+    ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
+    ax.grid(axis='y', alpha=0.3)
+    return encode_plot_to_base64(fig)
+
+
+def generate_agent_performance_bar_chart(summaries: Union[list, pd.DataFrame]) -> Tuple[str, str]:
+    """Generate bar chart showing agent performance scores (a distribution of agent averages for many agents)."""
     try:
-        if not summaries:
-            return None, "No data available"
-        
-        # Extract agent data
-        agents_data = {}
-        for summary in summaries:
-            agent_name = summary.get('agentName', 'Unknown')
-            agent_score = extract_numeric_value(summary.get('agentScore', 0))
-            
-            if agent_name not in agents_data:
-                agents_data[agent_name] = []
-            agents_data[agent_name].append(agent_score)
-        
-        # Calculate average scores
-        avg_scores = {name: np.mean(scores) for name, scores in agents_data.items()}
+        data, summary_text = chart_data('agent performance', summaries)
+        if data is None:
+            return None, summary_text
+        if 'bin' in data:
+            return _plot_histogram(data, 'agents', 'Agent Performance Distribution', 'Average Agent Score',
+                                   'Number of Agents'), summary_text
         
         # Create plot
         fig, ax = plt.subplots(figsize=(12, 6))
-        names = list(avg_scores.keys())
-        scores = list(avg_scores.values())
+        names = data['agent'].tolist()
+        scores = data['avg_score'].tolist()
         
         colors = ['#2ecc71' if score >= 80 else '#f39c12' if score >= 60 else '#e74c3c' 
                   for score in scores]
@@ -89,7 +368,6 @@ def generate_agent_performance_bar_chart(summaries: list) -> Tuple[str, str]:
         plt.xticks(rotation=45, ha='right')
         
         img_base64 = encode_plot_to_base64(fig)
-        summary_text = f"Generated agent performance bar chart with {len(agents_data)} agents. Average scores range from {min(scores):.1f} to {max(scores):.1f}."
         
         return img_base64, summary_text
     except Exception as e:
@@ -97,23 +375,17 @@ def generate_agent_performance_bar_chart(summaries: list) -> Tuple[str, str]:
         return None, f"Error generating chart: {str(e)}"
 
 
-def generate_agent_score_distribution_pie(summaries: list) -> Tuple[str, str]:
+def generate_agent_score_distribution_pie(summaries: Union[list, pd.DataFrame]) -> Tuple[str, str]:
     """Generate pie chart showing distribution of agent scores by performance level."""
     try:
-        if not summaries:
-            return None, "No data available"
-        
-        # Categorize scores
-        excellent = sum(1 for s in summaries if extract_numeric_value(s.get('agentScore', 0)) >= 85)
-        very_good = sum(1 for s in summaries if 75 <= extract_numeric_value(s.get('agentScore', 0)) < 85)
-        good = sum(1 for s in summaries if 60 <= extract_numeric_value(s.get('agentScore', 0)) < 75)
-        needs_improvement = sum(1 for s in summaries if extract_numeric_value(s.get('agentScore', 0)) < 60)
+        data, summary_text = chart_data('score distribution', summaries)
+        if data is None:
+            return None, summary_text
         
         # Create pie chart
         fig, ax = plt.subplots(figsize=(10, 8))
-        sizes = [excellent, very_good, good, needs_improvement]
-        labels = [f'Excellent (85+)\n{excellent}', f'Very Good (75-84)\n{very_good}', 
-                 f'Good (60-74)\n{good}', f'Needs Improvement (<60)\n{needs_improvement}']
+        sizes = data['calls'].tolist()
+        labels = [f'{level}\n{count}' for level, count in zip(data['level'], sizes)]
         colors = ['#27ae60', '#2ecc71', '#f39c12', '#e74c3c']
         explode = (0.05, 0.05, 0, 0)
         
@@ -124,7 +396,6 @@ def generate_agent_score_distribution_pie(summaries: list) -> Tuple[str, str]:
         ax.set_title('Agent Performance Distribution', fontsize=14, fontweight='bold', pad=20)
         
         img_base64 = encode_plot_to_base64(fig)
-        summary_text = f"Score distribution: Excellent ({excellent}), Very Good ({very_good}), Good ({good}), Needs Improvement ({needs_improvement})"
         
         return img_base64, summary_text
     except Exception as e:
@@ -132,28 +403,18 @@ def generate_agent_score_distribution_pie(summaries: list) -> Tuple[str, str]:
         return None, f"Error generating chart: {str(e)}"
 
 
-def generate_conversation_duration_chart(summaries: list) -> Tuple[str, str]:
-    """Generate bar chart showing conversation durations."""
+def generate_conversation_duration_chart(summaries: Union[list, pd.DataFrame]) -> Tuple[str, str]:
+    """Generate bar chart showing average conversation duration per agent (a duration histogram for many agents)."""
     try:
-        if not summaries:
-            return None, "No data available"
-        
-        # Extract duration data
-        durations = []
-        agents = []
-        for summary in summaries:
-            duration_str = summary.get('conversationlength', '0')
-            # Parse duration (e.g., "9 mins", "26 minutes")
-            duration_str = duration_str.lower().replace('mins', '').replace('minutes', '').replace('min', '').strip()
-            try:
-                duration = float(duration_str)
-                durations.append(duration)
-                agents.append(summary.get('agentName', 'Unknown')[:15])  # Truncate long names
-            except ValueError:
-                pass
-        
-        if not durations:
-            return None, "Could not parse conversation durations"
+        data, summary_text = chart_data('duration', summaries)
+        if data is None:
+            return None, summary_text
+        if 'bin' in data:
+            return _plot_histogram(data, 'calls', 'Call Duration Distribution', 'Duration (minutes)',
+                                   'Number of Calls'), summary_text
+        
+        durations = data['avg_minutes'].tolist()
+        agents = data['agent'].str[:15].tolist()  # Truncate long names
         
         # Create plot
         fig, ax = plt.subplots(figsize=(12, 6))
@@ -170,15 +431,13 @@ def generate_conversation_duration_chart(summaries: list) -> Tuple[str, str]:
                    ha='center', va='bottom', fontsize=9, fontweight='bold')
         
         ax.set_xlabel('Agent', fontsize=12, fontweight='bold')
-        ax.set_ylabel('Duration (minutes)', fontsize=12, fontweight='bold')
+        ax.set_ylabel('Average Duration (minutes)', fontsize=12, fontweight='bold')
         ax.set_title('Call Duration by Agent', fontsize=14, fontweight='bold', pad=20)
         ax.set_xticks(x_pos)
         ax.set_xticklabels(agents, rotation=45, ha='right')
         ax.grid(axis='y', alpha=0.3)
         
         img_base64 = encode_plot_to_base64(fig)
-        avg_duration = np.mean(durations)
-        summary_text = f"Average call duration: {avg_duration:.1f} minutes. Range: {min(durations):.0f} - {max(durations):.0f} minutes"
         
         return img_base64, summary_text
     except Exception as e:
@@ -186,24 +445,20 @@ def generate_conversation_duration_chart(summaries: list) -> Tuple[str, str]:
         return None, f"Error generating chart: {str(e)}"
 
 
-def generate_agent_vs_conversation_count(summaries: list) -> Tuple[str, str]:
-    """Generate bar chart showing number of conversations per agent."""
+def generate_agent_vs_conversation_count(summaries: Union[list, pd.DataFrame]) -> Tuple[str, str]:
+    """Generate bar chart showing number of conversations per agent (top agents plus 'Other' for many agents)."""
     try:
-        if not summaries:
-            return None, "No data available"
-        
-        # Count conversations per agent
-        agent_counts = {}
-        for summary in summaries:
-            agent_name = summary.get('agentName', 'Unknown')
-            agent_counts[agent_name] = agent_counts.get(agent_name, 0) + 1
+        data, summary_text = chart_data('agent count', summaries)
+        if data is None:
+            return None, summary_text
         
         # Create plot
         fig, ax = plt.subplots(figsize=(12, 6))
-        names = sorted(agent_counts.keys())
-        counts = [agent_counts[name] for name in names]
+        names = data['agent'].tolist()
+        counts = data['calls'].tolist()
         
-        colors = plt.cm.Set3(np.linspace(0, 1, len(names)))
+        colors = [(0.7, 0.7, 0.7, 1.0) if name.startswith('Other (') else color
+                  for name, color in zip(names, plt.cm.Set3(np.linspace(0, 1, len(names))))]
         bars = ax.bar(names, counts, color=colors, edgecolor='black', linewidth=1.2)
         
         # Add value labels
@@ -220,7 +475,6 @@ def generate_agent_vs_conversation_count(summaries: list) -> Tuple[str, str]:
         plt.xticks(rotation=45, ha='right')
         
         img_base64 = encode_plot_to_base64(fig)
-        summary_text = f"Total conversations: {sum(counts)} across {len(names)} agents. Agent with most calls: {max(agent_counts, key=agent_counts.get)} ({max(counts)} calls)"
         
         return img_base64, summary_text
     except Exception as e:
@@ -228,39 +482,35 @@ def generate_agent_vs_conversation_count(summaries: list) -> Tuple[str, str]:
         return None, f"Error generating chart: {str(e)}"
 
 
-def generate_customer_sentiment_distribution(summaries: list) -> Tuple[str, str]:
+# Color mapping for different sentiments
+SENTIMENT_COLORS = {
+    'happy': '#2ecc71',
+    'satisfied': '#27ae60',
+    'neutral': '#95a5a6',
+    'upset': '#e67e22',
+    'angry': '#e74c3c',
+    'frustrated': '#f39c12',
+    'calm': '#3498db',
+    'professional': '#34495e',
+    'appreciative': '#9b59b6',
+    'worried': '#e74c3c',
+    'alarm': '#c0392b'
+}
+
+
+def generate_customer_sentiment_distribution(summaries: Union[list, pd.DataFrame]) -> Tuple[str, str]:
     """Generate pie chart showing customer sentiment distribution."""
     try:
-        if not summaries:
-            return None, "No data available"
-        
-        # Extract sentiment data
-        sentiments = {}
-        for summary in summaries:
-            tone = summary.get('customerTone', 'Unknown').lower()
-            sentiments[tone] = sentiments.get(tone, 0) + 1
+        data, summary_text = chart_data('sentiment', summaries)
+        if data is None:
+            return None, summary_text
         
         # Create plot
         fig, ax = plt.subplots(figsize=(10, 8))
-        labels = list(sentiments.keys())
-        sizes = list(sentiments.values())
-        
-        # Color mapping for different sentiments
-        color_map = {
-            'happy': '#2ecc71',
-            'satisfied': '#27ae60',
-            'neutral': '#95a5a6',
-            'upset': '#e67e22',
-            'angry': '#e74c3c',
-            'frustrated': '#f39c12',
-            'calm': '#3498db',
-            'professional': '#34495e',
-            'appreciative': '#9b59b6',
-            'worried': '#e74c3c',
-            'alarm': '#c0392b'
-        }
-        
-        colors = [color_map.get(label, '#95a5a6') for label in labels]
+        labels = data['sentiment'].tolist()
+        sizes = data['calls'].tolist()
+        
+        colors = [SENTIMENT_COLORS.get(label, '#95a5a6') for label in labels]
         explode = [0.05 if size == max(sizes) else 0 for size in sizes]
         
         wedges, texts, autotexts = ax.pie(sizes, labels=labels, colors=colors, autopct='%1.1f%%',
@@ -270,7 +520,6 @@ def generate_customer_sentiment_distribution(summaries: list) -> Tuple[str, str]
         ax.set_title('Customer Sentiment Distribution', fontsize=14, fontweight='bold', pad=20)
         
         img_base64 = encode_plot_to_base64(fig)
-        summary_text = f"Customer sentiment breakdown: {', '.join([f'{tone.capitalize()} ({count})' for tone, count in sentiments.items()])}"
         
         return img_base64, summary_text
     except Exception as e:
@@ -278,23 +527,17 @@ def generate_customer_sentiment_distribution(summaries: list) -> Tuple[str, str]
         return None, f"Error generating chart: {str(e)}"
 
 
-def generate_agent_rating_distribution(summaries: list) -> Tuple[str, str]:
+def generate_agent_rating_distribution(summaries: Union[list, pd.DataFrame]) -> Tuple[str, str]:
     """Generate bar chart showing distribution of agent ratings (1-5 stars)."""
     try:
-        if not summaries:
-            return None, "No data available"
-        
-        # Count ratings
-        rating_counts = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-        for summary in summaries:
-            rating = int(extract_numeric_value(summary.get('agentRating', 3)))
-            if 1 <= rating <= 5:
-                rating_counts[rating] += 1
+        data, summary_text = chart_data('rating', summaries)
+        if data is None:
+            return None, summary_text
         
         # Create plot
         fig, ax = plt.subplots(figsize=(10, 6))
-        ratings = list(rating_counts.keys())
-        counts = list(rating_counts.values())
+        ratings = data['rating'].tolist()
+        counts = data['calls'].tolist()
         
         colors = ['#e74c3c', '#f39c12', '#f1c40f', '#2ecc71', '#27ae60']
         bars = ax.bar(ratings, counts, color=colors, edgecolor='black', linewidth=1.2, width=0.6)
@@ -316,8 +559,6 @@ def generate_agent_rating_distribution(summaries: list) -> Tuple[str, str]:
         ax.grid(axis='y', alpha=0.3)
         
         img_base64 = encode_plot_to_base64(fig)
-        avg_rating = sum(r * c for r, c in zip(ratings, counts)) / sum(counts) if sum(counts) > 0 else 0
-        summary_text = f"Average agent rating: {avg_rating:.2f}/5 stars. Distribution: {', '.join([f'{r} star(s) ({count} calls)' for r, count in rating_counts.items() if count > 0])}"
         
         return img_base64, summary_text
     except Exception as e:
@@ -325,21 +566,17 @@ def generate_agent_rating_distribution(summaries: list) -> Tuple[str, str]:
         return None, f"Error generating chart: {str(e)}"
 
 
-def generate_resolution_status_chart(summaries: list) -> Tuple[str, str]:
+def generate_resolution_status_chart(summaries: Union[list, pd.DataFrame]) -> Tuple[str, str]:
     """Generate pie chart showing resolution status of calls."""
     try:
-        if not summaries:
-            return None, "No data available"
-        
-        # Extract resolution data from resolutionStatus field
-        resolved = sum(1 for s in summaries if 'Resolved' in s.get('resolutionStatus', '') 
-                      and 'Unresolved' not in s.get('resolutionStatus', ''))
-        unresolved = len(summaries) - resolved
+        data, summary_text = chart_data('resolution', summaries)
+        if data is None:
+            return None, summary_text
         
         # Create plot
         fig, ax = plt.subplots(figsize=(10, 8))
-        sizes = [resolved, unresolved]
-        labels = [f'Resolved\n{resolved}', f'Unresolved\n{unresolved}']
+        sizes = data['calls'].tolist()
+        labels = [f'{status}\n{count}' for status, count in zip(data['status'], sizes)]
         colors = ['#2ecc71', '#e74c3c']
         explode = (0.05, 0.05)
         
@@ -350,8 +587,6 @@ def generate_resolution_status_chart(summaries: list) -> Tuple[str, str]:
         ax.set_title('Call Resolution Status', fontsize=14, fontweight='bold', pad=20)
         
         img_base64 = encode_plot_to_base64(fig)
-        resolution_rate = (resolved / len(summaries) * 100) if summaries else 0
-        summary_text = f"Overall resolution rate: {resolution_rate:.1f}% ({resolved}/{len(summaries)} calls resolved)"
         
         return img_base64, summary_text
     except Exception as e:
@@ -359,6 +594,33 @@ def generate_resolution_status_chart(summaries: list) -> Tuple[str, str]:
         return None, f"Error generating chart: {str(e)}"
 
 
+def generate_call_volume_chart(summaries: Union[list, pd.DataFrame]) -> Tuple[str, str]:
+    """Generate line chart showing calls per day, week or month."""
+    try:
+        data, summary_text = chart_data('volume', summaries)
+        if data is None:
+            return None, summary_text
+        
+        # Create plot
+        fig, ax = plt.subplots(figsize=(12, 6))
+        ax.plot(data['period'], data['calls'], color='#3498db', linewidth=2, marker='o' if len(data) <= 31 else None)
+        ax.fill_between(data['period'], data['calls'], color='#3498db', alpha=0.15)
+        
+        ax.set_xlabel('Period', fontsize=12, fontweight='bold')
+        ax.set_ylabel('Number of Calls', fontsize=12, fontweight='bold')
+        ax.set_title('Call Volume Over Time', fontsize=14, fontweight='bold', pad=20)
+        ax.set_ylim(bottom=0)
+        ax.grid(alpha=0.3)
+        fig.autofmt_xdate()
+        
+        img_base64 = encode_plot_to_base64(fig)
+        
+        return img_base64, summary_text
+    except Exception as e:
+        logger.error(f"Error generating call volume chart: {e}")
+        return None, f"Error generating chart: {str(e)}"
+
+
 def detect_chart_request(user_message: str) -> Optional[str]:
     """Detect if user is requesting a chart/graph and return the type."""
     message_lower = user_message.lower()
@@ -371,6 +633,8 @@ def detect_chart_request(user_message: str) -> Optional[str]:
         'sentiment': ['sentiment', 'customer tone', 'emotion', 'customer mood'],
         'rating': ['rating', 'ratings', 'stars', 'agent rating'],
         'resolution': ['resolution', 'resolved', 'unresolved', 'resolution status'],
+        'volume': ['call volume', 'calls over time', 'over time', 'trend', 'per day', 'per week', 'per month',
+                   'daily calls', 'weekly calls', 'monthly calls'],
     }
     
     for chart_type, keywords in chart_keywords.items():
@@ -384,17 +648,52 @@ def detect_chart_request(user_message: str) -> Optional[str]:
     return None
 
 
-def generate_chart(chart_type: str, summaries: list) -> Tuple[Optional[str], str]:
-    """Generate appropriate chart based on type requested."""
-    chart_generators = {
-        'agent performance': generate_agent_performance_bar_chart,
-        'score distribution': generate_agent_score_distribution_pie,
-        'duration': generate_conversation_duration_chart,
-        'agent count': generate_agent_vs_conversation_count,
-        'sentiment': generate_customer_sentiment_distribution,
-        'rating': generate_agent_rating_distribution,
-        'resolution': generate_resolution_status_chart,
-    }
+# Chart type -> PNG generator (every chart the chat and the dashboard can show)
+CHART_GENERATORS = {
+    'agent performance': generate_agent_performance_bar_chart,
+    'score distribution': generate_agent_score_distribution_pie,
+    'duration': generate_conversation_duration_chart,
+    'agent count': generate_agent_vs_conversation_count,
+    'sentiment': generate_customer_sentiment_distribution,
+    'rating': generate_agent_rating_distribution,
+    'resolution': generate_resolution_status_chart,
+    'volume': generate_call_volume_chart,
+}
+
+
+def chart_cache_key(chart_type: str, data_version: str) -> str:
+    """Return the rendered-chart cache key for a chart type under the current render settings."""
+    generator = CHART_GENERATORS.get(chart_type, generate_agent_performance_bar_chart)
+    render_params = {"dpi": Config.CHART_DPI, "format": "png", "max_bars": Config.CHART_MAX_BARS,
+                     "bins": Config.CHART_HISTOGRAM_BINS, "time_buckets": Config.CHART_MAX_TIME_BUCKETS}
+    return get_chart_cache().make_key(generator.__name__, data_version, render_params)
+
+
+def generate_chart(chart_type: str, summaries: list, data_version: str = None) -> Tuple[Optional[str], str]:
+    """
+    Generate appropriate chart based on type requested.
+    
+    Args:
+        chart_type: Chart type from detect_chart_request()
+        summaries: Summary dicts
+        data_version: Version stamp of the summaries; while it is unchanged the chart frame
+                      and rendered charts are reused (no caching if None)
+    
+    Returns:
+        Tuple of (base64 PNG or None, summary text)
+    """
+    generator = CHART_GENERATORS.get(chart_type, generate_agent_performance_bar_chart)
+    if data_version is None or not Config.CHART_CACHE_ENABLED:
+        return generator(get_chart_frame(summaries, data_version))
+    
+    chart_cache = get_chart_cache()
+    cache_key = chart_cache_key(chart_type, data_version)
+    cached = chart_cache.get(cache_key)
+    if cached is not None:
+        logger.info(f"🖼️ Chart cache hit: {chart_type} (version {data_version})")
+        return cached["image"], cached["summary"]
     
-    generator = chart_generators.get(chart_type, generate_agent_performance_bar_chart)
-    return generator(summaries)
+    image, summary_text = generator(get_chart_frame(summaries, data_version))
+    if image:
+        chart_cache.put(cache_key, chart_type, data_version, image, summary_text)
+    return image, summary_text
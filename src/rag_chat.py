@@ -4,20 +4,54 @@ RAG-based Chat Module for Call Summary Analysis
 This module integrates LangChain with FAISS vector store to provide
 intelligent RAG-based responses to user questions about call summaries.
 
+The pipeline is asyncio-native (aget_rag_response / aget_rag_response_stream):
+the query embedding overlaps with history and prompt preparation, the static
+system message is built once, and streams can be cancelled. Sync wrappers run
+it on a shared event loop for Streamlit (see src/async_bridge.py).
+
 Functions:
 - get_rag_response(): Generate response using RAG with vector retrieval
 - format_retrieved_context(): Format retrieved documents for LLM
 """
 
+import asyncio
+import hashlib
 import json
 import os
-from typing import List, Dict, Optional, Tuple
+import threading
+import time
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
 from langchain_openai import ChatOpenAI
 from langchain_core.documents import Document
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
-from src.vector_store import VectorStoreManager
+from src.vector_store import (
+    VectorStoreManager,
+    get_embeddings,
+    get_shared_vector_store_manager,
+    reset_shared_vector_store_managers,
+)
 from src.logger import logger
 from src.config import get_retriever_k, Config
+from src.context_budget import compute_context_budget, count_tokens, pack_documents, select_relevant
+from src.answer_cache import compute_prompt_hash, get_answer_cache, history_for_cache, stream_cached_answer
+from src.chat_history import ChatHistoryManager, window_history
+from src.async_bridge import iterate_sync, run_sync
+from src.summary_frame import get_summary_frame
+from src.analytics_engine import answer_aggregate_question, describe_filters, format_table_markdown
+from src.utils import get_summaries_version
+from src.llm_usage import log_usage
+
+
+def _prompt_path(prompt_file: str) -> str:
+    return os.path.join(os.path.dirname(__file__), '..', 'prompt_store', prompt_file)
+
+
+def _prompt_mtime(prompt_file: str) -> Optional[int]:
+    """Return a prompt file's modification time, or None if it does not exist."""
+    try:
+        return os.stat(_prompt_path(prompt_file)).st_mtime_ns
+    except OSError:
+        return None
 
 
 def load_chat_prompt(prompt_file: str) -> str:
@@ -30,7 +64,7 @@ def load_chat_prompt(prompt_file: str) -> str:
     Returns:
         Prompt content or empty string if file not found
     """
-    prompt_path = os.path.join(os.path.dirname(__file__), '..', 'prompt_store', prompt_file)
+    prompt_path = _prompt_path(prompt_file)
     try:
         with open(prompt_path, 'r', encoding='utf-8') as f:
             content = f.read().strip()
@@ -45,7 +79,8 @@ class RAGChatbot:
     """RAG-based chatbot for analyzing call summaries."""
     
     def __init__(self, api_key: str, summaries_file: str = None,
-                 vector_store_path: str = None, retriever_k: int = None):
+                 vector_store_path: str = None, retriever_k: int = None,
+                 vector_store_manager: VectorStoreManager = None):
         """
         Initialize RAG Chatbot.
         
@@ -54,6 +89,7 @@ class RAGChatbot:
             summaries_file: Path to bulk_summaries.json (uses config default if None)
             vector_store_path: Path to FAISS vector store (uses config default if None)
             retriever_k: Number of documents to retrieve (uses config default if None)
+            vector_store_manager: Existing (shared) manager to use instead of creating one
         """
         self.api_key = api_key
         
@@ -63,8 +99,17 @@ class RAGChatbot:
         vector_store_path = vector_store_path or Config.VECTOR_STORE_PATH
         retriever_k = retriever_k or Config.RETRIEVER_K
         
-        self.vector_store_manager = VectorStoreManager(summaries_file, vector_store_path, retriever_k=retriever_k)
+        self.vector_store_manager = vector_store_manager or VectorStoreManager(summaries_file, vector_store_path, retriever_k=retriever_k)
         self.llm = None
+        # Query embeddings use this chatbot's API key; the shared manager's index is only searched
+        self.embeddings = None
+        self.model = Config.MODEL_NAME
+        self.temperature = Config.TEMPERATURE
+        self.max_tokens = Config.MAX_TOKENS
+        self.answer_cache = None
+        self._system_message = None
+        self._system_message_key = None
+        self._system_message_lock = threading.Lock()
         self.is_initialized = False
         
     def initialize(self, model: str = None, 
@@ -91,13 +136,15 @@ class RAGChatbot:
         try:
             logger.info(f"🚀 RAG Chatbot initialization starting (force_recreate={force_recreate})...")
             
-            # Create vector store (will recreate if force_recreate=True)
-            logger.info("📦 Creating/loading vector store...")
-            if not self.vector_store_manager.create_vector_store(self.api_key, force_recreate=force_recreate):
-                logger.error("❌ Failed to create vector store")
-                return False
+            # Create vector store (will recreate if force_recreate=True); a shared manager is already loaded
+            if self.vector_store_manager.vector_store is None or force_recreate:
+                logger.info("📦 Creating/loading vector store...")
+                if not self.vector_store_manager.create_vector_store(self.api_key, force_recreate=force_recreate):
+                    logger.error("❌ Failed to create vector store")
+                    return False
             
             logger.info("✅ Vector store ready")
+            self.embeddings = get_embeddings(self.api_key, self.vector_store_manager.embedding_model)
             
             # Initialize LLM
             logger.info(f"🤖 Initializing LLM (model={model}, temp={temperature}, max_tokens={max_tokens})...")
@@ -105,10 +152,17 @@ class RAGChatbot:
                 model=model,
                 temperature=temperature,
                 max_tokens=max_tokens,
-                openai_api_key=self.api_key
+                openai_api_key=self.api_key,
+                stream_usage=True
             )
+            self.model = model
+            self.temperature = temperature
+            self.max_tokens = max_tokens
             logger.info("✅ LLM initialized successfully")
             
+            if Config.ANSWER_CACHE_ENABLED:
+                self.answer_cache = get_answer_cache(f"rag:{self.vector_store_manager.embedding_model}")
+            
             self.is_initialized = True
             logger.info("✅ RAG Chatbot initialized successfully!")
             return True
@@ -187,14 +241,250 @@ class RAGChatbot:
                     - Remember previous interactions only if they are part of the provided chat history.
                     - Greetings and pleasantries should be minimal; focus on delivering insights effectively."""
     
-    def get_rag_response(self, user_message: str, 
-                        chat_history: List[Dict] = None) -> Optional[str]:
+    def _get_system_message(self) -> Tuple[SystemMessage, int]:
         """
-        Generate RAG-based response using vector retrieval and LLM.
+        Return the static system message (system + guardrail prompt) and its token count.
+        
+        The message is built once and only rebuilt when a prompt file changes or
+        the model changes, so requests do not read prompt files from disk.
+        
+        Returns:
+            Tuple of (SystemMessage, token count)
+        """
+        key = (self.model, _prompt_mtime('chat_system_prompt.txt'), _prompt_mtime('chat_guardrail_prompt.txt'))
+        with self._system_message_lock:
+            if self._system_message is None or self._system_message_key != key:
+                system_prompt = self._load_system_prompt()
+                guardrail_prompt = load_chat_prompt('chat_guardrail_prompt.txt')
+                full_system_prompt = f"{system_prompt}\n\n{guardrail_prompt}" if guardrail_prompt else system_prompt
+                self._system_message = (SystemMessage(content=full_system_prompt),
+                                        count_tokens(full_system_prompt, self.model))
+                self._system_message_key = key
+            return self._system_message
+    
+    @staticmethod
+    def _history_messages(chat_history: List[Dict] = None) -> List:
+        """Convert history dicts to LangChain messages (a system message carries the rolling summary)."""
+        messages = []
+        for msg in chat_history or []:
+            if msg['role'] == 'user':
+                messages.append(HumanMessage(content=msg['content']))
+            elif msg['role'] == 'assistant':
+                messages.append(AIMessage(content=msg['content']))
+            elif msg['role'] == 'system':
+                messages.append(SystemMessage(content=msg['content']))
+        return messages
+    
+    def _assemble_messages(self, user_message: str, chat_history: List[Dict],
+                           retrieved_results: List[Dict]) -> List:
+        """
+        Assemble LLM messages from retrieved documents within the token budget.
+        
+        Retrieved documents are cut off by score threshold and similarity gap,
+        then packed best first until the context budget is used up.
+        
+        Args:
+            user_message: User's question about summaries
+            chat_history: History window to send (see _history_window)
+            retrieved_results: Scored documents, best first
+            
+        Returns:
+            List of LangChain messages
+        """
+        if len(retrieved_results) == 0:
+            logger.warning("⚠️  No documents retrieved! Vector store might be empty or query doesn't match any documents.")
+            vs_info = self.vector_store_manager.get_vector_store_info()
+            logger.info(f"   Vector store state: {vs_info}")
+        
+        # Static system message is pre-built (see _get_system_message), followed by chat history
+        system_message, prompt_tokens = self._get_system_message()
+        messages = [system_message] + self._history_messages(chat_history)
+        
+        # Adaptive k: relevance cut-off, then pack into the remaining token budget
+        prompt_tokens += sum(count_tokens(message.content, self.model) for message in messages[1:])
+        prompt_tokens += count_tokens(user_message, self.model)
+        budget = compute_context_budget(self.model, self.max_tokens, prompt_tokens)
+        relevant_results = select_relevant(retrieved_results)
+        packed_results, context_tokens = pack_documents(relevant_results, budget, self.model)
+        
+        # Log what was used
+        for i, result in enumerate(packed_results, 1):
+            agent_name = result.get('metadata', {}).get('agent_name', 'Unknown')
+            call_id = result.get('metadata', {}).get('call_id', 'N/A')
+            logger.info(f"   📄 Doc {i}: Call ID={call_id}, Agent={agent_name}, Score={result.get('score', 0):.3f}")
+        
+        context = self._format_retrieved_context(packed_results)
+        
+        # Log the actual count of documents used for verification
+        logger.info(f"📊 Using {len(packed_results)}/{len(retrieved_results)} retrieved documents in context "
+                    f"({len(relevant_results)} passed relevance cut-off)")
+        logger.info(f"📊 Context tokens: {context_tokens} of {budget} budget | Prompt tokens (excluding context): {prompt_tokens}")
+        
+        # Add context and current user message
+        full_message = f"""{context}
+
+                            User Question: {user_message}
+
+                            Please answer the question based on the retrieved call summaries above."""
+        
+        messages.append(HumanMessage(content=full_message))
+        return messages
+    
+    def _answer_analytics(self, user_message: str) -> Optional[Dict]:
+        """Compute aggregate questions over all summaries (None for questions that need retrieval)."""
+        if not Config.ANALYTICS_ENGINE_ENABLED:
+            return None
+        try:
+            frame = get_summary_frame(self.vector_store_manager.summaries_file)
+            return answer_aggregate_question(user_message, frame)
+        except Exception as e:
+            logger.warning(f"⚠️  Analytics engine unavailable, using retrieval: {str(e)}")
+            return None
+    
+    def _assemble_analytics_messages(self, user_message: str, chat_history: List[Dict], analytics: Dict) -> List:
+        """
+        Assemble LLM messages that ask the model to narrate a computed result table.
+        
+        Args:
+            user_message: User's question about summaries
+            chat_history: History window to send (see _history_window)
+            analytics: Result from answer_aggregate_question
+            
+        Returns:
+            List of LangChain messages
+        """
+        messages = [self._get_system_message()[0]] + self._history_messages(chat_history)
+        
+        table = format_table_markdown(analytics["table"], Config.ANALYTICS_MAX_TABLE_ROWS)
+        filters = describe_filters(analytics["spec"]) or "none (all call summaries)"
+        full_message = f"""## Computed Result: {analytics['description']}
+(computed over {analytics['matched_rows']:,} of {analytics['total_rows']:,} call summaries)
+Filters applied: {filters}
+
+{table}
+
+User Question: {user_message}
+
+Answer the question using the computed result above. The numbers are exact for the call summaries matching the filters applied; state those filters in your answer, and do not recompute the numbers or use other figures."""
+        messages.append(HumanMessage(content=full_message))
+        return messages
+    
+    def _history_window(self, chat_history: List[Dict] = None,
+                        history_manager: ChatHistoryManager = None) -> List[Dict]:
+        """Return the token-budgeted history to send, with the rolling summary if a manager is given."""
+        if history_manager is not None:
+            return history_manager.build_history(chat_history)
+        return window_history(chat_history, self.model)
+    
+    def _answer_cache_scope(self, user_message: str, query_vector: List[float],
+                            chat_history: List[Dict] = None) -> Optional[Dict]:
+        """
+        Compute the answer cache scope for a question, or None if caching is off or fails.
+        
+        The data version is the index snapshot being searched; the prompt hash covers
+        prompts, model settings, retrieval settings and, for follow-up questions, the
+        history window sent along (see history_for_cache). The question vector is the
+        retrieval query embedding (same embedding model).
+        """
+        if self.answer_cache is None:
+            return None
+        try:
+            manager = self.vector_store_manager
+            data_version = manager.snapshot_version or get_summaries_version(manager.summaries_file)
+            system_message, _ = self._get_system_message()
+            prompt_hash = compute_prompt_hash(
+                system_message.content,
+                self.model, self.temperature, self.max_tokens, manager.retriever_k,
+                Config.CONTEXT_TOKEN_BUDGET, Config.RETRIEVAL_SCORE_THRESHOLD, Config.RETRIEVAL_MAX_SCORE_GAP,
+                history_for_cache(user_message, chat_history)
+            )
+            return {"data_version": data_version, "prompt_hash": prompt_hash,
+                    "vector": self.answer_cache.normalize(query_vector)}
+        except Exception as e:
+            logger.warning(f"⚠️  Answer cache unavailable for this query: {str(e)}")
+            return None
+    
+    def get_answer_cache_stats(self) -> Dict:
+        """Return answer cache hit rate and staleness statistics (empty if caching is off)."""
+        if self.answer_cache is None:
+            return {}
+        manager = self.vector_store_manager
+        return self.answer_cache.stats(manager.snapshot_version or get_summaries_version(manager.summaries_file))
+    
+    async def _aprepare(self, user_message: str, chat_history: List[Dict],
+                        history_manager: ChatHistoryManager, timings: Dict) -> Tuple[Optional[Dict], Optional[Dict]]:
+        """
+        Run the steps before the LLM call, overlapping the independent ones.
+        
+        The query embedding (the only network round trip) runs concurrently with
+        the snapshot refresh, the history window and the system message; the
+        cache lookup and FAISS search then reuse the embedding. CPU-bound steps
+        (cache lookup, search, token counting in message assembly) run in worker
+        threads so they do not stall other sessions' streams on the shared loop.
+        
+        Aggregate questions are answered by the analytics engine instead: no
+        embedding or retrieval, and the messages ask the LLM to narrate the table.
+        
+        Returns:
+            Tuple of (cache scope, cache hit); on a miss the scope also carries the
+            assembled messages under 'messages' (and the analytics result under 'analytics')
+        """
+        manager = self.vector_store_manager
+        start = time.time()
+        
+        analytics = await asyncio.to_thread(self._answer_analytics, user_message)
+        if analytics:
+            history = await asyncio.to_thread(self._history_window, chat_history, history_manager)
+            timings['retrieval_seconds'] = time.time() - start
+            messages = await asyncio.to_thread(self._assemble_analytics_messages, user_message, history, analytics)
+            return {"messages": messages, "analytics": analytics}, None
+        
+        async def embed_query():
+            vector = await self.embeddings.aembed_query(user_message)
+            timings['embed_seconds'] = time.time() - start
+            return vector
+        
+        def prepare_local():
+            # Pick up a snapshot published by another session's reload before searching
+            manager.refresh_snapshot()
+            self._get_system_message()
+            return self._history_window(chat_history, history_manager)
+        
+        query_vector, history = await asyncio.gather(embed_query(), asyncio.to_thread(prepare_local))
+        
+        def lookup_cache():
+            scope = self._answer_cache_scope(user_message, query_vector, history)
+            return scope, (self.answer_cache.lookup(user_message, **scope) if scope else None)
+        
+        # CPU work (prompt hashing, token counting) runs off the event loop shared by all sessions
+        cache_scope, cached = await asyncio.to_thread(lookup_cache)
+        if cached:
+            return cache_scope, cached
+        
+        if manager.vector_store is None:
+            logger.error("❌ Vector store not available - vector store may not be initialized")
+            return cache_scope, None
+        
+        # Retrieve relevant summaries with similarity scores (up to retriever_k candidates)
+        logger.info(f"🔍 Retrieving documents for query: '{user_message[:100]}...'")
+        retrieved_results = await asyncio.to_thread(manager.similarity_search_with_scores, user_message,
+                                                    query_vector)
+        logger.info(f"✅ Retrieved {len(retrieved_results)} documents (k={manager.retriever_k})")
+        messages = await asyncio.to_thread(self._assemble_messages, user_message, history, retrieved_results)
+        timings['retrieval_seconds'] = time.time() - start
+        return dict(cache_scope or {}, messages=messages), None
+    
+    async def aget_rag_response(self, user_message: str,
+                                chat_history: List[Dict] = None,
+                                history_manager: ChatHistoryManager = None) -> Optional[str]:
+        """
+        Generate RAG-based response using vector retrieval and LLM (asyncio).
         
         Args:
             user_message: User's question about summaries
             chat_history: Previous conversation messages for context
+            history_manager: Session's history manager; recent turns are sent verbatim
+                             with its rolling summary of older turns
             
         Returns:
             LLM response or None if error occurs
@@ -204,79 +494,21 @@ class RAGChatbot:
             return None
         
         try:
-            # Retrieve relevant summaries using vector similarity
-            # Uses the retriever_k value configured in vector store manager
-            retriever = self.vector_store_manager.get_retriever()
-            
-            if retriever is None:
-                logger.error("❌ Retriever not available - vector store may not be initialized")
+            scope, cached = await self._aprepare(user_message, chat_history, history_manager, {})
+            if cached:
+                return cached["answer"]
+            scope.pop('analytics', None)
+            messages = scope.pop('messages', None)
+            if messages is None:
                 return None
             
-            # Get relevant documents using LangChain retriever.invoke() method
-            logger.info(f"🔍 Retrieving documents for query: '{user_message[:100]}...'")
-            retrieved_docs = retriever.invoke(user_message)
-            logger.info(f"✅ Retrieved {len(retrieved_docs)} documents (k={self.vector_store_manager.retriever_k})")
-            
-            if len(retrieved_docs) == 0:
-                logger.warning("⚠️  No documents retrieved! Vector store might be empty or query doesn't match any documents.")
-                summaries = self.vector_store_manager._load_summaries()
-                logger.info(f"   Total summaries in JSON: {len(summaries)}")
-                # Check vector store state
-                vs_info = self.vector_store_manager.get_vector_store_info()
-                logger.info(f"   Vector store state: {vs_info}")
-            
-            # Convert Document objects to dicts for formatting
-            retrieved_results = [
-                {
-                    "content": doc.page_content,
-                    "metadata": doc.metadata
-                }
-                for doc in retrieved_docs
-            ]
-            
-            # Log what was retrieved
-            for i, result in enumerate(retrieved_results, 1):
-                agent_name = result.get('metadata', {}).get('agent_name', 'Unknown')
-                call_id = result.get('metadata', {}).get('call_id', 'N/A')
-                logger.info(f"   📄 Doc {i}: Call ID={call_id}, Agent={agent_name}")
-            
-            context = self._format_retrieved_context(retrieved_results)
-            
-            # Log the actual count of retrieved documents for verification
-            logger.info(f"📊 Using {len(retrieved_results)} retrieved documents in context for LLM")
-            logger.info(f"📊 Full context length: {len(context)} characters")
-            
-            # Load system prompt
-            system_prompt = self._load_system_prompt()
-            
-            # Load guardrail prompt to append to system prompt
-            guardrail_prompt = load_chat_prompt('chat_guardrail_prompt.txt')
-            full_system_prompt = f"{system_prompt}\n\n{guardrail_prompt}" if guardrail_prompt else system_prompt
-            
-            # Build messages for LLM
-            messages = [SystemMessage(content=full_system_prompt)]
-            
-            # Add chat history if available
-            if chat_history:
-                for msg in chat_history:
-                    if msg['role'] == 'user':
-                        messages.append(HumanMessage(content=msg['content']))
-                    elif msg['role'] == 'assistant':
-                        messages.append(AIMessage(content=msg['content']))
-            
-            # Add context and current user message
-            full_message = f"""{context}
-
-                            User Question: {user_message}
-
-                            Please answer the question based on the retrieved call summaries above."""
-            
-            messages.append(HumanMessage(content=full_message))
-            
             # Get response from LLM
             logger.debug("Generating LLM response...")
-            response = self.llm.invoke(messages)
+            response = await self.llm.ainvoke(messages)
+            log_usage("RAG chat", getattr(response, 'usage_metadata', None), self.model)
             
+            if scope:
+                await asyncio.to_thread(self.answer_cache.store, user_message, response.content, **scope)
             logger.info("RAG response generated successfully")
             return response.content
             
@@ -284,14 +516,32 @@ class RAGChatbot:
             logger.error(f"Error generating RAG response: {str(e)}")
             return None
     
-    def get_rag_response_stream(self, user_message: str, 
-                                chat_history: List[Dict] = None):
+    async def aget_rag_response_stream(self, user_message: str,
+                                       chat_history: List[Dict] = None,
+                                       cache_info: Dict = None,
+                                       history_manager: ChatHistoryManager = None,
+                                       timings: Dict = None,
+                                       analytics_info: Dict = None,
+                                       usage_info: Dict = None) -> AsyncIterator[str]:
         """
-        Generate RAG-based response using vector retrieval and LLM with streaming.
+        Generate RAG-based response using vector retrieval and LLM with streaming (asyncio).
+        
+        Answers to semantically equivalent questions are served from the answer
+        cache and streamed back immediately, without retrieval or an LLM call.
+        Aggregate questions are computed by the analytics engine and only narrated by the LLM.
+        Closing the generator (or cancelling its task) cancels the LLM stream.
         
         Args:
             user_message: User's question about summaries
             chat_history: Previous conversation messages for context
+            cache_info: Optional dict filled with cache hit details (cached, similarity, age_seconds)
+            history_manager: Session's history manager; recent turns are sent verbatim
+                             with its rolling summary of older turns
+            timings: Optional dict filled with embed_seconds, retrieval_seconds and ttft_seconds
+            analytics_info: Optional dict filled with the analytics result (description, table,
+                            matched_rows, total_rows, compute_ms) when an aggregate question was computed
+            usage_info: Optional dict filled with prompt_tokens, cached_tokens, completion_tokens
+                        and cost_usd of the LLM request
             
         Yields:
             Chunks of the LLM response as they stream
@@ -300,69 +550,104 @@ class RAGChatbot:
             logger.error("❌ RAG Chatbot not initialized")
             return
         
+        timings = {} if timings is None else timings
         try:
-            # Retrieve relevant summaries using vector similarity
-            retriever = self.vector_store_manager.get_retriever()
-            
-            if retriever is None:
-                logger.error("❌ Retriever not available - vector store may not be initialized")
+            request_start = time.time()
+            scope, cached = await self._aprepare(user_message, chat_history, history_manager, timings)
+            if cached:
+                if cache_info is not None:
+                    cache_info.update(cached=True, similarity=cached["similarity"], age_seconds=cached["age_seconds"])
+                timings['ttft_seconds'] = time.time() - request_start
+                for chunk in stream_cached_answer(cached["answer"]):
+                    yield chunk
+                return
+            analytics = scope.pop('analytics', None)
+            if analytics and analytics_info is not None:
+                analytics_info.update(analytics)
+            messages = scope.pop('messages', None)
+            if messages is None:
                 return
-            
-            # Get relevant documents using LangChain retriever.invoke() method
-            logger.info(f"🔍 Retrieving documents for query: '{user_message[:100]}...'")
-            retrieved_docs = retriever.invoke(user_message)
-            logger.info(f"✅ Retrieved {len(retrieved_docs)} documents (k={self.vector_store_manager.retriever_k})")
-            
-            # Convert Document objects to dicts for formatting
-            retrieved_results = [
-                {
-                    "content": doc.page_content,
-                    "metadata": doc.metadata
-                }
-                for doc in retrieved_docs
-            ]
-            
-            context = self._format_retrieved_context(retrieved_results)
-            
-            # Load system prompt
-            system_prompt = self._load_system_prompt()
-            
-            # Load guardrail prompt to append to system prompt
-            guardrail_prompt = load_chat_prompt('chat_guardrail_prompt.txt')
-            full_system_prompt = f"{system_prompt}\n\n{guardrail_prompt}" if guardrail_prompt else system_prompt
-            
-            # Build messages for LLM
-            messages = [SystemMessage(content=full_system_prompt)]
-            
-            # Add chat history if available
-            if chat_history:
-                for msg in chat_history:
-                    if msg['role'] == 'user':
-                        messages.append(HumanMessage(content=msg['content']))
-                    elif msg['role'] == 'assistant':
-                        messages.append(AIMessage(content=msg['content']))
-            
-            # Add context and current user message
-            full_message = f"""{context}
-
-                            User Question: {user_message}
-
-                            Please answer the question based on the retrieved call summaries above."""
-            
-            messages.append(HumanMessage(content=full_message))
             
             # Get streaming response from LLM
             logger.debug("Generating streaming LLM response...")
-            stream = self.llm.stream(messages)
-            
-            for chunk in stream:
+            chunks = []
+            usage = None
+            async for chunk in self.llm.astream(messages):
+                if getattr(chunk, 'usage_metadata', None):
+                    usage = chunk.usage_metadata
+                if not chunk.content:
+                    continue
+                if not chunks:
+                    timings['ttft_seconds'] = time.time() - request_start
+                    logger.info(f"⏱️  Time to first token: {timings['ttft_seconds']:.2f}s "
+                                f"(embedding {timings.get('embed_seconds', 0):.2f}s, "
+                                f"retrieval {timings.get('retrieval_seconds', 0):.2f}s)")
+                chunks.append(chunk.content)
                 yield chunk.content
             
+            # Cached prompt tokens show how much of the static prefix the provider reused
+            counts = log_usage("RAG chat", usage, self.model)
+            if usage_info is not None:
+                usage_info.update(counts)
+            if scope:
+                await asyncio.to_thread(self.answer_cache.store, user_message, "".join(chunks), **scope)
             logger.info("RAG streaming response generated successfully")
             
+        except (asyncio.CancelledError, GeneratorExit):
+            logger.info(f"🛑 RAG response cancelled for: '{user_message[:80]}'")
+            raise
         except Exception as e:
             logger.error(f"Error generating streaming RAG response: {str(e)}")
     
+    def get_rag_response(self, user_message: str, 
+                        chat_history: List[Dict] = None,
+                        history_manager: ChatHistoryManager = None) -> Optional[str]:
+        """
+        Generate RAG-based response using vector retrieval and LLM.
+        
+        Sync wrapper around aget_rag_response (runs on the shared event loop).
+        
+        Args:
+            user_message: User's question about summaries
+            chat_history: Previous conversation messages for context
+            history_manager: Session's history manager; recent turns are sent verbatim
+                             with its rolling summary of older turns
+            
+        Returns:
+            LLM response or None if error occurs
+        """
+        return run_sync(self.aget_rag_response(user_message, chat_history, history_manager))
+    
+    def get_rag_response_stream(self, user_message: str, 
+                                chat_history: List[Dict] = None,
+                                cache_info: Dict = None,
+                                history_manager: ChatHistoryManager = None,
+                                timings: Dict = None,
+                                analytics_info: Dict = None,
+                                usage_info: Dict = None) -> Iterator[str]:
+        """
+        Generate RAG-based response using vector retrieval and LLM with streaming.
+        
+        Sync wrapper around aget_rag_response_stream (runs on the shared event
+        loop). Closing the iterator early, e.g. when Streamlit stops the script
+        because the user navigated away, cancels the LLM stream.
+        
+        Args:
+            user_message: User's question about summaries
+            chat_history: Previous conversation messages for context
+            cache_info: Optional dict filled with cache hit details (cached, similarity, age_seconds)
+            history_manager: Session's history manager; recent turns are sent verbatim
+                             with its rolling summary of older turns
+            timings: Optional dict filled with embed_seconds, retrieval_seconds and ttft_seconds
+            analytics_info: Optional dict filled with the analytics result for aggregate questions
+            usage_info: Optional dict filled with token usage, including cached prompt tokens
+            
+        Yields:
+            Chunks of the LLM response as they stream
+        """
+        return iterate_sync(self.aget_rag_response_stream(user_message, chat_history, cache_info,
+                                                          history_manager, timings, analytics_info, usage_info))
+    
     def reload_vector_store(self) -> bool:
         """
         Reload vector store to pick up new summaries.
@@ -372,3 +657,56 @@ class RAGChatbot:
         """
         logger.info("Reloading vector store...")
         return self.vector_store_manager.reload_vector_store(self.api_key)
+
+
+# Process-wide chatbots shared by all Streamlit sessions; sessions only keep their chat history
+_shared_chatbots: Dict[tuple, RAGChatbot] = {}
+_shared_chatbots_lock = threading.Lock()
+
+
+def get_shared_chatbot(api_key: str, model: str = None, temperature: float = None,
+                       max_tokens: int = None) -> Optional[RAGChatbot]:
+    """
+    Return the process-wide RAGChatbot for these LLM settings, creating it on first use.
+    
+    Chatbots hold no per-user state (history is passed into each call), so all
+    sessions with the same settings and API key share one instance. All chatbots
+    share one VectorStoreManager per index whatever their API key (see
+    get_shared_vector_store_manager); each chatbot embeds queries and calls the
+    LLM with its own key.
+    
+    Args:
+        api_key: OpenAI API key
+        model: OpenAI model name (uses Config default if None)
+        temperature: Temperature for LLM responses (uses Config default if None)
+        max_tokens: Maximum tokens for response (uses Config default if None)
+    
+    Returns:
+        Initialized RAGChatbot, or None if initialization failed
+    """
+    model = model or Config.MODEL_NAME
+    temperature = temperature if temperature is not None else Config.TEMPERATURE
+    max_tokens = max_tokens or Config.MAX_TOKENS
+    
+    manager = get_shared_vector_store_manager(api_key)
+    if manager is None:
+        return None
+    
+    key_hash = hashlib.sha256((api_key or '').encode('utf-8')).hexdigest()[:16]
+    key = (id(manager), model, temperature, max_tokens, key_hash)
+    with _shared_chatbots_lock:
+        chatbot = _shared_chatbots.get(key)
+        if chatbot is None:
+            logger.info(f"🆕 Creating shared RAG chatbot (model={model}, temp={temperature}, max_tokens={max_tokens})")
+            chatbot = RAGChatbot(api_key=api_key, vector_store_manager=manager)
+            if not chatbot.initialize(model=model, temperature=temperature, max_tokens=max_tokens):
+                return None
+            _shared_chatbots[key] = chatbot
+        return chatbot
+
+
+def reset_shared_chatbots() -> None:
+    """Drop all shared chatbots and vector store managers (e.g. after the vector store was cleared)."""
+    with _shared_chatbots_lock:
+        _shared_chatbots.clear()
+    reset_shared_vector_store_managers()
@@ -0,0 +1,369 @@
+"""
+Retrieval Benchmark and Evaluation Harness
+
+This module measures retrieval quality and speed so changes to document
+preparation, RETRIEVER_K or the index type can be compared across commits.
+
+It generates synthetic call summaries that follow the schema in
+prompt_store/summarize_user_prompt.txt, builds labelled query sets
+(agent-specific, department-specific and unresolved-issue queries) and reports
+recall@k, MRR, index build time, index memory (per-vector codes plus the fixed
+codebook cost) and p50/p95/p99 search latency.
+
+Usage:
+    python -m src.retrieval_benchmark --sizes 1000 10000 --index-types flat sq8 pq
+    python -m src.retrieval_benchmark --sizes 100000 1000000 --embedding-model local-hash-256
+
+Functions:
+- generate_synthetic_summaries(): Create schema-conformant synthetic summaries
+- build_query_set(): Create labelled queries with their relevant documents
+- run_benchmark(): Build an index and evaluate it against a query set
+"""
+
+import argparse
+import json
+import logging
+import os
+import subprocess
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import numpy as np
+import faiss
+from src.logger import logger
+from src.config import Config
+from src.index_compression import RerankingIndex, build_index, estimate_index_memory, format_bytes
+from src.vector_store import VectorStoreManager, embed_texts, get_embeddings
+
+
+DEFAULT_SIZES = [1000, 10000]
+SCALE_SIZES = [1000, 10000, 100000, 1000000]
+DEFAULT_RESULTS_DIR = 'output_data/benchmarks'
+
+FIRST_NAMES = ['James', 'Maria', 'Robert', 'Priya', 'Michael', 'Aisha', 'David', 'Chen', 'Sarah', 'Luis',
+               'Emma', 'Omar', 'Olivia', 'Raj', 'Sophia', 'Daniel', 'Fatima', 'Ethan', 'Grace', 'Kenji']
+LAST_NAMES = ['Smith', 'Garcia', 'Johnson', 'Patel', 'Brown', 'Khan', 'Miller', 'Wang', 'Davis', 'Lopez',
+              'Wilson', 'Nguyen', 'Taylor', 'Sharma', 'Anderson', 'Kim', 'Thomas', 'Ali', 'Moore', 'Tanaka']
+
+DEPARTMENTS = {
+    'Billing': ['Billing Dispute', 'Refund Request', 'Duplicate Charge', 'Payment Failure'],
+    'Technical Support': ['Wifi Connectivity', 'Device Setup', 'Software Bug', 'Network Outage'],
+    'Customer Service': ['Account Access', 'Complaint', 'Plan Change', 'Cancellation'],
+    'Shipping': ['Delayed Delivery', 'Lost Package', 'Damaged Item', 'Wrong Address'],
+    'Fraud Prevention': ['Suspicious Transaction', 'Card Blocked', 'Identity Theft', 'Chargeback'],
+    'Travel Services': ['Flight Cancellation', 'Lost Luggage', 'Seat Upgrade', 'Booking Change'],
+}
+
+CUSTOMER_TONES = ['Calm', 'Frustrated', 'Angry', 'Appreciative', 'Worried', 'Neutral', 'Upset', 'Satisfied']
+AGENT_TONES = ['Professional', 'Empathetic', 'Patient', 'Apologetic', 'Rushed', 'Friendly']
+EMOTIONS = ['Not Expressed', 'Relief', 'Anxiety', 'Annoyance', 'Gratitude', 'Disappointment']
+
+
+def generate_synthetic_summaries(num_summaries: int, seed: int = 42) -> List[Dict]:
+    """
+    Generate synthetic call summaries that follow the summarization JSON schema.
+
+    Agent pool size grows with the corpus so agent-specific queries keep a
+    realistic number of relevant calls at every scale.
+
+    Args:
+        num_summaries: Number of summaries to generate
+        seed: Random seed for reproducible corpora
+
+    Returns:
+        List of summary dicts with the same fields the summarizer produces
+    """
+    rng = np.random.default_rng(seed)
+    num_agents = max(20, num_summaries // 200)
+    agent_names = _agent_names(num_agents)
+    departments = list(DEPARTMENTS)
+    # Each agent works in one department
+    agent_departments = rng.integers(0, len(departments), size=num_agents)
+
+    agent_idx = rng.integers(0, num_agents, size=num_summaries)
+    category_idx = rng.integers(0, 4, size=num_summaries)
+    resolved = rng.random(num_summaries) < 0.7
+    scores = np.clip(rng.normal(78, 12, size=num_summaries), 20, 100).astype(int)
+    ratings = np.clip(np.round(scores / 20), 1, 5).astype(int)
+    minutes = rng.integers(2, 45, size=num_summaries)
+    seconds = rng.integers(0, 60, size=num_summaries)
+    day_offsets = rng.integers(0, 365, size=num_summaries)
+    start_minutes = rng.integers(8 * 60, 18 * 60, size=num_summaries)
+    customer_first = rng.integers(0, len(FIRST_NAMES), size=num_summaries)
+    customer_last = rng.integers(0, len(LAST_NAMES), size=num_summaries)
+    customer_tone = rng.integers(0, len(CUSTOMER_TONES), size=num_summaries)
+    agent_tone = rng.integers(0, len(AGENT_TONES), size=num_summaries)
+    emotion = rng.integers(0, len(EMOTIONS), size=num_summaries)
+    base_date = datetime(2025, 1, 1)
+
+    summaries = []
+    for i in range(num_summaries):
+        agent = agent_names[agent_idx[i]]
+        department = departments[agent_departments[agent_idx[i]]]
+        category = DEPARTMENTS[department][category_idx[i]]
+        status = 'Resolved' if resolved[i] else 'Unresolved'
+        start = start_minutes[i]
+        end = start + minutes[i]
+        summaries.append({
+            "id": i + 1,
+            "callId": f"SYN-{i + 1:07d}",
+            "conversationDate": (base_date + timedelta(days=int(day_offsets[i]))).strftime('%Y-%m-%d'),
+            "conversationTime": f"{_clock(start)} - {_clock(end)}",
+            "conversationLength": f"{minutes[i]} mins {seconds[i]} secs",
+            "agentName": agent,
+            "agentId": f"AG{agent_idx[i]:05d}",
+            "department": department,
+            "customerName": f"{FIRST_NAMES[customer_first[i]]} {LAST_NAMES[customer_last[i]]}",
+            "callSummary": (f"Customer called about a {category.lower()} issue. "
+                            f"{agent} investigated the account and "
+                            f"{'resolved the problem during the call' if resolved[i] else 'escalated the case for follow-up'}."),
+            "issueCategory": category,
+            "resolutionStatus": status,
+            "customerTone": CUSTOMER_TONES[customer_tone[i]],
+            "customerEmotions": EMOTIONS[emotion[i]],
+            "agentTone": AGENT_TONES[agent_tone[i]],
+            "agentEmotions": 'Not Expressed',
+            "agentScore": int(scores[i]),
+            "agentScoreReason": "Agent was clear and followed policy; empathy and resolution effectiveness drove the score.",
+            "agentRating": int(ratings[i]),
+            "agentRatingReason": "Rating reflects overall handling of the customer's issue.",
+            "filename": f"synthetic_{i + 1:07d}.txt",
+        })
+    return summaries
+
+
+def _agent_names(num_agents: int) -> List[str]:
+    """Return unique agent names, numbering repeats once first/last combinations run out."""
+    base = [f"{first} {last}" for last in LAST_NAMES for first in FIRST_NAMES]
+    return [base[i % len(base)] + (f" {i // len(base) + 1}" if i >= len(base) else '')
+            for i in range(num_agents)]
+
+
+def _clock(minute_of_day: int) -> str:
+    """Format minutes since midnight as 'H:MM am/pm'."""
+    hour, minute = divmod(int(minute_of_day), 60)
+    suffix = 'am' if hour < 12 else 'pm'
+    return f"{(hour - 1) % 12 + 1}:{minute:02d} {suffix}"
+
+
+def build_query_set(summaries: List[Dict], queries_per_type: int = 20, seed: int = 7) -> List[Dict]:
+    """
+    Build labelled queries with the positions of their relevant summaries.
+
+    Query types:
+    - agent: all calls handled by one agent
+    - department: all calls in one department
+    - unresolved: unresolved calls for one issue category
+
+    Args:
+        summaries: Corpus the queries are evaluated against
+        queries_per_type: Maximum number of queries per type
+        seed: Random seed for query sampling
+
+    Returns:
+        List of dicts with 'type', 'query' and 'relevant' (set of positions)
+    """
+    rng = np.random.default_rng(seed)
+    groups = {'agent': {}, 'department': {}, 'unresolved': {}}
+    for pos, summary in enumerate(summaries):
+        groups['agent'].setdefault(summary['agentName'], set()).add(pos)
+        groups['department'].setdefault(summary['department'], set()).add(pos)
+        if summary['resolutionStatus'] == 'Unresolved':
+            groups['unresolved'].setdefault(summary['issueCategory'], set()).add(pos)
+
+    templates = {
+        'agent': "Which calls were handled by agent {}?",
+        'department': "Show calls handled by the {} department",
+        'unresolved': "Summarize unresolved {} issues",
+    }
+    queries = []
+    for query_type, group in groups.items():
+        keys = sorted(group)
+        chosen = rng.choice(len(keys), size=min(queries_per_type, len(keys)), replace=False)
+        for key_idx in sorted(chosen):
+            key = keys[key_idx]
+            queries.append({
+                "type": query_type,
+                "query": templates[query_type].format(key),
+                "relevant": group[key],
+            })
+    return queries
+
+
+def _evaluate_rankings(rankings: np.ndarray, queries: List[Dict], k_values: List[int]) -> Dict:
+    """Compute recall@k and MRR per query type and overall."""
+    per_type = {}
+    for ranking, query in zip(rankings, queries):
+        stats = per_type.setdefault(query['type'], {f"recall@{k}": [] for k in k_values} | {"mrr": []})
+        relevant = query['relevant']
+        for k in k_values:
+            hits = sum(1 for doc in ranking[:k] if doc in relevant)
+            stats[f"recall@{k}"].append(hits / min(len(relevant), k))
+        first_hit = next((rank for rank, doc in enumerate(ranking, 1) if doc in relevant), None)
+        stats["mrr"].append(1.0 / first_hit if first_hit else 0.0)
+
+    results = {query_type: {metric: float(np.mean(values)) for metric, values in stats.items()}
+               for query_type, stats in per_type.items()}
+    all_metrics = results[next(iter(results))].keys() if results else []
+    results['overall'] = {metric: float(np.mean([results[t][metric] for t in per_type])) for metric in all_metrics}
+    return results
+
+
+def run_benchmark(summaries: List[Dict], queries: List[Dict], index_type: str = 'flat',
+                  embedding_model: str = 'local-hash', k_values: Optional[List[int]] = None,
+                  api_key: Optional[str] = None) -> Dict:
+    """
+    Build an index over the summaries and evaluate it against a query set.
+
+    Documents are prepared with VectorStoreManager._prepare_documents so the
+    benchmark measures exactly what the application indexes.
+
+    Args:
+        summaries: Corpus to index
+        queries: Labelled queries from build_query_set()
+        index_type: 'flat', 'sq8' or 'pq'
+        embedding_model: Embedding model name ('local-hash' needs no network access)
+        k_values: Cut-offs for recall@k (defaults to [10, RETRIEVER_K])
+        api_key: OpenAI API key when benchmarking OpenAI embedding models
+
+    Returns:
+        Dict with quality metrics, build time, memory and latency percentiles
+    """
+    k_values = sorted(set(k_values or [10, Config.RETRIEVER_K]))
+    max_k = min(max(k_values), len(summaries))
+    embeddings = get_embeddings(api_key, embedding_model)
+    manager = VectorStoreManager(index_type=index_type, embedding_model=embedding_model)
+
+    prepare_start = time.perf_counter()
+    texts = [doc.page_content for doc in manager._prepare_documents(summaries)]
+    prepare_time = time.perf_counter() - prepare_start
+
+    embed_start = time.perf_counter()
+    vectors = embed_texts(embeddings, texts)
+    embed_time = time.perf_counter() - embed_start
+
+    index_start = time.perf_counter()
+    index, built_type = build_index(vectors, index_type, Config.PQ_SUBQUANTIZERS)
+    index_time = time.perf_counter() - index_start
+    index_bytes = faiss.serialize_index(index).nbytes
+    # Per-vector codes scale with the corpus; the trained codebook and header are a fixed cost
+    dim = int(vectors.shape[1])
+    pq_m = index.pq.M if built_type == 'pq' else Config.PQ_SUBQUANTIZERS
+    vector_bytes = estimate_index_memory(len(summaries), dim, built_type, pq_m)
+    search_index = RerankingIndex(index, vectors, Config.RERANK_CANDIDATES_FACTOR) if built_type != 'flat' else index
+
+    embed_latencies = []
+    search_latencies = []
+    rankings = []
+    for query in queries:
+        t0 = time.perf_counter()
+        query_vector = embed_texts(embeddings, [query['query']])
+        t1 = time.perf_counter()
+        _, ids = search_index.search(query_vector, max_k)
+        t2 = time.perf_counter()
+        embed_latencies.append(t1 - t0)
+        search_latencies.append(t2 - t1)
+        rankings.append([int(i) for i in ids[0] if i != -1])
+
+    search_ms = np.array(search_latencies) * 1000
+    total_ms = (np.array(embed_latencies) + np.array(search_latencies)) * 1000
+    return {
+        "num_documents": len(summaries),
+        "num_queries": len(queries),
+        "index_type": built_type,
+        "embedding_model": embedding_model,
+        "dimension": dim,
+        "avg_document_chars": float(np.mean([len(t) for t in texts])) if texts else 0.0,
+        "build_time_s": {
+            "prepare": prepare_time,
+            "embed": embed_time,
+            "index": index_time,
+            "total": prepare_time + embed_time + index_time,
+        },
+        "index_memory_bytes": int(index_bytes),
+        "index_vector_bytes": int(vector_bytes),
+        "index_fixed_overhead_bytes": int(max(index_bytes - vector_bytes, 0)),
+        "index_memory_per_million_bytes": int(estimate_index_memory(1_000_000, dim, built_type, pq_m)),
+        "search_latency_ms": {
+            "p50": float(np.percentile(search_ms, 50)),
+            "p95": float(np.percentile(search_ms, 95)),
+            "p99": float(np.percentile(search_ms, 99)),
+        },
+        "query_latency_ms": {
+            "p50": float(np.percentile(total_ms, 50)),
+            "p95": float(np.percentile(total_ms, 95)),
+            "p99": float(np.percentile(total_ms, 99)),
+        },
+        "quality": _evaluate_rankings(rankings, queries, [k for k in k_values if k <= max_k] or [max_k]),
+    }
+
+
+def _git_commit() -> str:
+    """Return the current git commit hash, or 'unknown' outside a git checkout."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def _print_result(result: Dict) -> None:
+    """Print a one-block summary of a benchmark run."""
+    overall = result['quality']['overall']
+    quality = ' | '.join(f"{metric}={value:.3f}" for metric, value in overall.items())
+    print(f"\n[{result['num_documents']:>8} docs | {result['index_type']:<4} | {result['embedding_model']}]")
+    print(f"  quality : {quality}")
+    print(f"  build   : {result['build_time_s']['total']:.2f}s "
+          f"(prepare {result['build_time_s']['prepare']:.2f}s, embed {result['build_time_s']['embed']:.2f}s, "
+          f"index {result['build_time_s']['index']:.2f}s)")
+    print(f"  memory  : {format_bytes(result['index_memory_bytes'])} "
+          f"(vectors {format_bytes(result['index_vector_bytes'])} + fixed {format_bytes(result['index_fixed_overhead_bytes'])}; "
+          f"{format_bytes(result['index_memory_per_million_bytes'])} per 1M docs)")
+    latency = result['search_latency_ms']
+    print(f"  search  : p50={latency['p50']:.2f}ms p95={latency['p95']:.2f}ms p99={latency['p99']:.2f}ms")
+
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    """Run the benchmark from the command line and save results as JSON."""
+    parser = argparse.ArgumentParser(description="Benchmark vector retrieval quality and latency.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help=f"Corpus sizes to benchmark (full scale: {' '.join(map(str, SCALE_SIZES))})")
+    parser.add_argument('--index-types', nargs='+', default=['flat'], choices=['flat', 'sq8', 'pq'])
+    parser.add_argument('--embedding-model', default='local-hash',
+                        help="Embedding model (default: offline local-hash)")
+    parser.add_argument('--k', type=int, nargs='+', default=None, help="Cut-offs for recall@k")
+    parser.add_argument('--queries-per-type', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=None, help="Path of the JSON results file")
+    args = parser.parse_args(argv)
+
+    # Per-document debug logging would dominate runtime at large scales
+    logger.setLevel(logging.INFO)
+
+    report = {
+        "commit": _git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "config": {"retriever_k": Config.RETRIEVER_K, "rerank_candidates_factor": Config.RERANK_CANDIDATES_FACTOR,
+                   "pq_subquantizers": Config.PQ_SUBQUANTIZERS},
+        "runs": [],
+    }
+    for size in args.sizes:
+        summaries = generate_synthetic_summaries(size, seed=args.seed)
+        queries = build_query_set(summaries, args.queries_per_type)
+        for index_type in args.index_types:
+            result = run_benchmark(summaries, queries, index_type, args.embedding_model, args.k,
+                                   api_key=os.getenv('OPENAI_API_KEY'))
+            _print_result(result)
+            report["runs"].append(result)
+
+    output = args.output or os.path.join(
+        DEFAULT_RESULTS_DIR, f"retrieval_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{report['commit']}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved benchmark results to {output}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Coalesced Streaming Renderer for Chat UIs
+
+Chat answers used to be re-rendered once per token chunk, rebuilding the full
+answer string each time. That is quadratic in the answer length and sends
+hundreds of websocket updates per answer. StreamRenderer buffers chunks in a
+list and redraws the placeholder on a time or size cadence (every 50 ms by
+default), and records time to first token and tokens per second.
+
+Classes:
+- StreamRenderer: Buffer a text stream and flush it to a Streamlit placeholder
+
+Functions:
+- iter_openai_text(): Text deltas from an OpenAI streaming completion
+- format_stream_stats(): Caption fragment with TTFT and tokens/sec
+"""
+
+import time
+from typing import Any, Dict, Iterable, Iterator, List
+from src.config import Config
+from src.context_budget import count_tokens
+
+
+CURSOR = "▌"
+
+
+def iter_openai_text(completion: Iterable[Any], usage: Dict = None) -> Iterator[str]:
+    """
+    Yield the non-empty text deltas of an OpenAI streaming chat completion.
+
+    Args:
+        completion: Stream returned by chat.completions.create(stream=True)
+        usage: Optional dict that receives the final usage chunk (request it with
+               stream_options={"include_usage": True}), as the raw usage object under "usage"
+    """
+    for chunk in completion:
+        if usage is not None and getattr(chunk, 'usage', None) is not None:
+            usage["usage"] = chunk.usage
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+class StreamRenderer:
+    """Render a text stream into a placeholder with coalesced updates."""
+
+    def __init__(self, placeholder: Any, model: str = None, start_time: float = None,
+                 flush_interval_ms: int = None, flush_chars: int = None):
+        """
+        Args:
+            placeholder: Object with a markdown(text) method (e.g. st.empty())
+            model: Model name for token counting
+            start_time: time.time() when the request started (defaults to now), used for TTFT
+            flush_interval_ms: Minimum time between redraws (uses Config.STREAM_FLUSH_INTERVAL_MS if None)
+            flush_chars: Buffered characters that force a redraw sooner (uses Config.STREAM_FLUSH_CHARS if None)
+        """
+        self.placeholder = placeholder
+        self.model = model
+        self.start_time = time.time() if start_time is None else start_time
+        interval_ms = Config.STREAM_FLUSH_INTERVAL_MS if flush_interval_ms is None else flush_interval_ms
+        self.flush_interval = interval_ms / 1000
+        self.flush_chars = Config.STREAM_FLUSH_CHARS if flush_chars is None else flush_chars
+        self._parts: List[str] = []
+        self._pending: List[str] = []
+        self._pending_chars = 0
+        self._last_flush = 0.0
+        self._first_token_time = None
+        self._end_time = None
+        self._text = None
+        self.chunks = 0
+        self.flushes = 0
+
+    def write(self, chunk: str) -> None:
+        """Buffer a chunk and redraw if the flush interval or size threshold was reached."""
+        if not chunk:
+            return
+        now = time.time()
+        if self._first_token_time is None:
+            self._first_token_time = now
+        self._pending.append(chunk)
+        self._pending_chars += len(chunk)
+        self.chunks += 1
+        if now - self._last_flush >= self.flush_interval or (self.flush_chars and self._pending_chars >= self.flush_chars):
+            self._flush(now, CURSOR)
+
+    def _flush(self, now: float, suffix: str = "") -> None:
+        if self._pending:
+            # Join only the new chunks; the full text is joined once per redraw, not per chunk
+            self._parts.append("".join(self._pending))
+            self._pending, self._pending_chars = [], 0
+        self.placeholder.markdown("".join(self._parts) + suffix)
+        self._last_flush = now
+        self.flushes += 1
+
+    def render(self, stream: Iterable[str]) -> str:
+        """
+        Consume a text stream, render it and return the full text.
+
+        Args:
+            stream: Iterable of text chunks
+
+        Returns:
+            str: The complete text
+        """
+        for chunk in stream:
+            self.write(chunk)
+        return self.finish()
+
+    def finish(self) -> str:
+        """Draw the final text without the cursor and return it."""
+        if self._text is None:
+            self._end_time = time.time()
+            self._flush(self._end_time)
+            self._text = "".join(self._parts)
+        return self._text
+
+    @property
+    def text(self) -> str:
+        """Text received so far."""
+        return self._text if self._text is not None else "".join(self._parts + self._pending)
+
+    def get_stats(self) -> Dict:
+        """
+        Return streaming statistics.
+
+        Returns:
+            Dict with chunks, flushes, ttft_seconds (None if nothing arrived),
+            output_tokens and tokens_per_second (generation phase, after the first token)
+        """
+        stats = {"chunks": self.chunks, "flushes": self.flushes, "ttft_seconds": None,
+                 "output_tokens": 0, "tokens_per_second": None}
+        if self._first_token_time is None:
+            return stats
+        end = self._end_time or time.time()
+        stats["ttft_seconds"] = self._first_token_time - self.start_time
+        stats["output_tokens"] = count_tokens(self.text, self.model)
+        generation_seconds = end - self._first_token_time
+        if generation_seconds > 0:
+            stats["tokens_per_second"] = stats["output_tokens"] / generation_seconds
+        return stats
+
+
+def format_stream_stats(stats: Dict) -> str:
+    """Return ' | First token: 0.42s | 57 tokens/s' for a caption ('' if nothing streamed)."""
+    note = ""
+    if stats.get("ttft_seconds") is not None:
+        note += f" | First token: {stats['ttft_seconds']:.2f}s"
+    if stats.get("tokens_per_second"):
+        note += f" | {stats['tokens_per_second']:.0f} tokens/s"
+    return note
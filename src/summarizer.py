@@ -2,6 +2,7 @@ import openai
 import os
 from src.logger import logger
 from src.config import Config
+from src.llm_usage import log_usage
 
 
 def load_prompt(prompt_file):
@@ -16,6 +17,60 @@ def load_prompt(prompt_file):
         logger.error(f"Prompt file not found: {prompt_path}")
         return None
 
+def split_variable_block(template: str, placeholder: str):
+    """
+    Split a prompt template so its variable block comes last.
+
+    Provider-side prompt caching reuses the longest identical prefix of a
+    request, so static instructions must come before per-request content.
+    Text after the placeholder (e.g. rules below the transcript) is returned
+    separately so callers can move it ahead of the variable block.
+
+    Args:
+        template: Prompt template containing placeholder
+        placeholder: Marker replaced by per-request content
+
+    Returns:
+        Tuple of (text up to and excluding the placeholder, static text that followed it)
+    """
+    before, _, after = template.partition(placeholder)
+    return before, after.strip()
+
+
+def build_bulk_chat_messages(question: str, chat_history: list, summaries_context: str,
+                             system_prompt: str, user_prompt_template: str, guardrail_prompt: str) -> list:
+    """
+    Build full-summary chat messages with a stable, cacheable prefix.
+
+    The static system, guardrail and schema blocks come first, followed by the
+    summaries snapshot, then the variable chat history and finally the question.
+    The snapshot is identical across questions until the summaries change only
+    in a question-independent format such as 'table' (the default
+    CHAT_CONTEXT_FORMAT); 'projected' changes it with the question's fields.
+
+    Args:
+        question: Current user question
+        chat_history: Role/content history to send (excluding the current question)
+        summaries_context: Serialized summaries
+        system_prompt: Chat system prompt
+        user_prompt_template: Chat user prompt with the summaries placeholder
+        guardrail_prompt: Chat guardrail prompt
+
+    Returns:
+        List of role/content messages
+    """
+    static_blocks = [block for block in (system_prompt, guardrail_prompt) if block]
+    if user_prompt_template:
+        before, after = split_variable_block(user_prompt_template, '{{PASTE ENTIRE SUMMARY HERE}}')
+        static_blocks.append(f"{after}\n\n{before}{summaries_context}" if after else f"{before}{summaries_context}")
+    else:
+        static_blocks.append(summaries_context)
+    messages = [{"role": "system", "content": "\n\n".join(static_blocks)}]
+    messages.extend(chat_history or [])
+    messages.append({"role": "user", "content": f"User Question: {question}"})
+    return messages
+
+
 def summarize_call(transcript, model=None, max_sentences=3, temperature=None, max_tokens=None):
     # Use Config defaults if parameters not provided
     model = model or Config.MODEL_NAME
@@ -31,15 +86,15 @@ def summarize_call(transcript, model=None, max_sentences=3, temperature=None, ma
         logger.error("Could not load required prompt files")
         return None
     
-    # Replace placeholder with actual transcript
-    user_prompt = user_prompt_template.replace('{{PASTE TRANSCRIPT HERE}}', transcript)
-
-    user_prompt = user_prompt.replace('{{max_summary_length}}', str(max_sentences))
+    # Static instructions and schema first, transcript last, so every call shares a cacheable prompt prefix
+    user_prompt_template = user_prompt_template.replace('{{max_summary_length}}', str(max_sentences))
+    before, after = split_variable_block(user_prompt_template, '{{PASTE TRANSCRIPT HERE}}')
+    user_prompt = f"{before}{transcript}"
 
     logger.debug(f"User prompt after replacing the strings:  {user_prompt}")
 
-    # Combine guardrail prompt with system prompt for additional context
-    full_system_prompt = f"{system_prompt}\n\n{guardrail_prompt}"
+    # Combine guardrail prompt (and any rules that followed the transcript) with the system prompt
+    full_system_prompt = "\n\n".join(block for block in (system_prompt, guardrail_prompt, after) if block)
     
     try:
         # DEBUG logging
@@ -57,6 +112,7 @@ def summarize_call(transcript, model=None, max_sentences=3, temperature=None, ma
         )
 
         summary = response.choices[0].message.content.strip()
+        log_usage("Summarization", response.usage, model)
         logger.info(f"Successfully generated summary ({len(summary)} characters)")
         logger.debug(f"Summary preview: {summary[:300]}...")
         
@@ -96,21 +152,10 @@ def chat_with_bulk_summaries(user_message: str, chat_history: list, summaries_co
         logger.error("Could not load required chat prompt files")
         return None
     
-    # Format user prompt with summaries context
-    formatted_user_prompt = chat_user_prompt.replace('{{PASTE ENTIRE SUMMARY HERE}}', summaries_context)
-    
-    # Combine system and guardrail prompts
-    full_system_prompt = f"{chat_system_prompt}\n\n{chat_guardrail_prompt}"
-    
     try:
-        # Build messages list with system message, history, and current user message
-        messages = [{"role": "system", "content": full_system_prompt}]
-        
-        # Add entire conversation history
-        messages.extend(chat_history)
-        
-        # Add formatted user message with summaries context
-        messages.append({"role": "user", "content": f"{formatted_user_prompt}\n\nUser Question: {user_message}"})
+        # Static prompts and summaries first (cacheable prefix), then history, then the question
+        messages = build_bulk_chat_messages(user_message, chat_history, summaries_context,
+                                            chat_system_prompt, chat_user_prompt, chat_guardrail_prompt)
         
         logger.debug(f"Chat request with {len(chat_history)} previous messages and chat prompts applied")
         logger.debug(f"Model used: {model} | Temperature: {temperature} | Max tokens: {max_tokens}")
@@ -123,6 +168,7 @@ def chat_with_bulk_summaries(user_message: str, chat_history: list, summaries_co
         )
         
         assistant_message = response.choices[0].message.content
+        log_usage("Bulk summary chat", response.usage, model)
         logger.info(f"Chat response generated ({len(assistant_message)} characters)")
         
         return assistant_message
@@ -156,30 +202,23 @@ def chat_with_bulk_summaries(user_message: str, chat_history: list, summaries_co
         logger.error("Could not load required chat prompt files")
         return None
     
-    # Replace placeholder in user prompt with actual summaries
-    user_prompt = user_prompt_template.replace('{{PASTE ENTIRE SUMMARY HERE}}', summaries_context)
-    
-    # Prepare the full system prompt with guardrail
-    full_system_prompt = f"{system_prompt}\n\n{guardrail_prompt}"
-    
-    # Prepare messages for API call - include chat history
-    messages = chat_history.copy() if chat_history else []
-    messages.append({"role": "user", "content": f"{user_prompt}\n\nUser Query: {user_message}"})
+    # Static prompts and summaries first (cacheable prefix), then history, then the question
+    messages = build_bulk_chat_messages(user_message, chat_history, summaries_context,
+                                        system_prompt, user_prompt_template, guardrail_prompt)
     
     try:
         logger.debug(f"Chat model: {model} | Temperature: {temperature} | Max tokens: {max_tokens}")
-        logger.debug(f"Chat history messages: {len(messages)}")
+        logger.debug(f"Chat history messages: {len(messages) - 2}")
         
         response = openai.chat.completions.create(
             model=model,
-            messages=[
-                {"role": "system", "content": full_system_prompt}
-            ] + messages,
+            messages=messages,
             max_tokens=max_tokens,
             temperature=temperature
         )
         
         assistant_message = response.choices[0].message.content.strip()
+        log_usage("Bulk summary chat", response.usage, model)
         logger.info(f"Successfully generated chat response ({len(assistant_message)} characters)")
         
         return assistant_message
@@ -0,0 +1,171 @@
+"""
+Columnar View of Call Summaries
+
+This module turns the bulk summary JSON into a typed pandas DataFrame with one
+row per call, so aggregate questions and charts can be answered with
+vectorized operations over the full summary set. Frames are cached per
+summaries file and rebuilt only when the file changes.
+
+Functions:
+- build_summary_frame(): Build a typed DataFrame from summary dicts
+- parse_duration_seconds(): Vectorized conversationLength parsing
+- get_summary_frame(): Cached frame for a summaries file
+"""
+
+import json
+import threading
+from typing import Dict, List, Tuple
+import numpy as np
+import pandas as pd
+from src.logger import logger
+from src.utils import get_summaries_version
+
+
+# Summary JSON field -> frame column
+TEXT_COLUMNS = {
+    'callId': 'call_id',
+    'agentName': 'agent_name',
+    'agentId': 'agent_id',
+    'department': 'department',
+    'customerName': 'customer_name',
+    'issueCategory': 'issue_category',
+    'resolutionStatus': 'resolution_status',
+    'customerTone': 'customer_tone',
+    'customerEmotions': 'customer_emotions',
+    'agentTone': 'agent_tone',
+}
+NUMERIC_COLUMNS = {
+    'agentScore': 'agent_score',
+    'agentRating': 'agent_rating',
+}
+# Rounded int fields added at save time (see summary_normalizer), used only where the raw value is not a number
+CANONICAL_COLUMNS = {
+    'agentScore': 'score_int',
+    'agentRating': 'rating_int',
+}
+# Repeated text columns stored as categoricals for fast grouping and filtering
+CATEGORICAL_COLUMNS = ['agent_name', 'department', 'issue_category', 'resolution_status', 'customer_tone',
+                       'customer_emotions', 'agent_tone']
+
+_HOURS_RE = r"(\d+(?:\.\d+)?)\s*(?:h|hr|hrs|hour|hours)\b"
+_MINUTES_RE = r"(\d+(?:\.\d+)?)\s*(?:m|min|mins|minute|minutes)\b"
+_SECONDS_RE = r"(\d+(?:\.\d+)?)\s*(?:s|sec|secs|second|seconds)\b"
+_CLOCK_RE = r"^\s*(?:(\d+):)?(\d{1,2}):(\d{2})\s*$"
+
+
+def parse_duration_seconds(lengths: pd.Series) -> pd.Series:
+    """
+    Parse conversation lengths ("12 mins 30 secs", "1 hour 5 minutes", "12:30") into seconds.
+
+    Args:
+        lengths: Series of conversationLength strings
+
+    Returns:
+        Float series of seconds (NaN where nothing could be parsed)
+    """
+    text = lengths.fillna('').astype(str).str.lower()
+    parts = [text.str.extract(pattern, expand=False).astype(float) * factor
+             for pattern, factor in ((_HOURS_RE, 3600), (_MINUTES_RE, 60), (_SECONDS_RE, 1))]
+    seconds = pd.concat(parts, axis=1).sum(axis=1, min_count=1)
+
+    clock = text.str.extract(_CLOCK_RE).astype(float)
+    clock_seconds = clock[0].fillna(0) * 3600 + clock[1] * 60 + clock[2]
+    return seconds.fillna(clock_seconds)
+
+
+def _canonical(raw: pd.DataFrame, field: str) -> pd.Series:
+    """Float series of a canonical field (all NaN if no summary has it)."""
+    if field not in raw:
+        return pd.Series(np.nan, index=raw.index)
+    return pd.to_numeric(raw[field], errors='coerce').astype(float)
+
+
+def build_summary_frame(summaries: List[Dict]) -> pd.DataFrame:
+    """
+    Build a typed DataFrame with one row per summary.
+
+    Canonical fields from save-time normalization (conversation_datetime,
+    duration_seconds) are used where present; the raw fields are parsed only
+    for summaries saved without them. Scores and ratings keep the raw numeric
+    value at full precision and use the rounded score_int / rating_int only
+    where the raw value is text such as "85/100".
+
+    Args:
+        summaries: Summary dicts as produced by the summarizer
+
+    Returns:
+        DataFrame with text, categorical and numeric columns plus conversation_date
+        (datetime), month ('YYYY-MM') and duration_seconds
+    """
+    raw = pd.DataFrame.from_records(summaries) if summaries else pd.DataFrame()
+    frame = pd.DataFrame(index=raw.index)
+
+    for field, column in TEXT_COLUMNS.items():
+        values = raw[field] if field in raw else pd.Series(None, index=raw.index, dtype=object)
+        frame[column] = values.fillna('Unknown').astype(str).str.strip().replace('', 'Unknown')
+    for column in CATEGORICAL_COLUMNS:
+        frame[column] = frame[column].astype('category')
+
+    for field, column in NUMERIC_COLUMNS.items():
+        # Raw numbers keep full precision (4.5 stays 4.5); text such as "85/100" falls back to the int field
+        values = pd.to_numeric(raw[field], errors='coerce').astype(float) if field in raw \
+            else pd.Series(np.nan, index=raw.index)
+        missing = values.isna()
+        if missing.any():
+            values[missing] = _canonical(raw, CANONICAL_COLUMNS[field])[missing]
+        frame[column] = values
+
+    dates = pd.to_datetime(raw['conversation_datetime'], errors='coerce', format='ISO8601') \
+        if 'conversation_datetime' in raw else pd.Series(pd.NaT, index=raw.index)
+    missing = dates.isna()
+    if missing.any() and 'conversationDate' in raw:
+        dates[missing] = pd.to_datetime(raw.loc[missing, 'conversationDate'], errors='coerce', format='mixed')
+    frame['conversation_date'] = dates.dt.normalize()
+    frame['month'] = frame['conversation_date'].dt.strftime('%Y-%m').fillna('undated')
+
+    seconds = _canonical(raw, 'duration_seconds')
+    missing = seconds.isna()
+    if missing.any():
+        lengths = pd.Series('', index=raw.index[missing], dtype=object)
+        # Older summaries used a lowercase key
+        for field in ('conversationlength', 'conversationLength'):
+            if field in raw:
+                values = raw.loc[missing, field]
+                lengths = values.where(values.notna() & (values != ''), lengths)
+        seconds[missing] = parse_duration_seconds(lengths)
+    frame['duration_seconds'] = seconds
+    return frame
+
+
+_frames: Dict[str, Tuple[str, pd.DataFrame]] = {}
+_frames_lock = threading.Lock()
+
+
+def get_summary_frame(summaries_file: str) -> pd.DataFrame:
+    """
+    Return the summary frame for a summaries file, rebuilding it only when the file changed.
+
+    Args:
+        summaries_file: Path to bulk_summaries.json
+
+    Returns:
+        DataFrame (empty if the file is missing or invalid)
+    """
+    version = get_summaries_version(summaries_file)
+    with _frames_lock:
+        cached = _frames.get(summaries_file)
+        if cached and cached[0] == version:
+            return cached[1]
+
+    try:
+        with open(summaries_file, 'r', encoding='utf-8') as f:
+            summaries = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        logger.warning(f"⚠️  Could not load summaries for analytics from {summaries_file}: {str(e)}")
+        summaries = []
+
+    frame = build_summary_frame(summaries)
+    logger.info(f"📊 Built summary frame: {len(frame)} rows from {summaries_file}")
+    with _frames_lock:
+        _frames[summaries_file] = (version, frame)
+    return frame
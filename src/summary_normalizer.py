@@ -0,0 +1,180 @@
+"""
+Ingest-Time Normalization of Call Summaries
+
+The summarizer returns conversationLength as free text ("5 mins 30 secs",
+"1 hr 2 mins", "12:30"), and agentScore / agentRating are sometimes strings
+("85", "85/100", "4 stars"). Every consumer used to parse these again on every
+read (chart frame, vector store metadata, analytics). This module parses them
+once, when summaries are saved, with precompiled patterns and adds canonical
+numeric fields next to the original ones, which are kept unchanged:
+
+- duration_seconds: int seconds (from conversationLength)
+- score_int: int agent score (from agentScore, halves rounded up)
+- rating_int: int agent rating (from agentRating, halves rounded up)
+- conversation_datetime: ISO 8601 'YYYY-MM-DDTHH:MM:SS' (from conversationDate
+  and the start of conversationTime; time 00:00:00 if there is none)
+
+A field is None when its source value could not be parsed. Readers use the
+canonical field when a summary has it and fall back to parsing otherwise, so
+summaries saved before normalization keep working. The canonical fields are
+internal: the summaries table, CSV export and chat contexts leave them out
+(see strip_canonical).
+
+Functions:
+- parse_duration(): Conversation length text to seconds
+- parse_int(): Score or rating value to an int
+- parse_datetime(): Conversation date and time to an ISO datetime
+- normalize_summary(): Copy of a summary with the canonical fields added
+- normalize_summaries(): normalize_summary() for a list of summaries
+- strip_canonical(): Copy of a summary without the canonical fields
+"""
+
+import math
+import re
+from typing import Any, Dict, List, Optional
+
+
+# Canonical fields added by normalize_summary()
+CANONICAL_FIELDS = ['duration_seconds', 'score_int', 'rating_int', 'conversation_datetime']
+
+_DURATION_PART_RE = re.compile(
+    r"(\d+(?:\.\d+)?)\s*(h|hrs?|hours?|m|mins?|minutes?|s|secs?|seconds?)\b", re.IGNORECASE)
+_CLOCK_RE = re.compile(r"^\s*(?:(\d+):)?(\d{1,2}):(\d{2})\s*$")
+_NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
+_ISO_DATE_RE = re.compile(r"(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})")
+_US_DATE_RE = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})")
+_TIME_RE = re.compile(r"(\d{1,2}):(\d{2})(?::(\d{2}))?\s*([ap]\.?m\.?)?", re.IGNORECASE)
+
+_UNIT_SECONDS = {'h': 3600, 'm': 60, 's': 1}
+
+
+def parse_duration(value: Any) -> Optional[int]:
+    """
+    Parse a conversation length into seconds.
+
+    Args:
+        value: Length such as "5 mins 30 secs", "1 hr 2 mins", "12:30", "1:02:03" or a number of minutes
+
+    Returns:
+        int seconds, or None if nothing could be parsed
+    """
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return round(value * 60) if value == value else None
+    text = str(value)
+    parts = _DURATION_PART_RE.findall(text)
+    if parts:
+        return round(sum(float(number) * _UNIT_SECONDS[unit[0].lower()] for number, unit in parts))
+    clock = _CLOCK_RE.match(text)
+    if clock:
+        hours, minutes, seconds = clock.groups()
+        return int(hours or 0) * 3600 + int(minutes) * 60 + int(seconds)
+    return None
+
+
+def parse_int(value: Any) -> Optional[int]:
+    """
+    Parse a score or rating into an int.
+
+    The int is meant for sorting, filtering and display; aggregates should use the
+    raw value, which keeps fractional scores and ratings.
+
+    Args:
+        value: Number or text such as "85", "85/100", "4.5" or "4 stars" (the first number is used)
+
+    Returns:
+        int rounded half up (4.5 -> 5, 3.5 -> 4), or None if there is no number
+    """
+    if isinstance(value, bool) or value is None:
+        return None
+    if not isinstance(value, (int, float)):
+        match = _NUMBER_RE.search(str(value))
+        if not match:
+            return None
+        value = float(match.group())
+    return math.floor(value + 0.5) if value == value else None
+
+
+def parse_datetime(date_value: Any, time_value: Any = None) -> Optional[str]:
+    """
+    Combine a conversation date and time into an ISO 8601 datetime.
+
+    Args:
+        date_value: Date such as "2025-01-15", "2025/01/15" or "01/15/2025" (month first)
+        time_value: Time such as "10:15", "10:15 AM" or a range "10:15 - 10:27" (the start is used)
+
+    Returns:
+        'YYYY-MM-DDTHH:MM:SS', or None if the date could not be parsed
+    """
+    text = str(date_value or '')
+    match = _ISO_DATE_RE.search(text)
+    if match:
+        year, month, day = (int(part) for part in match.groups())
+    else:
+        match = _US_DATE_RE.search(text)
+        if not match:
+            return None
+        month, day, year = (int(part) for part in match.groups())
+    if not (1 <= month <= 12 and 1 <= day <= 31):
+        return None
+
+    hours = minutes = seconds = 0
+    clock = _TIME_RE.search(str(time_value or '')) or _TIME_RE.search(text[match.end():])
+    if clock:
+        hours, minutes, seconds = int(clock.group(1)), int(clock.group(2)), int(clock.group(3) or 0)
+        meridiem = (clock.group(4) or '').lower()
+        if meridiem.startswith('p') and hours < 12:
+            hours += 12
+        elif meridiem.startswith('a') and hours == 12:
+            hours = 0
+        if hours > 23 or minutes > 59 or seconds > 59:
+            hours = minutes = seconds = 0
+    return f"{year:04d}-{month:02d}-{day:02d}T{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+def normalize_summary(summary: Dict) -> Dict:
+    """
+    Return a copy of a summary with the canonical numeric fields added.
+
+    Args:
+        summary: Summary dict as produced by the summarizer
+
+    Returns:
+        dict with the original fields plus CANONICAL_FIELDS
+    """
+    # Older summaries used a lowercase key
+    length = summary.get('conversationLength') or summary.get('conversationlength')
+    return {
+        **summary,
+        'duration_seconds': parse_duration(length),
+        'score_int': parse_int(summary.get('agentScore')),
+        'rating_int': parse_int(summary.get('agentRating')),
+        'conversation_datetime': parse_datetime(summary.get('conversationDate'), summary.get('conversationTime')),
+    }
+
+
+def normalize_summaries(summaries: List[Dict]) -> List[Dict]:
+    """
+    Normalize a list of summaries (see normalize_summary).
+
+    Args:
+        summaries: Summary dicts
+
+    Returns:
+        New list of normalized summary dicts
+    """
+    return [normalize_summary(summary) for summary in summaries]
+
+
+def strip_canonical(summary: Dict) -> Dict:
+    """
+    Return a copy of a summary without the canonical fields, for display, export and LLM context.
+
+    Args:
+        summary: Summary dict, normalized or not
+
+    Returns:
+        dict with only the fields the summarizer produced
+    """
+    return {key: value for key, value in summary.items() if key not in CANONICAL_FIELDS}
@@ -0,0 +1,482 @@
+"""
+Indexed Summaries Table for Paginated Views
+
+The View Summaries page used to put every summary into one DataFrame and send
+it to the browser with st.dataframe on every rerun, and built the full CSV for
+the download button even when nobody downloaded it. This module mirrors the
+summaries file into a SQLite database with composite (filter, sort, id)
+indexes. Filtering, sorting and counting run in SQLite and only the visible
+page of rows is loaded and sent to the browser. The CSV is exported on demand
+with the same filters.
+
+Pages are read with keyset pagination on (sort column, id): the page start is
+found on a covering index (or taken from the previous page's last row) and
+only that page's rows are read. Totals and page boundaries are cached per data
+version and filters, so reruns do not count or seek again.
+
+The database is rebuilt when the summaries file changes (see
+utils.get_summaries_version). Rebuilds run on a background thread and write a
+new file that atomically replaces the old one; until then queries keep using
+the previous database. The summaries list itself is also loaded once per file
+version instead of on every rerun.
+
+Classes:
+- SummaryStore: SQLite mirror of a summaries file with paginated, filtered queries
+
+Functions:
+- get_summaries(): Summaries of a file, loaded once per file version
+- get_summary_store(): Return the process-wide store for a summaries file
+"""
+
+import csv
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+from src.config import Config
+from src.logger import logger
+from src.summary_normalizer import CANONICAL_FIELDS, parse_datetime, parse_duration, parse_int, strip_canonical
+from src.utils import get_summaries_version
+
+
+# Columns that can be sorted on ('id' is the position in the summaries file)
+SORT_COLUMNS = ['id', 'conversation_date', 'agent_name', 'department', 'resolution_status',
+                'score_int', 'rating_int', 'duration_seconds']
+# Columns that can be filtered on with a list of values (see distinct_values)
+FILTER_COLUMNS = ['agent_name', 'department', 'resolution_status']
+
+# Bumped when the table layout changes, so databases written by older code are rebuilt
+SCHEMA_VERSION = '3'
+# Sort columns hold no NULLs, so keyset comparisons stay simple; the stand-ins sort where NULL would (first)
+_MISSING_INT = -1
+_MISSING_DATE = ''
+# Cached totals and page boundaries per store
+_MAX_CACHED_QUERIES = 512
+
+_SCHEMA = """
+CREATE TABLE summaries (
+    id INTEGER PRIMARY KEY,
+    call_id TEXT,
+    agent_name TEXT,
+    department TEXT,
+    resolution_status TEXT,
+    conversation_date TEXT,
+    score_int INTEGER,
+    rating_int INTEGER,
+    duration_seconds INTEGER
+);
+CREATE TABLE summary_data (id INTEGER PRIMARY KEY, data TEXT);
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+_summaries: Dict[str, Tuple[str, list]] = {}
+_summaries_lock = threading.Lock()
+
+
+def get_summaries(summaries_file: str = None) -> list:
+    """
+    Return the summaries of a file, reading it only when it changed.
+
+    Args:
+        summaries_file: Path to bulk_summaries.json (uses Config.SUMMARIES_FILE if None)
+
+    Returns:
+        List of summary dicts shared by all callers (empty if the file is missing or invalid); do not modify it
+    """
+    summaries_file = summaries_file or Config.SUMMARIES_FILE
+    version = get_summaries_version(summaries_file)
+    with _summaries_lock:
+        cached = _summaries.get(summaries_file)
+        if cached and cached[0] == version:
+            return cached[1]
+    try:
+        with open(summaries_file, 'r', encoding='utf-8') as f:
+            summaries = json.load(f)
+        logger.debug(f"Loaded {len(summaries)} summaries from {summaries_file}")
+    except FileNotFoundError:
+        logger.error(f"Summaries file not found: {summaries_file}")
+        summaries = []
+    except json.JSONDecodeError:
+        logger.error(f"Error decoding JSON from file: {summaries_file}")
+        summaries = []
+    with _summaries_lock:
+        _summaries[summaries_file] = (version, summaries)
+    return summaries
+
+
+def _text(value) -> str:
+    return str(value or '').strip() or 'Unknown'
+
+
+def _row(idx: int, summary: Dict) -> tuple:
+    """Indexed columns of a summary, using the canonical fields from save-time normalization when present."""
+    if 'conversation_datetime' in summary:
+        conversation_datetime = summary['conversation_datetime']
+    else:
+        conversation_datetime = parse_datetime(summary.get('conversationDate'), summary.get('conversationTime'))
+    if 'duration_seconds' in summary:
+        duration = summary['duration_seconds']
+    else:
+        duration = parse_duration(summary.get('conversationLength') or summary.get('conversationlength'))
+    return (
+        idx,
+        summary.get('callId', ''),
+        _text(summary.get('agentName')),
+        _text(summary.get('department')),
+        _text(summary.get('resolutionStatus')),
+        conversation_datetime[:10] if conversation_datetime else _MISSING_DATE,
+        _int_or_missing(summary['score_int'] if 'score_int' in summary else parse_int(summary.get('agentScore'))),
+        _int_or_missing(summary['rating_int'] if 'rating_int' in summary else parse_int(summary.get('agentRating'))),
+        _int_or_missing(duration),
+    )
+
+
+def _int_or_missing(value) -> int:
+    return _MISSING_INT if value is None else value
+
+
+def _cache_put(cache: OrderedDict, key, value) -> None:
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > _MAX_CACHED_QUERIES:
+        cache.popitem(last=False)
+
+
+class SummaryStore:
+    """SQLite mirror of a summaries file, queried one page at a time."""
+
+    def __init__(self, summaries_file: str = None, db_path: str = None):
+        """
+        Args:
+            summaries_file: Path to bulk_summaries.json (uses Config.SUMMARIES_FILE if None)
+            db_path: SQLite database path (defaults to the summaries file path with a .db extension)
+        """
+        self.summaries_file = summaries_file or Config.SUMMARIES_FILE
+        self.db_path = db_path or f"{os.path.splitext(self.summaries_file)[0]}.db"
+        self.columns: List[str] = []
+        self._version = None
+        self._distinct: Dict[str, List[str]] = {}
+        self._totals: OrderedDict = OrderedDict()
+        self._cursors: OrderedDict = OrderedDict()
+        self._builder: Optional[threading.Thread] = None
+        self._failed_version = None
+        self._rebuilt = False
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        """True once a database is available to query (possibly for an older summaries version)."""
+        return self._version is not None
+
+    @property
+    def building(self) -> bool:
+        """True while a rebuild is running in the background."""
+        return self._builder is not None and self._builder.is_alive()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path)
+
+    def _read_meta(self) -> Dict[str, str]:
+        try:
+            with closing(self._connect()) as conn:
+                return dict(conn.execute("SELECT key, value FROM meta").fetchall())
+        except sqlite3.Error:
+            return {}
+
+    def refresh(self, wait: bool = True) -> bool:
+        """
+        Make sure the database matches the summaries file, rebuilding it if the file changed.
+
+        Args:
+            wait: Block until the rebuild has finished; with False the rebuild runs in the
+                  background and queries keep using the previous database (they only wait
+                  when there is no database yet)
+
+        Returns:
+            bool: True if a rebuilt database was swapped in since the last call
+        """
+        self._wait_for_build(wait)
+        with self._lock:
+            rebuilt, self._rebuilt = self._rebuilt, False
+            return rebuilt
+
+    def _wait_for_build(self, wait: bool) -> None:
+        """Start a rebuild if the summaries changed; wait for it if asked to or if there is no database yet."""
+        while True:
+            with self._lock:
+                builder = self._start_build_if_stale()
+                if builder is None or not (wait or self._version is None):
+                    return
+            builder.join()
+
+    def _start_build_if_stale(self) -> Optional[threading.Thread]:
+        """Return the running builder if the database is stale, starting one if needed (lock held)."""
+        version = get_summaries_version(self.summaries_file)
+        if version == self._version or version == self._failed_version:
+            return None
+        if self.building:
+            return self._builder
+        meta = self._read_meta() if os.path.exists(self.db_path) else {}
+        if meta.get('source_version') == version and meta.get('schema') == SCHEMA_VERSION:
+            self._swap_in(meta, version)
+            return None
+        if self._version is None and meta.get('schema') == SCHEMA_VERSION:
+            # Serve the database left by an earlier run while the new one is built
+            self._swap_in(meta, meta.get('source_version'))
+        self._builder = threading.Thread(target=self._run_builds, name="summary-store-build", daemon=True)
+        self._builder.start()
+        return self._builder
+
+    def _swap_in(self, meta: Dict[str, str], version: str) -> None:
+        """Point queries at the database described by meta (lock held)."""
+        self.columns = json.loads(meta.get('columns', '[]'))
+        self._distinct = {}
+        self._totals.clear()
+        self._cursors.clear()
+        self._version = version
+
+    def _run_builds(self) -> None:
+        """Rebuild until the database matches the summaries file (builder thread)."""
+        while True:
+            version = get_summaries_version(self.summaries_file)
+            if version == self._version:
+                return
+            try:
+                temp_path = self._build(version)
+            except Exception as e:
+                logger.error(f"❌ Failed to build summaries table: {str(e)}")
+                with self._lock:
+                    self._failed_version = version
+                return
+            with self._lock:
+                os.replace(temp_path, self.db_path)
+                self._swap_in(self._read_meta(), version)
+                self._failed_version = None
+                self._rebuilt = True
+
+    def _build(self, version: str) -> str:
+        """Write a new database for the current summaries and return its temporary path."""
+        start = time.time()
+        summaries = get_summaries(self.summaries_file)
+        # The canonical fields from save-time normalization only feed the indexed columns
+        columns = list(dict.fromkeys(key for summary in summaries for key in summary if key not in CANONICAL_FIELDS))
+
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        temp_path = f"{self.db_path}.{os.getpid()}.tmp"
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        with closing(sqlite3.connect(temp_path)) as conn:
+            # A throwaway file until it is swapped in, so durability is not needed while building
+            conn.execute("PRAGMA journal_mode=OFF")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.executescript(_SCHEMA)
+            conn.executemany("INSERT INTO summaries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                             (_row(idx, summary) for idx, summary in enumerate(summaries)))
+            # The JSON lives in its own table so index builds and counts scan only the narrow columns
+            conn.executemany("INSERT INTO summary_data VALUES (?, ?)",
+                             ((idx, json.dumps(strip_canonical(summary), ensure_ascii=False))
+                              for idx, summary in enumerate(summaries)))
+            # Indexes are built after loading, which is faster than maintaining them row by row.
+            # (sort, id) serves unfiltered pages; (filter, sort, id) serves filtered ones, and both
+            # cover the seek and count queries without reading the summary data
+            for column in SORT_COLUMNS[1:]:
+                conn.execute(f"CREATE INDEX idx_{column} ON summaries ({column}, id)")
+            for filter_column in FILTER_COLUMNS:
+                for column in SORT_COLUMNS:
+                    if column != filter_column:
+                        keys = f"{filter_column}, id" if column == 'id' else f"{filter_column}, {column}, id"
+                        conn.execute(f"CREATE INDEX idx_{filter_column}_{column} ON summaries ({keys})")
+            conn.executemany("INSERT INTO meta VALUES (?, ?)",
+                             [('source_version', version), ('schema', SCHEMA_VERSION),
+                              ('columns', json.dumps(columns))])
+            conn.commit()
+        logger.info(f"🗃️ Built summaries table: {len(summaries)} rows in {time.time() - start:.2f}s ({self.db_path})")
+        return temp_path
+
+    @staticmethod
+    def _where(filters: Dict = None) -> Tuple[List[str], list]:
+        """SQL conditions and parameters for filters (see query_page)."""
+        filters = filters or {}
+        clauses, params = [], []
+        for column, key in (('agent_name', 'agents'), ('department', 'departments'),
+                            ('resolution_status', 'statuses')):
+            values = filters.get(key)
+            if values:
+                clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+        if filters.get('date_from'):
+            clauses.append("conversation_date >= ?")
+            params.append(str(filters['date_from']))
+        if filters.get('date_to'):
+            # Undated rows hold '' and must not match an upper bound
+            clauses.append("conversation_date > ? AND conversation_date <= ?")
+            params.extend([_MISSING_DATE, str(filters['date_to'])])
+        return clauses, params
+
+    @staticmethod
+    def _where_sql(clauses: List[str]) -> str:
+        return f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    @staticmethod
+    def _order_by(sort_by: str, descending: bool) -> str:
+        if sort_by not in SORT_COLUMNS:
+            raise ValueError(f"Unknown sort column '{sort_by}' (expected one of {', '.join(SORT_COLUMNS)})")
+        direction = 'DESC' if descending else 'ASC'
+        # Ties are broken by file position so pages never overlap
+        return f"ORDER BY {sort_by} {direction}, id {direction}"
+
+    def _count(self, conn: sqlite3.Connection, clauses: List[str], params: list, filters_key: str) -> int:
+        """Number of matching rows, cached per data version and filters."""
+        key = (self._version, filters_key)
+        with self._lock:
+            if key in self._totals:
+                return self._totals[key]
+        total = conn.execute(f"SELECT COUNT(*) FROM summaries {self._where_sql(clauses)}", params).fetchone()[0]
+        with self._lock:
+            _cache_put(self._totals, key, total)
+        return total
+
+    def _seek(self, conn: sqlite3.Connection, clauses: List[str], params: list, query_key: tuple,
+              sort_by: str, descending: bool, offset: int) -> Optional[tuple]:
+        """
+        Return the (sort value, id) of the row just before offset.
+
+        Starts from the nearest cached page boundary at or before offset, so moving
+        to the next page needs no seek at all and jumps skip only index entries.
+        """
+        comparison = '<' if descending else '>'
+        with self._lock:
+            boundaries = self._cursors.get(query_key, {})
+            anchor = max((position for position in boundaries if position <= offset), default=0)
+            cursor = boundaries.get(anchor)
+        if anchor == offset:
+            return cursor
+        seek_clauses, seek_params = list(clauses), list(params)
+        if cursor is not None:
+            seek_clauses.append(f"({sort_by}, id) {comparison} (?, ?)")
+            seek_params.extend(cursor)
+        row = conn.execute(f"SELECT {sort_by}, id FROM summaries {self._where_sql(seek_clauses)} "
+                           f"{self._order_by(sort_by, descending)} LIMIT 1 OFFSET ?",
+                           seek_params + [offset - anchor - 1]).fetchone()
+        if row is not None:
+            self._remember_boundary(query_key, offset, tuple(row))
+        return tuple(row) if row else None
+
+    def _remember_boundary(self, query_key: tuple, offset: int, cursor: tuple) -> None:
+        with self._lock:
+            boundaries = self._cursors.get(query_key, {})
+            boundaries[offset] = cursor
+            _cache_put(self._cursors, query_key, boundaries)
+
+    def query_page(self, filters: Dict = None, sort_by: str = 'id', descending: bool = False,
+                   page: int = 1, page_size: int = None) -> Tuple[pd.DataFrame, int]:
+        """
+        Return one page of summaries.
+
+        Args:
+            filters: Dict with optional agents, departments and statuses (lists of values) and
+                     date_from / date_to (dates or 'YYYY-MM-DD', inclusive)
+            sort_by: One of SORT_COLUMNS
+            descending: Sort in descending order
+            page: 1-based page number
+            page_size: Rows per page (uses Config.SUMMARY_PAGE_SIZE if None)
+
+        Returns:
+            Tuple of (DataFrame of the page with the summary fields as columns, total matching rows)
+        """
+        self._wait_for_build(False)
+        order_by = self._order_by(sort_by, descending)
+        page_size = page_size or Config.SUMMARY_PAGE_SIZE
+        offset = (max(page, 1) - 1) * page_size
+        clauses, params = self._where(filters)
+        filters_key = json.dumps(clauses + [str(param) for param in params])
+        query_key = (self._version, filters_key, sort_by, descending)
+        with closing(self._connect()) as conn:
+            total = self._count(conn, clauses, params, filters_key)
+            page_clauses, page_params = list(clauses), list(params)
+            if offset:
+                cursor = self._seek(conn, clauses, params, query_key, sort_by, descending, offset)
+                if cursor is None:
+                    return pd.DataFrame(columns=self.columns), total
+                page_clauses.append(f"({sort_by}, id) {'<' if descending else '>'} (?, ?)")
+                page_params.extend(cursor)
+            keys = conn.execute(f"SELECT {sort_by}, id FROM summaries {self._where_sql(page_clauses)} "
+                                f"{order_by} LIMIT ?", page_params + [page_size]).fetchall()
+            data = dict(conn.execute(f"SELECT id, data FROM summary_data WHERE id IN ({', '.join('?' * len(keys))})",
+                                     [row_id for _, row_id in keys]).fetchall()) if keys else {}
+        if len(keys) == page_size:
+            self._remember_boundary(query_key, offset + page_size, tuple(keys[-1]))
+        frame = pd.DataFrame.from_records([json.loads(data[row_id]) for _, row_id in keys], columns=self.columns)
+        return frame, total
+
+    def distinct_values(self, column: str) -> List[str]:
+        """
+        Return the sorted distinct values of a filter column (cached until the summaries change).
+
+        Args:
+            column: One of FILTER_COLUMNS
+
+        Returns:
+            List of values
+        """
+        if column not in FILTER_COLUMNS:
+            raise ValueError(f"Unknown filter column '{column}' (expected one of {', '.join(FILTER_COLUMNS)})")
+        self._wait_for_build(False)
+        with self._lock:
+            if column in self._distinct:
+                return self._distinct[column]
+        with closing(self._connect()) as conn:
+            values = [value for value, in conn.execute(f"SELECT DISTINCT {column} FROM summaries ORDER BY {column}")]
+        with self._lock:
+            self._distinct[column] = values
+        return values
+
+    def date_range(self) -> Tuple[Optional[str], Optional[str]]:
+        """Return the first and last conversation dates ('YYYY-MM-DD'), or (None, None) if there are none."""
+        self._wait_for_build(False)
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT MIN(conversation_date), MAX(conversation_date) FROM summaries "
+                                "WHERE conversation_date > ?", [_MISSING_DATE]).fetchone()
+
+    def export_csv(self, filters: Dict = None, sort_by: str = 'id', descending: bool = False) -> bytes:
+        """
+        Export the matching summaries as CSV, streaming rows from the database.
+
+        Args:
+            filters: Filters as for query_page()
+            sort_by: One of SORT_COLUMNS
+            descending: Sort in descending order
+
+        Returns:
+            bytes: UTF-8 CSV with a header row of the summary fields
+        """
+        self._wait_for_build(False)
+        clauses, params = self._where(filters)
+        output = io.StringIO()
+        writer = csv.DictWriter(output, fieldnames=self.columns, extrasaction='ignore')
+        writer.writeheader()
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(f"SELECT data FROM summaries JOIN summary_data USING (id) "
+                                  f"{self._where_sql(clauses)} {self._order_by(sort_by, descending)}", params)
+            for data, in cursor:
+                writer.writerow(json.loads(data))
+        return output.getvalue().encode('utf-8')
+
+
+_stores: Dict[str, SummaryStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_summary_store(summaries_file: str = None) -> SummaryStore:
+    """Return the process-wide store for a summaries file, shared by all sessions."""
+    summaries_file = summaries_file or Config.SUMMARIES_FILE
+    with _stores_lock:
+        if summaries_file not in _stores:
+            _stores[summaries_file] = SummaryStore(summaries_file)
+        return _stores[summaries_file]
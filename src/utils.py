@@ -2,6 +2,7 @@ import os
 import json
 from datetime import datetime
 from src.logger import logger
+from src.summary_normalizer import normalize_summaries
 
 def load_sample_call() -> str:
     return open('sample_data/example_call.txt', 'r', encoding='utf-8').read()
@@ -46,10 +47,23 @@ def get_next_id() -> int:
         return 1
 
 
+def get_summaries_version(summaries_file: str = 'output_data/bulk_summaries.json') -> str:
+    """
+    Return a cheap version stamp of the summaries file (mtime and size).
+    The stamp changes whenever summaries are saved or cleared, so caches keyed on it invalidate.
+    """
+    try:
+        stat = os.stat(summaries_file)
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+    except OSError:
+        return "missing"
+
+
 def save_bulk_summary(summaries: list) -> None:
     """
     Save bulk summaries to output_data folder and update metadata with last ID.
-    Appends to existing file if it exists.
+    Appends to existing file if it exists. Summaries are normalized on save
+    (see summary_normalizer), so saved summaries carry canonical numeric fields.
     """
     output_dir = 'output_data'
     summaries_file = os.path.join(output_dir, 'bulk_summaries.json')
@@ -69,8 +83,9 @@ def save_bulk_summary(summaries: list) -> None:
                 logger.warning("Existing summaries file is corrupted, starting fresh")
                 all_summaries = []
         
-        # Append new summaries
+        # Append new summaries; normalizing all of them also upgrades summaries saved before normalization
         all_summaries.extend(summaries)
+        all_summaries = normalize_summaries(all_summaries)
         
         # Save updated summaries
         with open(summaries_file, 'w', encoding='utf-8') as f:
@@ -0,0 +1,349 @@
+"""
+Time-Partitioned Vector Index Shards
+
+This module splits the vector store into one FAISS shard per month of
+conversationDate (path/shards/YYYY-MM) and searches them in parallel. Queries
+that mention a date range ("in March 2025", "last month", "2024", "since
+March 2025") only search the shards inside that range; results from all
+searched shards are merged by distance. Shards are loaded lazily, older shards are memory-mapped read-only,
+and the least recently used shards are evicted once MAX_LOADED_SHARDS are open.
+
+Functions:
+- shard_key(): Month shard key ('YYYY-MM') for a summary
+- extract_date_range(): Month range mentioned in a query, if any
+- select_shards(): Shard keys overlapping a month range
+"""
+
+import heapq
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from langchain_core.documents import Document
+from src.logger import logger
+from src.mmr import search_with_vectors
+
+
+SHARDS_DIR = 'shards'
+UNDATED_SHARD = 'undated'
+
+_ISO_DATE_RE = re.compile(r"\b(20\d{2})[-/](\d{1,2})(?:[-/]\d{1,2})?\b")
+_YEAR_RE = re.compile(r"\b(20\d{2})\b")
+_MONTH_NAMES = ['january', 'february', 'march', 'april', 'may', 'june', 'july',
+                'august', 'september', 'october', 'november', 'december']
+# A bare 20xx number is a year only right after a month, a preposition or "year" (or at the start of the query),
+# and never before a count noun: "last 2000 calls" and "top 2050 agents" are counts
+_YEAR_CONTEXT_RE = re.compile(r"(?:^|\b(?:in|during|since|of|from|for|before|after|until|till|through|to|and|"
+                              r"between|year|fy)\s+|\b(?:" + "|".join(_MONTH_NAMES) +
+                              r"|jan|feb|mar|apr|jun|jul|aug|sept?|oct|nov|dec)\.?\s*,?\s*)$")
+_COUNT_NOUN_RE = re.compile(r"\s*(?:calls?|tickets?|agents?|customers?|callers?|cases?|conversations?|summar(?:y|ies)|"
+                            r"records?|rows?|results?|documents?|complaints?|reps?|people|users?|minutes?|seconds?|"
+                            r"hours?)\b")
+# Whole month names or exact abbreviations ("marketing" and "declined" are not months);
+# 'may' only counts when followed by a year
+_MONTH_RE = re.compile(
+    r"\b(" + "|".join(_MONTH_NAMES) + r"|jan|feb|mar|apr|jun|jul|aug|sept?|oct|nov|dec)\.?(?:\s*,?\s*(20\d{2}))?\b",
+    re.IGNORECASE
+)
+_LAST_N_MONTHS_RE = re.compile(r"\b(?:last|past|previous)\s+(\d{1,2})\s+months?\b", re.IGNORECASE)
+_RELATIVE_RE = re.compile(r"\b(this month|today|yesterday|last month|previous month|this year|last year|previous year)\b")
+
+# Relational words that open a range at one end ("since March 2025", "before June 2025")
+_AFTER_WORDS = ['since', 'from', 'starting', 'starting from', 'starting in', 'after', 'later than']
+_BEFORE_WORDS = ['before', 'prior to', 'earlier than', 'until', 'till', 'through', 'up to']
+# These exclude the month they name ("after January" starts in February)
+_EXCLUSIVE_WORDS = ['after', 'later than', 'before', 'prior to', 'earlier than']
+# Common outside dates ("calls from Billing"), so they only count right before a date
+_AMBIGUOUS_WORDS = ['from', 'starting', 'through', 'up to']
+_RELATION_WORD_RE = re.compile(
+    r"\b(?:" + "|".join(sorted((w.replace(' ', r'\s+') for w in _AFTER_WORDS + _BEFORE_WORDS), key=len, reverse=True)) + r")\b")
+# A relational word directly before a date, allowing "the start of", "early", "mid" and "in" in between
+_RELATION_RE = re.compile(
+    r"\b(" + "|".join(sorted((w.replace(' ', r'\s+') for w in _AFTER_WORDS + _BEFORE_WORDS), key=len, reverse=True)) + r")"
+    r"\s+(?:the\s+(?:start|beginning|middle|end)\s+of\s+|early\s+|mid-?\s*|late\s+|in\s+)?\Z")
+
+# Start of a range that is open towards the past ("before June 2025")
+OPEN_START = '0000-01'
+
+
+def _month_index(year: int, month: int) -> int:
+    return year * 12 + month - 1
+
+
+def _month_key(index: int) -> str:
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def shard_key(summary: Dict) -> str:
+    """
+    Return the month shard key for a summary.
+
+    Args:
+        summary: Summary with a conversationDate in YYYY-MM-DD format
+
+    Returns:
+        str: 'YYYY-MM', or UNDATED_SHARD if the date is missing or unparseable
+    """
+    match = _ISO_DATE_RE.search(str(summary.get('conversationDate', '') or ''))
+    if not match or not 1 <= int(match.group(2)) <= 12:
+        return UNDATED_SHARD
+    return f"{int(match.group(1)):04d}-{int(match.group(2)):02d}"
+
+
+def extract_date_range(query: str, today: date = None) -> Optional[Tuple[str, str]]:
+    """
+    Extract the month range a query refers to.
+
+    Recognizes ISO dates/months, month names (with or without a year), bare
+    years, and relative phrases (this/last month, this/last year, last N months).
+    Month names without a year use a year mentioned elsewhere in the query, or
+    the most recent such month. A date right after since/from/after runs to the
+    current month, and one after before/until starts at OPEN_START.
+
+    Args:
+        query: User question
+        today: Reference date for relative phrases (defaults to date.today())
+
+    Returns:
+        Tuple of ('YYYY-MM', 'YYYY-MM') inclusive, or None if no date is mentioned
+        or the relational words could not be resolved into one range
+    """
+    today = today or date.today()
+    current = _month_index(today.year, today.month)
+    text = query.lower()
+    # (position, first month, last month) of each date mentioned
+    mentions: List[Tuple[int, int, int]] = []
+
+    for match in _ISO_DATE_RE.finditer(text):
+        month = int(match.group(2))
+        if 1 <= month <= 12:
+            index = _month_index(int(match.group(1)), month)
+            mentions.append((match.start(), index, index))
+    # Blank out ISO dates without shifting positions
+    text_without_iso = _ISO_DATE_RE.sub(lambda match: ' ' * len(match.group()), text)
+
+    named_years = set()
+    years = [match for match in _YEAR_RE.finditer(text_without_iso)
+             if _YEAR_CONTEXT_RE.search(text_without_iso, 0, match.start())
+             and not _COUNT_NOUN_RE.match(text_without_iso, match.end())]
+    explicit_year = years[0] if years else None
+    for match in _MONTH_RE.finditer(text_without_iso):
+        prefix, year = match.group(1).lower(), match.group(2)
+        if prefix == 'may' and not year:
+            continue
+        month = next(i for i, name in enumerate(_MONTH_NAMES, start=1) if name.startswith(prefix[:3]))
+        if year:
+            named_years.add(year)
+            index = _month_index(int(year), month)
+        elif explicit_year:
+            named_years.add(explicit_year.group(1))
+            index = _month_index(int(explicit_year.group(1)), month)
+        else:
+            index = _month_index(today.year, month)
+            index = index if index <= current else index - 12
+        mentions.append((match.start(), index, index))
+
+    # A bare year that no month name claimed covers the whole year
+    for match in years:
+        year = match.group(1)
+        if year not in named_years:
+            mentions.append((match.start(), _month_index(int(year), 1), _month_index(int(year), 12)))
+
+    yesterday = date.fromordinal(today.toordinal() - 1)
+    relative = {
+        'this month': (current, current),
+        'today': (current, current),
+        'yesterday': (_month_index(yesterday.year, yesterday.month),) * 2,
+        'last month': (current - 1, current - 1),
+        'previous month': (current - 1, current - 1),
+        'this year': (_month_index(today.year, 1), current),
+        'last year': (_month_index(today.year - 1, 1), _month_index(today.year - 1, 12)),
+        'previous year': (_month_index(today.year - 1, 1), _month_index(today.year - 1, 12)),
+    }
+    for match in _RELATIVE_RE.finditer(text):
+        mentions.append((match.start(), *relative[match.group(1)]))
+    for match in _LAST_N_MONTHS_RE.finditer(text):
+        mentions.append((match.start(), current - int(match.group(1)) + 1, current))
+
+    if not mentions:
+        return None
+    return _resolve_range(text, sorted(mentions), current)
+
+
+def _resolve_range(text: str, mentions: List[Tuple[int, int, int]], current: int) -> Optional[Tuple[str, str]]:
+    """Combine date mentions and the relational words right before them into one month range."""
+    lows: List[int] = []
+    highs: List[int] = []
+    attached = set()
+    # 0 = start bound (since/after), 1 = plain date, 2 = end bound (before/until); must not decrease
+    last_kind = 0
+    for position, first, last in mentions:
+        relation = _RELATION_RE.search(text, 0, position)
+        word = ' '.join(relation.group(1).split()) if relation else None
+        if relation:
+            attached.add(relation.start())
+        if word in _AFTER_WORDS:
+            kind = 0
+            lows.append(last + 1 if word in _EXCLUSIVE_WORDS else first)
+        elif word in _BEFORE_WORDS:
+            kind = 2
+            highs.append(first - 1 if word in _EXCLUSIVE_WORDS else last)
+        else:
+            kind = 1
+            lows.append(first)
+            highs.append(last)
+        if kind < last_kind:
+            return None
+        last_kind = kind
+
+    # A relational word that is not right before a date ("after the merger") cannot be placed
+    for match in _RELATION_WORD_RE.finditer(text):
+        if match.start() not in attached and ' '.join(match.group().split()) not in _AMBIGUOUS_WORDS:
+            return None
+
+    low = min(lows) if lows else None
+    high = max(highs) if highs else current
+    if low is not None and low > high:
+        return None
+    return (OPEN_START if low is None else _month_key(low)), _month_key(high)
+
+
+def select_shards(shard_keys: Iterable[str], date_range: Optional[Tuple[str, str]]) -> List[str]:
+    """
+    Return the shard keys overlapping a month range.
+
+    The undated shard is always searched because its documents cannot be ruled out.
+
+    Args:
+        shard_keys: Available shard keys
+        date_range: ('YYYY-MM', 'YYYY-MM') inclusive, or None for all shards
+
+    Returns:
+        List of shard keys to search
+    """
+    if date_range is None:
+        return list(shard_keys)
+    start, end = date_range
+    return [key for key in shard_keys if key == UNDATED_SHARD or start <= key <= end]
+
+
+class ShardedVectorStore:
+    """
+    Read-only vector store that fans searches out over monthly FAISS shards.
+
+    Shards are opened on first use through the load_shard callable and kept in
+    an LRU cache. Searches take a query vector, as the by-vector methods of a
+    single LangChain FAISS store do; documents are added by building a new
+    snapshot, not through this class.
+    """
+
+    def __init__(self, shard_counts: Dict[str, int], dimension: int,
+                 load_shard: Callable[[str, bool], Any], max_loaded_shards: int = 12,
+                 max_workers: int = 4):
+        """
+        Args:
+            shard_counts: Document count per shard key
+            dimension: Embedding dimension
+            load_shard: Callable (shard key, read_only) -> LangChain FAISS store
+            max_loaded_shards: Shards kept open before the least recently used is evicted
+            max_workers: Threads used to search shards in parallel
+        """
+        self.shard_counts = dict(sorted(shard_counts.items()))
+        self.d = dimension
+        self._load_shard = load_shard
+        self.max_loaded_shards = max(1, max_loaded_shards)
+        self.max_workers = max(1, max_workers)
+        self._loaded: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        # One lock per shard key, so concurrent searches load different shards in parallel
+        # and searches that need the same shard share one load
+        self._load_locks: Dict[str, threading.Lock] = {}
+        dated = [key for key in self.shard_counts if key != UNDATED_SHARD]
+        self._newest_shard = max(dated) if dated else None
+
+    @property
+    def ntotal(self) -> int:
+        """Total number of documents across all shards."""
+        return sum(self.shard_counts.values())
+
+    @property
+    def loaded_shards(self) -> List[str]:
+        """Shard keys currently held in memory, least recently used first."""
+        with self._lock:
+            return list(self._loaded)
+
+    def _get_shard(self, key: str):
+        """Return an open shard, loading it (and evicting the LRU shard) if needed."""
+        with self._lock:
+            if key in self._loaded:
+                self._loaded.move_to_end(key)
+                return self._loaded[key]
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            # Another search may have finished loading this shard while this one waited
+            with self._lock:
+                if key in self._loaded:
+                    self._loaded.move_to_end(key)
+                    return self._loaded[key]
+            # Only the newest month still changes; older months are opened read-only via mmap
+            store = self._load_shard(key, key != self._newest_shard)
+            with self._lock:
+                self._loaded[key] = store
+                while len(self._loaded) > self.max_loaded_shards:
+                    evicted, _ = self._loaded.popitem(last=False)
+                    logger.debug(f"Evicted vector shard {evicted} from memory")
+            return store
+
+    def evict(self, keys: Iterable[str] = None) -> None:
+        """Drop shards from memory (all shards if keys is None); they reload on next use."""
+        with self._lock:
+            for key in list(self._loaded if keys is None else keys):
+                self._loaded.pop(key, None)
+
+    def _search_shard(self, key: str, embedding: List[float], k: int) -> List[Tuple[Document, float]]:
+        store = self._get_shard(key)
+        return store.similarity_search_with_score_by_vector(embedding, k=min(k, self.shard_counts[key]))
+
+    def similarity_search_with_score_by_vector(self, embedding: List[float], k: int = 4,
+                                               date_range: Optional[Tuple[str, str]] = None,
+                                               **kwargs: Any) -> List[Tuple[Document, float]]:
+        """
+        Search the shards inside date_range in parallel and merge results by distance.
+
+        Args:
+            embedding: Query vector
+            k: Number of results to return
+            date_range: ('YYYY-MM', 'YYYY-MM') inclusive, or None for all shards
+
+        Returns:
+            List of (document, L2 distance), closest first
+        """
+        keys = select_shards(self.shard_counts, date_range)
+        skipped = len(self.shard_counts) - len(keys)
+        if skipped:
+            logger.info(f"🗓️  Date range {date_range[0]}..{date_range[1]}: searching {len(keys)} shards, skipped {skipped}")
+        if not keys:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(keys))) as executor:
+            shard_results = list(executor.map(lambda key: self._search_shard(key, embedding, k), keys))
+        return heapq.nsmallest(k, (hit for hits in shard_results for hit in hits), key=lambda hit: hit[1])
+
+    def similarity_search_with_vectors(self, embedding: List[float], k: int = 4,
+                                       date_range: Optional[Tuple[str, str]] = None) -> List[Tuple[Document, float, Any]]:
+        """
+        Like similarity_search_with_score_by_vector, but each hit also carries its stored vector.
+
+        Returns:
+            List of (document, L2 distance, vector), closest first
+        """
+        keys = select_shards(self.shard_counts, date_range)
+        if not keys:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(keys))) as executor:
+            shard_results = list(executor.map(
+                lambda key: search_with_vectors(self._get_shard(key), embedding, min(k, self.shard_counts[key])), keys))
+        return heapq.nsmallest(k, (hit for hits in shard_results for hit in hits), key=lambda hit: hit[1])
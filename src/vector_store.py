@@ -7,19 +7,221 @@ from bulk summaries using FAISS for high-performance similarity search.
 Functions:
 - create_vector_store(): Initialize FAISS vector store from bulk summaries
 - load_vector_store(): Load existing vector store from disk
-- get_retriever(): Get a retriever for semantic search
+- similarity_search_with_scores(): Scored semantic search
 """
 
+import functools
 import json
 import os
+import threading
 import shutil
 import glob
-from typing import List, Dict, Optional
+import uuid
+from typing import Callable, List, Dict, Optional
+import numpy as np
+import faiss
 from langchain_openai import OpenAIEmbeddings
 from langchain_community.vectorstores import FAISS
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 from src.logger import logger
 from src.config import Config
+from src.index_compression import (
+    RerankingIndex,
+    build_index,
+    estimate_index_memory,
+    format_bytes,
+    load_exact_vectors,
+    measure_recall,
+    read_index_meta,
+    save_exact_vectors,
+    write_index_meta,
+)
+from src.local_embeddings import HashedNgramEmbeddings, is_local_embedding_model, parse_local_dimension
+from src.vector_shards import SHARDS_DIR, ShardedVectorStore, extract_date_range, shard_key
+from src.mmr import mmr_select, search_with_vectors
+from src.index_snapshots import (
+    gc_snapshots,
+    new_snapshot_version,
+    publish_snapshot,
+    read_current_version,
+    resolve_current_snapshot,
+    snapshot_path,
+    unpublish_snapshot,
+)
+from src.summary_normalizer import parse_int
+
+
+# Bump when the document text format changes so existing indexes are rebuilt (migrated)
+DOCUMENT_FORMAT_VERSION = 2
+
+# (label, summary keys) in output order; the first non-empty key wins
+_COMPACT_FIELDS = [
+    ('Call', ('callId',)),
+    ('Agent', ('agentName',)),
+    ('AgentID', ('agentId',)),
+    ('Customer', ('customerName',)),
+    ('Date', ('conversationDate',)),
+    ('Time', ('conversationTime',)),
+    ('Duration', ('conversationLength', 'conversationlength')),
+    ('Dept', ('department',)),
+    ('Issue', ('issueCategory',)),
+    ('Summary', ('callSummary',)),
+    ('CustTone', ('customerTone',)),
+    ('CustEmotions', ('customerEmotions',)),
+    ('AgentTone', ('agentTone',)),
+    ('AgentEmotions', ('agentEmotions',)),
+    ('Sentiment', ('sentiment',)),
+    ('Score', ('agentScore',)),
+    ('Rating', ('agentRating',)),
+    ('Status', ('resolutionStatus',)),
+    ('File', ('filename',)),
+]
+_FIELD_SUFFIXES = {'Score': '/100', 'Rating': '/5'}
+_EMPTY_VALUES = {'', 'n/a', 'na', 'none', 'null', 'unknown', 'not expressed'}
+
+
+def serialize_summary(summary: Dict) -> str:
+    """
+    Serialize a summary into the compact canonical document text (format v2).
+    
+    One "Label: value" line per field, short labels, no indentation, and
+    empty or placeholder values (N/A, Unknown, Not Expressed) omitted.
+    """
+    lines = []
+    for label, keys in _COMPACT_FIELDS:
+        value = next((summary.get(key) for key in keys if summary.get(key) not in (None, '')), None)
+        if value is None or str(value).strip().lower() in _EMPTY_VALUES:
+            continue
+        lines.append(f"{label}: {str(value).strip()}{_FIELD_SUFFIXES.get(label, '')}")
+    return "\n".join(lines)
+
+
+def _canonical_int(summary: Dict, canonical_field: str, raw_field: str) -> int:
+    """Canonical int field of a summary, parsing the raw field for summaries saved before normalization (0 if missing)."""
+    value = summary[canonical_field] if canonical_field in summary else parse_int(summary.get(raw_field))
+    return 0 if value is None else value
+
+
+def _format_document_v1(summary: Dict) -> str:
+    """Legacy (format v1) document text, kept to measure savings against."""
+    return f"""
+                        Call Summary:
+                        Call ID: {summary.get('callId', '')}
+                        Agent: {summary.get('agentName', 'Unknown')} (ID: {summary.get('agentId', 'N/A')}
+                        Customer: {summary.get('customerName', 'Unknown')}
+                        Date: {summary.get('conversationDate', 'N/A')} {summary.get('conversationTime', '')}
+                        Duration: {summary.get('conversationlength', 'N/A')}
+                        Department: {summary.get('department', 'N/A')}
+
+                        Issue Category: {summary.get('issueCategory', 'N/A')}
+                        Summary: {summary.get('callSummary', '')}
+
+                        Customer Tone: {summary.get('customerTone', 'N/A')}
+                        Customer Emotions: {summary.get('customerEmotions', 'N/A')}
+                        Agent Tone: {summary.get('agentTone', 'N/A')}
+                        Agent Emotions: {summary.get('agentEmotions', 'N/A')}
+                        Sentiment: {summary.get('sentiment', '')}
+
+                        Agent Performance Score: {summary.get('agentScore', 'N/A')}/100
+                        Agent Rating: {summary.get('agentRating', 'N/A')}/5
+                        Resolution Status: {summary.get('resolutionStatus', 'N/A')}
+                        File Name : {summary.get('filename', 'N/A')}
+                    """.strip()
+
+
+def measure_document_savings(summaries: List[Dict], sample_size: int = 200) -> Dict:
+    """
+    Measure per-document characters and tokens of the compact format vs the legacy format.
+    
+    Embedding tokens use the embedding model's tokenizer; context tokens use the chat model's.
+    
+    Args:
+        summaries: Summaries to measure (a sample is used for large corpora)
+        sample_size: Maximum number of summaries to measure
+    
+    Returns:
+        dict: Average chars, embedding tokens and context tokens per document for v1 and v2
+    """
+    from src.context_budget import count_tokens
+    
+    sample = summaries[:sample_size]
+    if not sample:
+        return {}
+    
+    stats = {}
+    for version, formatter in (('v1', _format_document_v1), ('v2', serialize_summary)):
+        texts = [formatter(summary) for summary in sample]
+        stats[version] = {
+            "chars": sum(len(text) for text in texts) / len(texts),
+            "embedding_tokens": sum(count_tokens(text, Config.EMBEDDING_MODEL) for text in texts) / len(texts),
+            "context_tokens": sum(count_tokens(text, Config.MODEL_NAME) for text in texts) / len(texts),
+        }
+    stats["saved"] = {metric: stats["v1"][metric] - stats["v2"][metric] for metric in stats["v1"]}
+    return stats
+
+
+def get_embeddings(api_key: Optional[str] = None, model: str = None) -> Embeddings:
+    """
+    Create the embeddings backend selected by the model name.
+    
+    Args:
+        api_key: OpenAI API key (not needed for local models)
+        model: Embedding model name (uses Config.EMBEDDING_MODEL if None).
+               'local-hash' or 'local-hash-<dim>' selects the offline hashed n-gram backend.
+    
+    Returns:
+        Embeddings: LangChain-compatible embeddings object
+    """
+    model = model or Config.EMBEDDING_MODEL
+    if is_local_embedding_model(model):
+        return HashedNgramEmbeddings(dimension=parse_local_dimension(model))
+    return OpenAIEmbeddings(openai_api_key=api_key, model=model)
+
+
+class QueryVectorsOnly(Embeddings):
+    """
+    Embedding function of loaded indexes, which are shared by sessions with different API keys.
+    
+    Indexes hold no API key of their own: callers embed queries with their own
+    embeddings and search by vector, so embedding through an index is an error.
+    """
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        raise ValueError("Shared indexes are built with VectorStoreManager.create_vector_store(api_key)")
+    
+    def embed_query(self, text: str) -> List[float]:
+        raise ValueError("Shared indexes are searched by vector; embed the query with the caller's own embeddings")
+
+
+def embed_texts(embeddings: Embeddings, texts: List[str], batch_size: int = None,
+                progress_callback: Callable[[int, int], None] = None) -> np.ndarray:
+    """
+    Embed texts into a float32 array, using the NumPy fast path when the backend has one.
+    
+    Args:
+        embeddings: Embeddings backend
+        texts: Texts to embed
+        batch_size: Texts embedded per call (uses Config.EMBEDDING_BATCH_SIZE if None)
+        progress_callback: Called with (texts embedded, total texts) after each batch
+    
+    Returns:
+        np.ndarray: Array of shape (len(texts), dimension)
+    """
+    batch_size = batch_size or Config.EMBEDDING_BATCH_SIZE
+    batches = []
+    for start in range(0, len(texts), batch_size):
+        batch = texts[start:start + batch_size]
+        if hasattr(embeddings, 'embed_array'):
+            batches.append(embeddings.embed_array(batch))
+        else:
+            batches.append(np.asarray(embeddings.embed_documents(batch), dtype=np.float32))
+        if progress_callback:
+            progress_callback(start + len(batch), len(texts))
+    if not batches:
+        return np.zeros((0, 0), dtype=np.float32)
+    return np.vstack(batches)
 
 
 class VectorStoreManager:
@@ -27,7 +229,10 @@ class VectorStoreManager:
     
     def __init__(self, summaries_file: str = None, 
                  vector_store_path: str = None,
-                 retriever_k: int = None):
+                 retriever_k: int = None,
+                 index_type: str = None,
+                 embedding_model: str = None,
+                 shard_by_month: bool = None):
         """
         Initialize the Vector Store Manager.
         
@@ -35,14 +240,26 @@ class VectorStoreManager:
             summaries_file: Path to bulk_summaries.json (uses config default if None)
             vector_store_path: Path to save/load FAISS vector store (uses config default if None)
             retriever_k: Number of documents to retrieve (uses config default if None)
+            index_type: 'flat', 'sq8' or 'pq' (uses config default if None)
+            embedding_model: Embedding model name, e.g. 'text-embedding-3-small' or 'local-hash'
+                             (uses config default if None)
+            shard_by_month: Split the index into monthly shards (uses Config.SHARD_BY_MONTH if None)
         """
         # Use provided values or fall back to config defaults
         self.summaries_file = summaries_file or Config.SUMMARIES_FILE
         self.vector_store_path = vector_store_path or Config.VECTOR_STORE_PATH
         self.retriever_k = retriever_k or Config.RETRIEVER_K
-        self.embeddings = None
+        self.index_type = (index_type or Config.VECTOR_INDEX_TYPE).lower()
+        self.embedding_model = embedding_model or Config.EMBEDDING_MODEL
+        self.shard_by_month = Config.SHARD_BY_MONTH if shard_by_month is None else shard_by_month
+        # Only the model name is kept: the API key passed to create_vector_store is used for that build only
+        self._query_embeddings = QueryVectorsOnly()
         self.vector_store = None
-        self.retriever = None
+        # Snapshot directory and version currently served (version is None for legacy indexes)
+        self.snapshot_path = None
+        self.snapshot_version = None
+        self._swap_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
         
     def _load_summaries(self) -> List[Dict]:
         """Load summaries from JSON file."""
@@ -66,36 +283,15 @@ class VectorStoreManager:
         """
         Convert summaries to Document objects for FAISS.
         
-        Combines key fields into meaningful content for better retrieval.
+        Uses the compact canonical serialization (see serialize_summary) so the
+        same short text is embedded and later sent to the LLM as context.
         """
         documents = []
         logger.info(f"📝 Starting document preparation for {len(summaries)} summaries...")
         
         for idx, summary in enumerate(summaries):
-            # Combine multiple fields for rich context
-            content = f"""
-                        Call Summary:
-                        Call ID: {summary.get('callId', '')}
-                        Agent: {summary.get('agentName', 'Unknown')} (ID: {summary.get('agentId', 'N/A')}
-                        Customer: {summary.get('customerName', 'Unknown')}
-                        Date: {summary.get('conversationDate', 'N/A')} {summary.get('conversationTime', '')}
-                        Duration: {summary.get('conversationlength', 'N/A')}
-                        Department: {summary.get('department', 'N/A')}
-
-                        Issue Category: {summary.get('issueCategory', 'N/A')}
-                        Summary: {summary.get('callSummary', '')}
-
-                        Customer Tone: {summary.get('customerTone', 'N/A')}
-                        Customer Emotions: {summary.get('customerEmotions', 'N/A')}
-                        Agent Tone: {summary.get('agentTone', 'N/A')}
-                        Agent Emotions: {summary.get('agentEmotions', 'N/A')}
-                        Sentiment: {summary.get('sentiment', '')}
-
-                        Agent Performance Score: {summary.get('agentScore', 'N/A')}/100
-                        Agent Rating: {summary.get('agentRating', 'N/A')}/5
-                        Resolution Status: {summary.get('resolutionStatus', 'N/A')}
-                        File Name : {summary.get('filename', 'N/A')}
-                    """
+            # Compact canonical text, generated once per summary at index time
+            content = serialize_summary(summary)
             
             # Create metadata with important fields for filtering
             metadata = {
@@ -103,8 +299,8 @@ class VectorStoreManager:
                 "agent_name": summary.get('agentName', ''),
                 "agent_id": summary.get('agentId', ''),
                 "customer_name": summary.get('customerName', ''),
-                "agent_score": summary.get('agentScore', 0),
-                "agent_rating": summary.get('agentRating', 0),
+                "agent_score": _canonical_int(summary, 'score_int', 'agentScore'),
+                "agent_rating": _canonical_int(summary, 'rating_int', 'agentRating'),
                 "resolution_status": summary.get('resolutionStatus', ''),
                 "issue_category": summary.get('issueCategory', ''),
                 "department": summary.get('department', ''),
@@ -112,20 +308,27 @@ class VectorStoreManager:
                 "filename": summary.get('filename', '')
             }
             
-            doc = Document(page_content=content.strip(), metadata=metadata)
+            doc = Document(page_content=content, metadata=metadata)
             documents.append(doc)
             logger.debug(f"   📄 Doc {idx+1}: {summary.get('callId', 'N/A')} - {summary.get('agentName', 'Unknown')}")
         
-        logger.info(f"✅ Prepared {len(documents)} documents for vector store embedding")
+        logger.info(f"✅ Prepared {len(documents)} documents for vector store embedding (format v{DOCUMENT_FORMAT_VERSION})")
         return documents
     
-    def create_vector_store(self, api_key: str, force_recreate: bool = False) -> bool:
+    def create_vector_store(self, api_key: str, force_recreate: bool = False,
+                            progress_callback: Callable[[str, int, int], None] = None) -> bool:
         """
         Create or load FAISS vector store from summaries.
         
+        Each build is written to a new snapshot directory and published with an
+        atomic pointer swap, so the snapshot in use is never modified or deleted
+        while it is being queried.
+        
         Args:
-            api_key: OpenAI API key for embeddings
-            force_recreate: If True, recreate vector store even if it exists
+            api_key: OpenAI API key for embeddings (not needed for local embedding models)
+            force_recreate: If True, build a new snapshot even if one exists
+            progress_callback: Called with (stage, done, total) while building; stages are
+                               'loading', 'embedding', 'indexing' and 'publishing'
             
         Returns:
             bool: True if successful, False otherwise
@@ -133,44 +336,28 @@ class VectorStoreManager:
         try:
             logger.info(f"🚀 Starting vector store creation (force_recreate={force_recreate})...")
             
-            # Initialize embeddings with OpenAI
-            logger.info("📌 Initializing OpenAI embeddings...")
-            self.embeddings = OpenAIEmbeddings(
-                openai_api_key=api_key,
-                model=Config.EMBEDDING_MODEL
-            )
-            logger.info(f"✅ Embeddings initialized successfully with model: {Config.EMBEDDING_MODEL}")
+            # Load the published snapshot unless a rebuild is forced
+            if not force_recreate:
+                current_path, current_version = resolve_current_snapshot(self.vector_store_path)
+                if current_path is not None:
+                    logger.info(f"📂 Loading existing vector store from {current_path}")
+                    try:
+                        store = self._open_snapshot(current_path)
+                        self._activate_snapshot(store, current_path, current_version)
+                        logger.info(f"✅ Vector store loaded successfully with {self._document_count()} documents (k={self.retriever_k} - retrieves up to {self.retriever_k} docs)")
+                        return True
+                    except Exception as e:
+                        logger.warning(f"⚠️  Failed to load existing vector store: {str(e)}. Recreating from scratch...")
+                        # Fall through to recreation logic below
             
-            # If forcing recreation, delete existing vector store first
-            if force_recreate and os.path.exists(self.vector_store_path):
-                import shutil
-                logger.info(f"🗑️  Deleting existing vector store at {self.vector_store_path}")
-                shutil.rmtree(self.vector_store_path)
-                logger.info(f"✅ Old vector store deleted successfully")
+            report = progress_callback or (lambda stage, done, total: None)
             
-            # Check if vector store exists and not forcing recreation
-            if os.path.exists(self.vector_store_path) and not force_recreate:
-                logger.info(f"📂 Loading existing vector store from {self.vector_store_path}")
-                try:
-                    self.vector_store = FAISS.load_local(
-                        self.vector_store_path,
-                        self.embeddings,
-                        allow_dangerous_deserialization=True
-                    )
-                    # Verify the vector store has documents
-                    doc_count = self.vector_store.index.ntotal if hasattr(self.vector_store.index, 'ntotal') else 0
-                    if doc_count == 0:
-                        logger.warning(f"⚠️  Vector store exists but has 0 documents. Recreating...")
-                        raise ValueError("Empty vector store")
-                    
-                    self.retriever = self.vector_store.as_retriever(search_kwargs={"k": self.retriever_k})
-                    logger.info(f"✅ Vector store loaded successfully with {doc_count} documents (k={self.retriever_k} - retrieves up to {self.retriever_k} docs)")
-                    return True
-                except Exception as e:
-                    logger.warning(f"⚠️  Failed to load existing vector store: {str(e)}. Recreating from scratch...")
-                    # Fall through to recreation logic below
+            # Document embeddings for this build (OpenAI or the offline local backend)
+            embeddings = get_embeddings(api_key, self.embedding_model)
+            logger.info(f"✅ Embeddings initialized with model: {self.embedding_model}")
             
             # Load summaries and prepare documents
+            report('loading', 0, 0)
             logger.info("📖 Loading summaries from JSON...")
             summaries = self._load_summaries()
             if not summaries:
@@ -179,34 +366,35 @@ class VectorStoreManager:
             
             logger.info(f"📝 Preparing {len(summaries)} documents for embedding...")
             documents = self._prepare_documents(summaries)
+            savings = measure_document_savings(summaries)
+            if savings:
+                logger.info(f"📉 Per-document savings vs v1 format: {savings['saved']['chars']:.0f} chars, "
+                            f"{savings['saved']['embedding_tokens']:.0f} embedding tokens, "
+                            f"{savings['saved']['context_tokens']:.0f} context tokens "
+                            f"(v2 avg: {savings['v2']['context_tokens']:.0f} tokens)")
             
-            # Create FAISS vector store
+            # Create FAISS vector store in a new snapshot; the current one keeps serving queries
             logger.info(f"🔧 Creating FAISS vector store with {len(documents)} documents and embeddings...")
-            self.vector_store = FAISS.from_documents(
-                documents=documents,
-                embedding=self.embeddings
+            report('embedding', 0, len(documents))
+            exact_vectors = embed_texts(
+                embeddings,
+                [doc.page_content for doc in documents],
+                progress_callback=lambda done, total: report('embedding', done, total)
             )
-            
-            # Verify all documents were indexed
-            indexed_count = self.vector_store.index.ntotal if hasattr(self.vector_store.index, 'ntotal') else len(documents)
-            logger.info(f"✅ FAISS vector store created with {indexed_count} documents indexed (expected: {len(documents)})")
-            
-            if indexed_count != len(documents):
-                logger.warning(f"⚠️  MISMATCH: Expected {len(documents)} documents but only {indexed_count} indexed!")
+            report('indexing', len(documents), len(documents))
+            version = new_snapshot_version()
+            new_snapshot_path = snapshot_path(self.vector_store_path, version)
+            if self.shard_by_month:
+                store = self._create_sharded_store(summaries, documents, exact_vectors, new_snapshot_path)
             else:
-                logger.info(f"✅ All {len(documents)} documents successfully indexed in FAISS")
+                store = self._create_single_store(documents, exact_vectors, new_snapshot_path)
             
-            # Save vector store locally
-            logger.info(f"💾 Saving vector store to {self.vector_store_path}...")
-            os.makedirs(self.vector_store_path, exist_ok=True)
-            self.vector_store.save_local(self.vector_store_path)
-            logger.info(f"✅ Vector store saved to {self.vector_store_path}")
-            
-            # Create retriever
-            logger.info("🔍 Creating retriever for semantic search...")
-            # Using configurable k value to retrieve documents
-            self.retriever = self.vector_store.as_retriever(search_kwargs={"k": self.retriever_k})
-            logger.info(f"✅ Vector store created and retriever initialized successfully (k={self.retriever_k} - retrieves up to {self.retriever_k} docs)")
+            # Publish atomically, switch this manager over, then drop old snapshots
+            report('publishing', len(documents), len(documents))
+            publish_snapshot(self.vector_store_path, version)
+            self._activate_snapshot(store, new_snapshot_path, version)
+            gc_snapshots(self.vector_store_path, Config.VECTOR_SNAPSHOTS_TO_KEEP)
+            logger.info(f"✅ Vector store created successfully (k={self.retriever_k} - retrieves up to {self.retriever_k} docs)")
             
             return True
             
@@ -214,44 +402,386 @@ class VectorStoreManager:
             logger.error(f"❌ Error creating vector store: {str(e)}")
             return False
     
-    def get_retriever(self):
-        """Get the FAISS retriever for semantic search."""
-        if self.retriever is None:
-            logger.warning("⚠️  Retriever not initialized. Call create_vector_store() first.")
-            return None
-        logger.debug(f"✅ Retriever available - ready for semantic search")
-        return self.retriever
+    def _open_snapshot(self, path: str):
+        """
+        Open the index stored in a snapshot directory.
+        
+        Args:
+            path: Snapshot directory (or the vector store root for legacy indexes)
+        
+        Returns:
+            FAISS or ShardedVectorStore
+        
+        Raises:
+            ValueError: If the snapshot is empty or was built with different settings
+        """
+        index_meta = read_index_meta(path)
+        if bool(index_meta.get('sharded')) != self.shard_by_month:
+            logger.warning(f"⚠️  Stored index layout does not match SHARD_BY_MONTH={self.shard_by_month}. Recreating...")
+            raise ValueError("Shard layout changed")
+        # Rebuild if the stored index type differs from the configured one
+        stored_type = index_meta.get('requested_index_type', 'flat')
+        if stored_type != self.index_type:
+            logger.warning(f"⚠️  Stored index type '{stored_type}' differs from configured '{self.index_type}'. Recreating...")
+            raise ValueError("Index type changed")
+        stored_format = index_meta.get('document_format_version', 1)
+        if stored_format != DOCUMENT_FORMAT_VERSION:
+            logger.warning(f"⚠️  Index uses document format v{stored_format}, current is v{DOCUMENT_FORMAT_VERSION}. Migrating (recreating)...")
+            raise ValueError("Document format changed")
+        stored_model = index_meta.get('embedding_model')
+        if stored_model and stored_model != self.embedding_model:
+            logger.warning(f"⚠️  Index was built with '{stored_model}' but '{self.embedding_model}' is configured. Recreating...")
+            raise ValueError("Embedding model changed")
+        
+        if self.shard_by_month:
+            store = self._open_sharded_store(index_meta, path)
+            doc_count = store.ntotal
+        else:
+            store = FAISS.load_local(path, self._query_embeddings, allow_dangerous_deserialization=True)
+            doc_count = store.index.ntotal
+            self._attach_reranker(index_meta, store, path)
+        # Verify the vector store has documents
+        if doc_count == 0:
+            logger.warning(f"⚠️  Vector store exists but has 0 documents. Recreating...")
+            raise ValueError("Empty vector store")
+        return store
+    
+    def _activate_snapshot(self, store, path: str, version: Optional[str]) -> None:
+        """Switch queries over to a loaded snapshot; in-flight searches finish on the old one."""
+        with self._swap_lock:
+            self.vector_store = store
+            self.snapshot_path = path
+            self.snapshot_version = version
+    
+    def refresh_snapshot(self) -> bool:
+        """
+        Switch to the published snapshot if it is newer than the one in use.
+        
+        Cheap enough to call before every query: it reads the small CURRENT
+        pointer file and only loads an index when the version changed. When the
+        manager is shared, only one thread loads the new snapshot; the others keep
+        querying the current one meanwhile.
+        
+        Returns:
+            bool: True if a new snapshot was swapped in
+        """
+        if self.vector_store is None:
+            return False
+        version = read_current_version(self.vector_store_path)
+        if version is None or version == self.snapshot_version:
+            return False
+        if not self._refresh_lock.acquire(blocking=False):
+            return False
+        try:
+            path = snapshot_path(self.vector_store_path, version)
+            store = self._open_snapshot(path)
+            self._activate_snapshot(store, path, version)
+            logger.info(f"🔄 Switched to vector store snapshot {version} ({self._document_count()} documents)")
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️  Could not switch to snapshot {version}: {str(e)}. Keeping {self.snapshot_version}")
+            return False
+        finally:
+            self._refresh_lock.release()
+    
+    def _build_faiss_store(self, documents: List[Document], vectors: np.ndarray) -> FAISS:
+        """
+        Build a LangChain FAISS store from precomputed vectors.
+        
+        Avoids FAISS.from_documents so vectors stay in NumPy end to end.
+        """
+        index = faiss.IndexFlatL2(vectors.shape[1])
+        index.add(vectors)
+        ids = [str(uuid.uuid4()) for _ in documents]
+        return FAISS(
+            embedding_function=self._query_embeddings,
+            index=index,
+            docstore=InMemoryDocstore(dict(zip(ids, documents))),
+            index_to_docstore_id=dict(enumerate(ids))
+        )
+    
+    def _create_single_store(self, documents: List[Document], exact_vectors: np.ndarray, path: str) -> FAISS:
+        """
+        Build and save a single (unsharded) FAISS index into a snapshot directory.
+        
+        Args:
+            documents: Prepared documents
+            exact_vectors: Embeddings of the documents (same order)
+            path: Snapshot directory to write
+        
+        Returns:
+            FAISS store ready for search
+        """
+        store = self._build_faiss_store(documents, exact_vectors)
+        
+        # Verify all documents were indexed
+        indexed_count = store.index.ntotal
+        logger.info(f"✅ FAISS vector store created with {indexed_count} documents indexed (expected: {len(documents)})")
+        
+        if indexed_count != len(documents):
+            logger.warning(f"⚠️  MISMATCH: Expected {len(documents)} documents but only {indexed_count} indexed!")
+        else:
+            logger.info(f"✅ All {len(documents)} documents successfully indexed in FAISS")
+        
+        # Swap in the compressed index before saving so only the codes are written to index.faiss
+        built_index_type = 'flat'
+        if self.index_type != 'flat':
+            built_index_type = self._compress_index(store, exact_vectors)
+        
+        # Save vector store locally
+        logger.info(f"💾 Saving vector store to {path}...")
+        os.makedirs(path, exist_ok=True)
+        store.save_local(path)
+        index_meta = {
+            "requested_index_type": self.index_type,
+            "index_type": built_index_type,
+            "embedding_model": self.embedding_model,
+            "document_format_version": DOCUMENT_FORMAT_VERSION,
+            "sharded": False,
+            "document_count": indexed_count,
+            "dimension": store.index.d
+        }
+        if built_index_type != 'flat':
+            # Exact vectors stay on disk and are memory-mapped for re-ranking
+            save_exact_vectors(path, exact_vectors)
+        write_index_meta(path, index_meta)
+        self._attach_reranker(index_meta, store, path)
+        logger.info(f"✅ Vector store saved to {path}")
+        return store
     
-    def similarity_search(self, query: str, k: int = 5) -> List[Dict]:
+    def _create_sharded_store(self, summaries: List[Dict], documents: List[Document],
+                              exact_vectors: np.ndarray, path: str) -> ShardedVectorStore:
+        """
+        Build and save one FAISS index per conversationDate month under <snapshot>/shards/YYYY-MM.
+        
+        Args:
+            summaries: Summaries the documents were prepared from (same order)
+            documents: Prepared documents
+            exact_vectors: Embeddings of the documents (same order)
+            path: Snapshot directory to write
+        
+        Returns:
+            ShardedVectorStore over the saved shards
+        """
+        groups: Dict[str, List[int]] = {}
+        for idx, summary in enumerate(summaries):
+            groups.setdefault(shard_key(summary), []).append(idx)
+        
+        shards_root = os.path.join(path, SHARDS_DIR)
+        shard_counts = {}
+        built_types = []
+        for key, positions in sorted(groups.items()):
+            shard_vectors = exact_vectors[positions]
+            store = self._build_faiss_store([documents[i] for i in positions], shard_vectors)
+            built_type = 'flat'
+            if self.index_type != 'flat':
+                store.index, built_type = build_index(shard_vectors, self.index_type, Config.PQ_SUBQUANTIZERS)
+            
+            shard_path = os.path.join(shards_root, key)
+            os.makedirs(shard_path, exist_ok=True)
+            store.save_local(shard_path)
+            if built_type != 'flat':
+                save_exact_vectors(shard_path, shard_vectors)
+            write_index_meta(shard_path, {"index_type": built_type, "document_count": len(positions)})
+            shard_counts[key] = len(positions)
+            built_types.append(built_type)
+            logger.debug(f"   Shard {key}: {len(positions)} documents ({built_type})")
+        
+        index_meta = {
+            "requested_index_type": self.index_type,
+            "index_type": max(set(built_types), key=built_types.count),
+            "embedding_model": self.embedding_model,
+            "document_format_version": DOCUMENT_FORMAT_VERSION,
+            "sharded": True,
+            "shards": shard_counts,
+            "document_count": len(documents),
+            "dimension": int(exact_vectors.shape[1])
+        }
+        write_index_meta(path, index_meta)
+        logger.info(f"🗓️  Saved {len(shard_counts)} monthly shards ({len(documents)} documents) to {shards_root}")
+        return self._open_sharded_store(index_meta, path)
+    
+    def _open_sharded_store(self, index_meta: Dict, path: str) -> ShardedVectorStore:
+        """Open the monthly shards listed in index_meta (shards load lazily on first search)."""
+        return ShardedVectorStore(
+            index_meta.get('shards', {}),
+            index_meta.get('dimension', 0),
+            functools.partial(self._load_shard, path),
+            max_loaded_shards=Config.MAX_LOADED_SHARDS,
+            max_workers=Config.SHARD_SEARCH_WORKERS
+        )
+    
+    def _load_shard(self, path: str, key: str, read_only: bool) -> FAISS:
+        """
+        Load one monthly shard from disk.
+        
+        Args:
+            path: Snapshot directory holding the shards
+            key: Shard key ('YYYY-MM' or 'undated')
+            read_only: Memory-map the index read-only instead of reading it into RAM
+        
+        Returns:
+            LangChain FAISS store for the shard
+        """
+        shard_path = os.path.join(path, SHARDS_DIR, key)
+        io_flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY if read_only else 0
+        store = FAISS.load_local(
+            shard_path,
+            self._query_embeddings,
+            allow_dangerous_deserialization=True,
+            io_flags=io_flags
+        )
+        self._attach_reranker(read_index_meta(shard_path), store, shard_path)
+        logger.debug(f"Loaded vector shard {key} ({'mmap read-only' if read_only else 'in memory'})")
+        return store
+    
+    def _document_count(self) -> int:
+        """Number of documents in the current vector store (all shards when sharded)."""
+        if isinstance(self.vector_store, ShardedVectorStore):
+            return self.vector_store.ntotal
+        return self.vector_store.index.ntotal if hasattr(self.vector_store.index, 'ntotal') else 0
+    
+    def _compress_index(self, store: FAISS, exact_vectors: np.ndarray) -> str:
+        """
+        Replace the store's flat FAISS index with the configured compressed index.
+        
+        Args:
+            store: FAISS store holding the flat index
+            exact_vectors: Exact float32 vectors that were added to the flat index
+        
+        Returns:
+            str: Index type actually built
+        """
+        num_docs, dim = exact_vectors.shape
+        
+        logger.info(f"🗜️  Compressing index with '{self.index_type}' ({num_docs} vectors, dim={dim})...")
+        compressed_index, built_type = build_index(exact_vectors, self.index_type, Config.PQ_SUBQUANTIZERS)
+        
+        # Measure memory and recall impact against the exact index
+        flat_bytes = estimate_index_memory(1_000_000, dim, 'flat')
+        compressed_bytes = estimate_index_memory(1_000_000, dim, built_type, Config.PQ_SUBQUANTIZERS)
+        recall_k = min(10, num_docs)
+        raw_recall = measure_recall(exact_vectors, compressed_index, k=recall_k)
+        reranked_recall = measure_recall(
+            exact_vectors,
+            RerankingIndex(compressed_index, exact_vectors, Config.RERANK_CANDIDATES_FACTOR),
+            k=recall_k
+        )
+        logger.info(f"📊 Index memory per 1M docs: {format_bytes(compressed_bytes)} ({built_type}) vs {format_bytes(flat_bytes)} (flat)")
+        logger.info(f"📊 Recall@{recall_k} vs exact: {raw_recall:.3f} compressed, {reranked_recall:.3f} with exact re-ranking")
+        
+        store.index = compressed_index
+        return built_type
+    
+    def _attach_reranker(self, index_meta: Dict, store: FAISS, path: str) -> None:
+        """Wrap a compressed index so its top candidates are re-ranked with exact on-disk vectors."""
+        if index_meta.get('index_type', 'flat') == 'flat':
+            return
+        exact_vectors = load_exact_vectors(path)
+        if exact_vectors is None:
+            logger.warning("⚠️  Exact vectors not found - searching compressed index without re-ranking")
+            return
+        store.index = RerankingIndex(
+            store.index,
+            exact_vectors,
+            Config.RERANK_CANDIDATES_FACTOR
+        )
+        logger.debug(f"Exact re-ranking enabled for '{index_meta.get('index_type')}' index ({Config.RERANK_CANDIDATES_FACTOR}x candidates)")
+    
+    def similarity_search(self, query: str, embedding: List[float], k: int = 5) -> List[Dict]:
         """
         Perform similarity search on vector store.
         
         Args:
-            query: Search query
+            query: Search query (used for its date range and for logging)
+            embedding: Query embedding, made with the caller's own embeddings
             k: Number of results to return
             
         Returns:
             List of relevant documents with metadata
         """
+        return [
+            {"content": result["content"], "metadata": result["metadata"]}
+            for result in self.similarity_search_with_scores(query, embedding, k=k, diversify=False)
+        ]
+    
+    def similarity_search_with_scores(self, query: str, embedding: List[float], k: int = None,
+                                      diversify: bool = None) -> List[Dict]:
+        """
+        Perform similarity search and return results with similarity scores.
+        
+        Embeddings are unit length, so FAISS squared L2 distances convert to
+        cosine similarity as 1 - d / 2 (higher is more similar). The index is
+        shared across API keys, so callers embed the query themselves.
+        
+        Args:
+            query: Search query (used for its date range and for logging)
+            embedding: Query embedding, made with the caller's own embeddings
+            k: Number of results to return (uses retriever_k if None)
+            diversify: Treat k as a candidate pool and keep an MMR-diverse subset of at most
+                       Config.MMR_K (uses Config.MMR_ENABLED if None)
+            
+        Returns:
+            List of dicts with content, metadata and score, best first
+        """
         if self.vector_store is None:
             logger.error("Vector store not initialized")
             return []
         
+        k = k or self.retriever_k
+        diversify = Config.MMR_ENABLED if diversify is None else diversify
         try:
-            results = self.vector_store.similarity_search(query, k=k)
-            logger.debug(f"Found {len(results)} similar documents for query: {query}")
+            if diversify:
+                results = self._diverse_search(query, k, embedding)
+            elif isinstance(self.vector_store, ShardedVectorStore):
+                results = self.vector_store.similarity_search_with_score_by_vector(
+                    embedding, k=k, date_range=extract_date_range(query))
+            else:
+                results = self.vector_store.similarity_search_with_score_by_vector(embedding, k=k)
+            logger.debug(f"Found {len(results)} scored documents for query: {query}")
             
             return [
                 {
                     "content": doc.page_content,
-                    "metadata": doc.metadata
+                    "metadata": doc.metadata,
+                    "score": 1.0 - float(distance) / 2.0
                 }
-                for doc in results
+                for doc, distance in results
             ]
         except Exception as e:
-            logger.error(f"Error during similarity search: {str(e)}")
+            logger.error(f"Error during scored similarity search: {str(e)}")
             return []
     
+    def _diverse_search(self, query: str, pool_size: int, embedding: List[float]) -> List[tuple]:
+        """
+        Fetch a candidate pool and keep a relevant but diverse subset with MMR.
+        
+        Re-ranking uses the vectors stored in the index, so no documents are re-embedded.
+        
+        Args:
+            query: Search query (used for its date range)
+            pool_size: Number of candidates to fetch
+            embedding: Query embedding
+        
+        Returns:
+            List of (document, L2 distance) for the kept candidates, closest first
+        """
+        if isinstance(self.vector_store, ShardedVectorStore):
+            candidates = self.vector_store.similarity_search_with_vectors(
+                embedding, pool_size, date_range=extract_date_range(query))
+        else:
+            candidates = search_with_vectors(self.vector_store, embedding, pool_size)
+        if not candidates:
+            return []
+        
+        picked = mmr_select(np.asarray(embedding), np.stack([vector for _, _, vector in candidates]),
+                            Config.MMR_K, Config.MMR_LAMBDA, Config.MMR_DUPLICATE_THRESHOLD)
+        # Best first again, so relevance cut-offs downstream see scores in order
+        picked.sort(key=lambda i: candidates[i][1])
+        logger.info(f"🎯 MMR kept {len(picked)} of {len(candidates)} candidates "
+                    f"(limit {Config.MMR_K}, lambda {Config.MMR_LAMBDA})")
+        return [(candidates[i][0], candidates[i][1]) for i in picked]
+    
     def get_vector_store_info(self) -> Dict:
         """Get information about the current vector store."""
         if self.vector_store is None:
@@ -259,13 +789,22 @@ class VectorStoreManager:
         
         try:
             # Get document count from FAISS index
-            doc_count = self.vector_store.index.ntotal if hasattr(self.vector_store.index, 'ntotal') else 0
+            doc_count = self._document_count()
             logger.info(f"📊 Vector Store Info: {doc_count} documents indexed")
             
+            index_meta = read_index_meta(self.snapshot_path) if self.snapshot_path else {}
+            index_type = index_meta.get('index_type', 'flat')
+            sharded = isinstance(self.vector_store, ShardedVectorStore)
+            dimension = self.vector_store.d if sharded else self.vector_store.index.d
+            
             return {
                 "status": "initialized",
                 "document_count": doc_count,
-                "retriever_available": self.retriever is not None
+                "index_type": index_type,
+                "index_memory_bytes": estimate_index_memory(doc_count, dimension, index_type, Config.PQ_SUBQUANTIZERS),
+                "snapshot_version": self.snapshot_version,
+                "shard_count": len(self.vector_store.shard_counts) if sharded else 1,
+                "loaded_shards": self.vector_store.loaded_shards if sharded else []
             }
         except Exception as e:
             logger.error(f"Error getting vector store info: {str(e)}")
@@ -308,9 +847,11 @@ class VectorStoreManager:
             # Step 1: Clear in-memory references first
             logger.info("\n🔧 STEP 1: Clearing in-memory references...")
             self.vector_store = None
-            self.retriever = None
-            self.embeddings = None
-            logger.info("✅ In-memory references cleared (vector_store, retriever, embeddings)")
+            self.snapshot_path = None
+            self.snapshot_version = None
+            # Unpublish first so other sessions never switch to a half-deleted snapshot
+            unpublish_snapshot(self.vector_store_path)
+            logger.info("✅ In-memory references cleared (vector_store)")
             
             # Step 2: List and count files before deletion
             logger.info("\n📁 STEP 2: Analyzing files to be deleted...")
@@ -403,3 +944,67 @@ class VectorStoreManager:
             logger.error(f"❌ ERROR CLEARING VECTOR STORE: {str(e)}")
             logger.error("=" * 70, exc_info=True)
             return False
+
+
+# Process-wide managers shared by all sessions, so each index is loaded into RAM once
+_shared_managers: Dict[tuple, VectorStoreManager] = {}
+_shared_managers_lock = threading.Lock()
+# One lock per manager key, so loading one index does not block sessions using another
+_shared_manager_locks: Dict[tuple, threading.Lock] = {}
+
+
+def get_shared_vector_store_manager(api_key: str, summaries_file: str = None,
+                                    vector_store_path: str = None,
+                                    retriever_k: int = None) -> Optional[VectorStoreManager]:
+    """
+    Return the process-wide VectorStoreManager for an index, loading it on first use.
+    
+    Managers are keyed by index location, retrieval settings and embedding model,
+    not by API key: sessions with different keys share one loaded index and embed
+    their queries with their own keys (see RAGChatbot). The shared manager follows
+    newly published snapshots through refresh_snapshot().
+    
+    The index is loaded (or built) under a lock for its key only, so other
+    sessions keep using already loaded indexes meanwhile.
+    
+    Args:
+        api_key: OpenAI API key, used if the index has to be loaded or built
+        summaries_file: Path to bulk_summaries.json (uses config default if None)
+        vector_store_path: Vector store root (uses config default if None)
+        retriever_k: Number of documents to retrieve (uses config default if None)
+    
+    Returns:
+        VectorStoreManager with a loaded index, or None if it could not be created
+    """
+    summaries_file = summaries_file or Config.SUMMARIES_FILE
+    vector_store_path = os.path.abspath(vector_store_path or Config.VECTOR_STORE_PATH)
+    retriever_k = retriever_k or Config.RETRIEVER_K
+    key = (summaries_file, vector_store_path, retriever_k, Config.EMBEDDING_MODEL,
+           Config.VECTOR_INDEX_TYPE, Config.SHARD_BY_MONTH)
+    
+    with _shared_managers_lock:
+        manager = _shared_managers.get(key)
+        if manager is not None:
+            return manager
+        key_lock = _shared_manager_locks.setdefault(key, threading.Lock())
+    
+    with key_lock:
+        # Another session may have finished loading while this one waited
+        with _shared_managers_lock:
+            manager = _shared_managers.get(key)
+        if manager is not None:
+            return manager
+        logger.info(f"🆕 Loading shared vector store for {vector_store_path}")
+        manager = VectorStoreManager(summaries_file, vector_store_path, retriever_k=retriever_k)
+        if not manager.create_vector_store(api_key):
+            return None
+        with _shared_managers_lock:
+            _shared_managers[key] = manager
+        return manager
+
+
+def reset_shared_vector_store_managers() -> None:
+    """Drop all shared managers (e.g. after the vector store was cleared); they reload on next use."""
+    with _shared_managers_lock:
+        _shared_managers.clear()
+        _shared_manager_locks.clear()
@@ -0,0 +1,100 @@
+from src.analytics_engine import answer_aggregate_question, classify_question
+from src.retrieval_benchmark import generate_synthetic_summaries
+from src.summary_frame import build_summary_frame
+from src.vector_shards import extract_date_range
+
+
+def test_aggregates_are_exact_over_all_summaries():
+    summaries = generate_synthetic_summaries(2000, seed=3)
+    frame = build_summary_frame(summaries)
+
+    result = answer_aggregate_question("How many unresolved calls in March 2025?", frame)
+    expected = sum(1 for s in summaries
+                   if s["resolutionStatus"] == "Unresolved" and s["conversationDate"].startswith("2025-03"))
+    assert result["table"]["calls"].tolist() == [expected]
+
+    result = answer_aggregate_question("average agent score by department", frame)
+    table = result["table"].set_index("department")["mean agent score"]
+    billing = [s["agentScore"] for s in summaries if s["department"] == "Billing"]
+    assert abs(table["Billing"] - sum(billing) / len(billing)) < 1e-9
+    assert list(table) == sorted(table, reverse=True)
+
+
+def test_narrative_questions_go_to_retrieval():
+    frame = build_summary_frame(generate_synthetic_summaries(200, seed=3))
+    assert classify_question("Why are customers angry about refunds?", frame) is None
+    assert classify_question("Summarize the calls handled by the billing team", frame) is None
+    spec = classify_question("top 3 agents by average rating", frame)
+    assert (spec["group_by"], spec["metric"], spec["top_n"]) == ("agent_name", "agent_rating", 3)
+
+
+def test_rankings_without_a_metric_use_agent_score():
+    summaries = generate_synthetic_summaries(500, seed=3)
+    frame = build_summary_frame(summaries)
+    result = answer_aggregate_question("Who is the best agent?", frame)
+    assert result["description"] == "Agent name ranked by average agent score"
+    scores = {}
+    for s in summaries:
+        scores.setdefault(s["agentName"], []).append(s["agentScore"])
+    assert result["table"]["agent_name"].iloc[0] == max(scores, key=lambda name: sum(scores[name]) / len(scores[name]))
+    assert classify_question("Which department is the worst?", frame)["metric"] == "agent_score"
+    # Rankings by call volume stay counts
+    spec = classify_question("Which agent handled the most calls?", frame)
+    assert (spec["group_by"], spec["metric"]) == ("agent_name", None)
+
+
+def test_date_filter_only_for_explicit_months():
+    frame = build_summary_frame(generate_synthetic_summaries(200, seed=3))
+    for question in ["How many calls did the marketing team handle?", "How many calls were declined refunds?",
+                     "How many calls did junior agents take?", "Average score on separate issues"]:
+        assert extract_date_range(question) is None, question
+    assert classify_question("How many calls did the billing team handle?", frame)["date_range"] is None
+    assert classify_question("How many calls in Dec 2024?", frame)["date_range"] == ("2024-12", "2024-12")
+
+
+def test_open_ended_date_phrases_count_the_whole_range():
+    summaries = generate_synthetic_summaries(500, seed=3)
+    frame = build_summary_frame(summaries)
+    result = answer_aggregate_question("How many calls since March 2025?", frame)
+    assert result["table"]["calls"].tolist() == [sum(1 for s in summaries if s["conversationDate"] >= "2025-03")]
+    result = answer_aggregate_question("How many calls before March 2025?", frame)
+    assert result["table"]["calls"].tolist() == [sum(1 for s in summaries if s["conversationDate"] < "2025-03")]
+    assert "months up to 2025-02" in result["description"]
+
+
+def test_counts_of_other_nouns_and_unfiltered_topics_go_to_retrieval():
+    frame = build_summary_frame(generate_synthetic_summaries(500, seed=3))
+    assert classify_question("How many agents are there?", frame) is None
+    assert classify_question("how many calls mention refunds?", frame) is None
+    assert classify_question("How many calls did the marketing team handle?", frame) is None
+    assert classify_question("How many unresolved Billing calls?", frame)["filters"] == {
+        "resolution_status": "Unresolved", "department": "Billing"}
+
+
+def test_superlative_attached_to_the_metric_wins():
+    summaries = generate_synthetic_summaries(500, seed=3)
+    frame = build_summary_frame(summaries)
+    result = answer_aggregate_question("Show me the top 5 calls with lowest score", frame)
+    assert (result["spec"]["aggregation"], result["spec"]["ascending"]) == ("min", True)
+    assert result["table"]["agent score"].tolist() == sorted(s["agentScore"] for s in summaries)[:5]
+
+
+def test_lowest_and_worst_sort_ascending_for_any_aggregation():
+    frame = build_summary_frame(generate_synthetic_summaries(500, seed=3))
+    result = answer_aggregate_question("Which agent had the lowest average score?", frame)
+    scores = result["table"]["mean agent score"]
+    assert result["spec"]["ascending"] and list(scores) == sorted(scores)
+    result = answer_aggregate_question("Which department has the worst average rating?", frame)
+    ratings = result["table"]["mean agent rating"]
+    assert result["spec"]["ascending"] and list(ratings) == sorted(ratings)
+
+
+def test_rated_rankings_group_by_the_ranked_dimension():
+    frame = build_summary_frame(generate_synthetic_summaries(500, seed=3))
+    for question, group_by, ascending in [("Who are the top rated agents?", "agent_name", False),
+                                          ("Which is the best rated agent?", "agent_name", False),
+                                          ("Who is the lowest rated agent?", "agent_name", True),
+                                          ("Which is the highest rated department?", "department", False)]:
+        result = answer_aggregate_question(question, frame)
+        assert result["spec"]["group_by"] == group_by and result["spec"]["metric"] == "agent_rating", question
+        assert result["spec"]["ascending"] == ascending and group_by in result["table"], question
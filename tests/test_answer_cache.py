@@ -0,0 +1,56 @@
+from src.answer_cache import SemanticAnswerCache, compute_prompt_hash, history_for_cache
+from src.local_embeddings import HashedNgramEmbeddings
+
+
+EMBEDDINGS = HashedNgramEmbeddings()
+
+
+def vector(question):
+    return SemanticAnswerCache.normalize(EMBEDDINGS.embed_query(question))
+
+
+def test_equivalent_question_hits_only_in_same_scope():
+    cache = SemanticAnswerCache(similarity_threshold=0.8, max_entries=10, ttl_seconds=0)
+    prompt_hash = compute_prompt_hash("system", "gpt-4o-mini", 0.7)
+    question = "Which agents have the highest scores?"
+    cache.store(question, "Alice and Bob.", "v1", prompt_hash, vector(question))
+
+    hit = cache.lookup("which agents have the highest scores", "v1", prompt_hash,
+                       vector("which agents have the highest scores"))
+    assert hit and hit["answer"] == "Alice and Bob."
+    assert cache.lookup("How many calls mention refunds?", "v1", prompt_hash,
+                        vector("How many calls mention refunds?")) is None
+    assert cache.lookup(question, "v1", compute_prompt_hash("other"), vector(question)) is None
+
+    stats = cache.stats("v1")
+    assert (stats["hits"], stats["lookups"], stats["entries"]) == (1, 3, 1)
+
+
+def test_new_data_version_evicts_stale_answers():
+    cache = SemanticAnswerCache(similarity_threshold=0.8, max_entries=10, ttl_seconds=0)
+    question = "Which agents have the highest scores?"
+    cache.store(question, "Alice and Bob.", "v1", "p", vector(question))
+    assert cache.stats("v2")["stale_entries"] == 1
+
+    assert cache.lookup(question, "v2", "p", vector(question)) is None
+    stats = cache.stats("v2")
+    assert stats["stale_evictions"] == 1 and stats["entries"] == 0
+
+
+def test_elliptical_follow_ups_are_keyed_by_their_conversation():
+    cache = SemanticAnswerCache(similarity_threshold=0.8, max_entries=10, ttl_seconds=0)
+    first = [{"role": "user", "content": "Which agents have the highest scores?"},
+             {"role": "assistant", "content": "Alice and Bob."}]
+    second = [{"role": "user", "content": "How many calls were unresolved in March?"},
+              {"role": "assistant", "content": "42."}]
+    for question in ["Only for Billing", "In March?", "Sort by rating", "Show me the top 5",
+                     "Expand on the second point"]:
+        cache.store(question, "answer in the first conversation", "v1",
+                    compute_prompt_hash("system", history_for_cache(question, first)), vector(question))
+        assert cache.lookup(question, "v1", compute_prompt_hash("system", history_for_cache(question, second)),
+                            vector(question)) is None, question
+        assert cache.lookup(question, "v1", compute_prompt_hash("system", history_for_cache(question, first)),
+                            vector(question)), question
+    # Questions that name what they are about, and first turns, are keyed without history
+    assert history_for_cache("Which agents have the highest scores?", second) == []
+    assert history_for_cache("Only for Billing", []) == []
@@ -0,0 +1,29 @@
+import asyncio
+import time
+from src.async_bridge import iterate_sync, run_sync
+
+
+def test_closing_bridged_iterator_cancels_async_generator():
+    state = {"closed": False}
+
+    async def numbers():
+        try:
+            for i in range(100):
+                await asyncio.sleep(0.01)
+                yield i
+        finally:
+            state["closed"] = True
+
+    iterator = iterate_sync(numbers())
+    assert [next(iterator), next(iterator)] == [0, 1]
+    iterator.close()
+    deadline = time.time() + 2
+    while not state["closed"] and time.time() < deadline:
+        time.sleep(0.01)
+    assert state["closed"]
+
+    async def add(a, b):
+        await asyncio.sleep(0)
+        return a + b
+
+    assert run_sync(add(2, 3)) == 5
@@ -0,0 +1,19 @@
+from src.chart_cache import ChartImageCache
+
+
+def test_lru_eviction_and_disk_persistence(tmp_path):
+    cache = ChartImageCache(max_entries=2, cache_dir=str(tmp_path))
+    keys = [cache.make_key(chart, "v1", {"dpi": 100}) for chart in ("rating", "sentiment", "resolution")]
+    assert cache.make_key("rating", "v2", {"dpi": 100}) != keys[0]
+    assert cache.make_key("rating", "v1", {"dpi": 200}) != keys[0]
+
+    for key, chart in zip(keys, ("rating", "sentiment", "resolution")):
+        cache.put(key, chart, "v1", f"png-{chart}", f"{chart} summary")
+    assert cache.stats()["entries"] == 2
+    assert len(list(tmp_path.glob("*.json"))) == 2
+
+    # A new process (fresh cache) reads surviving entries back from disk
+    restarted = ChartImageCache(max_entries=2, cache_dir=str(tmp_path))
+    assert restarted.get(keys[2])["image"] == "png-resolution"
+    assert restarted.get(keys[0]) is None
+    assert restarted.stats()["disk_hits"] == 1 and restarted.stats()["misses"] == 1
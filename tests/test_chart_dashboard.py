@@ -0,0 +1,22 @@
+from src.chart_dashboard import build_dashboard_specs, generate_dashboard
+from src.plotter import CHART_GENERATORS
+
+
+SUMMARIES = [
+    {"agentName": "Ann Lee", "agentScore": "88", "agentRating": "5", "customerTone": "Happy",
+     "resolutionStatus": "Resolved", "conversationLength": "9 mins", "conversationDate": "2025-03-04"},
+    {"agentName": "Bob Ray", "agentScore": "61", "agentRating": "3", "customerTone": "Angry",
+     "resolutionStatus": "Unresolved", "conversationLength": "21 mins", "conversationDate": "2025-03-06"},
+]
+
+
+def test_dashboard_renders_every_chart_in_worker_processes_then_from_cache():
+    stats = generate_dashboard(SUMMARIES, "dashboard-v1")
+    assert [chart["chart_type"] for chart in stats["charts"]] == list(CHART_GENERATORS)
+    assert all(chart["image"] for chart in stats["charts"]) and stats["rendered"] == len(CHART_GENERATORS)
+
+    again = generate_dashboard(SUMMARIES, "dashboard-v1")
+    assert again["cached"] == len(CHART_GENERATORS) and again["charts"][0]["image"] == stats["charts"][0]["image"]
+
+    specs = build_dashboard_specs(SUMMARIES)
+    assert len(specs) == len(CHART_GENERATORS) and all(chart["spec"] for chart in specs)
@@ -0,0 +1,23 @@
+import json
+from src.chart_specs import build_chart_spec, export_chart_png
+
+
+SUMMARIES = [
+    {"agentName": "Ann Lee", "agentScore": "88", "agentRating": "5", "resolutionStatus": "Resolved"},
+    {"agentName": "Ann Lee", "agentScore": "70", "agentRating": "4", "resolutionStatus": "Unresolved"},
+    {"agentName": "Bob Ray", "agentScore": "55", "agentRating": "4", "resolutionStatus": "Resolved"},
+]
+
+
+def test_spec_carries_aggregated_rows_and_png_renders_on_demand():
+    spec, summary_text = build_chart_spec("agent performance", SUMMARIES)
+    assert spec["mark"]["type"] == "bar"
+    assert spec["data"]["values"] == [{"agent": "Ann Lee", "avg_score": 79.0}, {"agent": "Bob Ray", "avg_score": 55.0}]
+    assert "2 agents" in summary_text
+
+    spec, summary_text = build_chart_spec("rating", SUMMARIES)
+    assert [row["calls"] for row in spec["data"]["values"]] == [0, 0, 0, 2, 1]
+    assert len(json.dumps(spec)) < 2000
+
+    assert build_chart_spec("sentiment", []) == (None, "No data available")
+    assert export_chart_png("resolution", SUMMARIES).startswith(b"\x89PNG")
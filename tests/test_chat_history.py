@@ -0,0 +1,45 @@
+from src.chat_history import SUMMARY_PREFIX, ChatHistoryManager, history_window_start
+
+
+def _conversation(turns):
+    history = []
+    for i in range(turns):
+        history.append({"role": "user", "content": f"question {i} " * 10, "timestamp": "2026-01-01 00:00:00"})
+        history.append({"role": "assistant", "content": f"answer {i} " * 10})
+    return history
+
+
+def test_window_respects_turn_limit_and_token_budget():
+    messages = [{"role": m["role"], "content": m["content"]} for m in _conversation(10)]
+    assert history_window_start(messages, token_budget=100_000, max_turns=3) == 14
+    start = history_window_start(messages, token_budget=60, max_turns=10)
+    assert messages[start]["role"] == "user" and len(messages) - start < 6
+
+
+def test_older_turns_are_folded_into_rolling_summary():
+    calls = []
+
+    def summarize(previous, messages):
+        calls.append(len(messages))
+        return f"{previous} +{len(messages)}".strip()
+
+    manager = ChatHistoryManager(model="gpt-4o", token_budget=100_000, max_turns=2, summarize_fn=summarize)
+    history = _conversation(5)
+    assert len(manager.build_history(history)) == 4
+
+    manager.schedule_summary(history)
+    manager.wait(timeout=5)
+    sent = manager.build_history(history)
+    assert sent[0]["role"] == "system" and sent[0]["content"] == f"{SUMMARY_PREFIX}\n+6"
+    assert [m["content"] for m in sent[1:]] == [m["content"] for m in history[6:]]
+
+    # Only turns that left the window since the last update are summarized again
+    history += _conversation(1)
+    manager.schedule_summary(history)
+    manager.wait(timeout=5)
+    assert calls == [6, 2]
+    assert manager.get_stats()["summarized_messages"] == 8
+
+    # A cleared history drops the summary
+    assert manager.build_history([]) == []
+    assert manager.get_stats()["summarized_messages"] == 0
@@ -0,0 +1,22 @@
+from src.context_budget import compute_context_budget, get_context_window, pack_documents, select_relevant
+
+
+def test_context_window_lookup():
+    assert get_context_window('gpt-4o-mini') == 128_000
+    assert get_context_window('gpt-4.1-mini-2025-04-14') == 1_047_576
+    assert get_context_window('unknown-model') == 128_000
+
+def test_budget_respects_cap_and_window():
+    assert compute_context_budget('gpt-4o', 600, 1000, budget_cap=8000) == 8000
+    assert compute_context_budget('gpt-4', 600, 1000, budget_cap=0) == 8192 - 600 - 1000 - 512
+
+def test_select_relevant_cuts_at_threshold_and_gap():
+    results = [{"score": s} for s in (0.9, 0.88, 0.85, 0.6, 0.58)]
+    assert len(select_relevant(results, score_threshold=0.0, max_gap=0.1)) == 3
+    assert len(select_relevant(results, score_threshold=0.87, max_gap=0)) == 2
+
+def test_pack_documents_stops_at_budget():
+    docs = [{"content": "word " * 50} for _ in range(10)]
+    packed, used = pack_documents(docs, 130)
+    assert len(packed) == 2
+    assert used <= 130
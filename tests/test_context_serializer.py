@@ -0,0 +1,30 @@
+import json
+from src.context_serializer import REASON_FIELDS, build_summaries_context, select_fields, serialize_summaries
+from src.retrieval_benchmark import generate_synthetic_summaries
+from src.summary_normalizer import CANONICAL_FIELDS, normalize_summaries
+
+
+def test_compact_formats_keep_rows_and_shrink_context():
+    summaries = generate_synthetic_summaries(50, seed=3)
+    question = "Which agents have the highest scores?"
+
+    fields = select_fields(question)
+    assert {'callId', 'agentName', 'agentScore'} <= set(fields)
+    assert not set(REASON_FIELDS) & set(fields)
+    assert set(REASON_FIELDS) <= set(select_fields("Why did the agent get a low score?"))
+
+    assert json.loads(serialize_summaries(summaries, 'minified')[0]) == summaries
+    table, table_fields = serialize_summaries(summaries, 'table')
+    rows = table.splitlines()[2:]
+    assert len(rows) == 50 and rows[0].split('|')[0] == summaries[0]['callId']
+
+    tokens = {fmt: build_summaries_context(summaries, question, fmt)[1]["tokens"]
+              for fmt in ('json', 'minified', 'table', 'projected')}
+    assert tokens['projected'] < tokens['table'] < tokens['minified'] < tokens['json']
+
+
+def test_json_formats_leave_out_canonical_fields():
+    summaries = normalize_summaries(generate_synthetic_summaries(5, seed=3))
+    for fmt in ('json', 'minified'):
+        rows = json.loads(serialize_summaries(summaries, fmt)[0])
+        assert rows[0] and not set(CANONICAL_FIELDS) & set(rows[0]), fmt
@@ -0,0 +1,22 @@
+import numpy as np
+from src.index_compression import RerankingIndex, build_index, estimate_index_memory, measure_recall
+
+
+def _vectors(n=500, d=32):
+    rng = np.random.default_rng(0)
+    return rng.standard_normal((n, d)).astype(np.float32)
+
+def test_sq8_reranking_matches_exact_search():
+    vectors = _vectors()
+    index, built_type = build_index(vectors, 'sq8')
+    assert built_type == 'sq8'
+    assert measure_recall(vectors, RerankingIndex(index, vectors, 4), k=10) >= 0.99
+
+def test_pq_falls_back_to_sq8_for_small_corpus():
+    _, built_type = build_index(_vectors(n=50), 'pq')
+    assert built_type == 'sq8'
+
+def test_estimate_index_memory():
+    assert estimate_index_memory(1_000_000, 3072, 'flat') == 1_000_000 * 3072 * 4
+    assert estimate_index_memory(1_000_000, 3072, 'sq8') == 1_000_000 * 3072
+    assert estimate_index_memory(1_000_000, 3072, 'pq', 64) == 1_000_000 * 64
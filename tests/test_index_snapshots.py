@@ -0,0 +1,24 @@
+import os
+from src.index_snapshots import gc_snapshots, list_snapshots, publish_snapshot, resolve_current_snapshot, snapshot_path
+
+
+def _make_snapshot(root, version):
+    os.makedirs(snapshot_path(root, version))
+
+def test_publish_and_resolve(tmp_path):
+    root = str(tmp_path)
+    assert resolve_current_snapshot(root) == (None, None)
+    _make_snapshot(root, "20250101-000000-aaaaaa")
+    publish_snapshot(root, "20250101-000000-aaaaaa")
+    assert resolve_current_snapshot(root) == (snapshot_path(root, "20250101-000000-aaaaaa"), "20250101-000000-aaaaaa")
+
+def test_gc_keeps_current_previous_and_newer_builds(tmp_path):
+    root = str(tmp_path)
+    versions = ["20250101-000000-a", "20250102-000000-b", "20250103-000000-c", "20250104-000000-d"]
+    for version in versions:
+        _make_snapshot(root, version)
+    open(os.path.join(root, "index.faiss"), "w").close()
+    publish_snapshot(root, versions[2])
+    assert gc_snapshots(root, keep=2) == versions[:1]
+    assert list_snapshots(root) == versions[1:]
+    assert not os.path.exists(os.path.join(root, "index.faiss"))
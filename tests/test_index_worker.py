@@ -0,0 +1,24 @@
+import json
+import time
+from src.config import Config
+from src.index_worker import IndexWorker
+from src.retrieval_benchmark import generate_synthetic_summaries
+
+
+def test_reindex_job_reports_progress(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'EMBEDDING_MODEL', 'local-hash')
+    monkeypatch.setattr(Config, 'EMBEDDING_BATCH_SIZE', 50)
+    summaries_file = tmp_path / "summaries.json"
+    summaries_file.write_text(json.dumps(generate_synthetic_summaries(200, seed=1)))
+
+    worker = IndexWorker()
+    job_id = worker.submit("unused", str(summaries_file), str(tmp_path / "vector_store"))
+    assert worker.submit("unused", str(summaries_file), str(tmp_path / "vector_store")) == job_id
+
+    deadline = time.time() + 60
+    while worker.get_status()["state"] in ("queued", "running") and time.time() < deadline:
+        time.sleep(0.05)
+    status = worker.get_status()
+    assert status["state"] == "done"
+    assert status["docs_done"] == status["docs_total"] == status["document_count"] == 200
+    assert status["snapshot_version"]
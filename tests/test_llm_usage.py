@@ -0,0 +1,21 @@
+from types import SimpleNamespace
+from src.llm_usage import add_usage, estimate_cost, format_usage, new_stage_stats, usage_to_dict
+
+
+def test_usage_records_cached_prompt_tokens_from_openai_and_langchain():
+    openai_usage = SimpleNamespace(prompt_tokens=10_000, completion_tokens=200,
+                                   prompt_tokens_details=SimpleNamespace(cached_tokens=8_192))
+    langchain_usage = {"input_tokens": 10_000, "output_tokens": 200, "input_token_details": {"cache_read": 8_192}}
+    expected = {"prompt_tokens": 10_000, "cached_tokens": 8_192, "completion_tokens": 200}
+    assert usage_to_dict(openai_usage) == expected
+    assert usage_to_dict(langchain_usage) == expected
+    assert usage_to_dict(None)["prompt_tokens"] == 0
+
+    # Cached input is billed at a discount
+    assert estimate_cost("gpt-4.1-mini", 10_000, 200, 8_192) < estimate_cost("gpt-4.1-mini", 10_000, 200)
+
+    stats = new_stage_stats()
+    add_usage(stats, openai_usage, "gpt-4.1-mini")
+    add_usage(stats, langchain_usage, "gpt-4.1-mini")
+    assert stats["calls"] == 2 and stats["cached_tokens"] == 16_384
+    assert "8,192/10,000 prompt tokens cached" in format_usage(expected)
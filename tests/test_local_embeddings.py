@@ -0,0 +1,25 @@
+import numpy as np
+from src.local_embeddings import HashedNgramEmbeddings, is_local_embedding_model, parse_local_dimension
+
+
+def test_model_name_parsing():
+    assert is_local_embedding_model('local-hash')
+    assert not is_local_embedding_model('text-embedding-3-small')
+    assert parse_local_dimension('local-hash') == 768
+    assert parse_local_dimension('local-hash-512') == 512
+
+def test_embeddings_are_deterministic_and_normalized():
+    texts = ["Wi-Fi router keeps dropping", "Refund for a delayed package", ""]
+    first = HashedNgramEmbeddings(dimension=256).embed_array(texts)
+    second = HashedNgramEmbeddings(dimension=256).embed_array(texts)
+    assert first.shape == (3, 256)
+    assert np.array_equal(first, second)
+    assert np.allclose(np.linalg.norm(first[:2], axis=1), 1.0)
+    assert not first[2].any()
+
+def test_similar_texts_score_higher():
+    embedder = HashedNgramEmbeddings(dimension=256)
+    query = np.array(embedder.embed_query("wifi router dropping"))
+    docs = embedder.embed_array(["the wifi router keeps dropping", "billing refund request"])
+    scores = docs @ query
+    assert scores[0] > scores[1]
@@ -0,0 +1,108 @@
+import asyncio
+from types import SimpleNamespace
+from src.map_reduce_chat import MapReduceChat
+from src.retrieval_benchmark import generate_synthetic_summaries
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def create(self, **kwargs):
+        self.requests.append(kwargs)
+        usage = SimpleNamespace(prompt_tokens=1000, completion_tokens=50)
+        if kwargs.get("stream"):
+            return self._stream(usage)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        message = SimpleNamespace(content="3 unresolved calls")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+    async def _stream(self, usage):
+        for text in ("Final ", "answer"):
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))], usage=None)
+        yield SimpleNamespace(choices=[], usage=usage)
+
+
+class FakeClient:
+    def __init__(self, completions):
+        self.chat = SimpleNamespace(completions=completions)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+
+def test_map_reduce_answers_batches_concurrently_and_streams_reduce():
+    completions = FakeCompletions()
+    chat = MapReduceChat(api_key="sk-test", model="gpt-4.1-mini", concurrency=3)
+    chat._client = lambda: FakeClient(completions)
+    chat.batch_token_budget = lambda prompt_tokens=0: 500
+    summaries = generate_synthetic_summaries(200, seed=4)
+
+    batches = chat.build_batches(summaries, "How many calls are unresolved?", "system")
+    assert len(batches) > 3
+    assert sum(batch["summaries"] for batch in batches) == 200
+    assert all(batch["tokens"] <= 500 for batch in batches)
+
+    partials = chat.map("How many calls are unresolved?", batches, "system")
+    answer = "".join(chat.reduce_stream("How many calls are unresolved?", partials, "system", summaries=200))
+
+    assert answer == "Final answer"
+    assert len(partials) == len(batches)
+    assert 1 < completions.max_in_flight <= 3
+    assert chat.stats["map"]["calls"] == len(batches)
+    assert chat.stats["map"]["prompt_tokens"] == 1000 * len(batches)
+    assert chat.stats["reduce"]["calls"] == 1 and chat.stats["reduce"]["cost_usd"] > 0
+
+
+class FailingFirstBatch(FakeCompletions):
+    async def create(self, **kwargs):
+        if not kwargs.get("stream") and "batch 1 of" in kwargs["messages"][0]["content"]:
+            raise RuntimeError("rate limited")
+        return await super().create(**kwargs)
+
+
+def test_failed_map_batch_is_disclosed_in_reduce_prompt():
+    completions = FailingFirstBatch()
+    chat = MapReduceChat(api_key="sk-test", model="gpt-4.1-mini", concurrency=3)
+    chat._client = lambda: FakeClient(completions)
+    chat.batch_token_budget = lambda prompt_tokens=0: 500
+    batches = chat.build_batches(generate_synthetic_summaries(200, seed=4), "How many calls are unresolved?", "system")
+
+    partials = chat.map("How many calls are unresolved?", batches, "system")
+    "".join(chat.reduce_stream("How many calls are unresolved?", partials, "system", summaries=200))
+
+    omitted, covered = batches[0]["summaries"], 200 - batches[0]["summaries"]
+    assert len(partials) == len(batches) - 1
+    assert chat.stats["map"]["failed"] == 1 and chat.stats["map"]["omitted_summaries"] == omitted
+    reduce_prompt = completions.requests[-1]["messages"][0]["content"]
+    assert f"covering {covered} call summaries" in reduce_prompt
+    assert f"{omitted} of the 200 call summaries could not be analyzed" in reduce_prompt
+
+
+def test_fold_groups_get_their_own_coverage_and_the_reduce_budget(monkeypatch):
+    completions = FailingFirstBatch()
+    chat = MapReduceChat(api_key="sk-test", model="gpt-4.1-mini", concurrency=3, max_tokens=900, map_max_tokens=100)
+    chat._client = lambda: FakeClient(completions)
+    chat.batch_token_budget = lambda prompt_tokens=0: 500
+    batches = chat.build_batches(generate_synthetic_summaries(200, seed=4), "How many calls are unresolved?", "system")
+    partials = chat.map("How many calls are unresolved?", batches, "system")
+
+    # Partial answers too large for one reduce request are folded in groups first
+    monkeypatch.setattr("src.map_reduce_chat.compute_context_budget", lambda *args: 40)
+    "".join(chat.reduce_stream("How many calls are unresolved?", partials, "system", summaries=200))
+
+    folds = [request for request in completions.requests
+             if "intermediate answer" in request["messages"][0]["content"]]
+    assert folds and all(request["max_tokens"] == 900 for request in folds)
+    first_group_calls = sum(batch["summaries"] for batch in batches[1:1 + folds[0]["messages"][-1]["content"].count("Batch ")])
+    assert f"covering {first_group_calls} call summaries" in folds[0]["messages"][0]["content"]
+    assert not any("could not be analyzed" in request["messages"][0]["content"] for request in folds)
+    assert "could not be analyzed" in completions.requests[-1]["messages"][0]["content"]
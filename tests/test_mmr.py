@@ -0,0 +1,21 @@
+import numpy as np
+from src.mmr import mmr_select
+
+
+def test_mmr_drops_near_duplicates_and_prefers_diverse_candidates():
+    query = np.array([1.0, 0.0, 0.0])
+    candidates = np.array([
+        [1.0, 0.10, 0.0],    # most relevant
+        [1.0, 0.11, 0.0],    # near-duplicate of the first
+        [1.0, 0.12, 0.001],  # near-duplicate of the first
+        [0.8, 0.0, 0.6],     # relevant, different direction
+        [0.0, 1.0, 0.0],     # irrelevant
+    ])
+
+    picked = mmr_select(query, candidates, k=3, lambda_mult=0.7, duplicate_threshold=0.99)
+    assert picked[:2] == [0, 3]
+    assert 1 not in picked and 2 not in picked
+
+    # Relevance only, no duplicate filter: plain top-k by similarity
+    assert mmr_select(query, candidates, k=3, lambda_mult=1.0) == [0, 1, 2]
+    assert mmr_select(query, candidates[:0], k=3) == []
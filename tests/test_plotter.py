@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+from src.plotter import (build_chart_frame, chart_data, generate_chart, get_chart_frame, histogram_data,
+                         time_bucket_counts)
+
+
+SUMMARIES = [
+    {"agentName": "Ann Lee", "agentScore": "88", "agentRating": "5", "customerTone": "Happy",
+     "resolutionStatus": "Resolved", "conversationlength": "9 mins"},
+    {"agentName": "Bob Ray", "agentScore": "n/a", "customerTone": "ANGRY",
+     "resolutionStatus": "Unresolved", "conversationLength": "1 hour 30 minutes"},
+]
+
+
+def test_chart_frame_is_vectorized_cached_and_shared():
+    frame = build_chart_frame(SUMMARIES)
+    assert frame["score"].tolist() == [88, 0]
+    assert frame["rating"].isna().tolist() == [False, True]
+    assert frame["duration_minutes"].tolist() == [9.0, 90.0]
+    assert frame["sentiment"].astype(str).tolist() == ["happy", "angry"]
+    assert frame["resolved"].tolist() == [True, False]
+
+    assert get_chart_frame(SUMMARIES, "v1") is get_chart_frame([], "v1")
+    image, text = generate_chart("resolution", SUMMARIES, "v1")
+    assert image and "50.0% (1/2" in text
+
+
+def test_large_corpora_switch_to_bounded_aggregates():
+    summaries = [{"agentName": f"Agent {i % 40}", "agentScore": str(50 + i % 40),
+                  "conversationLength": f"{5 + i % 30} mins", "conversationDate": f"2025-{1 + i % 12:02d}-15"}
+                 for i in range(400)]
+    duration, _ = chart_data("duration", summaries)
+    assert "bin" in duration and duration["calls"].sum() == 400 and len(duration) <= 21
+
+    counts, _ = chart_data("agent count", summaries)
+    assert len(counts) == 26 and counts["agent"].iloc[-1] == "Other (15 agents)" and counts["calls"].sum() == 400
+
+    volume, summary_text = chart_data("volume", summaries)
+    assert volume["calls"].sum() == 400 and len(volume) <= 60 and "per week" in summary_text
+    months, bucket = time_bucket_counts(volume["period"].repeat(volume["calls"]), max_buckets=12)
+    assert bucket == "month" and months["calls"].tolist() == [34] * 4 + [33] * 8
+
+    assert histogram_data(np.array([0, 9.5, 10, 19]), bins=2)["calls"].tolist() == [2, 2]
+    days, bucket = time_bucket_counts(pd.Series(pd.to_datetime(["2025-03-03", "2025-03-05", None])))
+    assert bucket == "day" and days["calls"].tolist() == [1, 0, 1]
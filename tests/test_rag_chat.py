@@ -0,0 +1,86 @@
+import json
+import threading
+from src.config import Config
+from src.rag_chat import get_shared_chatbot, reset_shared_chatbots
+from src.async_bridge import run_sync
+from src.retrieval_benchmark import generate_synthetic_summaries
+
+
+def test_sessions_share_one_chatbot_and_index(tmp_path, monkeypatch):
+    summaries_file = tmp_path / "summaries.json"
+    summaries_file.write_text(json.dumps(generate_synthetic_summaries(50, seed=1)))
+    monkeypatch.setattr(Config, 'EMBEDDING_MODEL', 'local-hash')
+    monkeypatch.setattr(Config, 'SUMMARIES_FILE', str(summaries_file))
+    monkeypatch.setattr(Config, 'VECTOR_STORE_PATH', str(tmp_path / "vector_store"))
+    reset_shared_chatbots()
+    try:
+        first = get_shared_chatbot("sk-test", model="gpt-4o-mini")
+        assert get_shared_chatbot("sk-test", model="gpt-4o-mini") is first
+        other_model = get_shared_chatbot("sk-test", model="gpt-4o")
+        assert other_model is not first
+        assert other_model.vector_store_manager is first.vector_store_manager
+        # Another API key gets its own chatbot (LLM and query embeddings) but the same loaded index
+        other_key = get_shared_chatbot("sk-other", model="gpt-4o-mini")
+        assert other_key is not first and other_key.api_key == "sk-other"
+        assert other_key.vector_store_manager is first.vector_store_manager
+    finally:
+        reset_shared_chatbots()
+
+
+def test_message_assembly_runs_off_the_event_loop(tmp_path, monkeypatch):
+    summaries_file = tmp_path / "summaries.json"
+    summaries_file.write_text(json.dumps(generate_synthetic_summaries(50, seed=1)))
+    monkeypatch.setattr(Config, 'EMBEDDING_MODEL', 'local-hash')
+    monkeypatch.setattr(Config, 'SUMMARIES_FILE', str(summaries_file))
+    monkeypatch.setattr(Config, 'VECTOR_STORE_PATH', str(tmp_path / "vector_store"))
+    monkeypatch.setattr(Config, 'ANALYTICS_ENGINE_ENABLED', False)
+    reset_shared_chatbots()
+    try:
+        chatbot = get_shared_chatbot("sk-test")
+        assemble, threads = chatbot._assemble_messages, {}
+
+        def record(*args):
+            threads["assemble"] = threading.current_thread()
+            return assemble(*args)
+
+        async def prepare():
+            threads["loop"] = threading.current_thread()
+            return await chatbot._aprepare("Which agents handled refund calls?", [], None, {})
+
+        monkeypatch.setattr(chatbot, "_assemble_messages", record)
+        scope, cached = run_sync(prepare())
+        assert cached is None and scope["messages"]
+        assert threads["assemble"] is not threads["loop"]
+    finally:
+        reset_shared_chatbots()
+
+
+def test_repeat_question_on_a_later_turn_hits_the_answer_cache(tmp_path, monkeypatch):
+    summaries_file = tmp_path / "summaries.json"
+    summaries_file.write_text(json.dumps(generate_synthetic_summaries(50, seed=1)))
+    monkeypatch.setattr(Config, 'EMBEDDING_MODEL', 'local-hash')
+    monkeypatch.setattr(Config, 'SUMMARIES_FILE', str(summaries_file))
+    monkeypatch.setattr(Config, 'VECTOR_STORE_PATH', str(tmp_path / "vector_store"))
+    monkeypatch.setattr(Config, 'ANALYTICS_ENGINE_ENABLED', False)
+    monkeypatch.setattr(Config, 'ANSWER_CACHE_ENABLED', True)
+    reset_shared_chatbots()
+    try:
+        chatbot = get_shared_chatbot("sk-test")
+        question = "Which agents handled lost package calls?"
+        scope, cached = run_sync(chatbot._aprepare(question, [], None, {}))
+        assert cached is None
+        scope.pop('messages')
+        chatbot.answer_cache.store(question, "Emma and Raj.", **scope)
+
+        history = [{"role": "user", "content": question}, {"role": "assistant", "content": "Emma and Raj."},
+                   {"role": "user", "content": "How many calls were escalated?"},
+                   {"role": "assistant", "content": "Twelve."}]
+        _, cached = run_sync(chatbot._aprepare(question, history, None, {}))
+        assert cached and cached["answer"] == "Emma and Raj."
+        # A follow-up depends on the earlier turns, so the history stays in its key
+        follow_up = "Which agents handled lost package calls for them?"
+        chatbot.answer_cache.store(follow_up, "Only Emma.", **scope)
+        _, cached = run_sync(chatbot._aprepare(follow_up, history, None, {}))
+        assert cached is None
+    finally:
+        reset_shared_chatbots()
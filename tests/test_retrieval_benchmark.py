@@ -0,0 +1,32 @@
+from src.retrieval_benchmark import _evaluate_rankings, build_query_set, generate_synthetic_summaries, run_benchmark
+
+
+def test_synthetic_summaries_follow_schema():
+    summaries = generate_synthetic_summaries(50)
+    assert len(summaries) == 50
+    for field in ('callId', 'conversationDate', 'conversationLength', 'agentName', 'department',
+                  'issueCategory', 'resolutionStatus', 'agentScore', 'agentRating'):
+        assert field in summaries[0]
+    assert summaries == generate_synthetic_summaries(50)
+
+def test_query_labels_match_corpus():
+    summaries = generate_synthetic_summaries(200)
+    for query in build_query_set(summaries, queries_per_type=3):
+        if query['type'] == 'unresolved':
+            assert all(summaries[pos]['resolutionStatus'] == 'Unresolved' for pos in query['relevant'])
+
+def test_recall_and_mrr():
+    queries = [{"type": "agent", "relevant": {1, 2}}]
+    metrics = _evaluate_rankings([[0, 1, 2]], queries, [1, 3])
+    assert metrics['agent']['recall@1'] == 0.0
+    assert metrics['agent']['recall@3'] == 1.0
+    assert metrics['overall']['mrr'] == 0.5
+
+def test_per_million_memory_excludes_the_codebook():
+    summaries = generate_synthetic_summaries(300)
+    queries = build_query_set(summaries, queries_per_type=1)
+    flat = run_benchmark(summaries, queries, 'flat')
+    pq = run_benchmark(summaries, queries, 'pq')
+    assert pq['index_type'] == 'pq'
+    assert pq['index_memory_per_million_bytes'] < flat['index_memory_per_million_bytes']
+    assert pq['index_fixed_overhead_bytes'] > 0
@@ -0,0 +1,29 @@
+from src.streaming import CURSOR, StreamRenderer, format_stream_stats
+
+
+class RecordingPlaceholder:
+    def __init__(self):
+        self.renders = []
+
+    def markdown(self, text):
+        self.renders.append(text)
+
+
+def test_renderer_coalesces_updates_and_reports_stats():
+    placeholder = RecordingPlaceholder()
+    renderer = StreamRenderer(placeholder, flush_interval_ms=60_000, flush_chars=100)
+    chunks = [f"tok{i} " for i in range(200)]
+
+    text = renderer.render(iter(chunks))
+
+    assert text == "".join(chunks)
+    assert placeholder.renders[-1] == text
+    # First chunk is drawn right away, then roughly one redraw per 100 buffered characters
+    assert placeholder.renders[0] == "tok0 " + CURSOR
+    assert renderer.chunks == 200
+    assert 2 < len(placeholder.renders) < 30
+
+    stats = renderer.get_stats()
+    assert stats["ttft_seconds"] >= 0 and stats["output_tokens"] > 0
+    assert "First token" in format_stream_stats(stats)
+    assert format_stream_stats(StreamRenderer(RecordingPlaceholder()).get_stats()) == ""
@@ -7,3 +7,20 @@ def test_basic():
     transcript = "Short sentence. This is a longer sentence that should rank higher. Small."
     summary = summarize_call(transcript, max_sentences=1)
     assert "This is a longer sentence" in summary
+
+def test_bulk_chat_messages_keep_a_stable_prefix():
+    from src.context_serializer import build_summaries_context
+    from src.retrieval_benchmark import generate_synthetic_summaries
+    from src.summarizer import build_bulk_chat_messages
+    template = "Schema and rules\nAll Call Summary:\n{{PASTE ENTIRE SUMMARY HERE}}"
+    summaries = generate_synthetic_summaries(20, seed=1)
+    # The default context format must not depend on the question's fields
+    first_context, _ = build_summaries_context(summaries, "How many calls were unresolved?")
+    second_context, _ = build_summaries_context(summaries, "Who scored best?")
+    first = build_bulk_chat_messages("How many calls were unresolved?", [], first_context, "system", template, "guardrail")
+    second = build_bulk_chat_messages("Who scored best?", [{"role": "user", "content": "hi"},
+                                                           {"role": "assistant", "content": "hello"}],
+                                      second_context, "system", template, "guardrail")
+    assert first[0] == second[0]
+    assert first[0]["content"].endswith(f"All Call Summary:\n{first_context}")
+    assert second[-1] == {"role": "user", "content": "User Question: Who scored best?"}
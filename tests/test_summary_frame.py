@@ -0,0 +1,15 @@
+import pandas as pd
+from src.summary_frame import build_summary_frame, parse_duration_seconds
+
+
+def test_frame_types_and_duration_parsing():
+    frame = build_summary_frame([
+        {"callId": "A1", "agentName": "Ann Lee", "department": "Billing", "agentScore": "85",
+         "conversationDate": "2025-03-04", "conversationLength": "12 mins 30 secs"},
+        {"callId": "A2", "agentScore": "n/a", "conversationDate": "", "conversationLength": "1 hour 5 minutes"},
+    ])
+    assert frame["agent_score"].tolist()[0] == 85 and pd.isna(frame["agent_score"].tolist()[1])
+    assert frame["month"].tolist() == ["2025-03", "undated"]
+    assert frame["department"].tolist() == ["Billing", "Unknown"]
+    assert frame["duration_seconds"].tolist() == [750.0, 3900.0]
+    assert parse_duration_seconds(pd.Series(["1:02:03", "4:05"])).tolist() == [3723.0, 245.0]
@@ -0,0 +1,37 @@
+from src.summary_frame import build_summary_frame
+from src.summary_normalizer import normalize_summaries, parse_datetime, parse_duration, parse_int
+
+
+def test_normalization_adds_canonical_fields_and_frame_uses_them():
+    assert [parse_duration(text) for text in ["5 mins 30 secs", "1 hr 2 mins", "12:30", "1:02:03", "soon"]] == \
+        [330, 3720, 750, 3723, None]
+    assert [parse_int(value) for value in [85, "85/100", "4 stars", 4.6, "n/a", None]] == [85, 85, 4, 5, None, None]
+    assert [parse_int(value) for value in ["4.5", 3.5, "87.5", 2.5]] == [5, 4, 88, 3]
+    assert parse_datetime("2025-01-15", "2:05 PM - 2:20 PM") == "2025-01-15T14:05:00"
+    assert parse_datetime("01/15/2025") == "2025-01-15T00:00:00"
+    assert parse_datetime("yesterday", "10:00") is None
+
+    original = {"callId": "A1", "agentScore": "85", "agentRating": "4 stars", "conversationLength": "1 hr 2 mins",
+                "conversationDate": "2025-01-15", "conversationTime": "10:15 - 11:17"}
+    normalized, = normalize_summaries([original])
+    assert "duration_seconds" not in original and normalized["agentScore"] == "85"
+    assert (normalized["duration_seconds"], normalized["score_int"], normalized["rating_int"],
+            normalized["conversation_datetime"]) == (3720, 85, 4, "2025-01-15T10:15:00")
+
+    # Canonical fields win; summaries saved before normalization are still parsed
+    frame = build_summary_frame([
+        {**normalized, "conversationLength": "unparseable"},
+        {"callId": "A2", "agentScore": "70", "conversationLength": "5 mins", "conversationDate": "2025-02-01"},
+    ])
+    assert frame["duration_seconds"].tolist() == [3720.0, 300.0]
+    assert frame["agent_score"].tolist() == [85.0, 70.0]
+    assert frame["agent_rating"].tolist()[0] == 4.0
+    assert frame["month"].tolist() == ["2025-01", "2025-02"]
+
+
+def test_frame_keeps_fractional_scores_and_ratings():
+    summaries = normalize_summaries([{"agentScore": "87.5", "agentRating": "4.5"}, {"agentScore": 70, "agentRating": 3.5},
+                                     {"agentScore": "85/100", "agentRating": "4 stars"}])
+    frame = build_summary_frame(summaries)
+    assert frame["agent_score"].tolist() == [87.5, 70.0, 85.0]
+    assert frame["agent_rating"].tolist() == [4.5, 3.5, 4.0]
@@ -0,0 +1,76 @@
+import json
+from src.summary_normalizer import normalize_summaries
+from src.summary_store import SummaryStore
+
+
+def test_paginated_filtered_queries_and_csv_export(tmp_path):
+    summaries_file = tmp_path / "bulk_summaries.json"
+    summaries = [
+        {"callId": f"C{i}", "agentName": ["Ann", "Bob", "Cy"][i % 3], "department": "Billing" if i % 2 else "Sales",
+         "resolutionStatus": "Resolved" if i % 4 else "Unresolved", "conversationDate": f"2025-01-{i + 1:02d}",
+         "agentScore": str(50 + i), "conversationLength": f"{i} mins"}
+        for i in range(20)
+    ]
+    summaries_file.write_text(json.dumps(summaries))
+    store = SummaryStore(str(summaries_file))
+
+    assert store.refresh() and not store.refresh()
+    assert store.distinct_values("agent_name") == ["Ann", "Bob", "Cy"]
+    assert store.date_range() == ("2025-01-01", "2025-01-20")
+
+    page, total = store.query_page(page=2, page_size=8)
+    assert total == 20 and page["callId"].tolist() == [f"C{i}" for i in range(8, 16)]
+    assert list(page.columns)[:2] == ["callId", "agentName"]
+
+    filters = {"agents": ["Ann", "Bob"], "departments": ["Billing"], "date_from": "2025-01-02", "date_to": "2025-01-15"}
+    page, total = store.query_page(filters, sort_by="score_int", descending=True, page_size=3)
+    assert total == 5 and page["callId"].tolist() == ["C13", "C9", "C7"]
+
+    csv_lines = store.export_csv(filters, sort_by="duration_seconds").decode("utf-8").splitlines()
+    assert csv_lines[0].startswith("callId,agentName") and len(csv_lines) == 6 and csv_lines[1].startswith("C1,")
+
+    # A changed summaries file rebuilds the table
+    summaries_file.write_text(json.dumps(summaries[:5]))
+    assert store.refresh()
+    assert store.query_page()[1] == 5
+
+
+def test_keyset_pages_match_offset_paging_and_rebuilds_run_in_background(tmp_path):
+    summaries_file = tmp_path / "bulk_summaries.json"
+    summaries = [{"callId": f"C{i}", "agentName": ["Ann", "Bob"][i % 2], "resolutionStatus": "Resolved",
+                  "agentScore": "n/a" if i % 7 == 0 else str(i % 10), "conversationDate": f"2025-02-{i % 28 + 1:02d}"}
+                 for i in range(100)]
+    summaries_file.write_text(json.dumps(summaries))
+    store = SummaryStore(str(summaries_file))
+    store.refresh()
+
+    def expected(rows, page, size):
+        return [row["callId"] for row in rows][(page - 1) * size:page * size]
+
+    by_score = sorted(enumerate(summaries), key=lambda item: (item[1]["agentScore"] == "n/a" and -1
+                                                              or int(item[1]["agentScore"]), item[0]), reverse=True)
+    ann = [summary for _, summary in by_score if summary["agentName"] == "Ann"]
+    # Jump ahead, then step forward and back: every page equals the OFFSET page
+    for page in (4, 5, 2, 1, 6):
+        rows, total = store.query_page({"agents": ["Ann"]}, sort_by="score_int", descending=True, page=page, page_size=9)
+        assert total == 50 and rows["callId"].tolist() == expected(ann, page, 9), page
+
+    summaries_file.write_text(json.dumps(summaries[:10]))
+    rebuilt = store.refresh(wait=False)
+    # The previous table serves queries until the new one is swapped in
+    assert store.query_page()[1] in (100, 10)
+    assert (store.refresh() or rebuilt) and not store.building
+    assert store.query_page()[1] == 10
+
+
+def test_canonical_fields_stay_out_of_the_table_and_csv(tmp_path):
+    summaries_file = tmp_path / "bulk_summaries.json"
+    summaries_file.write_text(json.dumps(normalize_summaries(
+        [{"callId": f"C{i}", "agentName": "Ann", "agentScore": "9/10", "conversationLength": f"{i} mins"}
+         for i in range(3)])))
+    store = SummaryStore(str(summaries_file))
+
+    page, _ = store.query_page(sort_by="duration_seconds", descending=True)
+    assert list(page.columns) == ["callId", "agentName", "agentScore", "conversationLength"]
+    assert page["callId"].tolist() == ["C2", "C1", "C0"]
+    assert store.export_csv().decode("utf-8").splitlines()[0] == "callId,agentName,agentScore,conversationLength"
@@ -0,0 +1,80 @@
+import threading
+import time
+from datetime import date
+from src.vector_shards import (OPEN_START, UNDATED_SHARD, ShardedVectorStore, extract_date_range, select_shards,
+                               shard_key)
+
+
+TODAY = date(2025, 3, 15)
+
+def test_shard_key():
+    assert shard_key({"conversationDate": "2025-01-31"}) == "2025-01"
+    assert shard_key({"conversationDate": "N/A"}) == UNDATED_SHARD
+
+def test_extract_date_range():
+    assert extract_date_range("calls on 2024-11-02", TODAY) == ("2024-11", "2024-11")
+    assert extract_date_range("complaints between January and February 2025", TODAY) == ("2025-01", "2025-02")
+    assert extract_date_range("escalations in December", TODAY) == ("2024-12", "2024-12")
+    assert extract_date_range("last month", TODAY) == ("2025-02", "2025-02")
+    assert extract_date_range("agents in 2024", TODAY) == ("2024-01", "2024-12")
+    assert extract_date_range("may I see unresolved calls", TODAY) is None
+    assert extract_date_range("calls in Sept. and Oct 2024", TODAY) == ("2024-09", "2024-10")
+    assert extract_date_range("refunds in May 2024", TODAY) == ("2024-05", "2024-05")
+
+def test_extract_date_range_ignores_words_starting_with_month_names():
+    for query in ["Which agents declined refunds?", "marketing department", "junior agents",
+                  "separate issues", "decision to escalate", "octane", "augmented answers", "novice agents"]:
+        assert extract_date_range(query, TODAY) is None, query
+
+def test_extract_date_range_open_ended_phrases():
+    assert extract_date_range("complaints since March 2024", TODAY) == ("2024-03", "2025-03")
+    assert extract_date_range("calls after January 2025", TODAY) == ("2025-02", "2025-03")
+    assert extract_date_range("escalations before June 2024", TODAY) == (OPEN_START, "2024-05")
+    assert extract_date_range("refunds until June 2024", TODAY) == (OPEN_START, "2024-06")
+    assert extract_date_range("calls from January to March 2024", TODAY) == ("2024-01", "2024-03")
+    assert extract_date_range("calls from Billing in March 2024", TODAY) == ("2024-03", "2024-03")
+    # Relational words that cannot be placed search everything
+    assert extract_date_range("callbacks after the outage in March 2024", TODAY) is None
+    assert extract_date_range("calls before January or after March 2024", TODAY) is None
+
+def test_select_shards_keeps_undated():
+    keys = ["2024-12", "2025-01", "2025-02", UNDATED_SHARD]
+    assert select_shards(keys, ("2025-01", "2025-01")) == ["2025-01", UNDATED_SHARD]
+    assert select_shards(keys, None) == keys
+    assert select_shards(keys, (OPEN_START, "2025-01")) == ["2024-12", "2025-01", UNDATED_SHARD]
+
+def test_cold_shards_load_in_parallel_and_once():
+    loads, running, peak = [], [0], [0]
+    lock = threading.Lock()
+
+    class Shard:
+        def similarity_search_with_score_by_vector(self, embedding, k):
+            return []
+
+    def load_shard(key, read_only):
+        with lock:
+            loads.append(key)
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+        return Shard()
+
+    store = ShardedVectorStore({"2025-01": 1, "2025-02": 1, "2025-03": 1}, 4, load_shard, max_workers=3)
+    threads = [threading.Thread(target=store.similarity_search_with_score_by_vector, args=([0.0] * 4,))
+               for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(loads) == ["2025-01", "2025-02", "2025-03"]
+    assert peak[0] > 1
+
+def test_extract_date_range_ignores_counts_that_look_like_years():
+    for query in ["last 2000 calls", "top 2050 agents", "average score in the last 2025 calls",
+                  "show 2024 tickets", "summaries of 2030 customers"]:
+        assert extract_date_range(query, TODAY) is None, query
+    assert extract_date_range("2024 escalations", TODAY) == ("2024-01", "2024-12")
+    assert extract_date_range("calls during 2024", TODAY) == ("2024-01", "2024-12")
+    assert extract_date_range("refunds for year 2024", TODAY) == ("2024-01", "2024-12")
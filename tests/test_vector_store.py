@@ -0,0 +1,76 @@
+import json
+import threading
+from src.vector_store import (
+    QueryVectorsOnly,
+    VectorStoreManager,
+    _format_document_v1,
+    get_embeddings,
+    get_shared_vector_store_manager,
+    measure_document_savings,
+    reset_shared_vector_store_managers,
+    serialize_summary,
+)
+
+
+SUMMARY = {
+    "callId": "C-1", "agentName": "Alice", "agentId": "N/A", "customerName": "Bob",
+    "conversationDate": "2025-01-02", "conversationLength": "5 minutes 10 seconds",
+    "department": "Billing", "issueCategory": "Refund", "callSummary": "Customer asked for a refund.",
+    "customerEmotions": "Not Expressed", "agentScore": "85", "agentRating": "4",
+    "resolutionStatus": "Resolved", "filename": ""
+}
+
+def test_serialize_summary_omits_empty_fields():
+    text = serialize_summary(SUMMARY)
+    assert "Duration: 5 minutes 10 seconds" in text
+    assert "Score: 85/100" in text
+    assert "AgentID" not in text and "CustEmotions" not in text and "File" not in text
+    assert len(text) < len(_format_document_v1(SUMMARY)) / 2
+
+def test_measure_document_savings():
+    stats = measure_document_savings([SUMMARY])
+    assert stats["saved"]["chars"] > 0 and stats["saved"]["context_tokens"] > 0
+
+
+def test_loading_one_shared_index_does_not_block_others(tmp_path, monkeypatch):
+    slow_started, release = threading.Event(), threading.Event()
+
+    def fake_create(self, api_key, force_recreate=False, progress_callback=None):
+        if self.vector_store_path.endswith("slow"):
+            slow_started.set()
+            release.wait(5)
+        return True
+
+    monkeypatch.setattr(VectorStoreManager, "create_vector_store", fake_create)
+    reset_shared_vector_store_managers()
+    try:
+        slow = threading.Thread(target=get_shared_vector_store_manager, args=("sk-a", None, str(tmp_path / "slow")))
+        slow.start()
+        assert slow_started.wait(5)
+        fast = get_shared_vector_store_manager("sk-a", None, str(tmp_path / "fast"))
+        assert not release.is_set() and fast is get_shared_vector_store_manager("sk-b", None, str(tmp_path / "fast"))
+        release.set()
+        slow.join(5)
+    finally:
+        release.set()
+        reset_shared_vector_store_managers()
+
+
+def test_shared_index_is_searched_with_caller_query_vectors(tmp_path):
+    summaries_file = tmp_path / "bulk_summaries.json"
+    summaries_file.write_text(json.dumps([dict(SUMMARY, callId=f"C-{i}", conversationDate=f"2025-0{i % 3 + 1}-02")
+                                          for i in range(6)]))
+    query_vector = get_embeddings(model="local-hash").embed_query("refund")
+    for sharded in (False, True):
+        path = str(tmp_path / f"index-{sharded}")
+        built = VectorStoreManager(str(summaries_file), path, embedding_model="local-hash", shard_by_month=sharded)
+        assert built.create_vector_store("sk-first-user")
+        # A second manager loads the published snapshot without any API key
+        loaded = VectorStoreManager(str(summaries_file), path, embedding_model="local-hash", shard_by_month=sharded)
+        assert loaded.create_vector_store(None)
+        for manager in (built, loaded):
+            assert not hasattr(manager, "embeddings")
+            results = manager.similarity_search_with_scores("refund in February 2025", query_vector, k=2, diversify=False)
+            assert len(results) == 2 and results[0]["score"] >= results[1]["score"]
+        if not sharded:
+            assert isinstance(loaded.vector_store.embedding_function, QueryVectorsOnly)